@@ -1,5 +1,8 @@
 import streamlit as st
-import pandas as pd
+
+from componentes.filtros_laterais import filtros_laterais
+from componentes.metricas import concluir_pagina, iniciar_pagina
+from dados import descrever_versao, obter_catalogo
 
 # ========================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -11,6 +14,7 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+iniciar_pagina("inicio")
 
 # ========================================
 # SIDEBAR - NAVEGAÇÃO E INFORMAÇÕES
@@ -31,6 +35,7 @@ with st.sidebar.expander("ℹ️ Sobre o Dashboard", expanded=False):
     - **Análise Interativa:** Filtros dinâmicos e gráficos personalizáveis
     - **Mapa Geográfico:** Visualização espacial dos eventos
     - **Probabilidade por País:** Análise de risco geológico por nação
+    - **Previsão de Tsunami:** Probabilidade prevista por um modelo treinado com o histórico
     
     ### 🧭 Como Usar
     Use o menu lateral para acessar as diferentes páginas do dashboard. Os filtros afetam automaticamente 
@@ -43,32 +48,56 @@ st.sidebar.subheader("🎚️ Filtros Globais")
 
 # Carregar dados
 try:
-    df = pd.read_csv("earthquake_data_tsunami.csv")
+    # Versão atual do catálogo (atualizada em segundo plano)
+    catalogo = obter_catalogo()
+    df = catalogo.eventos
     
-    # Filtro por Magnitude
     min_mag = float(df['magnitude'].min())
     max_mag = float(df['magnitude'].max())
-    magnitude_range = st.sidebar.slider(
-        "Magnitude (Escala Richter)",
-        min_value=min_mag,
-        max_value=max_mag,
-        value=(min_mag, max_mag),
-        step=0.1
-    )
-    
-    # Filtro por Profundidade
     min_depth = float(df['depth'].min())
     max_depth = float(df['depth'].max())
-    depth_range = st.sidebar.slider(
-        "Profundidade (km)",
-        min_value=min_depth,
-        max_value=max_depth,
-        value=(min_depth, max_depth),
-        step=1.0
-    )
     
-    # Filtro por Tsunami
-    tsunami_filter = st.sidebar.checkbox("Mostrar apenas eventos com tsunami", value=False)
+    def controles_filtros():
+        # Filtro por Magnitude
+        magnitude_range = st.slider(
+            "Magnitude (Escala Richter)",
+            min_value=min_mag,
+            max_value=max_mag,
+            value=(min_mag, max_mag),
+            step=0.1
+        )
+        
+        # Filtro por Profundidade
+        depth_range = st.slider(
+            "Profundidade (km)",
+            min_value=min_depth,
+            max_value=max_depth,
+            value=(min_depth, max_depth),
+            step=1.0
+        )
+        
+        # Filtro por Tsunami
+        tsunami_filter = st.checkbox("Mostrar apenas eventos com tsunami", value=False)
+        
+        # Filtro por Eventos Principais (declusterização)
+        apenas_principais = st.toggle(
+            "Apenas eventos principais (sem réplicas)",
+            value=False,
+            key="principais_app",
+            help="Remove as réplicas (eventos dependentes) identificadas pelo método de Gardner–Knopoff"
+        )
+        
+        return {
+            'magnitude': magnitude_range, 'profundidade': depth_range,
+            'tsunami': tsunami_filter, 'apenas_principais': apenas_principais,
+        }
+    
+    # Valores aplicados conforme DASHBOARD_MODO_FILTROS (imediato, lote ou espera)
+    filtros = filtros_laterais("app", controles_filtros)
+    apenas_principais = filtros['apenas_principais']
+    
+    st.sidebar.markdown("---")
+    st.sidebar.caption(f"📦 Versão dos dados: {descrever_versao(catalogo)}")
     
 except Exception as e:
     st.sidebar.error(f"Erro ao carregar dados: {e}")
@@ -113,6 +142,7 @@ Você pode:
 - 🗺️ **Explorar geograficamente** a distribuição dos eventos
 - 📈 **Analisar tendências** ao longo do tempo
 - 🌍 **Comparar riscos** entre diferentes países
+- 🤖 **Estimar a probabilidade de tsunami** de eventos reais ou hipotéticos
 
 ### 🚀 Como Começar
 
@@ -122,25 +152,28 @@ Use o **menu lateral** para navegar entre as diferentes seções do dashboard:
 2. **Análise Interativa** - Filtros dinâmicos e visualizações personalizáveis
 3. **Mapa Geográfico** - Visualização espacial dos eventos sísmicos
 4. **Probabilidade por País** - Análise de risco geológico por nação
+5. **Previsão de Tsunami** - Probabilidade de tsunami estimada por modelo
 
 ---
 """)
 
 # Exibir estatísticas rápidas
 try:
+    df_stats = df[df['principal'] == 1] if apenas_principais else df
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("📊 Total de Eventos", len(df))
+        st.metric("📊 Total de Eventos", len(df_stats))
     
     with col2:
-        st.metric("📈 Magnitude Máxima", f"{df['magnitude'].max():.1f}")
+        st.metric("📈 Magnitude Máxima", f"{df_stats['magnitude'].max():.1f}")
     
     with col3:
-        st.metric("🌊 Eventos com Tsunami", int(df['tsunami'].sum()))
+        st.metric("🌊 Eventos com Tsunami", int(df_stats['tsunami'].sum()))
     
     with col4:
-        st.metric("📍 Profundidade Média", f"{df['depth'].mean():.1f} km")
+        st.metric("📍 Profundidade Média", f"{df_stats['depth'].mean():.1f} km")
         
 except Exception as e:
     st.error(f"Erro ao exibir estatísticas: {e}")
@@ -159,3 +192,5 @@ st.markdown("""
 
 *Dashboard desenvolvido com Streamlit, Plotly e Pandas | Dados sísmicos históricos*
 """)
+
+concluir_pagina()
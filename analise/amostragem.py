@@ -0,0 +1,269 @@
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from dados import config
+from dados.filtros import FiltroEventos, mascara_eventos
+
+# ========================================
+# AMOSTRA ESTRATIFICADA PARA CONSULTAS APROXIMADAS
+# ========================================
+# Em catálogos muito grandes, as páginas mostram primeiro uma estimativa
+# calculada numa amostra e só depois o valor exato. A amostra é sorteada uma
+# vez por versão dos dados, estratificada por ano × tsunami: cada estrato
+# contribui com FRACAO_AMOSTRA dos seus eventos (no mínimo
+# MINIMO_POR_ESTRATO), e cada evento sorteado pesa N_h / n_h.
+#
+# Os eventos de maior magnitude (FRACAO_CERTEZA do catálogo) formam um
+# estrato à parte, incluído por inteiro. Com isso a magnitude máxima é exata
+# sempre que algum deles atende ao filtro; nos demais casos ela é só um
+# limite inferior.
+#
+# Totais usam o estimador estratificado N_h · ȳ_h; médias e proporções são
+# razões de totais, com a variância linearizada. As margens são a metade do
+# intervalo de 95% pela aproximação normal.
+
+MINIMO_POR_ESTRATO = 30
+FRACAO_CERTEZA = 0.001
+Z_95 = 1.959963984540054
+MODOS_CONSULTA_APROXIMADA = ("auto", "sempre", "nunca")
+
+
+@dataclass(frozen=True)
+class Estimativa:
+    """Valor estimado e margem do intervalo de 95% (valor ± margem)."""
+
+    valor: Optional[float]
+    margem: float = 0.0
+    exata: bool = False
+    # Só um mínimo: o máximo da amostra sem nenhum evento do estrato de certeza
+    limite_inferior: bool = False
+
+    def formatar(self, formato="{:.0f}"):
+        if self.valor is None:
+            return "N/A"
+        texto = formato.format(self.valor)
+        if self.exata:
+            return texto
+        if self.limite_inferior:
+            return f"≥ {texto}"
+        return f"{texto} ± {formato.format(self.margem)}"
+
+
+def consulta_aproximada_ativa(catalogo, modo=None):
+    """Se as páginas devem mostrar estimativas antes dos valores exatos."""
+    modo = (modo or config.CONSULTA_APROXIMADA).lower()
+    if modo not in MODOS_CONSULTA_APROXIMADA:
+        raise ValueError(
+            f"Modo de consulta aproximada '{modo}' desconhecido. Opções: {', '.join(MODOS_CONSULTA_APROXIMADA)}"
+        )
+    if modo == "auto":
+        return len(catalogo.eventos) >= config.LINHAS_CONSULTA_APROXIMADA
+    return modo == "sempre"
+
+
+class AmostraEstratificada:
+    """Amostra estratificada (ano × tsunami + estrato de certeza) e seus estimadores."""
+
+    def __init__(self, df, fracao=None, minimo_por_estrato=MINIMO_POR_ESTRATO,
+                 fracao_certeza=FRACAO_CERTEZA, semente=0):
+        fracao = config.FRACAO_AMOSTRA if fracao is None else fracao
+        self.populacao = len(df)
+        magnitude = df['magnitude'].to_numpy(dtype=np.float64)
+        self.limiar_certeza = float(np.quantile(magnitude, 1 - fracao_certeza)) if len(df) else np.inf
+        certeza = magnitude >= self.limiar_certeza
+
+        # O estrato de certeza recebe o código -1 e fica na posição 0
+        anos = df['Year'].to_numpy(dtype=np.int64)
+        combinado = np.where(certeza, -1, (anos - anos.min(initial=0)) * 2 + df['tsunami'].to_numpy(dtype=np.int64))
+        codigos, estrato = np.unique(combinado, return_inverse=True)
+        self.N = np.bincount(estrato).astype(np.float64)
+        self.n = np.where(
+            codigos == -1, self.N, np.minimum(self.N, np.maximum(minimo_por_estrato, np.ceil(fracao * self.N)))
+        )
+        self.certeza_estrato = codigos == -1
+
+        # Sorteio sem reposição: os n_h eventos de menor prioridade em cada estrato
+        prioridade = np.random.default_rng(semente).random(len(df))
+        ordem = np.lexsort((prioridade, estrato))
+        inicio_estrato = np.concatenate(([0], np.cumsum(self.N)[:-1])).astype(np.int64)
+        posicao = np.arange(len(df)) - inicio_estrato[estrato[ordem]]
+        indices = np.sort(ordem[posicao < self.n[estrato[ordem]]])
+
+        self.linhas = df.iloc[indices].reset_index(drop=True)
+        self.estrato = estrato[indices]
+        self.peso = (self.N / self.n)[self.estrato]
+        self.certeza = self.certeza_estrato[self.estrato]
+        # Ano de cada estrato comum (o de certeza atravessa anos, mas tem variância nula)
+        self.anos, self.ano_linha = np.unique(self.linhas['Year'].to_numpy(dtype=np.int64), return_inverse=True)
+        self.ano_estrato = np.zeros(len(self.N), dtype=np.int64)
+        self.ano_estrato[self.estrato] = self.ano_linha
+
+    def __len__(self):
+        return len(self.linhas)
+
+    @property
+    def nbytes(self):
+        return int(self.linhas.memory_usage(index=True, deep=True).sum() + self.peso.nbytes + self.estrato.nbytes)
+
+    def _variancias(self, y):
+        """Variância do estimador do total de y, por estrato."""
+        soma = np.bincount(self.estrato, weights=y, minlength=len(self.N))
+        soma_quadrados = np.bincount(self.estrato, weights=y * y, minlength=len(self.N))
+        media = soma / self.n
+        s2 = np.where(self.n > 1, (soma_quadrados - self.n * media ** 2) / np.maximum(self.n - 1, 1), 0.0)
+        return self.N ** 2 * (1 - self.n / self.N) * np.maximum(s2, 0.0) / self.n
+
+    def _total(self, y):
+        return float(np.dot(self.peso, y)), float(self._variancias(y).sum())
+
+    def _totais_por_ano(self, y):
+        totais = np.bincount(self.ano_linha, weights=self.peso * y, minlength=len(self.anos))
+        variancias = np.bincount(self.ano_estrato, weights=self._variancias(y), minlength=len(self.anos))
+        return totais, variancias
+
+    def _razao(self, y, x):
+        total_y, _ = self._total(y)
+        total_x, _ = self._total(x)
+        if total_x <= 0:
+            return Estimativa(None)
+        razao = total_y / total_x
+        _, variancia = self._total(y - razao * x)
+        return Estimativa(razao, Z_95 * np.sqrt(variancia) / total_x)
+
+    def _maximo(self, valores, mascara):
+        if not mascara.any():
+            return Estimativa(None)
+        if (mascara & self.certeza).any():
+            # Todo evento acima do limiar está no estrato de certeza
+            return Estimativa(float(valores[mascara & self.certeza].max()), exata=True)
+        return Estimativa(float(valores[mascara].max()), limite_inferior=True)
+
+    def resumo(self, filtro=None):
+        """Estimativas das métricas dos cartões: contagens, magnitudes, profundidade e tsunamis."""
+        mascara = mascara_eventos(self.linhas, filtro or FiltroEventos())
+        m = mascara.astype(np.float64)
+        magnitude = self.linhas['magnitude'].to_numpy(dtype=np.float64)
+        tsunami = self.linhas['tsunami'].to_numpy(dtype=np.float64)
+
+        total, variancia_total = self._total(m)
+        tsunamis, variancia_tsunamis = self._total(m * tsunami)
+        return {
+            'total': Estimativa(total, Z_95 * np.sqrt(variancia_total)),
+            'tsunamis': Estimativa(tsunamis, Z_95 * np.sqrt(variancia_tsunamis)),
+            'fracao_tsunami': self._razao(m * tsunami, m),
+            'magnitude_max': self._maximo(magnitude, mascara),
+            'magnitude_media': self._razao(m * magnitude, m),
+            'profundidade_media': self._razao(m * self.linhas['depth'].to_numpy(dtype=np.float64), m),
+            'latitude_media': self._razao(m * self.linhas['latitude'].to_numpy(dtype=np.float64), m),
+            'longitude_media': self._razao(m * self.linhas['longitude'].to_numpy(dtype=np.float64), m),
+            'amostra': int(mascara.sum()),
+        }
+
+    def agregar_por_ano(self, filtro=None):
+        """Mesmas colunas de ``agregar_por_ano`` (year, max_mag, mean_mag, count) e as margens."""
+        mascara = mascara_eventos(self.linhas, filtro or FiltroEventos())
+        m = mascara.astype(np.float64)
+        magnitude = self.linhas['magnitude'].to_numpy(dtype=np.float64)
+
+        contagem, variancia_contagem = self._totais_por_ano(m)
+        soma_magnitude, _ = self._totais_por_ano(m * magnitude)
+        com_eventos = contagem > 0
+        media = np.divide(soma_magnitude, contagem, out=np.full(len(contagem), np.nan), where=com_eventos)
+        residuo = m * (magnitude - np.nan_to_num(media)[self.ano_linha])
+        _, variancia_media = self._totais_por_ano(residuo)
+
+        maximo = pd.Series(np.where(mascara, magnitude, -np.inf)).groupby(self.ano_linha).max()
+        maximo_exato = pd.Series(mascara & self.certeza).groupby(self.ano_linha).any()
+        df_yearly = pd.DataFrame({
+            'year': self.anos,
+            'max_mag': maximo.reindex(range(len(self.anos))).to_numpy(),
+            'mean_mag': media,
+            'count': contagem,
+            'count_margem': Z_95 * np.sqrt(variancia_contagem),
+            'mean_mag_margem': Z_95 * np.sqrt(variancia_media) / np.where(com_eventos, contagem, 1.0),
+            'max_exato': maximo_exato.reindex(range(len(self.anos))).to_numpy(),
+        })
+        return df_yearly[com_eventos].reset_index(drop=True)
+
+    def pontos(self, filtro=None):
+        """Eventos da amostra que atendem ao filtro, com o peso de cada um (coluna ``peso``)."""
+        mascara = mascara_eventos(self.linhas, filtro or FiltroEventos())
+        return self.linhas[mascara].assign(peso=self.peso[mascara])
+
+
+def construir_amostra(catalogo):
+    return AmostraEstratificada(catalogo.eventos)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tempo e cobertura dos intervalos das consultas aproximadas.")
+    parser.add_argument("--linhas", type=int, default=5_000_000)
+    parser.add_argument("--fracao", type=float, default=None, help="fração por estrato (padrão: DASHBOARD_FRACAO_AMOSTRA)")
+    parser.add_argument("--sorteios", type=int, default=20, help="amostras independentes para medir a cobertura")
+    argumentos = parser.parse_args()
+
+    gerador = np.random.default_rng(0)
+    n = argumentos.linhas
+    df = pd.DataFrame({
+        'magnitude': np.round(6.5 + gerador.exponential(0.4, n), 1),
+        'depth': np.round(gerador.exponential(60, n), 2),
+        'latitude': gerador.uniform(-70, 70, n),
+        'longitude': gerador.uniform(-180, 180, n),
+        'Year': gerador.integers(1995, 2024, n),
+        'Month': gerador.integers(1, 13, n),
+        'tsunami': (gerador.random(n) < 0.3).astype(np.int64),
+        'principal': (gerador.random(n) < 0.6).astype(np.int64),
+    })
+
+    inicio = time.perf_counter()
+    amostra = AmostraEstratificada(df, fracao=argumentos.fracao)
+    print(f"Amostra de {len(amostra):,} de {n:,} eventos ({len(amostra.N)} estratos) em "
+          f"{time.perf_counter() - inicio:.2f} s, {amostra.nbytes / 2**20:.1f} MiB")
+
+    # Amostras independentes (outras sementes) para medir a cobertura dos intervalos
+    sorteios = [
+        AmostraEstratificada(df, fracao=argumentos.fracao, semente=semente + 1)
+        for semente in range(argumentos.sorteios)
+    ]
+
+    filtros = [
+        FiltroEventos(),
+        FiltroEventos(magnitude=(7.0, None), apenas_principais=True),
+        FiltroEventos(magnitude=(6.8, 7.4), profundidade=(0.0, 70.0), anos=(2010, 2012)),
+        FiltroEventos(magnitude=(7.0, None), bbox=(-60.0, 10.0, -90.0, -30.0)),
+    ]
+    metricas = ('total', 'tsunamis', 'fracao_tsunami', 'magnitude_media', 'profundidade_media')
+    print(f"{'filtro':<62} {'exato ms':>9} {'aprox ms':>9} " + " ".join(f"{m:>19}" for m in metricas))
+    for filtro in filtros:
+        inicio = time.perf_counter()
+        filtrado = df[mascara_eventos(df, filtro)]
+        exatos = {
+            'total': len(filtrado), 'tsunamis': filtrado['tsunami'].sum(),
+            'fracao_tsunami': filtrado['tsunami'].mean(), 'magnitude_media': filtrado['magnitude'].mean(),
+            'profundidade_media': filtrado['depth'].mean(),
+        }
+        segundos_exato = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        amostra.resumo(filtro)
+        segundos_aproximado = time.perf_counter() - inicio
+
+        # Cobertura: em quantos sorteios o intervalo de 95% contém o valor exato
+        cobertura = dict.fromkeys(metricas, 0)
+        for sorteio in sorteios:
+            resumo = sorteio.resumo(filtro)
+            for metrica in metricas:
+                estimativa = resumo[metrica]
+                if estimativa.valor is not None and abs(estimativa.valor - exatos[metrica]) <= estimativa.margem + 1e-6:
+                    cobertura[metrica] += 1
+
+        descricao = ", ".join(f"{k}={v}" for k, v in vars(filtro).items() if v not in (None, False)) or "(todos)"
+        print(f"{descricao:<62} {segundos_exato * 1000:>9.1f} {segundos_aproximado * 1000:>9.1f} " + " ".join(
+            f"{cobertura[m] / argumentos.sorteios:>18.0%} " for m in metricas
+        ))
+    print("Colunas de métricas: fração dos sorteios em que o intervalo de 95% contém o valor exato.")
@@ -0,0 +1,195 @@
+import argparse
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from analise.amostragem import construir_amostra, consulta_aproximada_ativa
+from analise.distribuicoes import construir_distribuicoes
+from analise.limites_placas import construir_colunas_limites, construir_taxa_por_limite
+from analise.linha_do_tempo import LinhaDoTempo
+from analise.serie_temporal import construir_serie
+from analise.simulacao_perigo import obter_simulacao
+from dados import config
+from dados.filtros import FiltroEventos
+from dados.regioes import construir_regioes
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# AQUECIMENTO DOS CACHES
+# ========================================
+# Cada versão publicada do catálogo é aquecida em segundo plano, num pool de
+# THREADS_AQUECIMENTO threads, antes que as páginas peçam os resultados:
+#
+#   - os derivados que as páginas guardam no cache em disco (mesmos nomes
+#     usados nas chamadas a ``catalogo.derivado``), inclusive a simulação de
+#     perigo da página 05;
+#   - resumo, agregação por ano e eventos dos filtros que as páginas 02 a 04
+#     aplicam antes de qualquer interação, com e sem réplicas;
+#   - os FILTROS_AQUECIMENTO filtros mais consultados, contados pelo cache
+#     em disco ao longo das execuções anteriores;
+#   - os quadros anuais da linha do tempo do mapa no filtro inicial.
+#
+# Se o cache em disco já tem a versão (um reinício com os mesmos dados), o
+# aquecimento só lê os arquivos e monta os índices em memória.
+
+_executor = None
+
+
+def filtros_iniciais(catalogo):
+    """Filtros aplicados pelas páginas 02 a 04 com os controles nos valores iniciais."""
+    magnitude = catalogo.limites['magnitude']
+    profundidade = catalogo.limites['profundidade']
+    filtros = []
+    for principais in (False, True):
+        filtros += [
+            FiltroEventos(apenas_principais=principais),
+            FiltroEventos(magnitude=magnitude, profundidade=profundidade, apenas_principais=principais),
+            FiltroEventos(magnitude=(magnitude[0], None), apenas_principais=principais),
+        ]
+    return filtros
+
+
+def tarefas_aquecimento(catalogo, filtros_frequentes=()):
+    """Funções sem argumentos que, executadas, deixam os caches prontos para ``catalogo``."""
+    tarefas = [
+        lambda: catalogo.derivado("limites_placas", construir_colunas_limites, persistir=True),
+        lambda: catalogo.derivado("regioes_risco", construir_regioes, persistir=True),
+        lambda: obter_simulacao(catalogo),
+    ]
+
+    for principais, sufixo in ((False, ""), (True, ":principais")):
+        tarefas += [
+            lambda p=principais, s=sufixo: catalogo.derivado(
+                f"distribuicoes{s}", lambda c: construir_distribuicoes(c, p), persistir=True
+            ),
+            lambda p=principais, s=sufixo: catalogo.derivado(
+                f"descricao{s}", lambda c: _descrever(c, p), persistir=True
+            ),
+            lambda p=principais, s=sufixo: catalogo.derivado(
+                f"serie_mensal{s}", lambda c: construir_serie(c, p), persistir=True
+            ),
+            lambda p=principais, s=sufixo: catalogo.derivado(
+                f"taxa_por_limite{s}", lambda c: construir_taxa_por_limite(c, p), persistir=True
+            ),
+        ]
+    if consulta_aproximada_ativa(catalogo):
+        tarefas.append(lambda: catalogo.derivado("amostra_estratificada", construir_amostra, persistir=True))
+
+    filtros = list(dict.fromkeys(filtros_iniciais(catalogo) + list(filtros_frequentes)))
+    for filtro in filtros:
+        tarefas.append(lambda f=filtro: _consultar(catalogo.backend, f))
+
+    filtro_mapa = filtros_iniciais(catalogo)[2]
+    tarefas.append(lambda: catalogo.derivado(
+        "linha_do_tempo:ano", lambda c: LinhaDoTempo(c.eventos, "ano")
+    ).quadros(filtro_mapa))
+    return tarefas
+
+
+def _descrever(catalogo, apenas_principais):
+    # Mesma tabela da seção de estatísticas descritivas da página 02
+    eventos = catalogo.eventos
+    if apenas_principais:
+        eventos = eventos[eventos['principal'] == 1]
+    return eventos.describe()
+
+
+def _consultar(backend, filtro):
+    if hasattr(backend, 'aquecer'):
+        # Consultas pelo cache em disco, sem entrar na contagem de filtros mais usados
+        backend.aquecer(filtro)
+        return
+    backend.resumo(filtro)
+    backend.agregar_por_ano(filtro)
+    backend.filtrar(filtro)
+
+
+def aquecer(catalogo, threads=None):
+    """Executa o aquecimento de ``catalogo`` e espera terminar; retorna o número de tarefas."""
+    from dados.cache_disco import obter_cache
+
+    cache = obter_cache()
+    frequentes = cache.filtros_frequentes(config.FILTROS_AQUECIMENTO) if cache is not None else ()
+    tarefas = tarefas_aquecimento(catalogo, frequentes)
+    with ThreadPoolExecutor(max_workers=threads or config.THREADS_AQUECIMENTO,
+                            thread_name_prefix="aquecimento") as executor:
+        for futuro in [executor.submit(tarefa) for tarefa in tarefas]:
+            try:
+                futuro.result()
+            except Exception:
+                logger.exception("Falha numa tarefa de aquecimento")
+    return len(tarefas)
+
+
+def aquecer_em_segundo_plano(catalogo):
+    """Ouvinte de ``GerenciadorCatalogo.ao_publicar``: aquece sem bloquear a publicação."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aquecimento-versao")
+
+    def executar():
+        inicio = time.perf_counter()
+        tarefas = aquecer(catalogo)
+        logger.info("Versão %s aquecida: %d tarefas em %.1f s", catalogo.versao, tarefas,
+                    time.perf_counter() - inicio)
+
+    _executor.submit(executar)
+
+
+if __name__ == "__main__":
+    from dados import cache_disco
+    from dados.catalogo import COLUNAS_EVENTOS, construir_catalogo
+
+    parser = argparse.ArgumentParser(
+        description="Início a frio × com o cache em disco: leitura do catálogo e aquecimento."
+    )
+    parser.add_argument("--linhas", type=int, default=None,
+                        help="catálogo sintético com este número de eventos (padrão: os CSVs do dashboard)")
+    parser.add_argument("--threads", type=int, default=None, help="padrão: DASHBOARD_THREADS_AQUECIMENTO")
+    parser.add_argument("--diretorio", default=None,
+                        help="cache em disco a aquecer (padrão: um diretório temporário, descartado ao final)")
+    argumentos = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporario:
+        arquivo_eventos = None
+        if argumentos.linhas:
+            gerador = np.random.default_rng(0)
+            n = argumentos.linhas
+            df = pd.DataFrame({
+                'magnitude': np.round(6.5 + gerador.exponential(0.4, n), 1),
+                'depth': np.round(gerador.exponential(60, n), 2),
+                'latitude': gerador.uniform(-70, 70, n),
+                'longitude': gerador.uniform(-180, 180, n),
+                'Year': gerador.integers(1995, 2024, n),
+                'Month': gerador.integers(1, 13, n),
+                'tsunami': (gerador.random(n) < 0.3).astype(np.int64),
+            })
+            arquivo_eventos = os.path.join(temporario, "eventos.csv")
+            df[COLUNAS_EVENTOS].to_csv(arquivo_eventos, index=False)
+
+        config.CACHE_DISCO = True
+        config.DIRETORIO_CACHE_DISCO = argumentos.diretorio or os.path.join(temporario, "derivados")
+
+        print(f"{'início':>8} {'catálogo s':>11} {'aquecimento s':>14} {'tarefas':>8} {'acertos':>8} {'faltas':>7}")
+        for rotulo in ("frio", "quente"):
+            # Cada rodada começa como um processo novo: só o disco é reaproveitado
+            cache_disco._cache = None
+            inicio = time.perf_counter()
+            catalogo = construir_catalogo(arquivo_eventos)
+            segundos_catalogo = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            tarefas = aquecer(catalogo, argumentos.threads)
+            segundos_aquecimento = time.perf_counter() - inicio
+
+            estatisticas = cache_disco.obter_cache().estatisticas()
+            print(f"{rotulo:>8} {segundos_catalogo:>11.2f} {segundos_aquecimento:>14.2f} {tarefas:>8} "
+                  f"{estatisticas['acertos']:>8} {estatisticas['faltas']:>7}")
+
+        print(f"Cache em disco: {estatisticas['arquivos']} arquivos, {estatisticas['bytes'] / 2**20:.1f} MiB")
@@ -0,0 +1,145 @@
+import argparse
+import json
+import time
+from math import lcm
+
+import numpy as np
+import pandas as pd
+
+# ========================================
+# DISTRIBUIÇÕES PRÉ-AGREGADAS PARA OS GRÁFICOS
+# ========================================
+# Em vez de enviar cada valor ao navegador para o Plotly agrupar no cliente,
+# os histogramas e o box plot da visão geral são montados a partir de
+# contagens e quartis calculados no servidor, uma vez por versão dos dados.
+#
+# O histograma é contado uma única vez na largura mais fina; as larguras
+# maiores são múltiplas dela e saem somando faixas vizinhas, sem voltar
+# aos eventos. A origem das faixas é alinhada a todas as larguras.
+
+LARGURAS_MAGNITUDE = (0.05, 0.1, 0.2, 0.5)
+LIMITE_PONTOS_EXTREMOS = 200
+
+
+def histograma_multiresolucao(valores, larguras=LARGURAS_MAGNITUDE):
+    """Contagens por faixa para cada largura, a partir de uma única contagem.
+
+    Retorna ``{largura: DataFrame(inicio, fim, contagem)}``. Cada largura
+    precisa ser múltipla inteira da menor.
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    valores = valores[np.isfinite(valores)]
+    larguras = sorted(larguras)
+    fina = larguras[0]
+
+    multiplos = [int(round(largura / fina)) for largura in larguras]
+    if any(not np.isclose(m * fina, largura) for m, largura in zip(multiplos, larguras)):
+        raise ValueError(f"larguras {larguras} não são múltiplas de {fina}")
+
+    if len(valores) == 0:
+        vazio = pd.DataFrame({'inicio': [], 'fim': [], 'contagem': []})
+        return {largura: vazio for largura in larguras}
+
+    # Origem e quantidade de faixas finas alinhadas a todas as larguras
+    passo_comum = lcm(*multiplos)
+    origem = np.floor(valores.min() / (fina * passo_comum)) * fina * passo_comum
+    posicao = np.floor((valores - origem) / fina + 1e-9).astype(np.int64)
+    n_faixas = int(np.ceil((posicao.max() + 1) / passo_comum)) * passo_comum
+    contagem_fina = np.bincount(posicao, minlength=n_faixas)
+
+    resultado = {}
+    for largura, multiplo in zip(larguras, multiplos):
+        contagem = contagem_fina.reshape(-1, multiplo).sum(axis=1)
+        ocupadas = np.flatnonzero(contagem)
+        contagem = contagem[ocupadas[0]:ocupadas[-1] + 1]
+        inicio = origem + (ocupadas[0] + np.arange(len(contagem))) * largura
+        resultado[largura] = pd.DataFrame({
+            'inicio': np.round(inicio, 10),
+            'fim': np.round(inicio + largura, 10),
+            'contagem': contagem,
+        })
+    return resultado
+
+
+def estatisticas_caixa(valores, limite_extremos=LIMITE_PONTOS_EXTREMOS):
+    """Quartis, média, limites dos bigodes (1,5 × IQR) e pontos extremos.
+
+    Os quartis usam interpolação linear, o mesmo método padrão do Plotly.
+    Se houver mais de ``limite_extremos`` pontos fora dos bigodes, apenas os
+    mais afastados da mediana são mantidos.
+    """
+    valores = np.sort(np.asarray(valores, dtype=np.float64))
+    valores = valores[np.isfinite(valores)]
+    if len(valores) == 0:
+        return None
+
+    q1, mediana, q3 = np.percentile(valores, [25, 50, 75])
+    iqr = q3 - q1
+    dentro = valores[(valores >= q1 - 1.5 * iqr) & (valores <= q3 + 1.5 * iqr)]
+    bigode_inferior, bigode_superior = float(dentro[0]), float(dentro[-1])
+
+    extremos = valores[(valores < bigode_inferior) | (valores > bigode_superior)]
+    total_extremos = len(extremos)
+    if total_extremos > limite_extremos:
+        mais_afastados = np.argsort(-np.abs(extremos - mediana), kind='stable')[:limite_extremos]
+        extremos = np.sort(extremos[mais_afastados])
+
+    return {
+        'q1': float(q1),
+        'mediana': float(mediana),
+        'q3': float(q3),
+        'media': float(valores.mean()),
+        'bigode_inferior': bigode_inferior,
+        'bigode_superior': bigode_superior,
+        'extremos': extremos.tolist(),
+        'total_extremos': total_extremos,
+        'eventos': len(valores),
+    }
+
+
+def construir_distribuicoes(catalogo, apenas_principais=False):
+    """Construtor para ``Catalogo.derivado``: payloads dos gráficos da visão geral."""
+    eventos = catalogo.eventos
+    if apenas_principais:
+        eventos = eventos[eventos['principal'] == 1]
+    return {
+        'magnitude': histograma_multiresolucao(eventos['magnitude']),
+        'profundidade': estatisticas_caixa(eventos['depth']),
+    }
+
+
+def tamanho_payload(distribuicoes):
+    """Quantidade de números enviados ao navegador pelos gráficos."""
+    histogramas = sum(3 * len(h) for h in distribuicoes['magnitude'].values())
+    caixa = distribuicoes['profundidade']
+    return histogramas + (7 + len(caixa['extremos']) if caixa else 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede os agregados dos gráficos da visão geral.")
+    parser.add_argument("--linhas", type=int, default=5_000_000)
+    argumentos = parser.parse_args()
+
+    gerador = np.random.default_rng(0)
+    n = argumentos.linhas
+    magnitude = np.round(6.5 + gerador.exponential(0.4, n), 1)
+    profundidade = gerador.exponential(60, n)
+
+    inicio = time.perf_counter()
+    histogramas = histograma_multiresolucao(magnitude)
+    caixa = estatisticas_caixa(profundidade)
+    segundos = time.perf_counter() - inicio
+
+    distribuicoes = {'magnitude': histogramas, 'profundidade': caixa}
+    payload = json.dumps({
+        'magnitude': {str(k): v.to_dict('list') for k, v in histogramas.items()}, 'profundidade': caixa
+    })
+    print(f"{n:,} eventos agregados em {segundos:.2f} s: {tamanho_payload(distribuicoes)} números "
+          f"({len(payload) / 1024:.1f} KiB) contra {2 * n:,} valores brutos")
+
+    # Conferência contra o np.histogram em cada largura
+    for largura, tabela in histogramas.items():
+        bordas = np.append(tabela['inicio'].to_numpy(), tabela['fim'].iloc[-1])
+        esperado, _ = np.histogram(magnitude + 1e-9, bins=bordas)
+        assert (esperado == tabela['contagem'].to_numpy()).all(), f"divergência na largura {largura}"
+    print("Histogramas conferidos com np.histogram.")
@@ -0,0 +1,296 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from analise.vizinhos import posicao_unitaria
+from dados import config
+
+# ========================================
+# DISTÂNCIA AO LIMITE DE PLACA MAIS PRÓXIMO
+# ========================================
+# O arquivo ``limites_placas.csv`` traz um traçado simplificado dos
+# principais limites de placas como polilinhas, cada uma com o seu tipo.
+# As polilinhas são divididas em segmentos curtos de arco de grande círculo.
+#
+# O índice é uma grade lat/lon em que cada célula guarda (formato CSR) os
+# únicos segmentos que podem ser o mais próximo de algum ponto dela: se o
+# segmento mais próximo do centro está a ``d`` km e a célula tem raio ``r``,
+# nenhum ponto da célula está a mais de ``d + r`` desse segmento, e um
+# segmento a mais de ``d + 2r`` do centro nunca fica mais perto do que isso.
+# Na consulta, cada grupo de eventos da mesma célula compara apenas com os
+# seus candidatos, em blocos de tamanho fixo.
+
+RAIO_TERRA_KM = 6371.0
+
+TIPOS_LIMITE = ('subducção', 'transformante', 'divergente', 'colisão')
+
+# Faixas de distância usadas nas agregações (km); a última é aberta
+FAIXAS_DISTANCIA_KM = (0, 50, 100, 250, 500, 1000)
+
+COMPRIMENTO_SEGMENTO_KM = 50.0
+TAMANHO_CELULA_GRAUS = 2.0
+ELEMENTOS_POR_BLOCO = 2_000_000
+PASSO_MAGNITUDE = 0.1
+
+
+def carregar_limites_placas(caminho=None):
+    return pd.read_csv(caminho or config.ARQUIVO_LIMITES_PLACAS)
+
+
+def rotulos_faixas(faixas=FAIXAS_DISTANCIA_KM):
+    rotulos = [f"{inicio}–{fim} km" for inicio, fim in zip(faixas[:-1], faixas[1:])]
+    return rotulos + [f"> {faixas[-1]} km"]
+
+
+def _densificar(limites, comprimento_max_km):
+    """Extremidades (vetores unitários) dos segmentos curtos de cada polilinha."""
+    inicios, fins, tipos, codigos = [], [], [], []
+    nomes = []
+
+    for nome, vertices in limites.groupby('Limite', sort=False):
+        tipo = TIPOS_LIMITE.index(vertices['Tipo'].iloc[0])
+        pontos = posicao_unitaria(vertices['latitude'], vertices['longitude'])
+        for a, b in zip(pontos[:-1], pontos[1:]):
+            angulo = float(np.arccos(np.clip(a @ b, -1.0, 1.0)))
+            if angulo < 1e-12:
+                continue
+            partes = max(int(np.ceil(angulo * RAIO_TERRA_KM / comprimento_max_km)), 1)
+
+            # Interpolação esférica entre os vértices
+            t = np.linspace(0, 1, partes + 1)[:, None]
+            arco = (np.sin((1 - t) * angulo) * a + np.sin(t * angulo) * b) / np.sin(angulo)
+            inicios.append(arco[:-1])
+            fins.append(arco[1:])
+            tipos.extend([tipo] * partes)
+            codigos.extend([len(nomes)] * partes)
+        nomes.append(nome)
+
+    return np.vstack(inicios), np.vstack(fins), np.asarray(tipos), np.asarray(codigos), nomes
+
+
+class IndiceLimitesPlacas:
+    """Segmentos dos limites de placas com candidatos pré-calculados por célula."""
+
+    def __init__(self, limites, tamanho_celula=TAMANHO_CELULA_GRAUS, comprimento_max_km=COMPRIMENTO_SEGMENTO_KM):
+        self.inicio, self.fim, self.tipo, self.limite, self.nomes_limites = _densificar(limites, comprimento_max_km)
+
+        # Normal do plano de cada arco e os vetores que delimitam o arco nesse plano:
+        # P está "dentro" do arco quando P·(N×A) ≥ 0 e P·(B×N) ≥ 0
+        normal = np.cross(self.inicio, self.fim)
+        self.normal = normal / np.linalg.norm(normal, axis=1, keepdims=True)
+        self.borda_inicio = np.cross(self.normal, self.inicio)
+        self.borda_fim = np.cross(self.fim, self.normal)
+
+        self.tamanho_celula = tamanho_celula
+        self.n_linhas = int(np.ceil(180 / tamanho_celula))
+        self.n_colunas = int(np.ceil(360 / tamanho_celula))
+        self._construir_candidatos()
+
+    def __len__(self):
+        return len(self.inicio)
+
+    def _construir_candidatos(self):
+        linhas, colunas = np.divmod(np.arange(self.n_linhas * self.n_colunas), self.n_colunas)
+        lat_sul = -90 + linhas * self.tamanho_celula
+        lat_norte = np.minimum(lat_sul + self.tamanho_celula, 90)
+        lon_oeste = -180 + colunas * self.tamanho_celula
+        lon_leste = np.minimum(lon_oeste + self.tamanho_celula, 180)
+        centro = posicao_unitaria((lat_sul + lat_norte) / 2, (lon_oeste + lon_leste) / 2)
+
+        # Raio da célula: distância do centro ao canto mais afastado
+        raio = RAIO_TERRA_KM * np.arccos(np.clip(np.minimum(
+            np.einsum('ij,ij->i', centro, posicao_unitaria(lat_sul, lon_oeste)),
+            np.einsum('ij,ij->i', centro, posicao_unitaria(lat_norte, lon_oeste)),
+        ), -1.0, 1.0))
+
+        todos = np.arange(len(self))
+        candidatos, quantidades = [], []
+        passo = max(ELEMENTOS_POR_BLOCO // len(self), 1)
+        for inicio in range(0, len(centro), passo):
+            matriz = self.distancias(centro[inicio:inicio + passo], todos)
+            limite = matriz.min(axis=1) + 2 * raio[inicio:inicio + passo]
+            celula, segmento = np.nonzero(matriz <= limite[:, None])
+            candidatos.append(segmento)
+            quantidades.append(np.bincount(celula, minlength=len(matriz)))
+
+        self.candidatos = np.concatenate(candidatos)
+        self.ponteiros = np.concatenate([[0], np.cumsum(np.concatenate(quantidades))])
+
+    def _celula(self, latitude, longitude):
+        linha = np.clip(((np.asarray(latitude) + 90) // self.tamanho_celula).astype(np.int64), 0, self.n_linhas - 1)
+        coluna = np.clip(((np.asarray(longitude) + 180) // self.tamanho_celula).astype(np.int64), 0, self.n_colunas - 1)
+        return linha * self.n_colunas + coluna
+
+    def distancias(self, pontos, segmentos):
+        """Matriz de distâncias (km) entre pontos unitários e segmentos de arco."""
+        seno_transversal = np.abs(pontos @ self.normal[segmentos].T)
+        dentro = (pontos @ self.borda_inicio[segmentos].T >= 0) & (pontos @ self.borda_fim[segmentos].T >= 0)
+
+        ate_inicio = np.arccos(np.clip(pontos @ self.inicio[segmentos].T, -1.0, 1.0))
+        ate_fim = np.arccos(np.clip(pontos @ self.fim[segmentos].T, -1.0, 1.0))
+        angulo = np.where(dentro, np.arcsin(np.clip(seno_transversal, 0.0, 1.0)), np.minimum(ate_inicio, ate_fim))
+        return angulo * RAIO_TERRA_KM
+
+    def mais_proximo(self, latitude, longitude):
+        """Distância (km) e segmento do limite mais próximo de cada ponto."""
+        pontos = posicao_unitaria(latitude, longitude)
+        celula = self._celula(latitude, longitude)
+
+        ordem = np.argsort(celula, kind='stable')
+        cortes = np.flatnonzero(np.diff(celula[ordem])) + 1
+
+        distancia = np.empty(len(pontos))
+        segmento = np.empty(len(pontos), dtype=np.int64)
+        if len(pontos) == 0:
+            return distancia, segmento
+
+        for grupo in np.split(ordem, cortes):
+            c = celula[grupo[0]]
+            candidatos = self.candidatos[self.ponteiros[c]:self.ponteiros[c + 1]]
+
+            passo = max(ELEMENTOS_POR_BLOCO // len(candidatos), 1)
+            for inicio in range(0, len(grupo), passo):
+                bloco = grupo[inicio:inicio + passo]
+                matriz = self.distancias(pontos[bloco], candidatos)
+                melhor = np.argmin(matriz, axis=1)
+                distancia[bloco] = matriz[np.arange(len(bloco)), melhor]
+                segmento[bloco] = candidatos[melhor]
+
+        return distancia, segmento
+
+
+# ========================================
+# COLUNAS DERIVADAS E AGREGAÇÃO POR TIPO
+# ========================================
+
+
+def construir_indice_limites(catalogo=None):
+    """Construtor para ``Catalogo.derivado``."""
+    return IndiceLimitesPlacas(carregar_limites_placas())
+
+
+def construir_colunas_limites(catalogo):
+    """Distância e tipo do limite mais próximo, alinhados a ``catalogo.eventos``."""
+    indice = catalogo.derivado("indice_limites_placas", construir_indice_limites)
+    eventos = catalogo.eventos
+    distancia, segmento = indice.mais_proximo(eventos['latitude'], eventos['longitude'])
+
+    return pd.DataFrame({
+        'distancia_limite_km': distancia,
+        'tipo_limite': pd.Categorical.from_codes(indice.tipo[segmento], categories=list(TIPOS_LIMITE)),
+        'limite': pd.Categorical.from_codes(indice.limite[segmento], categories=indice.nomes_limites),
+    }, index=eventos.index)
+
+
+class TaxaTsunamiPorLimite:
+    """Contagens por (tipo de limite, faixa de distância, magnitude) com somas acumuladas.
+
+    As contagens são montadas uma vez; a taxa de tsunamis para qualquer
+    magnitude mínima sai das somas acumuladas do fim para o início no eixo
+    da magnitude, sem voltar aos eventos.
+    """
+
+    def __init__(self, eventos, colunas_limites, faixas=FAIXAS_DISTANCIA_KM):
+        self.faixas = faixas
+        self.rotulos_faixas = rotulos_faixas(faixas)
+
+        magnitude = eventos['magnitude'].to_numpy(dtype=np.float64)
+        self.magnitude_inicial = np.floor(magnitude.min() / PASSO_MAGNITUDE) * PASSO_MAGNITUDE if len(magnitude) else 0.0
+        posicao_magnitude = np.floor((magnitude - self.magnitude_inicial) / PASSO_MAGNITUDE + 1e-9).astype(np.int64)
+        n_magnitudes = int(posicao_magnitude.max()) + 1 if len(magnitude) else 1
+
+        tipo = colunas_limites['tipo_limite'].cat.codes.to_numpy()
+        faixa = np.searchsorted(np.asarray(faixas[1:]), colunas_limites['distancia_limite_km'].to_numpy(), 'left')
+        forma = (len(TIPOS_LIMITE), len(self.rotulos_faixas), n_magnitudes)
+        chave = np.ravel_multi_index((tipo, faixa, posicao_magnitude), forma)
+
+        eventos_por_chave = np.bincount(chave, minlength=np.prod(forma)).reshape(forma)
+        tsunamis_por_chave = np.bincount(
+            chave, weights=eventos['tsunami'].to_numpy(), minlength=np.prod(forma)
+        ).reshape(forma)
+
+        # acumulado[..., k] = soma das magnitudes a partir da faixa k
+        self.acumulado_eventos = np.cumsum(eventos_por_chave[..., ::-1], axis=2)[..., ::-1]
+        self.acumulado_tsunamis = np.cumsum(tsunamis_por_chave[..., ::-1], axis=2)[..., ::-1]
+
+    def tabela(self, magnitude_min=None):
+        """Eventos, tsunamis e taxa por tipo de limite e faixa de distância."""
+        k = 0
+        if magnitude_min is not None:
+            k = int(np.ceil((magnitude_min - self.magnitude_inicial) / PASSO_MAGNITUDE - 1e-9))
+        k = max(k, 0)
+
+        n_magnitudes = self.acumulado_eventos.shape[2]
+        if k >= n_magnitudes:
+            eventos = np.zeros(self.acumulado_eventos.shape[:2], dtype=np.int64)
+            tsunamis = np.zeros(self.acumulado_eventos.shape[:2])
+        else:
+            eventos = self.acumulado_eventos[..., k]
+            tsunamis = self.acumulado_tsunamis[..., k]
+
+        tipo, faixa = np.meshgrid(np.arange(len(TIPOS_LIMITE)), np.arange(len(self.rotulos_faixas)), indexing='ij')
+        with np.errstate(invalid='ignore', divide='ignore'):
+            taxa = np.where(eventos > 0, tsunamis / eventos, np.nan)
+
+        return pd.DataFrame({
+            'tipo_limite': pd.Categorical(np.asarray(TIPOS_LIMITE)[tipo.ravel()], categories=list(TIPOS_LIMITE)),
+            'faixa_distancia': pd.Categorical(
+                np.asarray(self.rotulos_faixas)[faixa.ravel()], categories=self.rotulos_faixas
+            ),
+            'eventos': eventos.ravel().astype(np.int64),
+            'tsunamis': np.round(tsunamis.ravel()).astype(np.int64),
+            'taxa_tsunami': taxa.ravel(),
+        })
+
+
+def construir_taxa_por_limite(catalogo, apenas_principais=False):
+    """Construtor para ``Catalogo.derivado``.
+
+    Usa apenas os anos em que o catálogo registra algum tsunami; nos demais
+    a coluna ``tsunami`` é sempre 0 e diluiria as taxas.
+    """
+    eventos = catalogo.eventos
+    colunas = catalogo.derivado("limites_placas", construir_colunas_limites, persistir=True)
+
+    selecao = eventos.groupby('Year')['tsunami'].transform('max').to_numpy() == 1
+    if apenas_principais:
+        selecao &= (eventos['principal'] == 1).to_numpy()
+    return TaxaTsunamiPorLimite(eventos[selecao], colunas[selecao])
+
+
+def _busca_exaustiva(indice, latitude, longitude):
+    pontos = posicao_unitaria(latitude, longitude)
+    todos = np.arange(len(indice))
+    return np.concatenate([
+        indice.distancias(pontos[i:i + 256], todos).min(axis=1) for i in range(0, len(pontos), 256)
+    ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede a distância ao limite de placa mais próximo.")
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    argumentos = parser.parse_args()
+
+    inicio = time.perf_counter()
+    indice = IndiceLimitesPlacas(carregar_limites_placas())
+    print(f"Índice com {len(indice):,} segmentos de até {COMPRIMENTO_SEGMENTO_KM:.0f} km construído em "
+          f"{time.perf_counter() - inicio:.2f} s ({len(indice.candidatos) / (len(indice.ponteiros) - 1):.1f} "
+          f"candidatos por célula em média)")
+
+    gerador = np.random.default_rng(0)
+    n = argumentos.linhas
+    latitude = np.degrees(np.arcsin(gerador.uniform(-1, 1, n)))
+    longitude = gerador.uniform(-180, 180, n)
+
+    inicio = time.perf_counter()
+    distancia, segmento = indice.mais_proximo(latitude, longitude)
+    print(f"{n:,} eventos em {time.perf_counter() - inicio:.2f} s · "
+          f"distância mediana {np.median(distancia):.0f} km")
+
+    # Conferência contra a comparação com todos os segmentos
+    amostra = gerador.choice(n, 2000, replace=False)
+    esperado = _busca_exaustiva(indice, latitude[amostra], longitude[amostra])
+    assert np.allclose(esperado, distancia[amostra]), "divergência em relação à busca exaustiva"
+    print("Distâncias conferidas com a busca exaustiva.")
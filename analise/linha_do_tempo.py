@@ -0,0 +1,200 @@
+import argparse
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from dados import config
+from dados.filtros import FiltroEventos, chave_espacial, mascara_eventos
+
+# ========================================
+# QUADROS DA ANIMAÇÃO DO MAPA
+# ========================================
+# A linha do tempo da página 04 anima o mapa período a período (ano ou mês).
+# Um quadro com todos os eventos acumulados até o período faria a figura
+# crescer com o quadrado do número de períodos. Aqui cada quadro leva só os
+# eventos do próprio período, limitados a PONTOS_POR_QUADRO (os de maior
+# magnitude ficam), e atualiza apenas o traço dos eventos novos. Com muitos
+# períodos (meses ao longo de décadas), o limite por quadro cai para que a
+# figura inteira não passe de PONTOS_LINHA_DO_TEMPO. O histórico
+# aparece num fundo fixo, enviado uma vez: as células da grade espacial com
+# atividade no catálogo filtrado.
+#
+# A ordem dos eventos por período e magnitude é calculada uma vez por versão
+# dos dados; os quadros de cada filtro ficam num LRU compartilhado pelas
+# sessões. As colunas vão em float32, que o Plotly serializa em base64.
+
+PERIODOS = ("ano", "mes")
+QUADROS_EM_CACHE = 16
+TRACO_FUNDO, TRACO_PERIODO = 0, 1
+
+
+class LinhaDoTempo:
+    """Eventos de uma versão ordenados por período e, dentro dele, por magnitude decrescente."""
+
+    def __init__(self, eventos, periodo="ano"):
+        if periodo not in PERIODOS:
+            raise ValueError(f"Período '{periodo}' desconhecido. Opções: {', '.join(PERIODOS)}")
+        self.periodo = periodo
+        self.eventos = eventos
+
+        ano = eventos['Year'].to_numpy(dtype=np.int64)
+        chave = ano if periodo == "ano" else ano * 12 + eventos['Month'].to_numpy(dtype=np.int64) - 1
+        magnitude = eventos['magnitude'].to_numpy(dtype=np.float64)
+        self.ordem = np.lexsort((-magnitude, chave))
+        self.chaves = chave[self.ordem]
+
+        colunas = {'latitude': 'latitude', 'longitude': 'longitude', 'magnitude': 'magnitude', 'profundidade': 'depth'}
+        self.colunas = {
+            nome: eventos[coluna].to_numpy(dtype=np.float32)[self.ordem] for nome, coluna in colunas.items()
+        }
+        self.colunas['tsunami'] = eventos['tsunami'].to_numpy(dtype=np.int8)[self.ordem]
+
+        self._quadros = OrderedDict()
+        self._trava = threading.Lock()
+
+    def rotulo(self, chave):
+        if self.periodo == "ano":
+            return str(int(chave))
+        return f"{int(chave) % 12 + 1:02d}/{int(chave) // 12}"
+
+    def quadros(self, filtro=None, pontos_por_quadro=None, linhas=None):
+        """Fundo e quadros da animação para o filtro, memorizados por (filtro, orçamento).
+
+        ``linhas`` restringe a animação a um conjunto de linhas do catálogo
+        (uma seleção feita no mapa); esses quadros não são memorizados.
+        """
+        filtro = filtro or FiltroEventos()
+        pontos_por_quadro = pontos_por_quadro or config.PONTOS_POR_QUADRO
+        if linhas is not None:
+            mascara = np.zeros(len(self.eventos), dtype=bool)
+            mascara[linhas] = True
+            return self._montar(mascara & mascara_eventos(self.eventos, filtro), pontos_por_quadro)
+        chave = (filtro, pontos_por_quadro)
+        with self._trava:
+            resultado = self._quadros.get(chave)
+            if resultado is not None:
+                self._quadros.move_to_end(chave)
+                return resultado
+        resultado = self._montar(mascara_eventos(self.eventos, filtro), pontos_por_quadro)
+        with self._trava:
+            self._quadros[chave] = resultado
+            while len(self._quadros) > QUADROS_EM_CACHE:
+                self._quadros.popitem(last=False)
+        return resultado
+
+    def _montar(self, mascara, pontos_por_quadro):
+        selecionadas = np.flatnonzero(mascara[self.ordem])
+        if len(selecionadas) == 0:
+            return {'fundo': _fundo(self.colunas, selecionadas), 'quadros': [], 'pontos': 0, 'eventos': 0}
+        chaves = self.chaves[selecionadas]
+
+        # Todos os períodos entre o primeiro e o último evento, inclusive os
+        # vazios, para a animação andar em passos regulares
+        periodos = np.arange(chaves[0], chaves[-1] + 1)
+        inicios = np.searchsorted(chaves, periodos)
+        totais = np.searchsorted(chaves, periodos, side='right') - inicios
+        pontos_por_quadro = min(pontos_por_quadro, max(1, config.PONTOS_LINHA_DO_TEMPO // len(periodos)))
+
+        # Posição de cada evento no seu período: os primeiros são os de maior magnitude
+        posicao = np.arange(len(chaves)) - np.repeat(inicios, totais)
+        mantidas = selecionadas[posicao < pontos_por_quadro]
+        exibidos = np.minimum(totais, pontos_por_quadro)
+        fins = np.cumsum(exibidos)
+
+        quadros = []
+        for periodo, total, fim, quantidade in zip(periodos, totais, fins, exibidos):
+            linhas = mantidas[fim - quantidade:fim]
+            rotulo = self.rotulo(periodo)
+            titulo = f"{rotulo}: {total:,} eventos" + (f" ({quantidade:,} maiores exibidos)" if quantidade < total else "")
+            quadros.append({
+                'name': rotulo,
+                'data': [_traco_periodo(self.colunas, linhas)],
+                'traces': [TRACO_PERIODO],
+                'layout': {'title': {'text': titulo}},
+            })
+        return {
+            'fundo': _fundo(self.colunas, selecionadas),
+            'quadros': quadros,
+            'pontos': int(len(mantidas)),
+            'eventos': int(len(selecionadas)),
+        }
+
+
+def _tamanho_marcador(magnitude):
+    return np.clip((magnitude - 5.5) * 5, 3, 30).astype(np.float32)
+
+
+def _traco_periodo(colunas, linhas):
+    magnitude = colunas['magnitude'][linhas]
+    return {
+        'type': 'scattergeo',
+        'lat': colunas['latitude'][linhas],
+        'lon': colunas['longitude'][linhas],
+        'customdata': np.column_stack([magnitude, colunas['profundidade'][linhas]]),
+        'marker': {'size': _tamanho_marcador(magnitude), 'color': colunas['tsunami'][linhas]},
+    }
+
+
+def _fundo(colunas, selecionadas):
+    """Atividade do catálogo filtrado agregada nas células da grade espacial."""
+    latitude = colunas['latitude'][selecionadas]
+    longitude = colunas['longitude'][selecionadas]
+    celulas = pd.DataFrame({
+        'celula': chave_espacial(latitude, longitude),
+        'latitude': latitude,
+        'longitude': longitude,
+    }).groupby('celula').agg(latitude=('latitude', 'mean'), longitude=('longitude', 'mean'),
+                             eventos=('latitude', 'size'))
+    return {
+        'type': 'scattergeo',
+        'lat': celulas['latitude'].to_numpy(dtype=np.float32),
+        'lon': celulas['longitude'].to_numpy(dtype=np.float32),
+        'customdata': celulas['eventos'].to_numpy(dtype=np.int32),
+        'marker': {'size': np.clip(np.sqrt(celulas['eventos'].to_numpy()) * 3, 4, 40).astype(np.float32)},
+    }
+
+
+if __name__ == "__main__":
+    import plotly.io as pio
+
+    parser = argparse.ArgumentParser(description="Tamanho dos quadros da linha do tempo: acumulados × só os novos.")
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--anos", type=int, default=50, help="anos cobertos pelo catálogo sintético")
+    parser.add_argument("--pontos", type=int, default=None, help="pontos por quadro (padrão: DASHBOARD_PONTOS_POR_QUADRO)")
+    argumentos = parser.parse_args()
+
+    gerador = np.random.default_rng(0)
+    n = argumentos.linhas
+    df = pd.DataFrame({
+        'magnitude': np.round(6.5 + gerador.exponential(0.4, n), 1),
+        'depth': np.round(gerador.exponential(60, n), 2),
+        'latitude': gerador.uniform(-70, 70, n),
+        'longitude': gerador.uniform(-180, 180, n),
+        'Year': gerador.integers(2024 - argumentos.anos, 2024, n),
+        'Month': gerador.integers(1, 13, n),
+        'tsunami': (gerador.random(n) < 0.3).astype(np.int64),
+        'principal': (gerador.random(n) < 0.6).astype(np.int64),
+    })
+
+    print(f"{'período':>8} {'quadros':>8} {'pré-cálculo s':>14} {'quadros s':>10} {'pontos':>10} "
+          f"{'MiB novos':>10} {'MiB acumulados':>15}")
+    for periodo in PERIODOS:
+        inicio = time.perf_counter()
+        linha = LinhaDoTempo(df, periodo)
+        segundos_ordem = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        resultado = linha.quadros(FiltroEventos(magnitude=(6.5, None)), argumentos.pontos)
+        segundos_quadros = time.perf_counter() - inicio
+        tamanho = len(pio.to_json({'data': [resultado['fundo']], 'frames': resultado['quadros']}, validate=False))
+
+        # Mesmo orçamento por período, mas cada quadro repetindo os anteriores
+        pontos_acumulados = np.cumsum([len(q['data'][0]['lat']) for q in resultado['quadros']])
+        bytes_por_ponto = (tamanho / max(resultado['pontos'], 1))
+        tamanho_acumulado = pontos_acumulados.sum() * bytes_por_ponto
+
+        print(f"{periodo:>8} {len(resultado['quadros']):>8} {segundos_ordem:>14.2f} {segundos_quadros:>10.2f} "
+              f"{resultado['pontos']:>10,} {tamanho / 2**20:>10.1f} {tamanho_acumulado / 2**20:>15.1f}")
@@ -0,0 +1,259 @@
+import argparse
+import glob
+import json
+import os
+import re
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from dados import config
+
+# ========================================
+# MODELO DE PROBABILIDADE DE TSUNAMI
+# ========================================
+# Regressão logística regularizada, ajustada com numpy (IRLS). O artefato é
+# um JSON versionado em ``modelos/`` com médias, desvios e coeficientes, o
+# que permite pontuar qualquer quantidade de eventos com uma única
+# multiplicação de matrizes.
+
+DIRETORIO_MODELOS = os.environ.get(
+    "DASHBOARD_DIRETORIO_MODELOS", os.path.join(config.DIRETORIO_RAIZ, "modelos")
+)
+
+PREFIXO_ARTEFATO = "modelo_tsunami-v"
+
+COLUNAS_ENTRADA = ['magnitude', 'depth', 'latitude', 'longitude', 'sig',
+                   'mmi', 'cdi', 'gap', 'dmin', 'nst']
+
+# Atributos derivados das colunas de entrada (ver ``montar_atributos``)
+ATRIBUTOS = ['magnitude', 'log_depth', 'x', 'y', 'z', 'sig',
+             'mmi', 'cdi', 'gap', 'dmin', 'nst']
+
+
+def montar_atributos(df):
+    """Matriz (n, len(ATRIBUTOS)) em float64 a partir das colunas de entrada.
+
+    Latitude e longitude viram a posição no círculo unitário 3D, evitando a
+    descontinuidade em ±180°; a profundidade entra em escala logarítmica.
+    """
+    lat = np.radians(np.asarray(df['latitude'], dtype=np.float64))
+    lon = np.radians(np.asarray(df['longitude'], dtype=np.float64))
+    cos_lat = np.cos(lat)
+
+    colunas = [
+        np.asarray(df['magnitude'], dtype=np.float64),
+        np.log1p(np.asarray(df['depth'], dtype=np.float64)),
+        cos_lat * np.cos(lon),
+        cos_lat * np.sin(lon),
+        np.sin(lat),
+    ]
+    colunas += [np.asarray(df[c], dtype=np.float64) for c in ['sig', 'mmi', 'cdi', 'gap', 'dmin', 'nst']]
+    return np.column_stack(colunas)
+
+
+def sigmoide(z):
+    return 0.5 * (1.0 + np.tanh(0.5 * z))
+
+
+def ajustar_logistica(X, y, regularizacao, max_iteracoes=100):
+    """Newton-Raphson (IRLS) com penalidade L2 fora do intercepto."""
+    Xb = np.column_stack([np.ones(len(X)), X])
+    penalidade = np.eye(Xb.shape[1]) * regularizacao
+    penalidade[0, 0] = 0.0
+    pesos = np.zeros(Xb.shape[1])
+
+    for _ in range(max_iteracoes):
+        p = sigmoide(Xb @ pesos)
+        gradiente = Xb.T @ (p - y) + penalidade @ pesos
+        hessiana = (Xb * (p * (1 - p))[:, None]).T @ Xb + penalidade
+        passo = np.linalg.solve(hessiana, gradiente)
+        pesos -= passo
+        if np.max(np.abs(passo)) < 1e-8:
+            break
+
+    return pesos[0], pesos[1:]
+
+
+def area_sob_curva_roc(y, p):
+    """AUC pela estatística de Mann-Whitney (empates recebem posto médio)."""
+    y = np.asarray(y)
+    postos = pd.Series(p).rank().to_numpy()
+    positivos = y == 1
+    n_pos, n_neg = positivos.sum(), (~positivos).sum()
+    if n_pos == 0 or n_neg == 0:
+        return float('nan')
+    return float((postos[positivos].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg))
+
+
+def _metricas(y, p):
+    p = np.clip(p, 1e-12, 1 - 1e-12)
+    return {
+        'auc': area_sob_curva_roc(y, p),
+        'acuracia': float(np.mean((p >= 0.5) == (y == 1))),
+        'log_loss': float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))),
+        'eventos': int(len(y)),
+    }
+
+
+# ========================================
+# ARTEFATO
+# ========================================
+
+
+class ModeloTsunami:
+    """Modelo carregado de um artefato; ``prever`` pontua em lote."""
+
+    def __init__(self, artefato):
+        self.artefato = artefato
+        self.versao = artefato['versao_modelo']
+        self.media = np.asarray(artefato['media'])
+        self.desvio = np.asarray(artefato['desvio'])
+        self.intercepto = float(artefato['intercepto'])
+        self.coeficientes = np.asarray(artefato['coeficientes'])
+
+        # Padronização embutida nos pesos: p = σ(X·w' + b')
+        self._pesos = self.coeficientes / self.desvio
+        self._vies = self.intercepto - float(self.media @ self._pesos)
+
+    def prever(self, df):
+        """Probabilidade de tsunami para cada linha de ``df`` (uma chamada vetorizada)."""
+        return sigmoide(montar_atributos(df) @ self._pesos + self._vies)
+
+    @classmethod
+    def carregar(cls, caminho=None):
+        caminho = caminho or caminho_artefato_mais_recente()
+        if caminho is None:
+            raise FileNotFoundError(
+                f"Nenhum artefato '{PREFIXO_ARTEFATO}*.json' em '{DIRETORIO_MODELOS}'. "
+                "Execute: python -m analise.modelo_tsunami treinar"
+            )
+        with open(caminho, encoding='utf-8') as arquivo:
+            return cls(json.load(arquivo))
+
+
+def _versoes_existentes(diretorio):
+    versoes = {}
+    for caminho in glob.glob(os.path.join(diretorio, f"{PREFIXO_ARTEFATO}*.json")):
+        encontrado = re.search(r"-v(\d+)\.json$", caminho)
+        if encontrado:
+            versoes[int(encontrado.group(1))] = caminho
+    return versoes
+
+
+def caminho_artefato_mais_recente(diretorio=None):
+    versoes = _versoes_existentes(diretorio or DIRETORIO_MODELOS)
+    return versoes[max(versoes)] if versoes else None
+
+
+# ========================================
+# TREINAMENTO (OFFLINE)
+# ========================================
+
+
+def treinar(df, regularizacao=1.0, fracao_validacao=0.2, semente=42, versao_dados=None):
+    """Ajusta o modelo e devolve o artefato (dicionário serializável).
+
+    Anos sem nenhum tsunami registrado são descartados: no catálogo atual o
+    campo só passa a ser preenchido a partir de 2013, e os anos anteriores
+    ensinariam ao modelo um rótulo ausente como se fosse negativo.
+    """
+    anos_rotulados = df.groupby('Year')['tsunami'].transform('max') > 0
+    df = df[anos_rotulados].dropna(subset=COLUNAS_ENTRADA)
+
+    X = montar_atributos(df)
+    y = df['tsunami'].to_numpy(dtype=np.float64)
+
+    media = X.mean(axis=0)
+    desvio = X.std(axis=0)
+    desvio[desvio == 0] = 1.0
+    Xp = (X - media) / desvio
+
+    # Validação em uma amostra separada, depois ajuste final com tudo
+    gerador = np.random.default_rng(semente)
+    validacao = gerador.random(len(y)) < fracao_validacao
+    b, w = ajustar_logistica(Xp[~validacao], y[~validacao], regularizacao)
+    metricas_validacao = _metricas(y[validacao], sigmoide(Xp[validacao] @ w + b))
+
+    intercepto, coeficientes = ajustar_logistica(Xp, y, regularizacao)
+
+    return {
+        'tipo': 'regressao_logistica',
+        'atributos': ATRIBUTOS,
+        'colunas_entrada': COLUNAS_ENTRADA,
+        'media': media.tolist(),
+        'desvio': desvio.tolist(),
+        'intercepto': float(intercepto),
+        'coeficientes': coeficientes.tolist(),
+        'regularizacao': regularizacao,
+        'anos_treino': [int(df['Year'].min()), int(df['Year'].max())],
+        'metricas_validacao': metricas_validacao,
+        'versao_dados': versao_dados,
+        'treinado_em': datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def salvar_artefato(artefato, diretorio=None):
+    """Grava o artefato como a próxima versão disponível e retorna o caminho."""
+    diretorio = diretorio or DIRETORIO_MODELOS
+    os.makedirs(diretorio, exist_ok=True)
+    versao = max(_versoes_existentes(diretorio), default=0) + 1
+    artefato = dict(artefato, versao_modelo=versao)
+
+    caminho = os.path.join(diretorio, f"{PREFIXO_ARTEFATO}{versao}.json")
+    temporario = caminho + ".tmp"
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(artefato, arquivo, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+    return caminho
+
+
+def medir_pontuacao(modelo, linhas=1_000_000, semente=0):
+    """Tempo (s) para pontuar ``linhas`` eventos sintéticos em uma chamada."""
+    gerador = np.random.default_rng(semente)
+    df = pd.DataFrame({
+        'magnitude': gerador.uniform(6.5, 9.0, linhas),
+        'depth': gerador.uniform(0, 700, linhas),
+        'latitude': gerador.uniform(-90, 90, linhas),
+        'longitude': gerador.uniform(-180, 180, linhas),
+        'sig': gerador.uniform(600, 3000, linhas),
+        'mmi': gerador.integers(1, 10, linhas),
+        'cdi': gerador.integers(0, 10, linhas),
+        'gap': gerador.uniform(0, 240, linhas),
+        'dmin': gerador.uniform(0, 18, linhas),
+        'nst': gerador.integers(0, 950, linhas),
+    })
+    inicio = time.perf_counter()
+    modelo.prever(df)
+    return time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    from dados.catalogo import construir_catalogo
+
+    parser = argparse.ArgumentParser(description="Modelo de probabilidade de tsunami.")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    comando_treinar = subcomandos.add_parser("treinar", help="ajusta e grava uma nova versão do modelo")
+    comando_treinar.add_argument("--regularizacao", type=float, default=1.0)
+    comando_treinar.add_argument("--saida", default=None, help="diretório dos artefatos")
+
+    comando_medir = subcomandos.add_parser("medir", help="mede a pontuação em lote do modelo atual")
+    comando_medir.add_argument("--linhas", type=int, default=1_000_000)
+
+    argumentos = parser.parse_args()
+
+    if argumentos.comando == "treinar":
+        catalogo = construir_catalogo(backend="pandas")
+        artefato = treinar(catalogo.eventos, argumentos.regularizacao, versao_dados=catalogo.versao)
+        caminho = salvar_artefato(artefato, argumentos.saida)
+        metricas = artefato['metricas_validacao']
+        print(f"Modelo gravado em {caminho}")
+        print(f"Validação: AUC {metricas['auc']:.3f} · acurácia {metricas['acuracia']:.3f} "
+              f"· log-loss {metricas['log_loss']:.3f} ({metricas['eventos']} eventos)")
+    else:
+        modelo = ModeloTsunami.carregar()
+        segundos = medir_pontuacao(modelo, argumentos.linhas)
+        print(f"Modelo v{modelo.versao}: {argumentos.linhas:,} eventos pontuados em {segundos * 1000:.0f} ms")
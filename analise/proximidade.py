@@ -0,0 +1,183 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from analise.vizinhos import ArvoreKD, distancia_haversine_km, posicao_unitaria
+from dados import config
+
+# ========================================
+# PROXIMIDADE ENTRE EVENTOS E PONTOS DE INTERESSE
+# ========================================
+# Para cada ponto (cidade costeira, porto, usina) conta os eventos com
+# magnitude mínima dentro de um raio e encontra o tsunami mais próximo.
+#
+# Contagem no raio: os eventos ficam em uma grade lat/lon ordenada por
+# célula (formato CSR). Cada grupo de pontos da mesma célula consulta só as
+# células que o raio alcança, e as distâncias são calculadas em blocos de
+# tamanho fixo, limitando a memória a ``bloco_eventos × bloco_pontos``.
+# Os grupos são processados em paralelo por um pool de threads (o numpy
+# libera o GIL nas operações vetorizadas).
+#
+# Tsunami mais próximo: a distância de corda na esfera unitária cresce
+# junto com a distância ortodrômica, então o vizinho mais próximo em 3D
+# (árvore k-d) é também o mais próximo na superfície.
+
+KM_POR_GRAU = np.pi * 6371.0 / 180
+
+BLOCO_EVENTOS = 8192
+BLOCO_PONTOS = 256
+
+
+def carregar_pontos_interesse(caminho=None):
+    return pd.read_csv(caminho or config.ARQUIVO_PONTOS_INTERESSE)
+
+
+class GradeEventos:
+    """Índice espacial em grade: eventos ordenados por célula + ponteiros."""
+
+    def __init__(self, latitude, longitude, tamanho_celula):
+        self.tamanho_celula = tamanho_celula
+        self.n_linhas = int(np.ceil(180 / tamanho_celula))
+        self.n_colunas = int(np.ceil(360 / tamanho_celula))
+
+        celula = self.celula(latitude, longitude)
+        self.ordem = np.argsort(celula, kind='stable')
+        self.latitude = np.asarray(latitude, dtype=np.float64)[self.ordem]
+        self.longitude = np.asarray(longitude, dtype=np.float64)[self.ordem]
+        self.ponteiros = np.concatenate([
+            [0], np.cumsum(np.bincount(celula, minlength=self.n_linhas * self.n_colunas))
+        ])
+
+    def _linha_coluna(self, latitude, longitude):
+        linha = np.clip(((np.asarray(latitude) + 90) // self.tamanho_celula).astype(np.int64), 0, self.n_linhas - 1)
+        coluna = np.clip(((np.asarray(longitude) + 180) // self.tamanho_celula).astype(np.int64), 0, self.n_colunas - 1)
+        return linha, coluna
+
+    def celula(self, latitude, longitude):
+        linha, coluna = self._linha_coluna(latitude, longitude)
+        return linha * self.n_colunas + coluna
+
+    def candidatos(self, latitude, longitude, raio_km):
+        """Posições (na ordem da grade) dos eventos nas células que o raio alcança."""
+        linha, coluna = self._linha_coluna(latitude, longitude)
+        alcance_lat = int(np.ceil(raio_km / (KM_POR_GRAU * self.tamanho_celula)))
+        lat_extrema = min(abs(float(latitude)) + (alcance_lat + 1) * self.tamanho_celula, 89.9)
+        alcance_lon = int(np.ceil(raio_km / (KM_POR_GRAU * self.tamanho_celula * np.cos(np.radians(lat_extrema)))))
+        if 2 * alcance_lon + 1 >= self.n_colunas:
+            # O raio cobre a volta inteira (raios grandes ou perto dos polos): todas as colunas, uma vez
+            colunas = np.arange(self.n_colunas)
+        else:
+            colunas = (coluna + np.arange(-alcance_lon, alcance_lon + 1)) % self.n_colunas
+
+        faixas = []
+        for viz_linha in range(max(linha - alcance_lat, 0), min(linha + alcance_lat, self.n_linhas - 1) + 1):
+            celulas = viz_linha * self.n_colunas + colunas
+            faixas.extend(
+                np.arange(a, b) for a, b in zip(self.ponteiros[celulas], self.ponteiros[celulas + 1]) if b > a
+            )
+        return np.concatenate(faixas) if faixas else np.empty(0, dtype=np.int64)
+
+
+def _contar_grupo(grade, lat_pontos, lon_pontos, raio_km):
+    """Eventos dentro do raio para pontos que compartilham a mesma célula."""
+    candidatos = grade.candidatos(lat_pontos[0], lon_pontos[0], raio_km + grade.tamanho_celula * KM_POR_GRAU)
+    contagem = np.zeros(len(lat_pontos), dtype=np.int64)
+
+    for inicio_p in range(0, len(lat_pontos), BLOCO_PONTOS):
+        lat_p = lat_pontos[inicio_p:inicio_p + BLOCO_PONTOS]
+        lon_p = lon_pontos[inicio_p:inicio_p + BLOCO_PONTOS]
+        for inicio_e in range(0, len(candidatos), BLOCO_EVENTOS):
+            bloco = candidatos[inicio_e:inicio_e + BLOCO_EVENTOS]
+            distancias = distancia_haversine_km(
+                lat_p[:, None], lon_p[:, None], grade.latitude[bloco][None, :], grade.longitude[bloco][None, :]
+            )
+            contagem[inicio_p:inicio_p + BLOCO_PONTOS] += (distancias <= raio_km).sum(axis=1)
+
+    return contagem
+
+
+def contar_eventos_no_raio(latitude, longitude, lat_pontos, lon_pontos, raio_km, trabalhadores=None):
+    """Quantidade de eventos a até ``raio_km`` de cada ponto."""
+    lat_pontos = np.asarray(lat_pontos, dtype=np.float64)
+    lon_pontos = np.asarray(lon_pontos, dtype=np.float64)
+
+    # Células com lado próximo do raio: a consulta alcança poucas células vizinhas
+    tamanho_celula = float(np.clip(raio_km / KM_POR_GRAU, 0.5, 30.0))
+    grade = GradeEventos(latitude, longitude, tamanho_celula)
+
+    celula_ponto = grade.celula(lat_pontos, lon_pontos)
+    grupos = [np.flatnonzero(celula_ponto == c) for c in np.unique(celula_ponto)]
+
+    def processar(grupo):
+        return grupo, _contar_grupo(grade, lat_pontos[grupo], lon_pontos[grupo], raio_km)
+
+    contagem = np.zeros(len(lat_pontos), dtype=np.int64)
+    with ThreadPoolExecutor(max_workers=trabalhadores or os.cpu_count()) as pool:
+        for grupo, resultado in pool.map(processar, grupos):
+            contagem[grupo] = resultado
+    return contagem
+
+
+def consultar_proximidade(eventos, pontos, magnitude_min, raio_km, trabalhadores=None):
+    """Tabela de ``pontos`` com a contagem no raio e o tsunami mais próximo."""
+    resultado = pontos.copy()
+
+    selecionados = eventos[eventos['magnitude'] >= magnitude_min]
+    resultado['eventos_no_raio'] = contar_eventos_no_raio(
+        selecionados['latitude'].to_numpy(), selecionados['longitude'].to_numpy(),
+        pontos['latitude'], pontos['longitude'], raio_km, trabalhadores
+    )
+
+    tsunamis = eventos[eventos['tsunami'] == 1]
+    resultado['tsunami_mais_proximo_km'] = np.nan
+    resultado['tsunami_mais_proximo_magnitude'] = np.nan
+    resultado['tsunami_mais_proximo_ano'] = pd.array([pd.NA] * len(resultado), dtype='Int64')
+
+    if len(tsunamis) > 0:
+        arvore = ArvoreKD(posicao_unitaria(tsunamis['latitude'], tsunamis['longitude']))
+        consultas = posicao_unitaria(pontos['latitude'], pontos['longitude'])
+
+        with ThreadPoolExecutor(max_workers=trabalhadores or os.cpu_count()) as pool:
+            mais_proximos = np.array([i[0] for i, _ in pool.map(lambda q: arvore.consultar(q, 1), consultas)])
+
+        evento = tsunamis.iloc[mais_proximos]
+        resultado['tsunami_mais_proximo_km'] = distancia_haversine_km(
+            pontos['latitude'], pontos['longitude'], evento['latitude'], evento['longitude']
+        )
+        resultado['tsunami_mais_proximo_magnitude'] = evento['magnitude'].to_numpy()
+        resultado['tsunami_mais_proximo_ano'] = evento['Year'].to_numpy()
+
+    return resultado
+
+
+if __name__ == "__main__":
+    from dados.catalogo import construir_catalogo
+
+    parser = argparse.ArgumentParser(description="Eventos próximos de cidades costeiras e instalações.")
+    parser.add_argument("--magnitude", type=float, default=7.0, help="magnitude mínima")
+    parser.add_argument("--raio", type=float, default=300.0, help="raio em km")
+    parser.add_argument("--pontos", default=None, help="CSV com Nome, latitude e longitude")
+    parser.add_argument("--saida", default=None, help="grava o resultado em CSV")
+    parser.add_argument("--trabalhadores", type=int, default=None)
+    argumentos = parser.parse_args()
+
+    catalogo = construir_catalogo(backend="pandas")
+    pontos = carregar_pontos_interesse(argumentos.pontos)
+
+    inicio = time.perf_counter()
+    resultado = consultar_proximidade(
+        catalogo.eventos, pontos, argumentos.magnitude, argumentos.raio, argumentos.trabalhadores
+    )
+    segundos = time.perf_counter() - inicio
+
+    if argumentos.saida:
+        resultado.to_csv(argumentos.saida, index=False)
+        print(f"Resultado gravado em {argumentos.saida}")
+    else:
+        with pd.option_context('display.max_rows', None, 'display.width', 160):
+            print(resultado.sort_values('eventos_no_raio', ascending=False).to_string(index=False))
+    print(f"{len(pontos)} pontos × {len(catalogo.eventos)} eventos em {segundos * 1000:.0f} ms")
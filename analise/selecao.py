@@ -0,0 +1,125 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from dados.bitmaps import Bitmap
+from dados.filtros import FiltroEventos, agregar_por_ano, mascara_eventos, resumir_eventos
+
+# ========================================
+# SELEÇÕES VINCULADAS ENTRE GRÁFICOS
+# ========================================
+# Uma seleção feita num gráfico (caixa ou laço) chega como um conjunto de
+# números de linha do catálogo. Cartões, gráficos e tabelas da página são
+# recalculados a partir desse conjunto, sem refazer o filtro:
+#
+#   - colunas usadas pelos agregados ficam em arrays contíguos e o ano de
+#     cada evento já vem codificado (0..n_anos-1), uma vez por versão;
+#   - as contagens por ano saem de ``bincount`` só nas linhas selecionadas;
+#   - no backend pandas, os cartões usam os bitmaps por valor do índice
+#     (popcount), como os filtros da barra lateral.
+
+
+class IndiceSelecao:
+    """Colunas do catálogo prontas para resumir e agregar conjuntos de linhas."""
+
+    def __init__(self, catalogo):
+        eventos = catalogo.eventos
+        self.eventos = eventos
+        self.magnitude = eventos['magnitude'].to_numpy(dtype=np.float64)
+        self.tsunami = eventos['tsunami'].to_numpy(dtype=np.int64)
+        self.anos, self.ano_linha = np.unique(eventos['Year'].to_numpy(), return_inverse=True)
+        # Só o backend pandas tem o índice de bitmaps
+        self._bitmaps = getattr(catalogo.backend, 'indice', None)
+
+    def restringir(self, linhas, filtro=None):
+        """Linhas selecionadas que ainda atendem ao filtro da barra lateral."""
+        linhas = np.unique(np.asarray(linhas, dtype=np.int64))
+        linhas = linhas[(linhas >= 0) & (linhas < len(self.eventos))]
+        if filtro is None or filtro == FiltroEventos():
+            return linhas
+        return linhas[mascara_eventos(self.eventos.iloc[linhas], filtro)]
+
+    def eventos_de(self, linhas):
+        return self.eventos.iloc[linhas]
+
+    def resumo(self, linhas):
+        """Métricas dos cartões (``resumir_eventos``) das linhas selecionadas."""
+        if self._bitmaps is not None:
+            return self._bitmaps.resumir(Bitmap.de_indices(linhas))
+        if len(linhas) == 0:
+            return resumir_eventos(self.eventos.iloc[linhas])
+        return {
+            'total': int(len(linhas)),
+            'magnitude_max': float(np.nanmax(self.magnitude[linhas])),
+            'tsunamis': int(self.tsunami[linhas].sum()),
+        }
+
+    def agregar_por_ano(self, linhas):
+        """Mesmas colunas de ``agregar_por_ano``, só com as linhas selecionadas."""
+        codigos = self.ano_linha[linhas]
+        magnitude = self.magnitude[linhas]
+        contagem = np.bincount(codigos, minlength=len(self.anos))
+        soma = np.bincount(codigos, weights=magnitude, minlength=len(self.anos))
+        maximo = np.full(len(self.anos), -np.inf)
+        np.maximum.at(maximo, codigos, magnitude)
+
+        presentes = contagem > 0
+        return pd.DataFrame({
+            'year': self.anos[presentes],
+            'max_mag': maximo[presentes],
+            'mean_mag': soma[presentes] / contagem[presentes],
+            'count': contagem[presentes],
+        })
+
+
+if __name__ == "__main__":
+    from dados import BackendPandas
+
+    parser = argparse.ArgumentParser(description="Tempo para resumir seleções: índice × DataFrame filtrado.")
+    parser.add_argument("--linhas", type=int, default=2_000_000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    argumentos = parser.parse_args()
+
+    gerador = np.random.default_rng(0)
+    n = argumentos.linhas
+    df = pd.DataFrame({
+        'magnitude': np.round(6.5 + gerador.exponential(0.4, n), 1),
+        'depth': np.round(gerador.exponential(60, n), 2),
+        'latitude': gerador.uniform(-70, 70, n),
+        'longitude': gerador.uniform(-180, 180, n),
+        'Year': gerador.integers(1995, 2024, n),
+        'Month': gerador.integers(1, 13, n),
+        'tsunami': (gerador.random(n) < 0.3).astype(np.int64),
+        'principal': (gerador.random(n) < 0.6).astype(np.int64),
+    })
+
+    class _Catalogo:
+        eventos = df
+        backend = BackendPandas(df)
+
+    inicio = time.perf_counter()
+    indice = IndiceSelecao(_Catalogo)
+    _Catalogo.backend.indice  # monta os bitmaps antes das medições
+    print(f"Índice de seleção e bitmaps de {n:,} linhas em {time.perf_counter() - inicio:.2f} s")
+
+    # Seleções do tamanho de uma caixa pequena até metade do catálogo
+    print(f"{'linhas selecionadas':>20} {'DataFrame ms':>13} {'índice ms':>10}")
+    for tamanho in (1_000, 50_000, n // 10, n // 2):
+        linhas = np.sort(gerador.choice(n, tamanho, replace=False))
+
+        inicio = time.perf_counter()
+        for _ in range(argumentos.repeticoes):
+            selecionados = df.iloc[linhas]
+            esperado = (resumir_eventos(selecionados), agregar_por_ano(selecionados))
+        segundos_df = (time.perf_counter() - inicio) / argumentos.repeticoes
+
+        inicio = time.perf_counter()
+        for _ in range(argumentos.repeticoes):
+            obtido = (indice.resumo(linhas), indice.agregar_por_ano(linhas))
+        segundos_indice = (time.perf_counter() - inicio) / argumentos.repeticoes
+
+        assert obtido[0] == esperado[0], (obtido[0], esperado[0])
+        pd.testing.assert_frame_equal(obtido[1], esperado[1], check_dtype=False)
+        print(f"{tamanho:>20,} {segundos_df * 1000:>13.1f} {segundos_indice * 1000:>10.1f}")
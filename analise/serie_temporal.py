@@ -0,0 +1,156 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+# ========================================
+# SÉRIE TEMPORAL MENSAL DO CATÁLOGO
+# ========================================
+# O catálogo é reduzido uma vez a contagens por mês (eventos, tsunamis e
+# momento sísmico) e às suas somas acumuladas. A soma de qualquer janela
+# [início, fim] é então ``acumulado[fim + 1] - acumulado[início]``: taxas
+# móveis, frações de tsunami e momento acumulado saem em O(1) por janela,
+# sem voltar aos eventos.
+#
+# Os eventos também ficam ordenados por mês com ponteiros de início de cada
+# mês (formato CSR), para recuperar os eventos de um período por fatiamento.
+
+
+def momento_sismico(magnitude):
+    """Momento sísmico em N·m (Hanks & Kanamori, 1979)."""
+    return 10 ** (1.5 * np.asarray(magnitude, dtype=np.float64) + 9.1)
+
+
+def magnitude_equivalente(momento):
+    """Magnitude de momento de um único evento que liberaria ``momento``."""
+    momento = np.asarray(momento, dtype=np.float64)
+    with np.errstate(divide='ignore'):
+        return np.where(momento > 0, (np.log10(momento) - 9.1) / 1.5, np.nan)
+
+
+def _acumular(valores):
+    return np.concatenate([[0], np.cumsum(valores)])
+
+
+class SerieMensal:
+    """Índice mensal do catálogo com somas acumuladas, construído uma vez por versão."""
+
+    def __init__(self, eventos):
+        self.ano_inicial = int(eventos['Year'].min())
+        self.ano_final = int(eventos['Year'].max())
+        self.n_meses = (self.ano_final - self.ano_inicial + 1) * 12
+        self.periodos = pd.period_range(f"{self.ano_inicial}-01", periods=self.n_meses, freq='M')
+
+        mes = ((eventos['Year'].to_numpy() - self.ano_inicial) * 12 + eventos['Month'].to_numpy() - 1).astype(np.int64)
+
+        self.eventos_por_mes = np.bincount(mes, minlength=self.n_meses)
+        self.tsunamis_por_mes = np.bincount(mes, weights=eventos['tsunami'].to_numpy(), minlength=self.n_meses)
+        self.momento_por_mes = np.bincount(mes, weights=momento_sismico(eventos['magnitude']), minlength=self.n_meses)
+
+        self.acumulado_eventos = _acumular(self.eventos_por_mes)
+        self.acumulado_tsunamis = _acumular(self.tsunamis_por_mes)
+        self.acumulado_momento = _acumular(self.momento_por_mes)
+
+        self.ordem = np.argsort(mes, kind='stable')
+        self.ponteiros = self.acumulado_eventos
+
+    def posicao(self, ano, mes=1):
+        """Posição do mês no índice, limitada ao período do catálogo."""
+        return int(np.clip((ano - self.ano_inicial) * 12 + mes - 1, 0, self.n_meses - 1))
+
+    def _intervalo(self, ano_inicio, ano_fim):
+        inicio = self.posicao(self.ano_inicial if ano_inicio is None else ano_inicio, 1)
+        fim = self.posicao(self.ano_final if ano_fim is None else ano_fim, 12)
+        return inicio, fim
+
+    def totais(self, ano_inicio=None, ano_fim=None):
+        """Totais do período (anos inclusivos) em tempo constante."""
+        inicio, fim = self._intervalo(ano_inicio, ano_fim)
+        eventos = int(self.acumulado_eventos[fim + 1] - self.acumulado_eventos[inicio])
+        tsunamis = int(round(self.acumulado_tsunamis[fim + 1] - self.acumulado_tsunamis[inicio]))
+        momento = float(self.acumulado_momento[fim + 1] - self.acumulado_momento[inicio])
+        return {
+            'eventos': eventos,
+            'tsunamis': tsunamis,
+            'taxa_mensal': eventos / (fim - inicio + 1),
+            'fracao_tsunami': tsunamis / eventos if eventos > 0 else np.nan,
+            'momento': momento,
+            'magnitude_equivalente': float(magnitude_equivalente(momento)),
+        }
+
+    def movel(self, janela_meses=12, ano_inicio=None, ano_fim=None):
+        """Taxas móveis terminando em cada mês do período e momento acumulado.
+
+        Cada linha usa os ``janela_meses`` meses até o mês da linha (menos no
+        começo do catálogo). O momento acumulado começa do zero no primeiro
+        mês do período pedido.
+        """
+        inicio, fim = self._intervalo(ano_inicio, ano_fim)
+        fim_janela = np.arange(inicio, fim + 1) + 1
+        inicio_janela = np.maximum(fim_janela - janela_meses, 0)
+
+        eventos = self.acumulado_eventos[fim_janela] - self.acumulado_eventos[inicio_janela]
+        tsunamis = self.acumulado_tsunamis[fim_janela] - self.acumulado_tsunamis[inicio_janela]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            fracao = np.where(eventos > 0, tsunamis / eventos, np.nan)
+
+        return pd.DataFrame({
+            'eventos_janela': eventos,
+            'taxa_mensal': eventos / (fim_janela - inicio_janela),
+            'fracao_tsunami': fracao,
+            'momento_acumulado': self.acumulado_momento[fim_janela] - self.acumulado_momento[inicio],
+        }, index=self.periodos[inicio:fim + 1])
+
+    def posicoes_eventos(self, ano_inicio=None, ano_fim=None):
+        """Posições (``iloc``) dos eventos do período, sem varrer o catálogo."""
+        inicio, fim = self._intervalo(ano_inicio, ano_fim)
+        return self.ordem[self.ponteiros[inicio]:self.ponteiros[fim + 1]]
+
+
+def construir_serie(catalogo, apenas_principais=False):
+    """Construtor para ``Catalogo.derivado``."""
+    eventos = catalogo.eventos
+    if apenas_principais:
+        eventos = eventos[eventos['principal'] == 1]
+    return SerieMensal(eventos)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede a série temporal mensal.")
+    parser.add_argument("--linhas", type=int, default=5_000_000)
+    parser.add_argument("--janelas", type=int, default=100_000)
+    argumentos = parser.parse_args()
+
+    gerador = np.random.default_rng(0)
+    n = argumentos.linhas
+    eventos = pd.DataFrame({
+        'magnitude': 4.5 + gerador.exponential(0.5, n),
+        'tsunami': (gerador.random(n) < 0.05).astype(np.int64),
+        'Year': gerador.integers(1900, 2024, n),
+        'Month': gerador.integers(1, 13, n),
+    })
+
+    inicio = time.perf_counter()
+    serie = SerieMensal(eventos)
+    print(f"Série com {n:,} eventos e {serie.n_meses} meses construída em {time.perf_counter() - inicio:.2f} s")
+
+    anos = gerador.integers(1900, 2024, (argumentos.janelas, 2))
+    anos.sort(axis=1)
+    inicio = time.perf_counter()
+    for ano_inicio, ano_fim in anos:
+        serie.totais(ano_inicio, ano_fim)
+    segundos = time.perf_counter() - inicio
+    print(f"{argumentos.janelas:,} janelas arbitrárias em {segundos:.2f} s "
+          f"({segundos / argumentos.janelas * 1e6:.1f} µs por janela)")
+
+    # Conferência contra a varredura direta dos eventos
+    for ano_inicio, ano_fim in anos[:5]:
+        selecao = eventos[(eventos['Year'] >= ano_inicio) & (eventos['Year'] <= ano_fim)]
+        totais = serie.totais(ano_inicio, ano_fim)
+        assert totais['eventos'] == len(selecao)
+        assert totais['tsunamis'] == selecao['tsunami'].sum()
+        assert np.isclose(totais['momento'], momento_sismico(selecao['magnitude']).sum())
+        assert len(serie.posicoes_eventos(ano_inicio, ano_fim)) == len(selecao)
+    print("Totais conferidos com a varredura direta.")
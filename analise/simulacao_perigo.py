@@ -0,0 +1,333 @@
+import argparse
+import hashlib
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from analise.limites_placas import PASSO_MAGNITUDE, construir_colunas_limites
+from analise.modelo_tsunami import ajustar_logistica, sigmoide
+from analise.vizinhos import distancia_haversine_km
+from dados import config
+
+# ========================================
+# SIMULAÇÃO DE MONTE CARLO DO PERIGO SÍSMICO
+# ========================================
+# Os valores 0–10 de ``country_risk.csv`` são notas atribuídas à mão. Aqui
+# cada país ganha probabilidades anuais estimadas a partir do catálogo:
+#
+#   - fontes: eventos principais (sem réplicas) a até RAIO_FONTES_KM dos
+#     locais de referência do país (``locais_risco.csv``);
+#   - número de eventos por ano: Poisson com a taxa observada no catálogo;
+#   - magnitudes: Gutenberg–Richter truncada, com o valor b ajustado no
+#     catálogo inteiro (máxima verossimilhança de Aki–Utsu) e a magnitude
+#     máxima do país um pouco acima da maior observada;
+#   - posição e profundidade: sorteadas entre as fontes observadas;
+#   - intensidade em cada local: atenuação de Bakun & Wentworth (1997) com
+#     a distância hipocentral, mais uma variabilidade normal;
+#   - tsunami: só fontes tsunamigênicas geram tsunamis. São as rasas (até
+#     PROFUNDIDADE_MAXIMA_TSUNAMI_KM), perto de um local costeiro do país
+#     (coluna ``Costeiro``) e que geraram tsunami no catálogo ou ficam a até
+#     DISTANCIA_SUBDUCCAO_KM de uma zona de subducção. Nelas, a chance por
+#     evento usa a fração observada no país (suavizada pela global, só entre
+#     fontes tsunamigênicas) e a inclinação em magnitude de uma logística
+#     ajustada no catálogo, nos anos com tsunamis registrados. Um país sem
+#     fontes tsunamigênicas (sem costa ou sem fontes rasas perto dela) tem
+#     probabilidade de tsunami zero.
+#
+# Cada país é simulado em blocos de anos, todos vetorizados: um sorteio de
+# Poisson por ano, um de magnitude e um de fonte por evento. Os blocos vão
+# para um pool de processos quando o trabalho compensa o custo de subir os
+# processos; cada bloco tem a sua semente, então o resultado não depende do
+# número de processos. A saída são as probabilidades anuais de exceder cada
+# nível de intensidade em algum local do país e de ocorrer um tsunami.
+
+# Bakun & Wentworth (1997): MMI = a + b·M − c·log10(distância hipocentral em km)
+COEFICIENTES_MMI = (3.67, 1.17, 3.19)
+DESVIO_MMI = 0.5
+NIVEIS_MMI = (5, 6, 7, 8, 9)
+DISTANCIA_MINIMA_KM = 5.0
+
+MARGEM_MAGNITUDE_MAXIMA = 0.5
+MAGNITUDE_MAXIMA_ABSOLUTA = 9.5
+# Peso, em eventos, da fração global de tsunamis na fração de cada país
+PESO_FRACAO_GLOBAL = 5.0
+# Fontes tsunamigênicas: rasas e na faixa junto à fossa, onde ficam os epicentros
+# das rupturas de megaempurrão (três quartos dos tsunamis rasos do catálogo perto
+# de subducção estão a menos de 135 km do traçado); eventos intraplaca sob o
+# continente, mais longe, ficam de fora
+PROFUNDIDADE_MAXIMA_TSUNAMI_KM = 100.0
+DISTANCIA_SUBDUCCAO_KM = 150.0
+
+ANOS_POR_BLOCO = 25_000
+# Abaixo disso (eventos simulados no total), subir processos custa mais que simular
+EVENTOS_MINIMOS_POOL = 5_000_000
+SEMENTE = 0
+
+
+def carregar_locais_risco(caminho=None):
+    return pd.read_csv(caminho or config.ARQUIVO_LOCAIS_RISCO)
+
+
+def ajustar_valor_b(magnitudes, magnitude_minima, passo=PASSO_MAGNITUDE):
+    """Valor b de Gutenberg–Richter por máxima verossimilhança (Aki, 1965; Utsu, 1965)."""
+    return np.log10(np.e) / (np.mean(magnitudes) - (magnitude_minima - passo / 2))
+
+
+def ajustar_fontes(eventos, locais, colunas_limites, raio_km=None):
+    """Parâmetros de simulação de cada país com locais de referência.
+
+    ``colunas_limites`` é a distância e o tipo do limite de placa mais
+    próximo de cada evento (``construir_colunas_limites``). Retorna uma
+    lista de dicionários (um por país, na ordem de ``locais``), autocontidos
+    para irem a outro processo.
+    """
+    raio_km = config.RAIO_FONTES_KM if raio_km is None else raio_km
+    principal = eventos['principal'].to_numpy() == 1 if 'principal' in eventos.columns else np.ones(len(eventos), bool)
+    principais = eventos[principal]
+    limites = colunas_limites[principal]
+    magnitude = principais['magnitude'].to_numpy(dtype=np.float64)
+    anos_catalogo = int(eventos['Year'].max() - eventos['Year'].min() + 1)
+    magnitude_minima = float(magnitude.min())
+    valor_b = float(ajustar_valor_b(magnitude, magnitude_minima))
+
+    lat = principais['latitude'].to_numpy(dtype=np.float64)
+    lon = principais['longitude'].to_numpy(dtype=np.float64)
+    profundidade = principais['depth'].to_numpy(dtype=np.float64)
+    tsunami = principais['tsunami'].to_numpy(dtype=np.float64)
+    tsunamigenica = (profundidade <= PROFUNDIDADE_MAXIMA_TSUNAMI_KM) & (
+        (tsunami == 1)
+        | ((limites['tipo_limite'] == 'subducção').to_numpy()
+           & (limites['distancia_limite_km'].to_numpy() <= DISTANCIA_SUBDUCCAO_KM))
+    )
+
+    # Tsunami × magnitude, só nos anos em que o catálogo registra tsunamis
+    anos_rotulados = principais.loc[principais['tsunami'] == 1, 'Year'].unique()
+    rotulados = principais['Year'].isin(anos_rotulados).to_numpy()
+    media_rotulados = magnitude[rotulados].mean()
+    _, (inclinacao,) = ajustar_logistica(magnitude[rotulados, None] - media_rotulados, tsunami[rotulados], 0.0)
+    fracao_global = tsunami[rotulados & tsunamigenica].mean()
+
+    fontes = []
+    for pais, locais_pais in locais.groupby('Pais', sort=False):
+        # Distância epicentral de cada evento a cada local do país
+        epicentral = distancia_haversine_km(
+            lat[:, None], lon[:, None],
+            locais_pais['latitude'].to_numpy()[None, :], locais_pais['longitude'].to_numpy()[None, :]
+        )
+        proximos = (epicentral <= raio_km).any(axis=1)
+        hipocentral = np.hypot(epicentral[proximos], profundidade[proximos, None])
+        costeiros = locais_pais['Costeiro'].to_numpy() == 1
+        perto_da_costa = (epicentral[:, costeiros] <= raio_km).any(axis=1)
+
+        n = int(proximos.sum())
+        # A suavização pela fração global só vale onde há fontes tsunamigênicas
+        fontes_tsunami = proximos & perto_da_costa & tsunamigenica
+        rotulados_pais = fontes_tsunami & rotulados
+        fracao = (tsunami[rotulados_pais].sum() + PESO_FRACAO_GLOBAL * fracao_global) / (
+            rotulados_pais.sum() + PESO_FRACAO_GLOBAL
+        )
+        referencia = magnitude[rotulados_pais].mean() if rotulados_pais.any() else media_rotulados
+        fontes.append({
+            'pais': pais,
+            'locais': len(locais_pais),
+            'eventos': n,
+            'taxa': n / anos_catalogo,
+            'valor_b': valor_b,
+            'magnitude_minima': magnitude_minima,
+            'magnitude_maxima': float(min(magnitude[proximos].max() + MARGEM_MAGNITUDE_MAXIMA,
+                                          MAGNITUDE_MAXIMA_ABSOLUTA)) if n else magnitude_minima,
+            'distancias': np.maximum(hipocentral, DISTANCIA_MINIMA_KM).astype(np.float32),
+            'tsunamigenica': fontes_tsunami[proximos],
+            'fontes_tsunami': int(fontes_tsunami.sum()),
+            'logito_tsunami': float(np.log(fracao / (1 - fracao))),
+            'inclinacao_tsunami': float(inclinacao),
+            'magnitude_referencia': float(referencia),
+        })
+    return fontes
+
+
+def magnitudes_gutenberg_richter(u, valor_b, minima, maxima):
+    """Inversa da distribuição de Gutenberg–Richter truncada em [minima, maxima]."""
+    return minima - np.log10(1 - u * (1 - 10 ** (-valor_b * (maxima - minima)))) / valor_b
+
+
+def simular_bloco(fonte, anos, semente, niveis=NIVEIS_MMI):
+    """Contagens de ``anos`` simulados de um país: anos que excedem cada nível, com tsunami e com M≥7."""
+    gerador = np.random.default_rng(semente)
+    vazio = {'excedencias': np.zeros(len(niveis), dtype=np.int64), 'anos_tsunami': 0, 'anos_m7': 0, 'eventos': 0}
+    if fonte['eventos'] == 0:
+        return vazio
+
+    por_ano = gerador.poisson(fonte['taxa'], anos)
+    total = int(por_ano.sum())
+    if total == 0:
+        return vazio
+    ano = np.repeat(np.arange(anos), por_ano)
+    magnitude = magnitudes_gutenberg_richter(
+        gerador.random(total), fonte['valor_b'], fonte['magnitude_minima'], fonte['magnitude_maxima']
+    )
+    origem = gerador.integers(0, fonte['eventos'], total)
+
+    # Maior intensidade do evento entre os locais do país
+    a, b, c = COEFICIENTES_MMI
+    distancias = fonte['distancias'][origem]
+    intensidade = (a + b * magnitude[:, None] - c * np.log10(distancias)
+                   + DESVIO_MMI * gerador.standard_normal(distancias.shape)).max(axis=1)
+    maxima_ano = np.full(anos, -np.inf)
+    np.maximum.at(maxima_ano, ano, intensidade)
+
+    chance_tsunami = np.where(fonte['tsunamigenica'][origem], sigmoide(
+        fonte['logito_tsunami'] + fonte['inclinacao_tsunami'] * (magnitude - fonte['magnitude_referencia'])
+    ), 0.0)
+    tsunami = gerador.random(total) < chance_tsunami
+
+    return {
+        'excedencias': (maxima_ano[:, None] >= np.asarray(niveis)).sum(axis=0),
+        'anos_tsunami': len(np.unique(ano[tsunami])),
+        'anos_m7': len(np.unique(ano[magnitude >= 7.0])),
+        'eventos': total,
+    }
+
+
+def _simular_tarefa(argumentos):
+    return simular_bloco(*argumentos)
+
+
+def simular(fontes, anos=None, processos=None, semente=SEMENTE, niveis=NIVEIS_MMI):
+    """Probabilidades anuais por país e curvas de excedência de intensidade.
+
+    Retorna ``(probabilidades, curvas)``: uma linha por país e uma linha
+    por (país, nível de intensidade).
+    """
+    anos = anos or config.ANOS_SIMULADOS
+    processos = processos or config.PROCESSOS_SIMULACAO
+
+    # Tarefas em ordem fixa, cada uma com a sua semente
+    blocos = [min(ANOS_POR_BLOCO, anos - inicio) for inicio in range(0, anos, ANOS_POR_BLOCO)]
+    sementes = np.random.SeedSequence(semente).spawn(len(fontes) * len(blocos))
+    tarefas = [
+        (fonte, tamanho, sementes[i * len(blocos) + j], niveis)
+        for i, fonte in enumerate(fontes) for j, tamanho in enumerate(blocos)
+    ]
+
+    eventos_esperados = anos * sum(fonte['taxa'] for fonte in fontes)
+    if processos > 1 and len(tarefas) > 1 and eventos_esperados >= EVENTOS_MINIMOS_POOL:
+        # "spawn": o processo do Streamlit tem várias threads, e um fork herdaria travas presas
+        contexto = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=processos, mp_context=contexto) as executor:
+            resultados = list(executor.map(_simular_tarefa, tarefas, chunksize=max(1, len(tarefas) // (processos * 4))))
+    else:
+        resultados = [_simular_tarefa(tarefa) for tarefa in tarefas]
+
+    linhas, curvas = [], []
+    for i, fonte in enumerate(fontes):
+        partes = resultados[i * len(blocos):(i + 1) * len(blocos)]
+        excedencias = sum(parte['excedencias'] for parte in partes) / anos
+        linhas.append({
+            'Pais': fonte['pais'],
+            'Locais': fonte['locais'],
+            'Eventos_Catalogo': fonte['eventos'],
+            'Fontes_Tsunami': fonte['fontes_tsunami'],
+            'Taxa_Anual': fonte['taxa'],
+            'Magnitude_Maxima': fonte['magnitude_maxima'],
+            'P_Tremor': _interpolar_nivel(excedencias, niveis, config.LIMIAR_MMI),
+            'P_Tsunami': sum(parte['anos_tsunami'] for parte in partes) / anos,
+            'P_M7': sum(parte['anos_m7'] for parte in partes) / anos,
+            'Eventos_Simulados': sum(parte['eventos'] for parte in partes),
+        })
+        curvas += [{'Pais': fonte['pais'], 'MMI': nivel, 'Probabilidade': p} for nivel, p in zip(niveis, excedencias)]
+    return pd.DataFrame(linhas), pd.DataFrame(curvas)
+
+
+def _interpolar_nivel(excedencias, niveis, limiar):
+    if limiar in niveis:
+        return float(excedencias[list(niveis).index(limiar)])
+    # Entre dois níveis simulados, interpolação log-linear da curva
+    return float(np.exp(np.interp(limiar, niveis, np.log(np.maximum(excedencias, 1e-12)))))
+
+
+def periodo_retorno(probabilidade_anual):
+    """Anos médios entre ocorrências, a partir da probabilidade anual (processo de Poisson)."""
+    probabilidade_anual = np.asarray(probabilidade_anual, dtype=np.float64)
+    with np.errstate(divide='ignore'):
+        return np.where(probabilidade_anual > 0, -1 / np.log1p(-np.minimum(probabilidade_anual, 1 - 1e-12)), np.inf)
+
+
+def nome_derivado(locais):
+    """Nome do derivado no catálogo: muda com os locais e com os parâmetros da simulação."""
+    conteudo = pd.util.hash_pandas_object(locais, index=False).to_numpy().tobytes()
+    parametros = (config.ANOS_SIMULADOS, config.LIMIAR_MMI, config.RAIO_FONTES_KM, SEMENTE)
+    return f"simulacao_perigo:{hashlib.sha1(conteudo + repr(parametros).encode()).hexdigest()[:12]}"
+
+
+def construir_simulacao(catalogo, locais=None):
+    """Construtor para ``Catalogo.derivado``: ``(probabilidades, curvas)`` de cada país com locais."""
+    locais = carregar_locais_risco() if locais is None else locais
+    colunas_limites = catalogo.derivado("limites_placas", construir_colunas_limites, persistir=True)
+    return simular(ajustar_fontes(catalogo.eventos, locais, colunas_limites))
+
+
+def obter_simulacao(catalogo):
+    """Simulação de ``catalogo`` memorizada por versão dos dados, locais e parâmetros."""
+    locais = carregar_locais_risco()
+    return catalogo.derivado(nome_derivado(locais), lambda c: construir_simulacao(c, locais), persistir=True)
+
+
+if __name__ == "__main__":
+    from dados.catalogo import construir_catalogo
+
+    parser = argparse.ArgumentParser(description="Simulação de Monte Carlo do perigo por país: tempo e conferência.")
+    parser.add_argument("--anos", type=int, default=100_000)
+    parser.add_argument("--processos", default="1,4", help="quantidades de processos comparadas")
+    parser.add_argument("--regioes", type=int, default=None,
+                        help="acrescenta regiões sintéticas (locais sorteados perto de eventos do catálogo)")
+    argumentos = parser.parse_args()
+
+    catalogo = construir_catalogo()
+    locais = carregar_locais_risco()
+    if argumentos.regioes:
+        gerador = np.random.default_rng(1)
+        sorteados = catalogo.eventos.sample(argumentos.regioes, replace=True, random_state=1)
+        locais = pd.concat([locais, pd.DataFrame({
+            'Pais': [f"Região {i}" for i in range(argumentos.regioes)],
+            'Local': "sintético",
+            'Costeiro': 1,
+            'latitude': np.clip(sorteados['latitude'].to_numpy() + gerador.normal(0, 1, argumentos.regioes), -89, 89),
+            'longitude': sorteados['longitude'].to_numpy() + gerador.normal(0, 1, argumentos.regioes),
+        })], ignore_index=True)
+
+    inicio = time.perf_counter()
+    fontes = ajustar_fontes(catalogo.eventos, locais, construir_colunas_limites(catalogo))
+    print(f"{len(fontes)} regiões ajustadas em {time.perf_counter() - inicio:.2f} s "
+          f"(b = {fontes[0]['valor_b']:.2f}, inclinação do tsunami em M = {fontes[0]['inclinacao_tsunami']:.2f})")
+
+    # Força o pool mesmo com pouco trabalho, para medir os dois caminhos
+    EVENTOS_MINIMOS_POOL = 0
+    referencia = None
+    for processos in (int(p) for p in argumentos.processos.split(",")):
+        inicio = time.perf_counter()
+        probabilidades, curvas = simular(fontes, argumentos.anos, processos)
+        segundos = time.perf_counter() - inicio
+        print(f"{argumentos.anos:,} anos × {len(fontes)} regiões, {processos} processo(s): {segundos:.2f} s "
+              f"({probabilidades['Eventos_Simulados'].sum():,} eventos simulados)")
+        if referencia is None:
+            referencia = probabilidades
+        else:
+            # Sementes por bloco: o resultado não depende do número de processos
+            pd.testing.assert_frame_equal(referencia, probabilidades)
+
+    # Conferência: com Poisson, P(≥1 evento M≥7 no ano) = 1 − exp(−taxa · P(M≥7))
+    analitica = []
+    for fonte in fontes:
+        if fonte['eventos'] == 0:
+            analitica.append(0.0)
+            continue
+        acima_7 = 1 - (1 - 10 ** (-fonte['valor_b'] * (7.0 - fonte['magnitude_minima']))) / (
+            1 - 10 ** (-fonte['valor_b'] * (fonte['magnitude_maxima'] - fonte['magnitude_minima'])))
+        analitica.append(1 - np.exp(-fonte['taxa'] * np.clip(acima_7, 0, 1)))
+    referencia['P_M7_Analitica'] = analitica
+    colunas = ['Pais', 'Eventos_Catalogo', 'Fontes_Tsunami', 'Taxa_Anual', 'P_Tremor', 'P_Tsunami', 'P_M7', 'P_M7_Analitica']
+    print(referencia[colunas].head(20).to_string(index=False, float_format=lambda v: f"{v:.4f}"))
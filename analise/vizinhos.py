@@ -0,0 +1,216 @@
+import argparse
+import heapq
+import time
+
+import numpy as np
+import pandas as pd
+
+# ========================================
+# EVENTOS HISTÓRICOS SEMELHANTES (k-NN)
+# ========================================
+# Cada evento vira um ponto em 5 dimensões: magnitude, profundidade e a
+# posição do epicentro na esfera unitária (x, y, z). As escalas abaixo
+# definem o que conta como "uma unidade" de diferença em cada eixo.
+
+RAIO_TERRA_KM = 6371.0
+
+ESCALAS_PADRAO = {
+    'magnitude': 0.25,      # 0,25 de magnitude
+    'profundidade': 50.0,   # 50 km de profundidade
+    'distancia': 250.0,     # 250 km entre epicentros
+}
+
+
+def posicao_unitaria(latitude, longitude):
+    lat = np.radians(np.asarray(latitude, dtype=np.float64))
+    lon = np.radians(np.asarray(longitude, dtype=np.float64))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def montar_pontos(magnitude, profundidade, latitude, longitude, escalas=None):
+    """Pontos normalizados: distância euclidiana ≈ dissimilaridade entre eventos.
+
+    A corda entre duas posições na esfera unitária multiplicada pelo raio da
+    Terra aproxima a distância entre epicentros para distâncias regionais.
+    """
+    escalas = escalas or ESCALAS_PADRAO
+    return np.column_stack([
+        np.asarray(magnitude, dtype=np.float64) / escalas['magnitude'],
+        np.asarray(profundidade, dtype=np.float64) / escalas['profundidade'],
+        posicao_unitaria(latitude, longitude) * (RAIO_TERRA_KM / escalas['distancia']),
+    ])
+
+
+def distancia_haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RAIO_TERRA_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+# ========================================
+# ÁRVORE KD ESTÁTICA
+# ========================================
+
+
+class ArvoreKD:
+    """Árvore k-d construída uma vez, com folhas varridas de forma vetorizada.
+
+    Os nós ficam em arrays (início/fim da faixa de pontos, filhos e caixa
+    delimitadora). Os pontos são reordenados para que cada folha seja uma
+    fatia contígua, e a busca visita os nós em ordem de distância mínima.
+    """
+
+    def __init__(self, pontos, tamanho_folha=48):
+        pontos = np.asarray(pontos, dtype=np.float64)
+        n = len(pontos)
+        ordem = np.arange(n)
+
+        inicio, fim, esquerda, direita, minimos, maximos = [], [], [], [], [], []
+
+        def novo_no(a, b):
+            inicio.append(a)
+            fim.append(b)
+            esquerda.append(-1)
+            direita.append(-1)
+            fatia = pontos[ordem[a:b]]
+            minimos.append(fatia.min(axis=0) if b > a else np.zeros(pontos.shape[1]))
+            maximos.append(fatia.max(axis=0) if b > a else np.zeros(pontos.shape[1]))
+            return len(inicio) - 1
+
+        pilha = [novo_no(0, n)]
+        while pilha:
+            no = pilha.pop()
+            a, b = inicio[no], fim[no]
+            if b - a <= tamanho_folha:
+                continue
+            eixo = int(np.argmax(maximos[no] - minimos[no]))
+            meio = (a + b) // 2
+            trecho = ordem[a:b]
+            ordem[a:b] = trecho[np.argpartition(pontos[trecho, eixo], meio - a)]
+            esquerda[no] = novo_no(a, meio)
+            direita[no] = novo_no(meio, b)
+            pilha.extend([esquerda[no], direita[no]])
+
+        self.ordem = ordem
+        self.pontos = pontos[ordem]
+        self.inicio = np.asarray(inicio)
+        self.fim = np.asarray(fim)
+        self.esquerda = np.asarray(esquerda)
+        self.direita = np.asarray(direita)
+        self.minimos = np.asarray(minimos)
+        self.maximos = np.asarray(maximos)
+
+    def __len__(self):
+        return len(self.pontos)
+
+    def _distancia_caixa(self, no, q):
+        excesso = np.maximum(self.minimos[no] - q, 0) + np.maximum(q - self.maximos[no], 0)
+        return float(excesso @ excesso)
+
+    def consultar(self, q, k=10):
+        """Índices (no array original) e distâncias dos ``k`` vizinhos de ``q``."""
+        q = np.asarray(q, dtype=np.float64)
+        k = min(k, len(self))
+        if k == 0:
+            return np.empty(0, dtype=int), np.empty(0)
+
+        melhores_d = np.full(k, np.inf)
+        melhores_i = np.full(k, -1)
+        fila = [(0.0, 0)]
+
+        while fila:
+            limite, no = heapq.heappop(fila)
+            if limite >= melhores_d[-1]:
+                break
+            if self.esquerda[no] < 0:
+                a, b = self.inicio[no], self.fim[no]
+                diferenca = self.pontos[a:b] - q
+                d = np.einsum('ij,ij->i', diferenca, diferenca)
+                todos_d = np.concatenate([melhores_d, d])
+                todos_i = np.concatenate([melhores_i, np.arange(a, b)])
+                escolhidos = np.argsort(todos_d, kind='stable')[:k]
+                melhores_d, melhores_i = todos_d[escolhidos], todos_i[escolhidos]
+                continue
+            for filho in (self.esquerda[no], self.direita[no]):
+                d_filho = self._distancia_caixa(filho, q)
+                if d_filho < melhores_d[-1]:
+                    heapq.heappush(fila, (d_filho, filho))
+
+        validos = melhores_i >= 0
+        return self.ordem[melhores_i[validos]], np.sqrt(melhores_d[validos])
+
+
+# ========================================
+# ÍNDICE DE EVENTOS SEMELHANTES
+# ========================================
+
+
+class IndiceEventosSemelhantes:
+    """Árvore k-d sobre o catálogo, construída uma vez por versão dos dados."""
+
+    def __init__(self, eventos, escalas=None):
+        self.escalas = escalas or ESCALAS_PADRAO
+        self.eventos = eventos
+        self.arvore = ArvoreKD(montar_pontos(
+            eventos['magnitude'], eventos['depth'], eventos['latitude'], eventos['longitude'], self.escalas
+        ))
+
+    def semelhantes(self, magnitude, profundidade, latitude, longitude, k=10):
+        """DataFrame com os ``k`` eventos mais parecidos com o evento informado."""
+        consulta = montar_pontos([magnitude], [profundidade], [latitude], [longitude], self.escalas)[0]
+        indices, dissimilaridade = self.arvore.consultar(consulta, k)
+
+        vizinhos = self.eventos.iloc[indices].copy()
+        vizinhos['distancia_km'] = distancia_haversine_km(
+            latitude, longitude, vizinhos['latitude'], vizinhos['longitude']
+        )
+        vizinhos['dissimilaridade'] = dissimilaridade
+        return vizinhos
+
+
+def construir_indice(catalogo):
+    """Construtor para ``Catalogo.derivado``."""
+    return IndiceEventosSemelhantes(catalogo.eventos)
+
+
+def _busca_exaustiva(pontos, q, k):
+    d = np.einsum('ij,ij->i', pontos - q, pontos - q)
+    return np.argsort(d, kind='stable')[:k]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede o índice de eventos semelhantes.")
+    parser.add_argument("--linhas", type=int, default=2_000_000)
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    argumentos = parser.parse_args()
+
+    gerador = np.random.default_rng(0)
+    n = argumentos.linhas
+    eventos = pd.DataFrame({
+        'magnitude': 4.5 + gerador.exponential(0.5, n),
+        'depth': gerador.exponential(60, n),
+        'latitude': np.degrees(np.arcsin(gerador.uniform(-1, 1, n))),
+        'longitude': gerador.uniform(-180, 180, n),
+    })
+
+    inicio = time.perf_counter()
+    indice = IndiceEventosSemelhantes(eventos)
+    print(f"Índice com {n:,} eventos construído em {time.perf_counter() - inicio:.1f} s")
+
+    consultas = eventos.sample(argumentos.consultas, random_state=1)
+    tempos = []
+    for _, evento in consultas.iterrows():
+        inicio = time.perf_counter()
+        indice.semelhantes(evento['magnitude'], evento['depth'], evento['latitude'], evento['longitude'], argumentos.k)
+        tempos.append(time.perf_counter() - inicio)
+    print(f"Consulta k={argumentos.k}: mediana {np.median(tempos) * 1000:.2f} ms · "
+          f"p99 {np.percentile(tempos, 99) * 1000:.2f} ms")
+
+    # Conferência contra a busca exaustiva em algumas consultas
+    pontos = montar_pontos(eventos['magnitude'], eventos['depth'], eventos['latitude'], eventos['longitude'])
+    for posicao in consultas.index[:5]:
+        esperado = _busca_exaustiva(pontos, pontos[posicao], argumentos.k)
+        obtido, _ = indice.arvore.consultar(pontos[posicao], argumentos.k)
+        assert set(esperado) == set(obtido), "divergência em relação à busca exaustiva"
+    print("Resultados conferidos com a busca exaustiva.")
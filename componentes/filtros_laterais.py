@@ -0,0 +1,90 @@
+import time
+
+import streamlit as st
+
+from dados import config
+
+# ========================================
+# FILTROS DA BARRA LATERAL
+# ========================================
+# Cada alteração de um filtro (um valor por arraste de slider, um por tecla
+# confirmada, um por opção marcada) reexecuta a página inteira, e ajustar
+# vários filtros seguidos gera uma sequência de execuções completas.
+# Conforme DASHBOARD_MODO_FILTROS, as alterações dos filtros são aplicadas:
+#
+#   imediato  a cada alteração (comportamento original);
+#   lote      juntas, ao clicar em "Aplicar filtros". Os controles ficam num
+#             ``st.form``, e alterá-los não executa nada no servidor;
+#   espera    juntas, depois de ESPERA_FILTROS segundos sem alterações. Os
+#             controles ficam num fragmento: cada alteração reexecuta só a
+#             barra lateral, e a página roda uma vez no fim.
+#
+# Uma execução da página que ainda estiver em andamento quando os novos
+# filtros forem aplicados é interrompida pelo Streamlit no próximo elemento
+# desenhado (``runner.fastReruns``), sem chegar aos gráficos seguintes.
+
+MODOS_FILTROS = ("imediato", "lote", "espera")
+
+
+def filtros_laterais(chave, controles, modo=None):
+    """Desenha os filtros na barra lateral e retorna os valores aplicados.
+
+    ``controles`` cria os widgets com ``st.*`` (não ``st.sidebar.*``) e
+    retorna um dicionário com os valores escolhidos. ``chave`` identifica o
+    conjunto de filtros da página.
+    """
+    modo = (modo or config.MODO_FILTROS).lower()
+    if modo not in MODOS_FILTROS:
+        raise ValueError(f"Modo de filtros '{modo}' desconhecido. Opções: {', '.join(MODOS_FILTROS)}")
+
+    with st.sidebar:
+        if modo == "lote":
+            with st.form(f"filtros_{chave}", border=False):
+                valores = controles()
+                st.form_submit_button("Aplicar filtros", type="primary", width="stretch")
+            return valores
+        if modo == "espera":
+            return _filtros_com_espera(chave, controles)
+        return controles()
+
+
+def _filtros_com_espera(chave, controles):
+    estado = st.session_state.setdefault(f"_filtros_{chave}", {})
+    # O fragmento também roda dentro da execução completa: aí os valores
+    # pendentes são aplicados na hora, já que a página inteira está rodando
+    estado['execucao_completa'] = True
+    try:
+        _fragmento_espera(estado, controles)
+    finally:
+        estado['execucao_completa'] = False
+    return estado['aplicados']
+
+
+# Sem temporizador: com tudo aplicado, o fragmento não reexecuta sozinho. Só
+# enquanto há alterações pendentes ele se reexecuta, em fatias curtas: uma
+# alteração nova não interrompe o fragmento em andamento (fica na fila até
+# ele terminar), então cada execução espera no máximo FATIA_ESPERA_S
+FATIA_ESPERA_S = 0.1
+
+
+@st.fragment
+def _fragmento_espera(estado, controles):
+    valores = controles()
+    agora = time.monotonic()
+    if 'aplicados' not in estado:
+        estado.update(aplicados=valores, pendentes=valores, alterado_em=agora)
+    if valores != estado['pendentes']:
+        estado['pendentes'], estado['alterado_em'] = valores, agora
+    if valores == estado['aplicados']:
+        return
+
+    if estado['execucao_completa']:
+        estado['aplicados'] = valores
+        return
+    restante = config.ESPERA_FILTROS - (agora - estado['alterado_em'])
+    if restante <= 0:
+        estado['aplicados'] = valores
+        st.rerun()
+    st.caption("⏳ Aplicando os filtros…")
+    time.sleep(min(FATIA_ESPERA_S, restante))
+    st.rerun(scope="fragment")
@@ -0,0 +1,124 @@
+import logging
+import threading
+import time
+
+import plotly.io as pio
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from dados import config
+from dados.metricas import LIMITES_BYTES, contador, histograma
+from servicos.metricas import iniciar_servidor_metricas
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# MÉTRICAS DAS PÁGINAS
+# ========================================
+# Cada página chama ``iniciar_pagina`` logo após ``st.set_page_config`` e
+# ``concluir_pagina`` na última linha do script. A duração entre as duas é a
+# latência da execução. O Streamlit não avisa quando um script é
+# interrompido (um rerun no meio, ``st.stop()`` ou erro), então uma execução
+# que não chegou ao fim é contada como interrompida quando a próxima da
+# mesma sessão começa.
+#
+# ``grafico`` substitui ``st.plotly_chart``: mede a mensagem que o Streamlit
+# monta para o navegador, sem serializar a figura de novo, e soma no total
+# da execução, comparado ao fim com o orçamento da página
+# (ORCAMENTO_PAYLOAD_KB / ORCAMENTOS_PAYLOAD). A medida é o que sai de fato:
+# uma figura que o navegador já tem em cache vai como referência curta.
+# A medida intercepta ``ScriptRunContext._enqueue``, que é interno do
+# Streamlit; numa versão sem ele, a figura é serializada para ser medida.
+# Gráficos redesenhados só por um fragmento entram no histograma por
+# figura, não no total da execução.
+
+CHAVE_EXECUCAO = "_metricas_execucao"
+
+EXECUCOES = contador("dashboard_execucoes_total", "Execuções de página", ["pagina", "resultado"])
+DURACAO = histograma("dashboard_execucao_segundos", "Duração das execuções completas de página", ["pagina"])
+BYTES_GRAFICO = histograma("dashboard_grafico_bytes", "Tamanho de cada figura enviada ao navegador",
+                           ["pagina"], LIMITES_BYTES)
+BYTES_EXECUCAO = histograma("dashboard_payload_execucao_bytes", "Bytes de gráficos enviados por execução de página",
+                            ["pagina"], LIMITES_BYTES)
+ORCAMENTO_EXCEDIDO = contador("dashboard_orcamento_payload_excedido_total",
+                              "Execuções que passaram do orçamento de bytes da página", ["pagina"])
+
+
+def orcamento_payload_kb(pagina):
+    return config.ORCAMENTOS_PAYLOAD.get(pagina, config.ORCAMENTO_PAYLOAD_KB)
+
+
+def iniciar_pagina(pagina):
+    """Começa a medir a execução de ``pagina`` (nome da URL; "inicio" para a principal)."""
+    iniciar_servidor_metricas()
+    anterior = st.session_state.get(CHAVE_EXECUCAO)
+    if anterior is not None and not anterior['concluida']:
+        EXECUCOES.incrementar(pagina=anterior['pagina'], resultado="interrompida")
+    st.session_state[CHAVE_EXECUCAO] = {
+        'pagina': pagina, 'inicio': time.perf_counter(), 'bytes': 0, 'concluida': False,
+    }
+
+
+def concluir_pagina():
+    """Registra a execução completa: duração, bytes dos gráficos e orçamento."""
+    execucao = st.session_state.get(CHAVE_EXECUCAO)
+    if execucao is None or execucao['concluida']:
+        return
+    execucao['concluida'] = True
+    pagina = execucao['pagina']
+    EXECUCOES.incrementar(pagina=pagina, resultado="completa")
+    DURACAO.observar(time.perf_counter() - execucao['inicio'], pagina=pagina)
+    BYTES_EXECUCAO.observar(execucao['bytes'], pagina=pagina)
+
+    orcamento = orcamento_payload_kb(pagina)
+    if execucao['bytes'] > orcamento * 1024:
+        ORCAMENTO_EXCEDIDO.incrementar(pagina=pagina)
+        logger.warning("Página '%s' enviou %.0f KiB em gráficos numa execução (orçamento: %.0f KiB)",
+                       pagina, execucao['bytes'] / 1024, orcamento)
+
+
+def _tamanho_serializado(figura):
+    return len(pio.to_json(figura, validate=False))
+
+
+def _enviar_medindo(contexto, figura, opcoes):
+    """Desenha a figura e devolve (elemento, bytes das mensagens enviadas para ela)."""
+    # ``_enqueue`` é interno do Streamlit: sem ele, mede a figura serializada
+    enviar = getattr(contexto, "_enqueue", None)
+    if not callable(enviar):
+        return st.plotly_chart(figura, **opcoes), _tamanho_serializado(figura)
+
+    # Só as mensagens desta thread: outra thread da sessão que desenhe algo
+    # durante a chamada não entra na conta da figura
+    thread = threading.get_ident()
+    tamanhos = []
+
+    def medir(mensagem):
+        if threading.get_ident() == thread:
+            tamanhos.append(mensagem.ByteSize())
+        enviar(mensagem)
+
+    contexto._enqueue = medir
+    try:
+        resultado = st.plotly_chart(figura, **opcoes)
+    finally:
+        contexto._enqueue = enviar
+    if not tamanhos:
+        # Nenhuma mensagem passou por ali: o Streamlit mudou o caminho de envio
+        return resultado, _tamanho_serializado(figura)
+    return resultado, sum(tamanhos)
+
+
+def grafico(figura, **opcoes):
+    """``st.plotly_chart`` com o tamanho da figura contado na execução da página."""
+    contexto = get_script_run_ctx()
+    if contexto is None:
+        # Fora de uma sessão nada é enviado ao navegador
+        return st.plotly_chart(figura, **opcoes)
+
+    resultado, tamanho = _enviar_medindo(contexto, figura, opcoes)
+    execucao = st.session_state.get(CHAVE_EXECUCAO)
+    BYTES_GRAFICO.observar(tamanho, pagina=execucao['pagina'] if execucao else "desconhecida")
+    if execucao is not None and not execucao['concluida']:
+        execucao['bytes'] += tamanho
+    return resultado
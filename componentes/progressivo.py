@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+# ========================================
+# RESULTADOS PROGRESSIVOS
+# ========================================
+# No modo de consulta aproximada, cada seção é desenhada primeiro com a
+# estimativa da amostra estratificada, num espaço reservado (``st.empty``).
+# O cálculo exato começa ao mesmo tempo numa thread e, em ``concluir()``,
+# substitui a estimativa no mesmo lugar da página. O navegador recebe a
+# estimativa assim que ela é desenhada, sem esperar o restante da execução.
+#
+# Só o cálculo roda na thread: os elementos do Streamlit são sempre criados
+# pela execução da página.
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="refino-exato")
+
+
+class RefinoProgressivo:
+    """Seções desenhadas com estimativas e trocadas pelo resultado exato quando ele fica pronto."""
+
+    def __init__(self, ativo):
+        self.ativo = ativo
+        self._pendentes = []
+
+    def exibir(self, desenhar, aproximado, exato):
+        """Chama ``desenhar(resultado, aproximado)`` com a estimativa e, depois, com o valor exato.
+
+        ``aproximado`` e ``exato`` são funções sem argumentos. Fora do modo
+        aproximado, desenha direto o resultado exato. Retorna uma função que
+        devolve o resultado exato (esperando por ele, se preciso), para as
+        seções seguintes da página reaproveitarem o cálculo.
+        """
+        if not self.ativo:
+            resultado = exato()
+            desenhar(resultado, False)
+            return lambda: resultado
+        futuro = _executor.submit(exato)
+        area = st.empty()
+        with area.container():
+            desenhar(aproximado(), True)
+        self._pendentes.append((area, futuro, desenhar))
+        return futuro.result
+
+    def concluir(self):
+        """Espera os cálculos exatos e troca cada estimativa pelo resultado, na ordem da página."""
+        for area, futuro, desenhar in self._pendentes:
+            resultado = futuro.result()
+            with area.container():
+                desenhar(resultado, False)
+        self._pendentes.clear()
+
+
+def legenda_aproximada(amostra, total_amostra):
+    """Aviso exibido junto das estimativas."""
+    st.caption(
+        f"≈ Estimativa a partir de {total_amostra:,} eventos de uma amostra estratificada por ano e tsunami "
+        f"({len(amostra):,} de {amostra.populacao:,}); intervalos de 95%. O valor exato substitui este assim "
+        f"que ficar pronto."
+    )
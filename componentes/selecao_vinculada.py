@@ -0,0 +1,50 @@
+import numpy as np
+import streamlit as st
+
+from componentes.metricas import grafico
+
+# ========================================
+# SELEÇÃO VINCULADA ENTRE GRÁFICOS
+# ========================================
+# Os gráficos selecionáveis levam o número de linha do catálogo de cada ponto
+# como primeiro valor de ``customdata``. Uma seleção por caixa ou laço
+# reexecuta a página, e o estado do gráfico (guardado pelo Streamlit em
+# ``st.session_state[chave]``) já está disponível no início da execução:
+# a página aplica a seleção a todas as seções, inclusive às desenhadas antes
+# do gráfico. Um duplo clique no gráfico limpa a seleção.
+#
+# Os números de linha só valem para a versão do catálogo em que a seleção
+# foi feita. A chave do gráfico inclui a versão: quando a atualização em
+# segundo plano publica uma versão nova, a página procura a seleção numa
+# chave que ainda não existe, o gráfico volta sem seleção e o estado antigo
+# é descartado pelo Streamlit.
+
+MODOS_SELECAO = ("box", "lasso")
+
+
+def chave_versao(chave, catalogo):
+    """Chave do gráfico na versão de ``catalogo``."""
+    return f"{chave}:{catalogo.versao}"
+
+
+def linhas_selecionadas(chave, catalogo):
+    """Números de linha de ``catalogo`` selecionados no gráfico ``chave`` (None sem seleção)."""
+    estado = st.session_state.get(chave_versao(chave, catalogo))
+    pontos = estado['selection']['points'] if estado else []
+    if not pontos:
+        return None
+    return np.unique(np.array([ponto['customdata'][0] for ponto in pontos], dtype=np.int64))
+
+
+def grafico_selecionavel(figura, chave, catalogo):
+    """Desenha o gráfico com seleção por caixa e laço, guardada em ``chave`` na versão de ``catalogo``."""
+    grafico(figura, use_container_width=True, key=chave_versao(chave, catalogo), on_select="rerun",
+            selection_mode=MODOS_SELECAO)
+
+
+def aviso_selecao(linhas, origem):
+    """Aviso exibido nas seções que estão mostrando só a seleção."""
+    st.caption(
+        f"🖌️ Mostrando os {len(linhas):,} eventos selecionados {origem}. "
+        f"Dê um duplo clique no gráfico para limpar a seleção."
+    )
@@ -0,0 +1,15 @@
+from dados.backend import BackendPandas, obter_backend
+from dados.catalogo import Catalogo, descrever_versao, obter_catalogo
+from dados.filtros import FiltroEventos, agregar_por_ano, filtrar_eventos, resumir_eventos
+
+__all__ = [
+    "BackendPandas",
+    "Catalogo",
+    "FiltroEventos",
+    "agregar_por_ano",
+    "descrever_versao",
+    "filtrar_eventos",
+    "obter_backend",
+    "obter_catalogo",
+    "resumir_eventos",
+]
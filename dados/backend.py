@@ -0,0 +1,114 @@
+import os
+import threading
+from collections import OrderedDict
+
+from dados import config
+from dados.bitmaps import IndiceBitmaps
+from dados.filtros import agregar_por_ano, carregar_eventos_csv
+
+# ========================================
+# BACKEND PANDAS (PADRÃO)
+# ========================================
+
+
+class BackendPandas:
+    """Mantém o catálogo inteiro em memória e filtra com pandas.
+
+    Os filtros são resolvidos num índice de bitmaps por valor, montado na
+    primeira consulta. Cada seleção é guardada como ``Bitmap`` (não como
+    DataFrame) num LRU compartilhado pelas sessões; contagens saem dela por
+    popcount e o DataFrame só é montado quando uma página pede as linhas.
+    """
+
+    nome = "pandas"
+    em_memoria = True
+    SELECOES_EM_CACHE = 64
+
+    def __init__(self, df):
+        self.df = df
+        self._indice = None
+        self._selecoes = OrderedDict()
+        self._trava = threading.Lock()
+
+    @property
+    def indice(self):
+        if self._indice is None:
+            with self._trava:
+                if self._indice is None:
+                    self._indice = IndiceBitmaps(self.df)
+        return self._indice
+
+    def selecionar(self, filtro):
+        """Linhas que atendem ao filtro, como ``Bitmap``."""
+        with self._trava:
+            selecao = self._selecoes.get(filtro)
+            if selecao is not None:
+                self._selecoes.move_to_end(filtro)
+                return selecao
+        selecao = self.indice.selecionar(filtro)
+        with self._trava:
+            self._selecoes[filtro] = selecao
+            while len(self._selecoes) > self.SELECOES_EM_CACHE:
+                self._selecoes.popitem(last=False)
+        return selecao
+
+    def limites(self):
+        df = self.df
+        return {
+            'magnitude': (float(df['magnitude'].min()), float(df['magnitude'].max())),
+            'profundidade': (float(df['depth'].min()), float(df['depth'].max())),
+            'anos': (int(df['Year'].min()), int(df['Year'].max())),
+        }
+
+    def filtrar(self, filtro):
+        return self.df.iloc[self.selecionar(filtro).indices()]
+
+    def agregar_por_ano(self, filtro):
+        return agregar_por_ano(self.filtrar(filtro))
+
+    def resumo(self, filtro):
+        return self.indice.resumir(self.selecionar(filtro))
+
+
+# ========================================
+# SELEÇÃO DO BACKEND
+# ========================================
+
+BACKENDS_DISPONIVEIS = ("pandas", "sqlite")
+
+
+def obter_backend(nome=None, df=None, caminho_csv=None, versao=None):
+    """Cria o backend configurado em ``DASHBOARD_BACKEND``.
+
+    ``df`` permite reaproveitar um catálogo já carregado; caso contrário o
+    CSV de eventos é lido do diretório de dados. Quando ``versao`` é
+    informada, o backend SQLite usa um banco exclusivo daquela versão.
+    """
+    nome = (nome or config.BACKEND).lower()
+    caminho_csv = caminho_csv or config.ARQUIVO_EVENTOS
+
+    if nome not in BACKENDS_DISPONIVEIS:
+        raise ValueError(
+            f"Backend '{nome}' desconhecido. Opções: {', '.join(BACKENDS_DISPONIVEIS)}"
+        )
+
+    if df is None:
+        df = carregar_eventos_csv(caminho_csv)
+
+    if nome == "sqlite":
+        from dados.backend_sqlite import BackendSQLite
+
+        if versao is not None:
+            caminho_banco = os.path.join(config.DIRETORIO_CACHE, f"catalogo-{versao}.sqlite")
+            # As colunas entram na assinatura: um banco da mesma versão dos
+            # dados gravado antes de uma coluna nova (ex.: ``principal``) é refeito
+            return BackendSQLite.construir(df, caminho_banco, f"{versao}:" + ",".join(df.columns))
+
+        estado = os.stat(caminho_csv)
+        assinatura = (
+            f"{os.path.abspath(caminho_csv)}:{estado.st_size}:{estado.st_mtime_ns}:"
+            + ",".join(df.columns)
+        )
+        return BackendSQLite.construir(df, config.ARQUIVO_SQLITE, assinatura)
+
+    return BackendPandas(df)
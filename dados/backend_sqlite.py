@@ -0,0 +1,260 @@
+import os
+import sqlite3
+import sys
+from contextlib import closing
+
+import pandas as pd
+
+from dados.filtros import FiltroEventos, chave_espacial, chaves_bbox
+
+# ========================================
+# BACKEND SQLITE (BANCO EMBARCADO)
+# ========================================
+# Os eventos ficam em um arquivo SQLite local com índices nas colunas
+# usadas pelos filtros. Filtros e agregações são executados pelo banco;
+# somente o resultado volta para o Python.
+
+TABELA = "eventos"
+
+INDICES = {
+    "idx_magnitude": ["magnitude"],
+    "idx_depth": ["depth"],
+    "idx_ano_mes": ["Year", "Month"],
+    "idx_tsunami": ["tsunami"],
+    "idx_celula": ["celula"],
+    "idx_principal": ["principal"],
+}
+
+
+def _coluna(nome):
+    return '"' + nome.replace('"', '""') + '"'
+
+
+def _clausula_where(filtro):
+    condicoes = []
+    parametros = []
+
+    def intervalo(coluna, limites):
+        if limites is None:
+            return
+        minimo, maximo = limites
+        if minimo is not None:
+            condicoes.append(f"{_coluna(coluna)} >= ?")
+            parametros.append(minimo)
+        if maximo is not None:
+            condicoes.append(f"{_coluna(coluna)} <= ?")
+            parametros.append(maximo)
+
+    intervalo("magnitude", filtro.magnitude)
+    intervalo("depth", filtro.profundidade)
+    intervalo("Year", filtro.anos)
+
+    if filtro.tsunami is not None:
+        condicoes.append(f"{_coluna('tsunami')} = ?")
+        parametros.append(int(filtro.tsunami))
+
+    if filtro.bbox is not None:
+        lat_min, lat_max, lon_min, lon_max = filtro.bbox
+        celulas = chaves_bbox(filtro.bbox)
+        condicoes.append(f"celula IN ({', '.join('?' * len(celulas))})")
+        parametros.extend(celulas)
+        intervalo("latitude", (lat_min, lat_max))
+        intervalo("longitude", (lon_min, lon_max))
+
+    if filtro.apenas_principais:
+        condicoes.append("principal = 1")
+
+    if not condicoes:
+        return "", parametros
+    return "WHERE " + " AND ".join(condicoes), parametros
+
+
+class BackendSQLite:
+    """Consulta o catálogo armazenado em um arquivo SQLite indexado."""
+
+    nome = "sqlite"
+    em_memoria = False
+
+    def __init__(self, caminho_banco, colunas, tipos):
+        self.caminho_banco = caminho_banco
+        self.colunas = list(colunas)
+        self.tipos = dict(tipos)
+
+    # ----------------------------------------
+    # Construção do banco
+    # ----------------------------------------
+
+    @classmethod
+    def construir(cls, df, caminho_banco, assinatura):
+        """Cria (ou reaproveita) o banco para o catálogo ``df``.
+
+        O banco só é reconstruído quando a assinatura do arquivo de origem
+        muda. A escrita é feita em um arquivo temporário e depois trocada
+        com ``os.replace`` para que leitores nunca vejam um banco parcial.
+        """
+        if cls._assinatura_gravada(caminho_banco) != assinatura:
+            os.makedirs(os.path.dirname(caminho_banco) or ".", exist_ok=True)
+            temporario = f"{caminho_banco}.{os.getpid()}.tmp"
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+            df_banco = df.copy()
+            df_banco.insert(0, "id", range(len(df_banco)))
+            df_banco["celula"] = chave_espacial(df_banco["latitude"], df_banco["longitude"])
+
+            with closing(sqlite3.connect(temporario)) as conn:
+                df_banco.to_sql(TABELA, conn, index=False)
+                for nome_indice, colunas in INDICES.items():
+                    if not set(colunas) <= set(df_banco.columns):
+                        continue
+                    lista = ", ".join(_coluna(c) for c in colunas)
+                    conn.execute(f"CREATE INDEX {nome_indice} ON {TABELA} ({lista})")
+                conn.execute("CREATE TABLE meta (chave TEXT PRIMARY KEY, valor TEXT)")
+                conn.executemany(
+                    "INSERT INTO meta VALUES (?, ?)",
+                    [("assinatura", assinatura)]
+                    + [(f"tipo:{coluna}", str(tipo)) for coluna, tipo in df.dtypes.items()],
+                )
+                conn.execute("ANALYZE")
+                conn.commit()
+            os.replace(temporario, caminho_banco)
+
+        return cls.abrir(caminho_banco)
+
+    @classmethod
+    def abrir(cls, caminho_banco):
+        with closing(sqlite3.connect(caminho_banco)) as conn:
+            linhas = conn.execute(
+                "SELECT chave, valor FROM meta WHERE chave LIKE 'tipo:%' ORDER BY rowid"
+            ).fetchall()
+        tipos = {chave[len("tipo:"):]: valor for chave, valor in linhas}
+        return cls(caminho_banco, tipos.keys(), tipos)
+
+    @staticmethod
+    def _assinatura_gravada(caminho_banco):
+        if not os.path.exists(caminho_banco):
+            return None
+        try:
+            with closing(sqlite3.connect(caminho_banco)) as conn:
+                linha = conn.execute(
+                    "SELECT valor FROM meta WHERE chave = 'assinatura'"
+                ).fetchone()
+        except sqlite3.DatabaseError:
+            return None
+        return linha[0] if linha else None
+
+    # ----------------------------------------
+    # Consultas
+    # ----------------------------------------
+
+    def _conectar(self):
+        # Uma conexão por consulta: cada sessão do Streamlit roda em sua própria thread
+        return sqlite3.connect(f"file:{self.caminho_banco}?mode=ro", uri=True)
+
+    def limites(self):
+        sql = (
+            f"SELECT MIN(magnitude), MAX(magnitude), MIN(depth), MAX(depth), "
+            f"MIN({_coluna('Year')}), MAX({_coluna('Year')}) FROM {TABELA}"
+        )
+        with closing(self._conectar()) as conn:
+            mag_min, mag_max, prof_min, prof_max, ano_min, ano_max = conn.execute(sql).fetchone()
+        return {
+            'magnitude': (float(mag_min), float(mag_max)),
+            'profundidade': (float(prof_min), float(prof_max)),
+            'anos': (int(ano_min), int(ano_max)),
+        }
+
+    def filtrar(self, filtro):
+        where, parametros = _clausula_where(filtro)
+        lista = ", ".join(["id"] + [_coluna(c) for c in self.colunas])
+        sql = f"SELECT {lista} FROM {TABELA} {where} ORDER BY id"
+        with closing(self._conectar()) as conn:
+            df = pd.read_sql_query(sql, conn, params=parametros, index_col="id")
+        df.index = pd.Index(df.index.to_numpy(dtype="int64"))
+        return df.astype(self.tipos)
+
+    def agregar_por_ano(self, filtro):
+        where, parametros = _clausula_where(filtro)
+        ano = _coluna("Year")
+        sql = (
+            f"SELECT {ano} AS year, MAX(magnitude) AS max_mag, AVG(magnitude) AS mean_mag, "
+            f"COUNT(*) AS count FROM {TABELA} {where} GROUP BY {ano} ORDER BY {ano}"
+        )
+        with closing(self._conectar()) as conn:
+            df = pd.read_sql_query(sql, conn, params=parametros)
+        return df.astype({'year': self.tipos['Year'], 'max_mag': 'float64',
+                          'mean_mag': 'float64', 'count': 'int64'})
+
+    def resumo(self, filtro):
+        where, parametros = _clausula_where(filtro)
+        sql = f"SELECT COUNT(*), MAX(magnitude), SUM(tsunami) FROM {TABELA} {where}"
+        with closing(self._conectar()) as conn:
+            total, magnitude_max, tsunamis = conn.execute(sql, parametros).fetchone()
+        return {
+            'total': int(total),
+            'magnitude_max': float(magnitude_max) if total > 0 else None,
+            'tsunamis': int(tsunamis or 0),
+        }
+
+
+# ========================================
+# VERIFICAÇÃO CONTRA O CAMINHO PANDAS
+# ========================================
+
+FILTROS_VERIFICACAO = [
+    FiltroEventos(),
+    FiltroEventos(magnitude=(7.0, None)),
+    FiltroEventos(magnitude=(6.5, 7.5), profundidade=(0.0, 70.0)),
+    FiltroEventos(magnitude=(6.5, 9.1), profundidade=(2.7, 670.81), tsunami=1),
+    FiltroEventos(tsunami=0, anos=(2005, 2015)),
+    FiltroEventos(bbox=(-60.0, 10.0, -90.0, -30.0)),
+    FiltroEventos(magnitude=(7.2, None), bbox=(20.0, 50.0, 120.0, 160.0), tsunami=1),
+    FiltroEventos(magnitude=(9.5, None)),
+    FiltroEventos(apenas_principais=True),
+    FiltroEventos(magnitude=(7.0, None), tsunami=1, apenas_principais=True),
+]
+
+
+def verificar_equivalencia(df, backend_sql, filtros=None):
+    """Compara filtros, agregações e resumos do SQLite com o caminho pandas.
+
+    Retorna a lista de divergências encontradas (vazia quando os resultados
+    são idênticos).
+    """
+    from dados.backend import BackendPandas
+
+    backend_pandas = BackendPandas(df)
+    divergencias = []
+
+    for filtro in filtros or FILTROS_VERIFICACAO:
+        comparacoes = [
+            ("filtrar", lambda b: b.filtrar(filtro), {}),
+            ("agregar_por_ano", lambda b: b.agregar_por_ano(filtro), {"check_exact": False}),
+        ]
+        for nome, consulta, opcoes in comparacoes:
+            try:
+                pd.testing.assert_frame_equal(
+                    consulta(backend_pandas), consulta(backend_sql), **opcoes
+                )
+            except AssertionError as erro:
+                divergencias.append(f"{nome} {filtro}: {erro}")
+
+        if backend_pandas.resumo(filtro) != backend_sql.resumo(filtro):
+            divergencias.append(f"resumo {filtro}")
+
+    if backend_pandas.limites() != backend_sql.limites():
+        divergencias.append("limites")
+
+    return divergencias
+
+
+if __name__ == "__main__":
+    from dados.backend import obter_backend
+    from dados.catalogo import construir_catalogo
+
+    df_eventos = construir_catalogo(backend="pandas").eventos
+    falhas = verificar_equivalencia(df_eventos, obter_backend("sqlite", df=df_eventos))
+    for falha in falhas:
+        print(f"DIVERGÊNCIA: {falha}")
+    print(f"{len(FILTROS_VERIFICACAO)} filtros verificados, {len(falhas)} divergência(s).")
+    sys.exit(1 if falhas else 0)
@@ -0,0 +1,358 @@
+import argparse
+import time
+
+import numpy as np
+
+from dados.filtros import FiltroEventos, mascara_eventos
+
+# ========================================
+# BITMAPS COMPRIMIDOS (ESTILO ROARING)
+# ========================================
+# Um conjunto de linhas do catálogo é dividido em blocos de 65.536 linhas.
+# Cada bloco guarda só os 16 bits baixos das linhas presentes:
+#
+#   - bloco esparso (até 4.096 linhas): vetor ordenado de uint16;
+#   - bloco denso: mapa de 65.536 bits (1.024 palavras de 64 bits).
+#
+# Blocos vazios não existem. Interseção e união são feitas bloco a bloco
+# (E/OU de palavras, busca de bits ou ``intersect1d`` conforme os tipos) e
+# a contagem é a soma do popcount das palavras. Assim nenhum bloco passa de
+# 8 KiB e um conjunto esparso custa 2 bytes por linha.
+
+BITS_BLOCO = 16
+TAMANHO_BLOCO = 1 << BITS_BLOCO
+LIMITE_ESPARSO = 4096
+PALAVRAS_BLOCO = TAMANHO_BLOCO // 64
+
+# Colunas de baixa cardinalidade ganham um bitmap por valor distinto
+COLUNAS_INDEXAVEIS = ('tsunami', 'principal', 'Year', 'Month', 'magnitude', 'depth')
+LIMITE_CARDINALIDADE = 256
+
+if hasattr(np, 'bitwise_count'):
+    def _popcount(palavras):
+        return int(np.bitwise_count(palavras).sum())
+else:
+    _BITS_POR_BYTE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+    def _popcount(palavras):
+        return int(_BITS_POR_BYTE[palavras.view(np.uint8)].sum())
+
+
+def _denso(posicoes):
+    bits = np.zeros(TAMANHO_BLOCO, dtype=bool)
+    bits[posicoes] = True
+    return np.packbits(bits, bitorder='little').view(np.uint64)
+
+
+def _posicoes(bloco):
+    if bloco.dtype == np.uint16:
+        return bloco
+    bits = np.unpackbits(bloco.view(np.uint8), bitorder='little')
+    return np.flatnonzero(bits).astype(np.uint16)
+
+
+def _normalizar(bloco):
+    """Escolhe a forma mais compacta; devolve None para bloco vazio."""
+    if bloco.dtype == np.uint16:
+        if len(bloco) == 0:
+            return None
+        return _denso(bloco) if len(bloco) > LIMITE_ESPARSO else bloco
+    cardinalidade = _popcount(bloco)
+    if cardinalidade == 0:
+        return None
+    return _posicoes(bloco) if cardinalidade <= LIMITE_ESPARSO else bloco
+
+
+def _contem(denso, posicoes):
+    palavras = denso[posicoes >> 6]
+    return ((palavras >> (posicoes & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+
+def _e_bloco(a, b):
+    if a.dtype == np.uint16 and b.dtype == np.uint16:
+        return _normalizar(np.intersect1d(a, b, assume_unique=True))
+    if a.dtype == np.uint16:
+        return _normalizar(a[_contem(b, a)])
+    if b.dtype == np.uint16:
+        return _normalizar(b[_contem(a, b)])
+    return _normalizar(a & b)
+
+
+def _ou_blocos(blocos):
+    esparsos = [b for b in blocos if b.dtype == np.uint16]
+    densos = [b for b in blocos if b.dtype != np.uint16]
+    if not densos and sum(len(b) for b in esparsos) <= LIMITE_ESPARSO:
+        return _normalizar(np.unique(np.concatenate(esparsos)))
+    palavras = np.bitwise_or.reduce(densos) if densos else np.zeros(PALAVRAS_BLOCO, dtype=np.uint64)
+    if esparsos:
+        palavras = palavras | _denso(np.concatenate(esparsos))
+    return _normalizar(palavras)
+
+
+class Bitmap:
+    """Conjunto imutável de números de linha, comprimido por blocos."""
+
+    __slots__ = ('chaves', 'blocos')
+
+    def __init__(self, chaves, blocos):
+        self.chaves = np.asarray(chaves, dtype=np.int64)
+        self.blocos = list(blocos)
+
+    @classmethod
+    def de_indices(cls, indices):
+        """A partir de números de linha ordenados e sem repetição."""
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) == 0:
+            return cls([], [])
+        chaves = indices >> BITS_BLOCO
+        cortes = np.flatnonzero(np.diff(chaves)) + 1
+        inicios = np.concatenate([[0], cortes])
+        baixos = (indices & (TAMANHO_BLOCO - 1)).astype(np.uint16)
+        return cls(chaves[inicios], [_normalizar(parte) for parte in np.split(baixos, cortes)])
+
+    @classmethod
+    def de_mascara(cls, mascara):
+        return cls.de_indices(np.flatnonzero(mascara))
+
+    @classmethod
+    def completo(cls, n):
+        """Todas as linhas de 0 a n - 1."""
+        return cls.de_indices(np.arange(n))
+
+    def __len__(self):
+        return sum(len(b) if b.dtype == np.uint16 else _popcount(b) for b in self.blocos)
+
+    @property
+    def nbytes(self):
+        return self.chaves.nbytes + sum(b.nbytes for b in self.blocos)
+
+    def indices(self):
+        """Números de linha em ordem crescente (int64)."""
+        if not self.blocos:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([
+            (chave << BITS_BLOCO) + _posicoes(bloco).astype(np.int64)
+            for chave, bloco in zip(self.chaves, self.blocos)
+        ])
+
+    def __and__(self, outro):
+        comuns, pos_a, pos_b = np.intersect1d(self.chaves, outro.chaves, assume_unique=True, return_indices=True)
+        chaves, blocos = [], []
+        for chave, i, j in zip(comuns, pos_a, pos_b):
+            bloco = _e_bloco(self.blocos[i], outro.blocos[j])
+            if bloco is not None:
+                chaves.append(chave)
+                blocos.append(bloco)
+        return Bitmap(chaves, blocos)
+
+    def __or__(self, outro):
+        return Bitmap.uniao([self, outro])
+
+    @staticmethod
+    def uniao(bitmaps):
+        """União de vários bitmaps de uma vez, bloco a bloco."""
+        por_chave = {}
+        for bitmap in bitmaps:
+            for chave, bloco in zip(bitmap.chaves.tolist(), bitmap.blocos):
+                por_chave.setdefault(chave, []).append(bloco)
+        chaves = sorted(por_chave)
+        return Bitmap(chaves, [
+            por_chave[c][0] if len(por_chave[c]) == 1 else _ou_blocos(por_chave[c]) for c in chaves
+        ])
+
+    def intersecta(self, outro):
+        """Se há ao menos uma linha em comum, sem montar a interseção inteira."""
+        comuns, pos_a, pos_b = np.intersect1d(self.chaves, outro.chaves, assume_unique=True, return_indices=True)
+        return any(_e_bloco(self.blocos[i], outro.blocos[j]) is not None for i, j in zip(pos_a, pos_b))
+
+
+# ========================================
+# ÍNDICE DE BITMAPS DO CATÁLOGO
+# ========================================
+
+
+def _intervalo_numpy(valores, intervalo):
+    mascara = np.ones(len(valores), dtype=bool)
+    if intervalo is None:
+        return mascara
+    minimo, maximo = intervalo
+    if minimo is not None:
+        mascara &= valores >= minimo
+    if maximo is not None:
+        mascara &= valores <= maximo
+    return mascara
+
+
+class IndiceBitmaps:
+    """Um bitmap por valor distinto das colunas de baixa cardinalidade.
+
+    Os predicados sobre colunas indexadas viram uniões e interseções de
+    bitmaps; os demais (colunas contínuas, bbox) são avaliados só nas linhas
+    que sobraram. O resultado de ``selecionar`` é sempre um ``Bitmap``.
+    """
+
+    def __init__(self, df, colunas=COLUNAS_INDEXAVEIS, limite_cardinalidade=LIMITE_CARDINALIDADE):
+        self.n = len(df)
+        self._colunas = {c: df[c].to_numpy() for c in ('magnitude', 'depth', 'Year', 'latitude', 'longitude')
+                         if c in df.columns}
+        self.valores = {}
+        self.bitmaps = {}
+        for coluna in colunas:
+            if coluna not in df.columns or df[coluna].nunique() > limite_cardinalidade:
+                continue
+            dados = df[coluna].to_numpy()
+            validos = np.flatnonzero(~np.isnan(dados)) if dados.dtype.kind == 'f' else np.arange(len(dados))
+            ordem = validos[np.argsort(dados[validos], kind='stable')]
+            ordenados = dados[ordem]
+            cortes = np.flatnonzero(ordenados[1:] != ordenados[:-1]) + 1
+            inicios = np.concatenate([[0], cortes]) if len(ordenados) else np.empty(0, dtype=np.int64)
+            self.valores[coluna] = ordenados[inicios]
+            # A ordenação estável mantém as linhas de cada valor em ordem crescente
+            self.bitmaps[coluna] = [Bitmap.de_indices(parte) for parte in np.split(ordem, cortes)] if len(ordem) else []
+
+    @property
+    def nbytes(self):
+        return sum(b.nbytes for lista in self.bitmaps.values() for b in lista)
+
+    def igual(self, coluna, valor):
+        valores = self.valores[coluna]
+        posicao = np.searchsorted(valores, valor)
+        if posicao < len(valores) and valores[posicao] == valor:
+            return self.bitmaps[coluna][posicao]
+        return Bitmap([], [])
+
+    def intervalo(self, coluna, intervalo):
+        valores = self.valores[coluna]
+        minimo, maximo = intervalo
+        inicio = 0 if minimo is None else np.searchsorted(valores, minimo, side='left')
+        fim = len(valores) if maximo is None else np.searchsorted(valores, maximo, side='right')
+        return Bitmap.uniao(self.bitmaps[coluna][inicio:fim])
+
+    def selecionar(self, filtro):
+        """Linhas que atendem ao filtro, com a mesma semântica de ``mascara_eventos``."""
+        predicados, residuais = [], []
+        for coluna, intervalo in (('magnitude', filtro.magnitude), ('depth', filtro.profundidade),
+                                  ('Year', filtro.anos)):
+            if intervalo is None:
+                continue
+            if coluna in self.valores:
+                predicados.append(self.intervalo(coluna, intervalo))
+            else:
+                residuais.append((coluna, intervalo))
+        if filtro.tsunami is not None:
+            predicados.append(self.igual('tsunami', filtro.tsunami))
+        if filtro.apenas_principais:
+            predicados.append(self.igual('principal', 1))
+        if filtro.bbox is not None:
+            lat_min, lat_max, lon_min, lon_max = filtro.bbox
+            residuais += [('latitude', (lat_min, lat_max)), ('longitude', (lon_min, lon_max))]
+
+        if not predicados:
+            if not residuais:
+                return Bitmap.completo(self.n)
+            candidatos = None
+        else:
+            # Interseção do menor para o maior: o resultado só encolhe
+            predicados.sort(key=len)
+            selecao = predicados[0]
+            for predicado in predicados[1:]:
+                if len(selecao) == 0:
+                    break
+                selecao = selecao & predicado
+            if not residuais:
+                return selecao
+            candidatos = selecao.indices()
+
+        mascara = None
+        for coluna, intervalo in residuais:
+            dados = self._colunas[coluna] if candidatos is None else self._colunas[coluna][candidatos]
+            parcial = _intervalo_numpy(dados, intervalo)
+            mascara = parcial if mascara is None else mascara & parcial
+        if candidatos is None:
+            return Bitmap.de_mascara(mascara)
+        return Bitmap.de_indices(candidatos[mascara])
+
+    def resumir(self, selecao):
+        """Métricas dos cartões (``resumir_eventos``) a partir do bitmap, sem montar o DataFrame."""
+        total = len(selecao)
+        if total == 0:
+            return {'total': 0, 'magnitude_max': None, 'tsunamis': 0}
+
+        if 'magnitude' in self.valores and total * 16 > self.n:
+            # Seleção grande: o primeiro valor, de cima para baixo, presente nela.
+            # Seleções pequenas saem mais baratas lendo só as suas linhas.
+            magnitude_max = next(
+                float(valor) for valor, bitmap in zip(self.valores['magnitude'][::-1], self.bitmaps['magnitude'][::-1])
+                if bitmap.intersecta(selecao)
+            )
+        else:
+            magnitude_max = float(np.nanmax(self._colunas['magnitude'][selecao.indices()]))
+
+        return {
+            'total': total,
+            'magnitude_max': magnitude_max,
+            'tsunamis': len(selecao & self.igual('tsunami', 1)),
+        }
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Compara filtros por bitmap com a varredura das colunas.")
+    parser.add_argument("--linhas", type=int, default=5_000_000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    argumentos = parser.parse_args()
+
+    gerador = np.random.default_rng(0)
+    n = argumentos.linhas
+    df = pd.DataFrame({
+        'magnitude': np.round(6.5 + gerador.exponential(0.4, n), 1),
+        'depth': np.round(gerador.exponential(60, n), 2),
+        'latitude': gerador.uniform(-70, 70, n),
+        'longitude': gerador.uniform(-180, 180, n),
+        'Year': gerador.integers(1995, 2024, n),
+        'Month': gerador.integers(1, 13, n),
+        'tsunami': (gerador.random(n) < 0.3).astype(np.int64),
+        'principal': (gerador.random(n) < 0.6).astype(np.int64),
+    })
+
+    inicio = time.perf_counter()
+    indice = IndiceBitmaps(df)
+    print(f"Índice de {n:,} linhas em {time.perf_counter() - inicio:.2f} s: "
+          f"{indice.nbytes / 2**20:.1f} MiB em bitmaps para {', '.join(indice.valores)}")
+
+    filtros = [
+        FiltroEventos(tsunami=1),
+        FiltroEventos(tsunami=1, anos=(2005, 2015), apenas_principais=True),
+        FiltroEventos(magnitude=(7.5, None), tsunami=1),
+        FiltroEventos(magnitude=(6.8, 7.4), profundidade=(0.0, 70.0), anos=(2010, 2012)),
+        FiltroEventos(magnitude=(7.0, None), bbox=(-60.0, 10.0, -90.0, -30.0)),
+    ]
+    print(f"{'filtro':<70} {'linhas':>10} {'varredura':>10} {'bitmap':>8} {'contagem':>9} {'KiB':>8}")
+    for filtro in filtros:
+        inicio = time.perf_counter()
+        for _ in range(argumentos.repeticoes):
+            mascara = mascara_eventos(df, filtro)
+            filtrado = df[mascara]
+            resumo_varredura = (len(filtrado), int(filtrado['tsunami'].sum()))
+        varredura = (time.perf_counter() - inicio) / argumentos.repeticoes
+
+        inicio = time.perf_counter()
+        for _ in range(argumentos.repeticoes):
+            selecao = indice.selecionar(filtro)
+        segundos_bitmap = (time.perf_counter() - inicio) / argumentos.repeticoes
+
+        inicio = time.perf_counter()
+        resumo = indice.resumir(selecao)
+        segundos_contagem = time.perf_counter() - inicio
+
+        assert np.array_equal(selecao.indices(), np.flatnonzero(mascara)), f"divergência em {filtro}"
+        assert (resumo['total'], resumo['tsunamis']) == resumo_varredura, f"contagem divergente em {filtro}"
+        if len(filtrado):
+            assert resumo['magnitude_max'] == filtrado['magnitude'].max()
+
+        descricao = ", ".join(f"{k}={v}" for k, v in vars(filtro).items() if v not in (None, False))
+        print(f"{descricao:<70} {len(selecao):>10,} {varredura * 1000:>8.1f}ms {segundos_bitmap * 1000:>6.1f}ms "
+              f"{segundos_contagem * 1000:>7.1f}ms {selecao.nbytes / 1024:>8.0f}")
+    print(f"Resultados idênticos à varredura. Um DataFrame com todas as colunas ocupa "
+          f"{df.memory_usage(index=True).sum() / 2**20:.0f} MiB.")
@@ -0,0 +1,407 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import asdict
+
+from dados import config
+from dados.filtros import FiltroEventos
+from dados.metricas import contador
+
+logger = logging.getLogger(__name__)
+
+LEITURAS = contador("dashboard_cache_disco_leituras_total", "Leituras do cache em disco", ["resultado"])
+DESCARTES = contador("dashboard_cache_disco_descartes_total", "Artefatos removidos do cache em disco pelo LRU")
+CONSULTAS = contador("dashboard_consultas_total", "Consultas por filtro ao backend com cache",
+                     ["metodo", "resultado"])
+
+# ========================================
+# CACHE EM DISCO DOS ARTEFATOS DERIVADOS
+# ========================================
+# O catálogo lido e declusterizado, os derivados das páginas e os resultados
+# das consultas por filtro ficam em DIRETORIO_CACHE/derivados, um arquivo
+# por chave. A chave é o hash da versão do catálogo (ela mesma o hash do
+# conteúdo dos CSVs) junto com o nome do artefato e seus parâmetros, e com a
+# assinatura das demais entradas (``assinatura_entradas``): VERSAO_ESQUEMA,
+# o código de ``analise/``, ``dados/``, ``componentes/`` e ``pages/`` (as
+# páginas também montam derivados persistidos), o conteúdo dos outros
+# arquivos de entrada (limites de placas, pontos de interesse, locais de
+# risco) e os parâmetros de ``config`` que mudam os resultados. Uma versão
+# nova dos dados, uma correção no código ou um parâmetro diferente nunca
+# leem um artefato antigo e nada precisa ser invalidado; os arquivos que
+# deixam de ser lidos saem pelo LRU.
+#
+# A assinatura não faz E/S a cada chave: o hash do código é calculado uma
+# vez por processo, e os arquivos de entrada são conferidos (``stat``) no
+# máximo a cada VERIFICAR_ARQUIVOS_A_CADA_S segundos.
+#
+# A data de modificação de cada arquivo marca o último uso (é atualizada a
+# cada leitura). Quando o total passa de LIMITE_CACHE_DISCO_MB, os menos
+# usados são removidos até sobrar FRACAO_APOS_DESCARTE do limite. A gravação
+# é atômica (arquivo temporário + ``os.replace``), então vários processos
+# podem compartilhar o diretório.
+#
+# Os arquivos são pickles: o diretório deve ser acessível só pelo dashboard.
+
+# Aumentar quando o formato dos artefatos mudar sem mudança no código de DIRETORIOS_CODIGO
+VERSAO_ESQUEMA = 2
+# Pacotes cujas funções constroem artefatos persistidos (``derivado(..., persistir=True)``
+# e ``memorizar_em_disco``)
+DIRETORIOS_CODIGO = ("analise", "dados", "componentes", "pages")
+VERIFICAR_ARQUIVOS_A_CADA_S = 2.0
+# Arquivos já cobertos pela versão do catálogo e arquivos gerados pelo próprio dashboard
+ARQUIVOS_FORA_DA_ASSINATURA = frozenset({
+    "ARQUIVO_EVENTOS", "ARQUIVO_RISCO", "ARQUIVO_SQLITE", "ARQUIVO_MANIFESTO",
+})
+# Parâmetros de operação (portas, diretórios, intervalos, limites) que não mudam nenhum artefato
+PARAMETROS_FORA_DA_ASSINATURA = frozenset({
+    "DIRETORIO_RAIZ", "DIRETORIO_DADOS", "DIRETORIO_CACHE", "DIRETORIO_ESTATICO", "DIRETORIO_CACHE_DISCO",
+    "INTERVALO_ATUALIZACAO", "MEMORIA_COMPARTILHADA", "API_PORTA", "API_CACHE_RESPOSTAS",
+    "MODO_FILTROS", "ESPERA_FILTROS", "CACHE_DISCO", "LIMITE_CACHE_DISCO_MB", "THREADS_AQUECIMENTO",
+    "FILTROS_AQUECIMENTO", "METRICAS_HOST", "METRICAS_PORTA", "ORCAMENTO_PAYLOAD_KB", "ORCAMENTOS_PAYLOAD",
+    "PROCESSOS_SIMULACAO",
+})
+
+EXTENSAO = ".pkl"
+FRACAO_APOS_DESCARTE = 0.8
+ARQUIVO_FREQUENCIAS = "filtros_frequentes.json"
+# A contagem de uso dos filtros é gravada a cada tantas consultas
+GRAVAR_FREQUENCIAS_A_CADA = 50
+
+
+_hash_codigo = None
+_hashes_arquivos = {}
+# (parâmetros, momento da conferência dos arquivos, assinatura)
+_assinatura = None
+_trava_assinatura = threading.Lock()
+
+
+def _hash_arquivo(caminho):
+    """Hash do conteúdo, refeito só quando a data de modificação ou o tamanho mudam."""
+    try:
+        estado = os.stat(caminho)
+    except OSError:
+        return None
+    marca = (estado.st_mtime_ns, estado.st_size)
+    guardado = _hashes_arquivos.get(caminho)
+    if guardado is None or guardado[0] != marca:
+        with open(caminho, 'rb') as arquivo:
+            guardado = _hashes_arquivos[caminho] = (marca, hashlib.sha256(arquivo.read()).hexdigest())
+    return guardado[1]
+
+
+def _hash_codigo_fonte():
+    # Calculado uma vez por processo: o código não muda sem reiniciar
+    global _hash_codigo
+    if _hash_codigo is None:
+        conteudo = hashlib.sha256()
+        for pasta in DIRETORIOS_CODIGO:
+            for caminho in sorted(glob.glob(os.path.join(config.DIRETORIO_RAIZ, pasta, "*.py"))):
+                conteudo.update(os.path.basename(caminho).encode())
+                with open(caminho, 'rb') as arquivo:
+                    conteudo.update(arquivo.read())
+        _hash_codigo = conteudo.hexdigest()
+    return _hash_codigo
+
+
+def assinatura_entradas():
+    """Hash de tudo o que, além da versão do catálogo, muda os artefatos."""
+    global _assinatura
+    # Só leitura de atributos: um parâmetro alterado muda a assinatura na hora
+    parametros = tuple(
+        (nome, valor) for nome, valor in sorted(vars(config).items())
+        if nome.isupper() and nome not in PARAMETROS_FORA_DA_ASSINATURA
+        and not (nome.startswith("ARQUIVO_") and nome in ARQUIVOS_FORA_DA_ASSINATURA)
+    )
+    agora = time.monotonic()
+    guardada = _assinatura
+    if guardada is not None and guardada[0] == parametros and agora - guardada[1] < VERIFICAR_ARQUIVOS_A_CADA_S:
+        return guardada[2]
+
+    with _trava_assinatura:
+        entradas = [(nome, _hash_arquivo(valor) if nome.startswith("ARQUIVO_") else valor)
+                    for nome, valor in parametros]
+        valor = hashlib.sha256(repr((VERSAO_ESQUEMA, _hash_codigo_fonte(), entradas)).encode()).hexdigest()
+        _assinatura = (parametros, agora, valor)
+    return valor
+
+
+class CacheDisco:
+    """Artefatos endereçados por conteúdo, com limite de tamanho e descarte LRU."""
+
+    def __init__(self, diretorio, limite_bytes):
+        self.diretorio = diretorio
+        self.limite_bytes = limite_bytes
+        self.acertos = 0
+        self.faltas = 0
+        # Bytes em disco; medido no diretório na primeira gravação do processo
+        self._total = None
+        self._trava = threading.Lock()
+
+        self._frequencias = Counter()
+        self._consultas_sem_gravar = 0
+        self._carregar_frequencias()
+
+    @staticmethod
+    def chave(partes):
+        # ``repr`` de tuplas, números, strings e FiltroEventos é estável entre execuções
+        return hashlib.sha256(repr((assinatura_entradas(), partes)).encode()).hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave[:2], chave + EXTENSAO)
+
+    def obter(self, partes):
+        """Artefato guardado para ``partes``; levanta KeyError se não houver."""
+        caminho = self._caminho(self.chave(partes))
+        try:
+            with open(caminho, 'rb') as arquivo:
+                valor = pickle.load(arquivo)
+        except FileNotFoundError:
+            self.faltas += 1
+            LEITURAS.incrementar(resultado="falta")
+            raise KeyError(partes) from None
+        except Exception as erro:
+            # Arquivo truncado ou gravado por uma versão incompatível do código
+            logger.warning("Descartando artefato ilegível %s: %s", caminho, erro)
+            self._remover(caminho)
+            self.faltas += 1
+            LEITURAS.incrementar(resultado="ilegivel")
+            raise KeyError(partes) from None
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+        self.acertos += 1
+        LEITURAS.incrementar(resultado="acerto")
+        return valor
+
+    def gravar(self, partes, valor):
+        caminho = self._caminho(self.chave(partes))
+        pasta = os.path.dirname(caminho)
+        os.makedirs(pasta, exist_ok=True)
+        descritor, temporario = tempfile.mkstemp(dir=pasta, suffix=".tmp")
+        try:
+            with os.fdopen(descritor, 'wb') as arquivo:
+                pickle.dump(valor, arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+            tamanho = os.path.getsize(temporario)
+            if tamanho > self.limite_bytes:
+                # Sozinho já estouraria o limite: fica só na memória
+                os.remove(temporario)
+                return
+            os.replace(temporario, caminho)
+        except BaseException:
+            self._remover(temporario)
+            raise
+
+        with self._trava:
+            if self._total is None:
+                self._total = sum(tamanho for _, tamanho, _ in self._arquivos())
+            else:
+                self._total += tamanho
+            if self._total > self.limite_bytes:
+                self._descartar()
+
+    def memorizar(self, partes, calcular):
+        """``calcular()`` uma vez para ``partes``; as chamadas seguintes leem do disco."""
+        try:
+            return self.obter(partes)
+        except KeyError:
+            pass
+        valor = calcular()
+        try:
+            self.gravar(partes, valor)
+        except Exception as erro:
+            # Disco cheio ou valor que não pode ser serializado: segue sem cache
+            logger.warning("Artefato %r não foi gravado em disco: %s", partes[:2], erro)
+        return valor
+
+    def _arquivos(self):
+        entradas = []
+        for caminho in glob.glob(os.path.join(self.diretorio, "*", "*" + EXTENSAO)):
+            try:
+                estado = os.stat(caminho)
+            except FileNotFoundError:
+                continue
+            entradas.append((estado.st_mtime_ns, estado.st_size, caminho))
+        return entradas
+
+    def _descartar(self):
+        # Relê o diretório: outros processos também gravam e removem arquivos
+        entradas = sorted(self._arquivos())
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        alvo = self.limite_bytes * FRACAO_APOS_DESCARTE
+        removidos = 0
+        for _, tamanho, caminho in entradas:
+            if total <= alvo:
+                break
+            self._remover(caminho)
+            total -= tamanho
+            removidos += 1
+        self._total = total
+        DESCARTES.incrementar(removidos)
+        logger.info("Cache em disco: %d artefatos menos usados removidos", removidos)
+
+    @staticmethod
+    def _remover(caminho):
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+
+    def estatisticas(self):
+        entradas = self._arquivos()
+        return {
+            'arquivos': len(entradas),
+            'bytes': sum(tamanho for _, tamanho, _ in entradas),
+            'limite_bytes': self.limite_bytes,
+            'acertos': self.acertos,
+            'faltas': self.faltas,
+        }
+
+    # ----------------------------------------
+    # Filtros mais usados (para o aquecimento)
+    # ----------------------------------------
+
+    def registrar_filtro(self, filtro):
+        with self._trava:
+            self._frequencias[filtro] += 1
+            self._consultas_sem_gravar += 1
+            if self._consultas_sem_gravar < GRAVAR_FREQUENCIAS_A_CADA:
+                return
+            self._consultas_sem_gravar = 0
+            frequencias = self._frequencias.most_common(config.FILTROS_AQUECIMENTO * 4)
+        self._gravar_frequencias(frequencias)
+
+    def filtros_frequentes(self, quantidade):
+        with self._trava:
+            return [filtro for filtro, _ in self._frequencias.most_common(quantidade)]
+
+    def _carregar_frequencias(self):
+        try:
+            with open(os.path.join(self.diretorio, ARQUIVO_FREQUENCIAS)) as arquivo:
+                registros = json.load(arquivo)
+            for campos, contagem in registros:
+                self._frequencias[_filtro_de_json(campos)] = contagem
+        except FileNotFoundError:
+            pass
+        except Exception as erro:
+            logger.warning("Contagem de filtros ignorada: %s", erro)
+
+    def _gravar_frequencias(self, frequencias):
+        caminho = os.path.join(self.diretorio, ARQUIVO_FREQUENCIAS)
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            descritor, temporario = tempfile.mkstemp(dir=self.diretorio, suffix=".tmp")
+            with os.fdopen(descritor, 'w') as arquivo:
+                json.dump([[asdict(filtro), contagem] for filtro, contagem in frequencias], arquivo)
+            os.replace(temporario, caminho)
+        except OSError as erro:
+            logger.warning("Contagem de filtros não foi gravada: %s", erro)
+
+
+def _filtro_de_json(campos):
+    # JSON devolve as tuplas dos intervalos como listas
+    return FiltroEventos(**{
+        nome: tuple(valor) if isinstance(valor, list) else valor for nome, valor in campos.items()
+    })
+
+
+# ========================================
+# CONSULTAS POR FILTRO
+# ========================================
+
+
+class ConsultasEmCache:
+    """Backend cujas consultas por filtro passam pelo cache em disco.
+
+    ``resumo`` e ``agregar_por_ano`` sempre; ``filtrar`` só quando o backend
+    não mantém o catálogo em memória (no pandas, montar o DataFrame a partir
+    do bitmap é mais rápido que ler o arquivo). Os resultados lidos ficam
+    também num LRU em memória, e cada filtro consultado é contado para o
+    aquecimento. Os demais atributos são os do backend original.
+    """
+
+    RESULTADOS_EM_MEMORIA = 128
+
+    def __init__(self, backend, versao, cache):
+        self.original = backend
+        self.versao = versao
+        self.cache = cache
+        self._resultados = OrderedDict()
+        self._trava = threading.Lock()
+
+    def __getattr__(self, nome):
+        return getattr(self.original, nome)
+
+    def _consultar(self, metodo, filtro, contar=True):
+        if contar:
+            self.cache.registrar_filtro(filtro)
+        chave = (metodo, filtro)
+        with self._trava:
+            resultado = self._resultados.get(chave)
+            if resultado is not None:
+                self._resultados.move_to_end(chave)
+                CONSULTAS.incrementar(metodo=metodo, resultado="memoria")
+                return resultado
+        CONSULTAS.incrementar(metodo=metodo, resultado="cache_disco")
+        resultado = self.cache.memorizar(
+            (self.versao, metodo, self.original.nome, filtro), lambda: getattr(self.original, metodo)(filtro)
+        )
+        with self._trava:
+            self._resultados[chave] = resultado
+            while len(self._resultados) > self.RESULTADOS_EM_MEMORIA:
+                self._resultados.popitem(last=False)
+        return resultado
+
+    def filtrar(self, filtro, contar=True):
+        if not getattr(self.original, 'em_memoria', False):
+            return self._consultar('filtrar', filtro, contar)
+        if contar:
+            self.cache.registrar_filtro(filtro)
+        return self.original.filtrar(filtro)
+
+    def agregar_por_ano(self, filtro):
+        return self._consultar('agregar_por_ano', filtro)
+
+    def resumo(self, filtro):
+        return self._consultar('resumo', filtro)
+
+    def aquecer(self, filtro):
+        """Mesmas consultas das páginas, sem contar o filtro como uso."""
+        self._consultar('resumo', filtro, contar=False)
+        self._consultar('agregar_por_ano', filtro, contar=False)
+        self.filtrar(filtro, contar=False)
+
+
+# ========================================
+# INSTÂNCIA DO PROCESSO
+# ========================================
+
+_cache = None
+_trava_cache = threading.Lock()
+
+
+def obter_cache():
+    """Cache em disco compartilhado pelo processo; None quando desativado."""
+    global _cache
+    if not config.CACHE_DISCO:
+        return None
+    if _cache is None:
+        with _trava_cache:
+            if _cache is None:
+                _cache = CacheDisco(config.DIRETORIO_CACHE_DISCO, int(config.LIMITE_CACHE_DISCO_MB * 2**20))
+    return _cache
+
+
+def memorizar_em_disco(partes, calcular):
+    """``cache.memorizar`` quando o cache está ativo; senão só calcula."""
+    cache = obter_cache()
+    if cache is None:
+        return calcular()
+    return cache.memorizar(partes, calcular)
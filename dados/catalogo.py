@@ -0,0 +1,290 @@
+import glob
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from analise.declusterizacao import declusterizar
+from dados import config
+from dados.backend import obter_backend
+from dados.cache_disco import ConsultasEmCache, memorizar_em_disco, obter_cache
+from dados.filtros import FiltroEventos, resumir_eventos
+from dados.metricas import contador, histograma, medidor
+
+logger = logging.getLogger(__name__)
+
+DERIVADOS = contador("dashboard_derivados_total", "Pedidos de derivados do catálogo", ["resultado"])
+CARGA_CATALOGO = histograma("dashboard_carga_catalogo_segundos", "Tempo para montar uma versão do catálogo")
+VERSOES_PUBLICADAS = contador("dashboard_versoes_publicadas_total", "Versões do catálogo publicadas")
+VERSOES_REJEITADAS = contador("dashboard_versoes_rejeitadas_total", "Versões novas dos dados que falharam na carga")
+EVENTOS_CATALOGO = medidor("dashboard_catalogo_eventos", "Eventos na versão publicada do catálogo")
+
+COLUNAS_EVENTOS = ['magnitude', 'depth', 'latitude', 'longitude', 'Year', 'Month', 'tsunami']
+COLUNAS_RISCO = ['Pais', 'Risco_Terremoto', 'Risco_Tsunami', 'Placa_Tectonica']
+
+
+# ========================================
+# VERSÃO IMUTÁVEL DO CATÁLOGO
+# ========================================
+
+
+class Catalogo:
+    """Uma versão consistente dos dados (eventos + risco) e seus derivados.
+
+    Uma instância nunca é alterada depois de publicada: cada rerun obtém a
+    versão atual uma única vez e trabalha com ela até o fim, mesmo que uma
+    versão mais nova seja publicada no meio do caminho.
+    """
+
+    def __init__(self, versao, eventos, risco, backend):
+        self.versao = versao
+        self.carregado_em = datetime.now()
+        self.eventos = eventos
+        self.risco = risco
+        # Consultas por filtro guardadas em disco, por versão (DASHBOARD_CACHE_DISCO)
+        cache = obter_cache()
+        self.backend = ConsultasEmCache(backend, versao, cache) if cache is not None else backend
+
+        # Agregados pré-calculados fora do caminho das requisições
+        self.limites = backend.limites()
+        self.resumo = resumir_eventos(eventos)
+        self.por_ano = self.backend.agregar_por_ano(FiltroEventos())
+
+        self._derivados = {}
+        # Reentrante: um derivado pode depender de outro
+        self._trava = threading.RLock()
+
+    def derivado(self, nome, construir, persistir=False):
+        """Calcula ``construir(self)`` uma vez por versão e memoriza o resultado.
+
+        Com ``persistir``, o resultado também vai para o cache em disco e é
+        reaproveitado por outros processos e após reinícios. Só vale para
+        derivados autocontidos: os que guardam uma referência a
+        ``self.eventos`` duplicariam o catálogo inteiro no arquivo.
+        """
+        if nome in self._derivados:
+            DERIVADOS.incrementar(resultado="memoria")
+            return self._derivados[nome]
+        with self._trava:
+            if nome not in self._derivados:
+                DERIVADOS.incrementar(resultado="construido")
+                if persistir:
+                    self._derivados[nome] = memorizar_em_disco((self.versao, nome), lambda: construir(self))
+                else:
+                    self._derivados[nome] = construir(self)
+        return self._derivados[nome]
+
+
+def _estado_arquivos(caminhos):
+    return tuple((os.stat(c).st_size, os.stat(c).st_mtime_ns) for c in caminhos)
+
+
+def _ler_estavel(caminho):
+    """Lê o arquivo inteiro e garante que ele não mudou durante a leitura."""
+    antes = _estado_arquivos([caminho])
+    with open(caminho, 'rb') as arquivo:
+        conteudo = arquivo.read()
+    if _estado_arquivos([caminho]) != antes:
+        raise IOError(f"Arquivo '{caminho}' foi alterado durante a leitura.")
+    return conteudo
+
+
+def _validar(df, colunas, nome):
+    faltantes = [c for c in colunas if c not in df.columns]
+    if faltantes:
+        raise ValueError(f"{nome}: colunas ausentes {faltantes}")
+    if len(df) == 0:
+        raise ValueError(f"{nome}: arquivo sem registros")
+
+
+def _versao_conteudo(bytes_eventos, bytes_risco):
+    # A versão é derivada do conteúdo lido, não do horário de modificação
+    return hashlib.sha256(bytes_eventos + b'\0' + bytes_risco).hexdigest()[:12]
+
+
+def versao_arquivos(arquivo_eventos=None, arquivo_risco=None):
+    """Versão que ``construir_catalogo`` atribuiria aos arquivos atuais, sem montá-la."""
+    return _versao_conteudo(
+        _ler_estavel(arquivo_eventos or config.ARQUIVO_EVENTOS),
+        _ler_estavel(arquivo_risco or config.ARQUIVO_RISCO)
+    )
+
+
+def construir_catalogo(arquivo_eventos=None, arquivo_risco=None, backend=None):
+    """Lê os arquivos de dados e monta uma nova versão completa do catálogo."""
+    arquivo_eventos = arquivo_eventos or config.ARQUIVO_EVENTOS
+    arquivo_risco = arquivo_risco or config.ARQUIVO_RISCO
+
+    bytes_eventos = _ler_estavel(arquivo_eventos)
+    bytes_risco = _ler_estavel(arquivo_risco)
+    versao = _versao_conteudo(bytes_eventos, bytes_risco)
+
+    def ler():
+        eventos = pd.read_csv(io.BytesIO(bytes_eventos))
+        risco = pd.read_csv(io.BytesIO(bytes_risco))
+        _validar(eventos, COLUNAS_EVENTOS, os.path.basename(arquivo_eventos))
+        _validar(risco, COLUNAS_RISCO, os.path.basename(arquivo_risco))
+
+        # Classificação principal/réplica calculada uma vez por versão
+        eventos['principal'] = declusterizar(eventos)['principal'].astype('int64')
+        return eventos, risco
+
+    # Mesmo conteúdo, mesma versão: após um reinício, a leitura e a
+    # declusterização saem do cache em disco
+    eventos, risco = memorizar_em_disco((versao, "catalogo"), ler)
+
+    return Catalogo(versao, eventos, risco, obter_backend(backend, df=eventos, versao=versao))
+
+
+# ========================================
+# ATUALIZAÇÃO EM SEGUNDO PLANO
+# ========================================
+
+
+class GerenciadorCatalogo:
+    """Mantém a versão atual do catálogo e a substitui em segundo plano.
+
+    Uma thread observa os arquivos de dados; quando eles mudam e permanecem
+    estáveis por um ciclo de verificação, a nova versão é construída fora do
+    caminho das requisições e publicada com uma única atribuição.
+    """
+
+    def __init__(self, arquivos=None, construir=None, intervalo=None):
+        # ``construir(*arquivos)`` monta a versão a partir dos arquivos observados
+        self.arquivos = list(arquivos or [config.ARQUIVO_EVENTOS, config.ARQUIVO_RISCO])
+        self.construir = construir or construir_catalogo
+        self.intervalo = config.INTERVALO_ATUALIZACAO if intervalo is None else intervalo
+        self.ultimo_erro = None
+        self._atual = None
+        self._estado_carregado = None
+        self._estado_rejeitado = None
+        self._thread = None
+        self._parar = threading.Event()
+        self._ouvintes = []
+
+    @property
+    def atual(self):
+        return self._atual
+
+    def ao_publicar(self, funcao):
+        """Registra ``funcao(catalogo)``, chamada a cada nova versão publicada."""
+        self._ouvintes.append(funcao)
+        if self._atual is not None:
+            funcao(self._atual)
+
+    def carregar(self):
+        estado = _estado_arquivos(self.arquivos)
+        inicio = time.perf_counter()
+        novo = self.construir(*self.arquivos)
+        CARGA_CATALOGO.observar(time.perf_counter() - inicio)
+        self._estado_carregado = estado
+        if self._atual is None or novo.versao != self._atual.versao:
+            anterior = self._atual
+            self._atual = novo
+            VERSOES_PUBLICADAS.incrementar()
+            EVENTOS_CATALOGO.definir(len(novo.eventos))
+            logger.info("Catálogo versão %s publicado", novo.versao)
+            for funcao in self._ouvintes:
+                try:
+                    funcao(novo)
+                except Exception:
+                    logger.exception("Falha ao notificar nova versão do catálogo")
+            if anterior is not None:
+                _remover_bancos_antigos({novo.versao, anterior.versao})
+        return self._atual
+
+    def iniciar(self):
+        if self._atual is None:
+            self.carregar()
+        if self.intervalo > 0 and self._thread is None:
+            self._thread = threading.Thread(
+                target=self._observar, name="atualizacao-catalogo", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+
+    def _observar(self):
+        estado_anterior = None
+        while not self._parar.wait(self.intervalo):
+            try:
+                estado = _estado_arquivos(self.arquivos)
+            except FileNotFoundError:
+                # Arquivo sendo substituído; tenta de novo no próximo ciclo
+                continue
+
+            # Só recarrega quando o arquivo mudou e ficou parado por um ciclo inteiro
+            conhecido = estado in (self._estado_carregado, self._estado_rejeitado)
+            if not conhecido and estado == estado_anterior:
+                try:
+                    self.carregar()
+                    self.ultimo_erro = None
+                except Exception as erro:
+                    # Mantém a versão atual até os arquivos mudarem de novo
+                    self._estado_rejeitado = estado
+                    self.ultimo_erro = erro
+                    VERSOES_REJEITADAS.incrementar()
+                    logger.warning("Nova versão dos dados ignorada: %s", erro)
+            estado_anterior = estado
+
+
+def _remover_bancos_antigos(versoes_mantidas):
+    padrao = os.path.join(config.DIRETORIO_CACHE, "catalogo-*.sqlite")
+    for caminho in glob.glob(padrao):
+        versao = os.path.basename(caminho)[len("catalogo-"):-len(".sqlite")]
+        if versao not in versoes_mantidas:
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+
+
+def _criar_gerenciador():
+    if config.MEMORIA_COMPARTILHADA:
+        from dados.memoria_compartilhada import anexar_catalogo
+
+        if os.path.exists(config.ARQUIVO_MANIFESTO):
+            # O processo publicador é quem observa os CSVs; aqui só o manifesto
+            return GerenciadorCatalogo([config.ARQUIVO_MANIFESTO], anexar_catalogo)
+        logger.warning(
+            "Manifesto de memória compartilhada '%s' não encontrado; "
+            "carregando o catálogo localmente.", config.ARQUIVO_MANIFESTO
+        )
+    return GerenciadorCatalogo()
+
+
+_gerenciador = None
+_trava_gerenciador = threading.Lock()
+
+
+def obter_gerenciador():
+    """Gerenciador único por processo, compartilhado por todas as sessões."""
+    global _gerenciador
+    if _gerenciador is None:
+        with _trava_gerenciador:
+            if _gerenciador is None:
+                gerenciador = _criar_gerenciador()
+                if config.THREADS_AQUECIMENTO > 0:
+                    # Caches de cada versão preparados antes dos acessos às páginas
+                    from analise.aquecimento import aquecer_em_segundo_plano
+
+                    gerenciador.ao_publicar(aquecer_em_segundo_plano)
+                _gerenciador = gerenciador.iniciar()
+    return _gerenciador
+
+
+def obter_catalogo():
+    """Versão atual do catálogo; deve ser chamada uma vez no início do rerun."""
+    return obter_gerenciador().atual
+
+
+def descrever_versao(catalogo):
+    return f"{catalogo.versao} · carregada às {catalogo.carregado_em:%H:%M:%S}"
+
@@ -0,0 +1,119 @@
+import os
+
+# ========================================
+# CONFIGURAÇÃO DA CAMADA DE DADOS
+# ========================================
+# Todos os valores podem ser sobrescritos por variáveis de ambiente,
+# permitindo trocar o backend sem alterar o código das páginas.
+
+DIRETORIO_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DIRETORIO_DADOS = os.environ.get("DASHBOARD_DIRETORIO_DADOS", DIRETORIO_RAIZ)
+
+ARQUIVO_EVENTOS = os.path.join(DIRETORIO_DADOS, "earthquake_data_tsunami.csv")
+# Risco por país ou, com as colunas Estado e Municipio, por região (ver dados/regioes.py)
+ARQUIVO_RISCO = os.environ.get("DASHBOARD_ARQUIVO_RISCO", os.path.join(DIRETORIO_DADOS, "country_risk.csv"))
+
+# Diretório para artefatos gerados (bancos, índices, caches)
+DIRETORIO_CACHE = os.environ.get("DASHBOARD_DIRETORIO_CACHE", os.path.join(DIRETORIO_RAIZ, ".cache"))
+
+# Backend de consultas: "pandas" (padrão) ou "sqlite"
+BACKEND = os.environ.get("DASHBOARD_BACKEND", "pandas").lower()
+
+ARQUIVO_SQLITE = os.environ.get(
+    "DASHBOARD_ARQUIVO_SQLITE",
+    os.path.join(DIRETORIO_CACHE, "catalogo.sqlite")
+)
+
+# Tamanho (em graus) da célula usada como chave espacial dos eventos
+TAMANHO_CELULA_GRAUS = float(os.environ.get("DASHBOARD_TAMANHO_CELULA", "5"))
+
+# Intervalo (segundos) entre verificações dos arquivos de dados pela thread
+# de atualização. 0 desativa a atualização em segundo plano.
+INTERVALO_ATUALIZACAO = float(os.environ.get("DASHBOARD_INTERVALO_ATUALIZACAO", "30"))
+
+# Memória compartilhada entre processos: quando ativada, os workers anexam
+# as colunas publicadas por ``python -m dados.memoria_compartilhada``.
+MEMORIA_COMPARTILHADA = os.environ.get("DASHBOARD_MEMORIA_COMPARTILHADA", "0") == "1"
+
+ARQUIVO_MANIFESTO = os.environ.get(
+    "DASHBOARD_ARQUIVO_MANIFESTO",
+    os.path.join(DIRETORIO_CACHE, "memoria_compartilhada.json")
+)
+
+# Lista local de cidades costeiras e instalações usada nas consultas de proximidade
+ARQUIVO_PONTOS_INTERESSE = os.path.join(DIRETORIO_DADOS, "pontos_interesse.csv")
+
+# Traçado simplificado dos principais limites de placas tectônicas (polilinhas por tipo)
+ARQUIVO_LIMITES_PLACAS = os.path.join(DIRETORIO_DADOS, "limites_placas.csv")
+
+# Pacote estático (HTML/JSON) gerado por ``python -m servicos.estatico``
+DIRETORIO_ESTATICO = os.environ.get("DASHBOARD_DIRETORIO_ESTATICO", os.path.join(DIRETORIO_RAIZ, "estatico"))
+
+# API HTTP local (``python -m servicos.api``): porta e respostas mantidas em cache
+API_PORTA = int(os.environ.get("DASHBOARD_API_PORTA", "8502"))
+API_CACHE_RESPOSTAS = int(os.environ.get("DASHBOARD_API_CACHE_RESPOSTAS", "256"))
+
+# Filtros da barra lateral: "imediato" (cada alteração reexecuta a página),
+# "lote" (aplicados juntos pelo botão "Aplicar filtros") ou "espera"
+# (aplicados juntos após ESPERA_FILTROS segundos sem alterações)
+MODO_FILTROS = os.environ.get("DASHBOARD_MODO_FILTROS", "imediato").lower()
+ESPERA_FILTROS = float(os.environ.get("DASHBOARD_ESPERA_FILTROS", "0.6"))
+
+# Consultas aproximadas (páginas 02 a 04): "auto" liga acima de
+# LINHAS_CONSULTA_APROXIMADA eventos, "sempre" ou "nunca" forçam o modo.
+# FRACAO_AMOSTRA é a fração de cada estrato (ano × tsunami) na amostra.
+CONSULTA_APROXIMADA = os.environ.get("DASHBOARD_CONSULTA_APROXIMADA", "auto").lower()
+LINHAS_CONSULTA_APROXIMADA = int(os.environ.get("DASHBOARD_LINHAS_CONSULTA_APROXIMADA", "1000000"))
+FRACAO_AMOSTRA = float(os.environ.get("DASHBOARD_FRACAO_AMOSTRA", "0.02"))
+
+# Linha do tempo do mapa (página 04): máximo de eventos por quadro da animação
+# (os de maior magnitude do período) e na animação inteira
+PONTOS_POR_QUADRO = int(os.environ.get("DASHBOARD_PONTOS_POR_QUADRO", "300"))
+PONTOS_LINHA_DO_TEMPO = int(os.environ.get("DASHBOARD_PONTOS_LINHA_DO_TEMPO", "60000"))
+
+# Cache em disco dos artefatos derivados (catálogo declusterizado, derivados
+# das páginas e consultas por filtro), com descarte dos menos usados acima do
+# limite. "0" desativa.
+CACHE_DISCO = os.environ.get("DASHBOARD_CACHE_DISCO", "1") == "1"
+DIRETORIO_CACHE_DISCO = os.environ.get(
+    "DASHBOARD_DIRETORIO_CACHE_DISCO",
+    os.path.join(DIRETORIO_CACHE, "derivados")
+)
+LIMITE_CACHE_DISCO_MB = float(os.environ.get("DASHBOARD_LIMITE_CACHE_DISCO_MB", "512"))
+
+# Aquecimento a cada versão publicada: threads usadas e quantos dos filtros
+# mais consultados são pré-calculados além dos estados iniciais das páginas
+THREADS_AQUECIMENTO = int(os.environ.get("DASHBOARD_THREADS_AQUECIMENTO", "2"))
+FILTROS_AQUECIMENTO = int(os.environ.get("DASHBOARD_FILTROS_AQUECIMENTO", "20"))
+
+# Mescla de catálogos de várias agências (``python -m dados.fontes``):
+# registros de fontes diferentes dentro das três tolerâncias são o mesmo evento
+TOLERANCIA_TEMPO_S = float(os.environ.get("DASHBOARD_TOLERANCIA_TEMPO_S", "60"))
+TOLERANCIA_DISTANCIA_KM = float(os.environ.get("DASHBOARD_TOLERANCIA_DISTANCIA_KM", "100"))
+TOLERANCIA_MAGNITUDE = float(os.environ.get("DASHBOARD_TOLERANCIA_MAGNITUDE", "0.5"))
+
+# Métricas no formato do Prometheus (``servicos/metricas.py``): porta local
+# do processo do dashboard (0 desativa)
+METRICAS_HOST = os.environ.get("DASHBOARD_METRICAS_HOST", "127.0.0.1")
+METRICAS_PORTA = int(os.environ.get("DASHBOARD_METRICAS_PORTA", "8503"))
+
+# Orçamento de bytes dos gráficos enviados por execução de página, em KiB.
+# Acima dele, um aviso vai para o log. ORCAMENTOS_PAYLOAD ajusta páginas
+# específicas: "mapa_geografico=8192,visao_geral=1024".
+ORCAMENTO_PAYLOAD_KB = float(os.environ.get("DASHBOARD_ORCAMENTO_PAYLOAD_KB", "4096"))
+ORCAMENTOS_PAYLOAD = {
+    pagina.strip(): float(kb)
+    for pagina, _, kb in (
+        item.partition("=") for item in os.environ.get("DASHBOARD_ORCAMENTOS_PAYLOAD", "").split(",") if item.strip()
+    )
+}
+
+# Simulação de Monte Carlo do perigo sísmico (página 05): locais de
+# referência de cada país, anos simulados, processos do pool (0 = um por
+# núcleo), intensidade de Mercalli do tremor e raio das fontes em torno dos locais
+ARQUIVO_LOCAIS_RISCO = os.path.join(DIRETORIO_DADOS, "locais_risco.csv")
+ANOS_SIMULADOS = int(os.environ.get("DASHBOARD_ANOS_SIMULADOS", "100000"))
+PROCESSOS_SIMULACAO = int(os.environ.get("DASHBOARD_PROCESSOS_SIMULACAO", "0")) or os.cpu_count() or 1
+LIMIAR_MMI = float(os.environ.get("DASHBOARD_LIMIAR_MMI", "6"))
+RAIO_FONTES_KM = float(os.environ.get("DASHBOARD_RAIO_FONTES_KM", "300"))
@@ -0,0 +1,117 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from dados import config
+
+# ========================================
+# FILTRO DE EVENTOS
+# ========================================
+
+Intervalo = Optional[Tuple[Optional[float], Optional[float]]]
+
+
+@dataclass(frozen=True)
+class FiltroEventos:
+    """Critérios de seleção de eventos, compartilhados por todos os backends.
+
+    Cada intervalo é uma tupla (mínimo, máximo) inclusiva; qualquer limite
+    pode ser None para deixá-lo aberto. ``bbox`` é
+    (lat_min, lat_max, lon_min, lon_max). ``apenas_principais`` descarta as
+    réplicas identificadas na declusterização do catálogo.
+    """
+
+    magnitude: Intervalo = None
+    profundidade: Intervalo = None
+    tsunami: Optional[int] = None
+    anos: Intervalo = None
+    bbox: Optional[Tuple[float, float, float, float]] = None
+    apenas_principais: bool = False
+
+
+def _mascara_intervalo(serie, intervalo):
+    mascara = np.ones(len(serie), dtype=bool)
+    if intervalo is None:
+        return mascara
+    minimo, maximo = intervalo
+    if minimo is not None:
+        mascara &= (serie >= minimo).to_numpy()
+    if maximo is not None:
+        mascara &= (serie <= maximo).to_numpy()
+    return mascara
+
+
+def mascara_eventos(df, filtro):
+    """Retorna a máscara booleana dos eventos que atendem ao filtro."""
+    mascara = _mascara_intervalo(df['magnitude'], filtro.magnitude)
+    mascara &= _mascara_intervalo(df['depth'], filtro.profundidade)
+    mascara &= _mascara_intervalo(df['Year'], filtro.anos)
+
+    if filtro.tsunami is not None:
+        mascara &= (df['tsunami'] == filtro.tsunami).to_numpy()
+
+    if filtro.bbox is not None:
+        lat_min, lat_max, lon_min, lon_max = filtro.bbox
+        mascara &= _mascara_intervalo(df['latitude'], (lat_min, lat_max))
+        mascara &= _mascara_intervalo(df['longitude'], (lon_min, lon_max))
+
+    if filtro.apenas_principais:
+        mascara &= (df['principal'] == 1).to_numpy()
+
+    return mascara
+
+
+def filtrar_eventos(df, filtro):
+    return df[mascara_eventos(df, filtro)]
+
+
+def agregar_por_ano(df):
+    """Magnitude máxima, média e contagem por ano (colunas usadas na página 03)."""
+    df_yearly = df.groupby('Year')['magnitude'].agg(['max', 'mean', 'count']).reset_index()
+    df_yearly.columns = ['year', 'max_mag', 'mean_mag', 'count']
+    return df_yearly
+
+
+def resumir_eventos(df):
+    """Métricas exibidas nos cartões das páginas."""
+    return {
+        'total': int(len(df)),
+        'magnitude_max': float(df['magnitude'].max()) if len(df) > 0 else None,
+        'tsunamis': int(df['tsunami'].sum()) if len(df) > 0 else 0,
+    }
+
+
+# ========================================
+# CHAVE ESPACIAL
+# ========================================
+
+def _colunas_grade(tamanho_celula):
+    return int(np.ceil(360 / tamanho_celula))
+
+
+def chave_espacial(latitude, longitude, tamanho_celula=None):
+    """Índice da célula lat/lon (grade regular) de cada evento."""
+    tamanho_celula = tamanho_celula or config.TAMANHO_CELULA_GRAUS
+    n_colunas = _colunas_grade(tamanho_celula)
+    n_linhas = int(np.ceil(180 / tamanho_celula))
+    linha = np.clip(((np.asarray(latitude) + 90) // tamanho_celula).astype(int), 0, n_linhas - 1)
+    coluna = np.clip(((np.asarray(longitude) + 180) // tamanho_celula).astype(int), 0, n_colunas - 1)
+    return linha * n_colunas + coluna
+
+
+def chaves_bbox(bbox, tamanho_celula=None):
+    """Todas as chaves de célula que intersectam o retângulo informado."""
+    tamanho_celula = tamanho_celula or config.TAMANHO_CELULA_GRAUS
+    lat_min, lat_max, lon_min, lon_max = bbox
+    canto_inferior = chave_espacial(max(lat_min, -90), max(lon_min, -180), tamanho_celula)
+    canto_superior = chave_espacial(min(lat_max, 90), min(lon_max, 180), tamanho_celula)
+    n_colunas = _colunas_grade(tamanho_celula)
+    linhas = range(int(canto_inferior) // n_colunas, int(canto_superior) // n_colunas + 1)
+    colunas = range(int(canto_inferior) % n_colunas, int(canto_superior) % n_colunas + 1)
+    return [linha * n_colunas + coluna for linha in linhas for coluna in colunas]
+
+
+def carregar_eventos_csv(caminho=None):
+    return pd.read_csv(caminho or config.ARQUIVO_EVENTOS)
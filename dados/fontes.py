@@ -0,0 +1,242 @@
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from analise.declusterizacao import KM_POR_GRAU, pares_candidatos, tempo_em_dias
+from dados import config
+from dados.catalogo import COLUNAS_EVENTOS
+
+# ========================================
+# MESCLA DE CATÁLOGOS DE VÁRIAS FONTES
+# ========================================
+# Agências diferentes publicam o mesmo terremoto com pequenas diferenças de
+# instante, epicentro e magnitude. A mescla junta as exportações num único
+# CSV no formato do catálogo do dashboard, com um registro por evento:
+#
+#   - dois registros de fontes diferentes são o mesmo evento quando ficam
+#     dentro das três tolerâncias (tempo, distância e magnitude); os pares
+#     encadeados formam um grupo;
+#   - de cada grupo ficam os registros da fonte preferida (a primeira na
+#     lista), com as colunas ``fonte`` e ``n_fontes``. Normalmente é um só;
+#     quando a tolerância encadeia eventos vizinhos (A1 ~ B ~ A2), a fonte
+#     preferida já os separou e os dois ficam, sem o registro de B.
+#
+# Os pares candidatos saem da mesma busca da declusterização: registros
+# ordenados por (célula lat/lon, tempo) e busca binária no tempo só nas
+# células vizinhas, em tempo quase linear. Os grupos são os componentes
+# conexos do grafo de pares, por propagação de rótulos vetorizada.
+#
+# Com a coluna ``time`` em todas as fontes, a tolerância de tempo vale sobre
+# o instante. Sem ela, só ano e mês são comparáveis: o mesmo evento precisa
+# cair no mesmo mês nas duas fontes, e a distância e a magnitude decidem.
+
+# Célula mínima da grade de candidatos, para tolerâncias de distância pequenas
+TAMANHO_CELULA_MINIMO = 0.1
+
+
+def agrupar(eventos, fonte, tempo_s=None, distancia_km=None, magnitude=None):
+    """Rótulo do grupo de cada registro (a menor posição do grupo).
+
+    ``fonte`` é a posição da fonte de cada registro; só registros de fontes
+    diferentes são ligados.
+    """
+    tempo_s = config.TOLERANCIA_TEMPO_S if tempo_s is None else tempo_s
+    distancia_km = config.TOLERANCIA_DISTANCIA_KM if distancia_km is None else distancia_km
+    magnitude = config.TOLERANCIA_MAGNITUDE if magnitude is None else magnitude
+
+    n = len(eventos)
+    if n == 0:
+        return np.arange(0)
+    lat = eventos['latitude'].to_numpy(dtype=np.float64)
+    lon = eventos['longitude'].to_numpy(dtype=np.float64)
+    mag = eventos['magnitude'].to_numpy(dtype=np.float64)
+    t = tempo_em_dias(eventos)
+    tolerancia_dias = tempo_s / 86400
+
+    tamanho_celula = max(distancia_km / KM_POR_GRAU, TAMANHO_CELULA_MINIMO)
+    i, j = pares_candidatos(
+        lat, lon, t, np.full(n, float(distancia_km)), np.full(n, tolerancia_dias), 1.0, tamanho_celula
+    )
+    # Cada par aparece nos dois sentidos; tempo e distância já vêm conferidos
+    mesmo_evento = (i < j) & (fonte[i] != fonte[j]) & (np.abs(mag[i] - mag[j]) <= magnitude + 1e-9)
+    return _componentes(n, i[mesmo_evento], j[mesmo_evento])
+
+
+def _componentes(n, a, b):
+    """Componentes conexos do grafo de arestas (a, b): rótulo = menor vértice."""
+    rotulo = np.arange(n)
+    while True:
+        # Cada vértice adota o menor rótulo entre os vizinhos e depois salta
+        # para o rótulo do seu rótulo, encurtando as cadeias pela metade
+        menor = np.minimum(rotulo[a], rotulo[b])
+        novo = rotulo.copy()
+        np.minimum.at(novo, a, menor)
+        np.minimum.at(novo, b, menor)
+        novo = novo[novo]
+        if np.array_equal(novo, rotulo):
+            return rotulo
+        rotulo = novo
+
+
+def mesclar_fontes(fontes, tempo_s=None, distancia_km=None, magnitude=None):
+    """Um registro por evento a partir de ``[(nome, DataFrame), ...]`` em ordem de preferência.
+
+    Retorna o catálogo mesclado, ordenado no tempo, e um dicionário com as
+    contagens da mescla.
+    """
+    for nome, df in fontes:
+        faltantes = [c for c in COLUNAS_EVENTOS if c not in df.columns]
+        if faltantes:
+            raise ValueError(f"{nome}: colunas ausentes {faltantes}")
+    nomes = [nome for nome, _ in fontes]
+    if len(set(nomes)) != len(nomes):
+        raise ValueError("Fontes com nomes repetidos")
+
+    eventos = pd.concat([df for _, df in fontes], ignore_index=True)
+    fonte = np.repeat(np.arange(len(fontes)), [len(df) for _, df in fontes])
+    if not all('time' in df.columns for _, df in fontes):
+        # Instante só em parte das fontes: a comparação é por mês em todas
+        eventos = eventos.drop(columns='time', errors='ignore')
+
+    rotulo = agrupar(eventos, fonte, tempo_s, distancia_km, magnitude)
+    t = tempo_em_dias(eventos)
+
+    # Uma agência não relata o mesmo evento duas vezes: todos os registros
+    # da fonte preferida do grupo ficam
+    preferida = np.full(len(eventos), len(fontes))
+    np.minimum.at(preferida, rotulo, fonte)
+    representantes = np.flatnonzero(fonte == preferida[rotulo])
+
+    registros = np.bincount(rotulo, minlength=len(eventos))
+    grupo_fonte = np.unique(rotulo.astype(np.int64) * len(fontes) + fonte)
+    n_fontes = np.bincount(grupo_fonte // len(fontes), minlength=len(eventos))
+
+    representantes = representantes[np.argsort(t[representantes], kind='stable')]
+    mesclado = eventos.iloc[representantes].reset_index(drop=True)
+    mesclado['fonte'] = np.asarray(nomes, dtype=object)[fonte[representantes]]
+    mesclado['n_fontes'] = n_fontes[rotulo[representantes]]
+
+    estatisticas = {
+        'registros': len(eventos),
+        'eventos': len(mesclado),
+        'em_mais_de_uma_fonte': int((mesclado['n_fontes'] > 1).sum()),
+        # Grupos com dois registros da mesma fonte: a tolerância encadeou eventos próximos
+        'grupos_com_repeticao': int((registros > n_fontes).sum()),
+        'por_fonte': mesclado['fonte'].value_counts().reindex(nomes, fill_value=0).to_dict(),
+        'por_instante': 'time' in eventos.columns,
+    }
+    return mesclado, estatisticas
+
+
+def gravar_atomico(df, caminho):
+    """Grava o CSV num temporário e troca de uma vez: a atualização em segundo plano nunca lê um arquivo pela metade."""
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    descritor, temporario = tempfile.mkstemp(dir=pasta, suffix=".tmp")
+    try:
+        with os.fdopen(descritor, 'w', newline='') as arquivo:
+            df.to_csv(arquivo, index=False)
+        os.replace(temporario, caminho)
+    except BaseException:
+        os.remove(temporario)
+        raise
+
+
+def _agencias_sinteticas(n, n_fontes, semente=0):
+    """Eventos verdadeiros relatados por várias agências, cada uma com seus erros.
+
+    Retorna a lista de fontes e, para cada registro na ordem concatenada, o
+    evento verdadeiro de origem.
+    """
+    gerador = np.random.default_rng(semente)
+    inicio = np.datetime64('1975-01-01T00:00:00', 's')
+    segundos = gerador.integers(0, 50 * 365 * 86400, n)
+    lat = np.degrees(np.arcsin(gerador.uniform(-0.95, 0.95, n)))
+    lon = gerador.uniform(-180, 180, n)
+    mag = np.round(5.0 + gerador.exponential(0.6, n), 1)
+    profundidade = gerador.exponential(60, n)
+    tsunami = (gerador.random(n) < 0.1).astype(np.int64)
+
+    fontes, origem = [], []
+    for k in range(n_fontes):
+        # Cada agência relata 80% dos eventos, com erros de alguns segundos, km e décimos
+        relatados = np.flatnonzero(gerador.random(n) < 0.8)
+        m = len(relatados)
+        instante = inicio + (segundos[relatados] + gerador.normal(0, 8, m).round().astype(np.int64))
+        fontes.append((f"agencia{k + 1}", pd.DataFrame({
+            'time': instante,
+            'magnitude': np.round(mag[relatados] + gerador.normal(0, 0.1, m), 1),
+            'depth': np.round(profundidade[relatados] + gerador.normal(0, 5, m).clip(-profundidade[relatados]), 2),
+            'latitude': np.clip(lat[relatados] + gerador.normal(0, 10 / KM_POR_GRAU, m), -90, 90),
+            'longitude': (lon[relatados] + gerador.normal(0, 10 / KM_POR_GRAU, m) + 180) % 360 - 180,
+            'Year': instante.astype('datetime64[Y]').astype(np.int64) + 1970,
+            'Month': instante.astype('datetime64[M]').astype(np.int64) % 12 + 1,
+            'tsunami': tsunami[relatados],
+        })))
+        origem.append(relatados)
+    return fontes, np.concatenate(origem)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Mescla catálogos de várias agências num só, sem eventos duplicados.",
+        epilog="Exemplo: python -m dados.fontes usgs=usgs.csv emsc=emsc.csv --saida earthquake_data_tsunami.csv",
+    )
+    parser.add_argument("arquivos", nargs="*",
+                        help="CSVs das fontes, em ordem de preferência (nome=caminho ou só o caminho)")
+    parser.add_argument("--saida", default=None, help="CSV mesclado (padrão: o arquivo de eventos do dashboard)")
+    parser.add_argument("--tempo-s", type=float, default=None, help="padrão: DASHBOARD_TOLERANCIA_TEMPO_S")
+    parser.add_argument("--distancia-km", type=float, default=None, help="padrão: DASHBOARD_TOLERANCIA_DISTANCIA_KM")
+    parser.add_argument("--magnitude", type=float, default=None, help="padrão: DASHBOARD_TOLERANCIA_MAGNITUDE")
+    parser.add_argument("--sintetico", type=int, default=None,
+                        help="mede a mescla com este número de eventos verdadeiros relatados por agências sintéticas")
+    parser.add_argument("--fontes", type=int, default=3, help="agências sintéticas")
+    argumentos = parser.parse_args()
+    tolerancias = (argumentos.tempo_s, argumentos.distancia_km, argumentos.magnitude)
+
+    if argumentos.sintetico:
+        fontes, origem = _agencias_sinteticas(argumentos.sintetico, argumentos.fontes)
+        registros = len(origem)
+
+        inicio = time.perf_counter()
+        mesclado, estatisticas = mesclar_fontes(fontes, *tolerancias)
+        segundos = time.perf_counter() - inicio
+
+        # Conferência contra a verdade: um grupo por evento relatado
+        eventos = pd.concat([df for _, df in fontes], ignore_index=True)
+        fonte = np.repeat(np.arange(len(fontes)), [len(df) for _, df in fontes])
+        rotulo = agrupar(eventos, fonte, *tolerancias)
+        pares = pd.DataFrame({'rotulo': rotulo, 'origem': origem}).drop_duplicates()
+        divididos = int((pares.groupby('origem').size() > 1).sum())
+        fundidos = int((pares.groupby('rotulo').size() > 1).sum())
+        relatados = len(np.unique(origem))
+
+        print(f"{registros:,} registros de {len(fontes)} agências ({relatados:,} eventos verdadeiros) "
+              f"mesclados em {segundos:.1f} s → {estatisticas['eventos']:,} eventos")
+        print(f"Eventos verdadeiros divididos em mais de um grupo: {divididos:,} ({divididos / relatados:.3%})")
+        print(f"Grupos com mais de um evento verdadeiro: {fundidos:,} ({fundidos / len(mesclado):.3%})")
+        print(f"Grupos com registros repetidos de uma fonte: {estatisticas['grupos_com_repeticao']:,}")
+    else:
+        if not argumentos.arquivos:
+            parser.error("informe os arquivos das fontes ou --sintetico")
+        fontes = []
+        for argumento in argumentos.arquivos:
+            nome, _, caminho = argumento.rpartition("=")
+            nome = nome or os.path.splitext(os.path.basename(caminho))[0]
+            fontes.append((nome, pd.read_csv(caminho)))
+
+        inicio = time.perf_counter()
+        mesclado, estatisticas = mesclar_fontes(fontes, *tolerancias)
+        saida = argumentos.saida or config.ARQUIVO_EVENTOS
+        gravar_atomico(mesclado, saida)
+
+        print(f"{estatisticas['registros']:,} registros → {estatisticas['eventos']:,} eventos em "
+              f"{time.perf_counter() - inicio:.1f} s ({'por instante' if estatisticas['por_instante'] else 'por mês'})")
+        print(f"Em mais de uma fonte: {estatisticas['em_mais_de_uma_fonte']:,}; "
+              f"grupos com registros repetidos de uma fonte: {estatisticas['grupos_com_repeticao']:,}")
+        for nome, quantidade in estatisticas['por_fonte'].items():
+            print(f"  {nome}: {quantidade:,} eventos mantidos")
+        print(f"Gravado em {saida}")
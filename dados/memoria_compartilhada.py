@@ -0,0 +1,223 @@
+import argparse
+import atexit
+import io
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+from datetime import datetime
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from dados import config
+from dados.backend import BackendPandas
+from dados.catalogo import Catalogo, GerenciadorCatalogo
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# CATÁLOGO EM MEMÓRIA COMPARTILHADA
+# ========================================
+# Um processo publicador lê os CSVs e copia as colunas numéricas dos eventos
+# para um único segmento de memória compartilhada do sistema operacional.
+# Cada worker do Streamlit apenas anexa o segmento (somente leitura) e monta
+# o DataFrame sobre ele, sem copiar os dados. O manifesto JSON descreve o
+# segmento ativo e é trocado atomicamente a cada nova versão.
+#
+# Só as colunas dos eventos são compartilhadas. O que cada worker monta
+# sobre elas continua privado e cresce com o catálogo: o índice de bitmaps
+# do ``BackendPandas`` (montado na primeira consulta), o LRU de seleções, os
+# ``derivado`` da versão (regiões, simulação, índices de vizinhos...) e as
+# cópias que as páginas fazem ao filtrar. ``--status`` mostra o tamanho do
+# segmento e estima o índice de bitmaps que cada worker vai montar.
+
+ALINHAMENTO = 64
+
+
+def _alinhar(deslocamento):
+    return (deslocamento + ALINHAMENTO - 1) // ALINHAMENTO * ALINHAMENTO
+
+
+def _anexar_segmento(nome):
+    """Anexa um segmento existente sem registrá-lo no resource_tracker.
+
+    Sem isso, o Python < 3.13 removeria o segmento quando o worker
+    encerrasse, derrubando os demais processos que ainda o utilizam.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=nome, track=False)
+    segmento = shared_memory.SharedMemory(name=nome)
+    resource_tracker.unregister(segmento._name, "shared_memory")
+    return segmento
+
+
+def _gravar_manifesto(manifesto, caminho):
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+def _ler_manifesto(caminho):
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+# ========================================
+# PUBLICADOR
+# ========================================
+
+
+class PublicadorMemoria:
+    """Publica cada versão do catálogo em um segmento novo.
+
+    Ao publicar uma versão, o segmento anterior é removido do sistema logo
+    após a troca do manifesto: os workers que já o anexaram continuam
+    lendo o mapeamento existente até liberarem aquela versão.
+    """
+
+    def __init__(self, caminho_manifesto=None):
+        self.caminho_manifesto = caminho_manifesto or config.ARQUIVO_MANIFESTO
+        self._segmento = None
+        self._trava = threading.Lock()
+
+    def publicar(self, catalogo):
+        eventos = catalogo.eventos
+        numericas = [c for c in eventos.columns if pd.api.types.is_numeric_dtype(eventos[c])]
+        ignoradas = [c for c in eventos.columns if c not in numericas]
+        if ignoradas:
+            logger.warning("Colunas não numéricas fora da memória compartilhada: %s", ignoradas)
+
+        colunas = []
+        tamanho = 0
+        for nome in numericas:
+            dados = np.ascontiguousarray(eventos[nome].to_numpy())
+            tamanho = _alinhar(tamanho)
+            colunas.append({"nome": nome, "dtype": dados.dtype.str, "deslocamento": tamanho})
+            tamanho += dados.nbytes
+
+        nome_segmento = f"sismos_{catalogo.versao}_{os.getpid()}"
+        segmento = shared_memory.SharedMemory(name=nome_segmento, create=True, size=max(tamanho, 1))
+        for coluna in colunas:
+            destino = np.ndarray(
+                (len(eventos),), dtype=coluna["dtype"],
+                buffer=segmento.buf, offset=coluna["deslocamento"]
+            )
+            destino[:] = eventos[coluna["nome"]].to_numpy()
+
+        manifesto = {
+            "versao": catalogo.versao,
+            "segmento": nome_segmento,
+            "bytes": tamanho,
+            "linhas": len(eventos),
+            "colunas": colunas,
+            "risco": catalogo.risco.to_json(orient="split", force_ascii=False, index=False),
+            "pid_publicador": os.getpid(),
+            "publicado_em": datetime.now().isoformat(timespec="seconds"),
+        }
+
+        with self._trava:
+            _gravar_manifesto(manifesto, self.caminho_manifesto)
+            anterior, self._segmento = self._segmento, segmento
+            if anterior is not None:
+                anterior.close()
+                anterior.unlink()
+
+        logger.info("Versão %s publicada em '%s' (%d bytes)", catalogo.versao, nome_segmento, tamanho)
+
+    def encerrar(self):
+        """Remove o segmento ativo e o manifesto que aponta para ele."""
+        with self._trava:
+            if self._segmento is None:
+                return
+            try:
+                if _ler_manifesto(self.caminho_manifesto).get("segmento") == self._segmento.name:
+                    os.remove(self.caminho_manifesto)
+            except (OSError, ValueError):
+                pass
+            self._segmento.close()
+            try:
+                self._segmento.unlink()
+            except FileNotFoundError:
+                pass
+            self._segmento = None
+
+
+# ========================================
+# WORKERS
+# ========================================
+
+
+def anexar_catalogo(caminho_manifesto=None):
+    """Monta um ``Catalogo`` sobre o segmento descrito no manifesto.
+
+    As colunas são visões somente leitura da memória compartilhada; o
+    segmento fica referenciado pelo catálogo e é liberado junto com ele.
+    """
+    manifesto = _ler_manifesto(caminho_manifesto or config.ARQUIVO_MANIFESTO)
+    segmento = _anexar_segmento(manifesto["segmento"])
+
+    colunas = {}
+    for coluna in manifesto["colunas"]:
+        visao = np.ndarray(
+            (manifesto["linhas"],), dtype=coluna["dtype"],
+            buffer=segmento.buf, offset=coluna["deslocamento"]
+        )
+        visao.flags.writeable = False
+        colunas[coluna["nome"]] = visao
+
+    eventos = pd.DataFrame(colunas, copy=False)
+    risco = pd.read_json(io.StringIO(manifesto["risco"]), orient="split", convert_dates=False)
+
+    catalogo = Catalogo(manifesto["versao"], eventos, risco, BackendPandas(eventos))
+    catalogo.segmento = segmento
+    return catalogo
+
+
+def _executar_publicador():
+    publicador = PublicadorMemoria()
+    atexit.register(publicador.encerrar)
+
+    # SIGTERM/SIGINT passam por sys.exit para que o atexit limpe o segmento
+    for sinal in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sinal, lambda *_: sys.exit(0))
+
+    gerenciador = GerenciadorCatalogo()
+    gerenciador.ao_publicar(publicador.publicar)
+    gerenciador.iniciar()
+    print(f"Publicando o catálogo em memória compartilhada ({publicador.caminho_manifesto}).")
+    print("Inicie os workers com DASHBOARD_MEMORIA_COMPARTILHADA=1. Ctrl+C encerra.")
+    threading.Event().wait()
+
+
+def _exibir_status():
+    manifesto = _ler_manifesto(config.ARQUIVO_MANIFESTO)
+    print(f"Versão:      {manifesto['versao']}")
+    print(f"Segmento:    {manifesto['segmento']} ({manifesto['bytes'] / 1024 ** 2:.2f} MiB, compartilhado)")
+    print(f"Linhas:      {manifesto['linhas']}")
+    print(f"Colunas:     {', '.join(c['nome'] for c in manifesto['colunas'])}")
+    print(f"Publicador:  pid {manifesto['pid_publicador']} em {manifesto['publicado_em']}")
+
+    # O índice é montado aqui do mesmo jeito que num worker, só para medir
+    catalogo = anexar_catalogo()
+    indice = catalogo.backend.indice
+    print(f"Por worker:  índice de bitmaps {indice.nbytes / 1024 ** 2:.2f} MiB, não compartilhado; "
+          f"mais as seleções em cache e os derivados da versão")
+    catalogo.segmento.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Publica o catálogo em memória compartilhada.")
+    parser.add_argument("--status", action="store_true", help="mostra o segmento publicado e sai")
+    argumentos = parser.parse_args()
+
+    if argumentos.status:
+        _exibir_status()
+    else:
+        _executar_publicador()
@@ -0,0 +1,167 @@
+import math
+import threading
+
+# ========================================
+# REGISTRO DE MÉTRICAS DO PROCESSO
+# ========================================
+# Contadores, medidores e histogramas alimentados pela camada de dados, pelas
+# páginas e pela API, expostos no formato de texto do Prometheus (0.0.4) por
+# ``servicos/metricas.py``. Cada métrica tem rótulos fixos na criação; cada
+# combinação de valores dos rótulos é uma série própria.
+#
+# As métricas são criadas na importação dos módulos que as alimentam. Pedir
+# de novo uma métrica já registrada devolve a mesma instância, então módulos
+# recarregados pelo Streamlit (ao salvar um arquivo, em desenvolvimento) não
+# duplicam séries.
+
+LIMITES_SEGUNDOS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+LIMITES_BYTES = (1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7, 2.5e7)
+
+
+class _Metrica:
+    tipo = None
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._series = {}
+        self._trava = threading.Lock()
+
+    def _chave(self, valores):
+        if set(valores) != set(self.rotulos):
+            raise ValueError(f"{self.nome}: rótulos esperados {self.rotulos}, recebidos {tuple(valores)}")
+        return tuple(str(valores[rotulo]) for rotulo in self.rotulos)
+
+    def _formatar_rotulos(self, chave, extra=()):
+        pares = list(zip(self.rotulos, chave)) + list(extra)
+        if not pares:
+            return ""
+        return "{" + ",".join(f'{nome}="{_escapar(valor)}"' for nome, valor in pares) + "}"
+
+    def linhas(self):
+        with self._trava:
+            series = sorted(self._series.items())
+        if not series and not self.rotulos:
+            series = [((), 0)]
+        return [f"{self.nome}{self._formatar_rotulos(chave)} {_numero(valor)}" for chave, valor in series]
+
+
+class Contador(_Metrica):
+    """Valor que só cresce (eventos, bytes enviados, acertos de cache)."""
+
+    tipo = "counter"
+
+    def incrementar(self, quantidade=1, **rotulos):
+        if quantidade < 0:
+            raise ValueError(f"{self.nome}: contador não pode diminuir")
+        chave = self._chave(rotulos)
+        with self._trava:
+            self._series[chave] = self._series.get(chave, 0) + quantidade
+
+
+class Medidor(_Metrica):
+    """Valor atual que sobe e desce (eventos no catálogo, sessões abertas)."""
+
+    tipo = "gauge"
+
+    def definir(self, valor, **rotulos):
+        chave = self._chave(rotulos)
+        with self._trava:
+            self._series[chave] = valor
+
+
+class Histograma(_Metrica):
+    """Distribuição em faixas cumulativas, com soma e contagem das observações."""
+
+    tipo = "histogram"
+
+    def __init__(self, nome, ajuda, rotulos=(), limites=LIMITES_SEGUNDOS):
+        super().__init__(nome, ajuda, rotulos)
+        self.limites = tuple(sorted(limites))
+
+    def observar(self, valor, **rotulos):
+        chave = self._chave(rotulos)
+        with self._trava:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = {'faixas': [0] * len(self.limites), 'soma': 0.0, 'contagem': 0}
+            for posicao, limite in enumerate(self.limites):
+                if valor <= limite:
+                    serie['faixas'][posicao] += 1
+                    break
+            serie['soma'] += valor
+            serie['contagem'] += 1
+
+    def linhas(self):
+        with self._trava:
+            series = sorted((chave, dict(serie, faixas=list(serie['faixas']))) for chave, serie in self._series.items())
+        linhas = []
+        for chave, serie in series:
+            acumulado = 0
+            for limite, quantidade in zip(self.limites, serie['faixas']):
+                acumulado += quantidade
+                rotulos = self._formatar_rotulos(chave, [('le', _numero(limite))])
+                linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+            rotulos = self._formatar_rotulos(chave, [('le', "+Inf")])
+            linhas.append(f"{self.nome}_bucket{rotulos} {serie['contagem']}")
+            linhas.append(f"{self.nome}_sum{self._formatar_rotulos(chave)} {_numero(serie['soma'])}")
+            linhas.append(f"{self.nome}_count{self._formatar_rotulos(chave)} {serie['contagem']}")
+        return linhas
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _numero(valor):
+    if isinstance(valor, float):
+        if math.isinf(valor):
+            return "+Inf" if valor > 0 else "-Inf"
+        if valor.is_integer() and abs(valor) < 1e15:
+            return str(int(valor))
+    return repr(valor) if isinstance(valor, float) else str(valor)
+
+
+class Registro:
+    """Métricas do processo, indexadas pelo nome."""
+
+    def __init__(self):
+        self._metricas = {}
+        self._trava = threading.Lock()
+
+    def _registrar(self, classe, nome, ajuda, rotulos, **opcoes):
+        with self._trava:
+            metrica = self._metricas.get(nome)
+            if metrica is None:
+                metrica = self._metricas[nome] = classe(nome, ajuda, rotulos, **opcoes)
+            elif type(metrica) is not classe or metrica.rotulos != tuple(rotulos):
+                raise ValueError(f"Métrica '{nome}' já registrada com outro tipo ou rótulos")
+            return metrica
+
+    def contador(self, nome, ajuda, rotulos=()):
+        return self._registrar(Contador, nome, ajuda, rotulos)
+
+    def medidor(self, nome, ajuda, rotulos=()):
+        return self._registrar(Medidor, nome, ajuda, rotulos)
+
+    def histograma(self, nome, ajuda, rotulos=(), limites=LIMITES_SEGUNDOS):
+        return self._registrar(Histograma, nome, ajuda, rotulos, limites=limites)
+
+    def expor(self):
+        """Todas as métricas no formato de texto do Prometheus."""
+        with self._trava:
+            metricas = sorted(self._metricas.values(), key=lambda metrica: metrica.nome)
+        linhas = []
+        for metrica in metricas:
+            linhas.append(f"# HELP {metrica.nome} {metrica.ajuda}")
+            linhas.append(f"# TYPE {metrica.nome} {metrica.tipo}")
+            linhas += metrica.linhas()
+        return "\n".join(linhas) + "\n"
+
+
+# Registro compartilhado pelo processo
+REGISTRO = Registro()
+contador = REGISTRO.contador
+medidor = REGISTRO.medidor
+histograma = REGISTRO.histograma
@@ -0,0 +1,185 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+# ========================================
+# HIERARQUIA DE REGIÕES DE RISCO
+# ========================================
+# O arquivo de risco pode ter só países (uma linha por país) ou descer até
+# estados e municípios (colunas ``Estado`` e ``Municipio``; vazias quando a
+# linha para num nível acima). Cada linha é uma região com valores próprios;
+# os nós acima dela guardam os valores agregados de todas as regiões da sua
+# subárvore: média e máximo de cada risco, risco combinado e placa mais
+# frequente. Tudo é calculado uma vez por versão dos dados.
+#
+# Os nós ficam numa tabela ordenada por (nível, pai, nome). Assim os filhos
+# de cada nó são contíguos, delimitados por ``inicio_filhos`` e
+# ``fim_filhos``, e um dicionário leva do caminho ("Japão / Hokkaido") à
+# posição. Consultar um nó ou listar os filhos não percorre as regiões.
+
+NIVEIS = ("Pais", "Estado", "Municipio")
+ROTULOS_NIVEIS = {"Pais": "País", "Estado": "Estado", "Municipio": "Município"}
+SEPARADOR = " / "
+
+
+class RegioesRisco:
+    """Regiões de risco em hierarquia país → estado → município, com agregados por nó."""
+
+    def __init__(self, risco):
+        self.niveis = [nivel for nivel in NIVEIS if nivel in risco.columns]
+        nomes = risco[self.niveis].astype('string').apply(lambda coluna: coluna.str.strip()).fillna('')
+        # Profundidade de cada linha: até o primeiro nível vazio
+        profundidade = np.cumprod((nomes != '').to_numpy(dtype=bool), axis=1).sum(axis=1)
+        if (profundidade == 0).any():
+            raise ValueError("Regiões de risco: linhas sem país")
+
+        regioes = nomes.assign(
+            Risco_Terremoto=risco['Risco_Terremoto'].to_numpy(dtype=np.float64),
+            Risco_Tsunami=risco['Risco_Tsunami'].to_numpy(dtype=np.float64),
+            Placa_Tectonica=risco['Placa_Tectonica'].to_numpy(),
+        )
+        regioes['Risco_Combinado'] = (regioes['Risco_Terremoto'] + regioes['Risco_Tsunami']) / 2
+
+        partes = []
+        posicoes_pais = {}
+        inicio = 0
+        for nivel in range(len(self.niveis)):
+            parte = _agregar_nivel(regioes[profundidade > nivel], self.niveis[:nivel + 1])
+            parte['nivel'] = nivel
+            if nivel == 0:
+                parte['pai'] = -1
+                parte['caminho'] = parte['nome']
+            else:
+                caminho_pai = _juntar(parte, self.niveis[:nivel])
+                parte['pai'] = caminho_pai.map(posicoes_pais).to_numpy(dtype=np.int64)
+                parte['caminho'] = caminho_pai + SEPARADOR + parte['nome']
+            parte = parte.sort_values(['pai', 'nome'], kind='stable').reset_index(drop=True)
+            posicoes_pais = dict(zip(parte['caminho'], range(inicio, inicio + len(parte))))
+            inicio += len(parte)
+            partes.append(parte)
+
+        self.tabela = pd.concat(partes, ignore_index=True)
+        for nivel in self.niveis:
+            self.tabela[nivel] = self.tabela[nivel].fillna('')
+
+        # ``pai`` não decresce ao longo da tabela: os filhos de cada nó são contíguos
+        pai = self.tabela['pai'].to_numpy()
+        posicoes = np.arange(len(self.tabela))
+        self.inicio_filhos = np.searchsorted(pai, posicoes, side='left')
+        self.fim_filhos = np.searchsorted(pai, posicoes, side='right')
+        self.n_raizes = int(np.searchsorted(pai, 0, side='left'))
+        self._posicoes = dict(zip(self.tabela['caminho'].str.casefold(), posicoes.tolist()))
+
+    def __len__(self):
+        return len(self.tabela)
+
+    def posicao(self, *nomes):
+        """Posição do nó pelos nomes do país para baixo, sem diferenciar maiúsculas; None se não existir."""
+        return self._posicoes.get(SEPARADOR.join(nome.strip() for nome in nomes).casefold())
+
+    def no(self, posicao):
+        return self.tabela.iloc[posicao]
+
+    def raizes(self):
+        """Países, com os valores agregados."""
+        return self.tabela.iloc[:self.n_raizes]
+
+    def filhos(self, posicao):
+        return self.tabela.iloc[self.inicio_filhos[posicao]:self.fim_filhos[posicao]]
+
+    def tem_filhos(self, posicao):
+        return self.fim_filhos[posicao] > self.inicio_filhos[posicao]
+
+    def rotulo_nivel(self, nivel):
+        return ROTULOS_NIVEIS[self.niveis[nivel]]
+
+
+def _juntar(tabela, colunas):
+    caminho = tabela[colunas[0]]
+    for coluna in colunas[1:]:
+        caminho = caminho + SEPARADOR + tabela[coluna]
+    return caminho
+
+
+def _agregar_nivel(regioes, chaves):
+    agregado = regioes.groupby(chaves, sort=False).agg(
+        Risco_Terremoto=('Risco_Terremoto', 'mean'),
+        Risco_Terremoto_Max=('Risco_Terremoto', 'max'),
+        Risco_Tsunami=('Risco_Tsunami', 'mean'),
+        Risco_Tsunami_Max=('Risco_Tsunami', 'max'),
+        Risco_Combinado=('Risco_Combinado', 'mean'),
+        Risco_Combinado_Max=('Risco_Combinado', 'max'),
+        Regioes=('Risco_Combinado', 'size'),
+    )
+    # Placa mais frequente entre as regiões do nó (empates: a primeira em ordem alfabética)
+    placas = (
+        regioes.groupby(chaves + ['Placa_Tectonica'], sort=False).size().rename('n').reset_index()
+        .sort_values(['n', 'Placa_Tectonica'], ascending=[False, True], kind='stable')
+        .drop_duplicates(chaves).set_index(chaves)['Placa_Tectonica']
+    )
+    agregado['Placa_Tectonica'] = placas.reindex(agregado.index).to_numpy()
+    agregado = agregado.reset_index()
+    agregado['nome'] = agregado[chaves[-1]]
+    return agregado
+
+
+def construir_regioes(catalogo):
+    """Construtor para ``Catalogo.derivado``."""
+    return RegioesRisco(catalogo.risco)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Montagem e consultas da hierarquia × varredura da tabela plana.")
+    parser.add_argument("--paises", type=int, default=200)
+    parser.add_argument("--estados", type=int, default=25, help="estados por país")
+    parser.add_argument("--municipios", type=int, default=10, help="municípios por estado")
+    parser.add_argument("--consultas", type=int, default=10_000)
+    argumentos = parser.parse_args()
+
+    gerador = np.random.default_rng(0)
+    p, e, m = argumentos.paises, argumentos.estados, argumentos.municipios
+    n = p * e * m
+    risco = pd.DataFrame({
+        'Pais': np.repeat([f"País {i}" for i in range(p)], e * m),
+        'Estado': np.tile(np.repeat([f"Estado {j}" for j in range(e)], m), p),
+        'Municipio': np.tile([f"Município {k}" for k in range(m)], p * e),
+        'Risco_Terremoto': gerador.integers(0, 11, n),
+        'Risco_Tsunami': gerador.integers(0, 11, n),
+        'Placa_Tectonica': gerador.choice(["Pacífico", "Eurasiática", "Sul-Americana", "Indo-Australiana"], n),
+    })
+
+    inicio = time.perf_counter()
+    regioes = RegioesRisco(risco)
+    print(f"Hierarquia de {n:,} municípios ({len(regioes):,} nós) montada em {time.perf_counter() - inicio:.2f} s")
+
+    # Conferência dos agregados de país contra um groupby direto
+    esperado = risco.groupby('Pais')['Risco_Terremoto'].agg(['mean', 'max'])
+    obtido = regioes.raizes().set_index('Pais')
+    assert np.allclose(obtido.loc[esperado.index, 'Risco_Terremoto'], esperado['mean'])
+    assert np.allclose(obtido.loc[esperado.index, 'Risco_Terremoto_Max'], esperado['max'])
+
+    alvos = risco.iloc[gerador.integers(0, n, argumentos.consultas)]
+    caminhos = (alvos['Pais'] + SEPARADOR + alvos['Estado'] + SEPARADOR + alvos['Municipio']).tolist()
+
+    inicio = time.perf_counter()
+    for pais, estado, municipio in alvos[['Pais', 'Estado', 'Municipio']].head(200).itertuples(index=False):
+        linha = risco[(risco['Pais'] == pais) & (risco['Estado'] == estado) & (risco['Municipio'] == municipio)].iloc[0]
+    segundos_varredura = (time.perf_counter() - inicio) / 200
+
+    inicio = time.perf_counter()
+    for caminho in caminhos:
+        posicao = regioes.posicao(*caminho.split(SEPARADOR))
+    segundos_posicao = (time.perf_counter() - inicio) / len(caminhos)
+
+    inicio = time.perf_counter()
+    for caminho in caminhos[:1000]:
+        nomes = caminho.split(SEPARADOR)
+        opcoes = regioes.filhos(regioes.posicao(nomes[0]))['nome'].tolist()
+        no = regioes.no(regioes.posicao(*nomes))
+    segundos_detalhe = (time.perf_counter() - inicio) / 1000
+
+    print(f"Varredura da tabela plana por região: {segundos_varredura * 1e3:.2f} ms")
+    print(f"Posição pelo caminho: {segundos_posicao * 1e6:.1f} µs")
+    print(f"Filhos do país + linha do município: {segundos_detalhe * 1e3:.3f} ms")
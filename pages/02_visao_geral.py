@@ -3,7 +3,14 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from analise.amostragem import construir_amostra, consulta_aproximada_ativa
+from analise.distribuicoes import LARGURAS_MAGNITUDE, construir_distribuicoes
+from componentes.metricas import concluir_pagina, grafico, iniciar_pagina
+from componentes.progressivo import RefinoProgressivo, legenda_aproximada
+from dados import FiltroEventos, descrever_versao, obter_catalogo
+
 st.set_page_config(page_title="Visão Geral - Dashboard de Terremotos", layout="wide")
+iniciar_pagina("visao_geral")
 
 st.title("📊 Visão Geral dos Dados Sísmicos")
 
@@ -14,30 +21,87 @@ incluindo distribuições, tendências e métricas principais.
 
 # Carregar dados
 try:
-    df = pd.read_csv("earthquake_data_tsunami.csv")
+    catalogo = obter_catalogo()
 except FileNotFoundError:
     st.error("Arquivo de dados 'earthquake_data_tsunami.csv' não encontrado.")
     st.stop()
 
+df = catalogo.eventos
+
+# Em catálogos grandes, estimativas da amostra estratificada aparecem antes
+# dos valores exatos (DASHBOARD_CONSULTA_APROXIMADA)
+amostra = catalogo.derivado("amostra_estratificada", construir_amostra, persistir=True) if consulta_aproximada_ativa(catalogo) else None
+refino = RefinoProgressivo(amostra is not None)
+
+apenas_principais = st.sidebar.toggle(
+    "Apenas eventos principais (sem réplicas)",
+    value=False,
+    key="principais_visao",
+    help="Remove as réplicas (eventos dependentes) identificadas pelo método de Gardner–Knopoff"
+)
+
+filtro = FiltroEventos(apenas_principais=apenas_principais)
+
+if apenas_principais:
+    df = df[df['principal'] == 1]
+
+st.sidebar.caption(f"📦 Versão dos dados: {descrever_versao(catalogo)}")
+
+# Contagens e quartis dos gráficos calculados uma vez por versão dos dados
+# (e guardados no cache em disco, reaproveitados após reinícios)
+distribuicoes = catalogo.derivado(
+    "distribuicoes:principais" if apenas_principais else "distribuicoes",
+    lambda c: construir_distribuicoes(c, apenas_principais),
+    persistir=True
+)
+
 # ========================================
 # SEÇÃO 1: RESUMO ESTATÍSTICO
 # ========================================
 
 st.subheader("📈 Resumo Estatístico")
 
-col1, col2, col3, col4 = st.columns(4)
 
-with col1:
-    st.metric("Total de Eventos", len(df))
+def resumo_exato(df):
+    return {
+        'total': len(df),
+        'magnitude_max': f"{df['magnitude'].max():.2f}",
+        'magnitude_media': f"{df['magnitude'].mean():.2f}",
+        'profundidade_media': f"{df['depth'].mean():.2f} km",
+    }
 
-with col2:
-    st.metric("Magnitude Máxima", f"{df['magnitude'].max():.2f}")
 
-with col3:
-    st.metric("Magnitude Média", f"{df['magnitude'].mean():.2f}")
+def resumo_aproximado(amostra, filtro):
+    resumo = amostra.resumo(filtro)
+    return {
+        'total': resumo['total'].formatar(),
+        'magnitude_max': resumo['magnitude_max'].formatar("{:.2f}"),
+        'magnitude_media': resumo['magnitude_media'].formatar("{:.2f}"),
+        'profundidade_media': resumo['profundidade_media'].formatar("{:.2f}") + " km",
+        'amostra': resumo['amostra'],
+    }
 
-with col4:
-    st.metric("Profundidade Média", f"{df['depth'].mean():.2f} km")
+
+def desenhar_resumo(resumo, aproximado):
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("Total de Eventos", resumo['total'])
+
+    with col2:
+        st.metric("Magnitude Máxima", resumo['magnitude_max'])
+
+    with col3:
+        st.metric("Magnitude Média", resumo['magnitude_media'])
+
+    with col4:
+        st.metric("Profundidade Média", resumo['profundidade_media'])
+
+    if aproximado:
+        legenda_aproximada(amostra, resumo['amostra'])
+
+
+refino.exibir(desenhar_resumo, lambda: resumo_aproximado(amostra, filtro), lambda: resumo_exato(df))
 
 st.markdown("---")
 
@@ -52,23 +116,44 @@ Este histograma mostra como os eventos sísmicos se distribuem por faixa de magn
 A maioria dos eventos concentra-se em magnitudes menores, enquanto eventos de alta magnitude são mais raros.
 """)
 
-fig_magnitude = px.histogram(
-    df,
-    x='magnitude',
-    nbins=30,
-    title='Distribuição de Magnitude dos Terremotos',
-    labels={'magnitude': 'Magnitude (Escala Richter)', 'count': 'Quantidade de Eventos'},
-    color_discrete_sequence=['#1f77b4']
-)
 
-fig_magnitude.update_layout(
-    height=400,
-    hovermode='x unified',
-    xaxis_title='Magnitude (Escala Richter)',
-    yaxis_title='Quantidade de Eventos'
-)
-
-st.plotly_chart(fig_magnitude, use_container_width=True)
+@st.fragment
+def secao_histograma_magnitude(distribuicoes):
+    """Trocar a largura das faixas redesenha só o histograma."""
+    largura_faixa = st.radio(
+        "Largura das faixas de magnitude",
+        options=LARGURAS_MAGNITUDE,
+        index=LARGURAS_MAGNITUDE.index(0.1),
+        format_func=lambda largura: f"{largura:g}",
+        horizontal=True,
+        key="largura_magnitude"
+    )
+
+    # Faixas já contadas no servidor: o navegador recebe só as contagens
+    faixas = distribuicoes['magnitude'][largura_faixa]
+
+    fig_magnitude = go.Figure(go.Bar(
+        x=(faixas['inicio'] + faixas['fim']) / 2,
+        y=faixas['contagem'],
+        width=largura_faixa,
+        customdata=faixas[['inicio', 'fim']],
+        hovertemplate='Magnitude %{customdata[0]:.2f} – %{customdata[1]:.2f}<br>Eventos: %{y}<extra></extra>',
+        marker_color='#1f77b4'
+    ))
+
+    fig_magnitude.update_layout(
+        title='Distribuição de Magnitude dos Terremotos',
+        height=400,
+        bargap=0,
+        hovermode='x unified',
+        xaxis_title='Magnitude (Escala Richter)',
+        yaxis_title='Quantidade de Eventos'
+    )
+
+    grafico(fig_magnitude, use_container_width=True)
+
+
+secao_histograma_magnitude(distribuicoes)
 
 st.markdown("---")
 
@@ -83,21 +168,44 @@ Este gráfico de caixa (box plot) ilustra a distribuição da profundidade dos t
 Eventos rasos (próximos à superfície) tendem a causar mais danos, enquanto eventos profundos são geralmente menos destrutivos.
 """)
 
-fig_depth = px.box(
-    df,
-    y='depth',
-    title='Distribuição de Profundidade dos Terremotos',
-    labels={'depth': 'Profundidade (km)'},
-    color_discrete_sequence=['#ff7f0e']
-)
+caixa = distribuicoes['profundidade']
+
+# Box plot a partir dos quartis e bigodes pré-calculados, com os pontos extremos à parte
+fig_depth = go.Figure(go.Box(
+    x=['Profundidade'],
+    q1=[caixa['q1']],
+    median=[caixa['mediana']],
+    q3=[caixa['q3']],
+    mean=[caixa['media']],
+    lowerfence=[caixa['bigode_inferior']],
+    upperfence=[caixa['bigode_superior']],
+    name='Profundidade',
+    marker_color='#ff7f0e'
+))
+
+fig_depth.add_trace(go.Scatter(
+    x=['Profundidade'] * len(caixa['extremos']),
+    y=caixa['extremos'],
+    mode='markers',
+    name='Valores extremos',
+    marker=dict(color='#ff7f0e', size=5, opacity=0.6)
+))
 
 fig_depth.update_layout(
+    title='Distribuição de Profundidade dos Terremotos',
     height=400,
     showlegend=False,
+    xaxis=dict(showticklabels=False),
     yaxis_title='Profundidade (km)'
 )
 
-st.plotly_chart(fig_depth, use_container_width=True)
+if caixa['total_extremos'] > len(caixa['extremos']):
+    st.caption(
+        f"Exibindo os {len(caixa['extremos'])} valores extremos mais afastados da mediana "
+        f"de um total de {caixa['total_extremos']}."
+    )
+
+grafico(fig_depth, use_container_width=True)
 
 st.markdown("---")
 
@@ -112,24 +220,47 @@ Este gráfico de pizza mostra a proporção de eventos sísmicos que geraram tsu
 aos que não geraram. Tsunamis são eventos raros, ocorrendo apenas quando certas condições geológicas são atendidas.
 """)
 
-# Contar eventos com e sem tsunami
-tsunami_counts = df['tsunami'].value_counts().reset_index()
-tsunami_counts.columns = ['tsunami', 'count']
-tsunami_counts['label'] = tsunami_counts['tsunami'].apply(
-    lambda x: '🌊 Com Tsunami' if x == 1 else '🏔️ Sem Tsunami'
-)
 
-fig_tsunami = px.pie(
-    tsunami_counts,
-    values='count',
-    names='label',
-    title='Proporção de Eventos com Tsunami',
-    color_discrete_sequence=['#d62728', '#2ca02c']
-)
+def contar_tsunamis(df):
+    # Contar eventos com e sem tsunami
+    tsunami_counts = df['tsunami'].value_counts().reset_index()
+    tsunami_counts.columns = ['tsunami', 'count']
+    return tsunami_counts, None
+
+
+def contar_tsunamis_aproximado(amostra, filtro):
+    resumo = amostra.resumo(filtro)
+    tsunamis = resumo['tsunamis'].valor
+    tsunami_counts = pd.DataFrame({'tsunami': [1, 0], 'count': [tsunamis, resumo['total'].valor - tsunamis]})
+    return tsunami_counts, resumo['fracao_tsunami']
 
-fig_tsunami.update_layout(height=400)
 
-st.plotly_chart(fig_tsunami, use_container_width=True)
+def desenhar_tsunamis(resultado, aproximado):
+    tsunami_counts, fracao = resultado
+    tsunami_counts['label'] = tsunami_counts['tsunami'].apply(
+        lambda x: '🌊 Com Tsunami' if x == 1 else '🏔️ Sem Tsunami'
+    )
+
+    fig_tsunami = px.pie(
+        tsunami_counts,
+        values='count',
+        names='label',
+        title='Proporção de Eventos com Tsunami',
+        color_discrete_sequence=['#d62728', '#2ca02c']
+    )
+
+    fig_tsunami.update_layout(height=400)
+
+    grafico(fig_tsunami, use_container_width=True)
+
+    if aproximado:
+        st.caption(f"≈ Proporção estimada na amostra: {fracao.formatar('{:.1%}')} (intervalo de 95%).")
+
+
+refino.exibir(desenhar_tsunamis, lambda: contar_tsunamis_aproximado(amostra, filtro), lambda: contar_tsunamis(df))
+
+# A tabela descritiva abaixo é sempre exata
+refino.concluir()
 
 st.markdown("---")
 
@@ -144,7 +275,12 @@ A tabela abaixo apresenta as estatísticas descritivas completas do conjunto de
 incluindo contagem, média, desvio padrão, mínimo, quartis e máximo.
 """)
 
-st.dataframe(df.describe(), use_container_width=True)
+descricao = catalogo.derivado(
+    "descricao:principais" if apenas_principais else "descricao",
+    lambda c: df.describe(),
+    persistir=True
+)
+st.dataframe(descricao, use_container_width=True)
 
 st.markdown("---")
 
@@ -204,3 +340,5 @@ with st.expander("Clique para expandir a legenda das colunas"):
 st.markdown("---")
 
 st.info("💡 Dica: Use o menu lateral para filtrar os dados e explorar diferentes aspectos dos eventos sísmicos.")
+
+concluir_pagina()
@@ -1,11 +1,21 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import matplotlib.pyplot as plt
 import numpy as np
 
+from analise.amostragem import construir_amostra, consulta_aproximada_ativa
+from analise.selecao import IndiceSelecao
+from analise.serie_temporal import construir_serie
+from analise.vizinhos import construir_indice
+from componentes.filtros_laterais import filtros_laterais
+from componentes.metricas import concluir_pagina, grafico, iniciar_pagina
+from componentes.progressivo import RefinoProgressivo, legenda_aproximada
+from componentes.selecao_vinculada import aviso_selecao, grafico_selecionavel, linhas_selecionadas
+from dados import FiltroEventos, descrever_versao, obter_catalogo
+
 st.set_page_config(page_title="Análise Interativa - Dashboard de Terremotos", layout="wide")
+iniciar_pagina("analise_interativa")
 
 st.title("🔍 Análise Interativa de Terremotos e Tsunamis")
 
@@ -19,60 +29,93 @@ os dados de terremotos e tsunamis de forma personalizada.
 # ========================================
 
 try:
-    df = pd.read_csv("earthquake_data_tsunami.csv")
+    catalogo = obter_catalogo()
 except FileNotFoundError:
     st.error("Arquivo de dados 'earthquake_data_tsunami.csv' não encontrado.")
     st.stop()
 
+# Backend definido por DASHBOARD_BACKEND (pandas ou sqlite)
+backend = catalogo.backend
+limites = catalogo.limites
+
+# Em catálogos grandes, estimativas da amostra estratificada aparecem antes
+# dos valores exatos (DASHBOARD_CONSULTA_APROXIMADA)
+amostra = catalogo.derivado("amostra_estratificada", construir_amostra, persistir=True) if consulta_aproximada_ativa(catalogo) else None
+refino = RefinoProgressivo(amostra is not None)
+
 # ========================================
 # SIDEBAR - FILTROS INTERATIVOS
 # ========================================
 
 st.sidebar.subheader("🎚️ Filtros de Análise Interativa")
 
-# Filtro 1: Magnitude
-min_mag = float(df['magnitude'].min())
-max_mag = float(df['magnitude'].max())
-magnitude_range = st.sidebar.slider(
-    "Magnitude (Escala Richter)",
-    min_value=min_mag,
-    max_value=max_mag,
-    value=(min_mag, max_mag),
-    step=0.1,
-    key="mag_filter"
-)
+min_mag, max_mag = limites['magnitude']
+min_depth, max_depth = limites['profundidade']
 
-# Filtro 2: Profundidade
-min_depth = float(df['depth'].min())
-max_depth = float(df['depth'].max())
-depth_range = st.sidebar.slider(
-    "Profundidade (km)",
-    min_value=min_depth,
-    max_value=max_depth,
-    value=(min_depth, max_depth),
-    step=1.0,
-    key="depth_filter"
-)
 
-# Filtro 3: Tsunami
-tsunami_filter = st.sidebar.selectbox(
-    "Filtrar por Tsunami",
-    options=["Todos", "Com Tsunami", "Sem Tsunami"],
-    key="tsunami_filter"
-)
+def controles_filtros():
+    # Filtro 1: Magnitude
+    magnitude_range = st.slider(
+        "Magnitude (Escala Richter)",
+        min_value=min_mag,
+        max_value=max_mag,
+        value=(min_mag, max_mag),
+        step=0.1,
+        key="mag_filter"
+    )
+
+    # Filtro 2: Profundidade
+    depth_range = st.slider(
+        "Profundidade (km)",
+        min_value=min_depth,
+        max_value=max_depth,
+        value=(min_depth, max_depth),
+        step=1.0,
+        key="depth_filter"
+    )
+
+    # Filtro 3: Tsunami
+    tsunami_filter = st.selectbox(
+        "Filtrar por Tsunami",
+        options=["Todos", "Com Tsunami", "Sem Tsunami"],
+        key="tsunami_filter"
+    )
+
+    # Filtro: Eventos Principais (declusterização)
+    apenas_principais = st.toggle(
+        "Apenas eventos principais (sem réplicas)",
+        value=False,
+        key="principais_analise",
+        help="Remove as réplicas (eventos dependentes) identificadas pelo método de Gardner–Knopoff"
+    )
 
-# Aplicar filtros
-df_filtered = df[
-    (df['magnitude'] >= magnitude_range[0]) & 
-    (df['magnitude'] <= magnitude_range[1]) &
-    (df['depth'] >= depth_range[0]) & 
-    (df['depth'] <= depth_range[1])
-]
+    return {
+        'magnitude': magnitude_range, 'profundidade': depth_range,
+        'tsunami': tsunami_filter, 'apenas_principais': apenas_principais,
+    }
 
-if tsunami_filter == "Com Tsunami":
-    df_filtered = df_filtered[df_filtered['tsunami'] == 1]
-elif tsunami_filter == "Sem Tsunami":
-    df_filtered = df_filtered[df_filtered['tsunami'] == 0]
+
+# Valores aplicados conforme DASHBOARD_MODO_FILTROS (imediato, lote ou espera)
+filtros = filtros_laterais("analise", controles_filtros)
+apenas_principais = filtros['apenas_principais']
+
+st.sidebar.markdown("---")
+st.sidebar.caption(f"📦 Versão dos dados: {descrever_versao(catalogo)}")
+
+# Aplicar filtros (executados pelo backend configurado)
+filtro = FiltroEventos(
+    magnitude=filtros['magnitude'],
+    profundidade=filtros['profundidade'],
+    tsunami={"Com Tsunami": 1, "Sem Tsunami": 0}.get(filtros['tsunami']),
+    apenas_principais=apenas_principais
+)
+
+# Seleção (caixa ou laço) no gráfico de dispersão: vale para os cartões, a
+# evolução temporal e a tabela, recalculados a partir das linhas selecionadas
+indice_selecao = catalogo.derivado("indice_selecao", IndiceSelecao)
+selecionadas = linhas_selecionadas("selecao_dispersao", catalogo)
+if selecionadas is not None:
+    selecionadas = indice_selecao.restringir(selecionadas, filtro)
 
 # ========================================
 # EXIBIR INFORMAÇÕES SOBRE FILTROS
@@ -81,16 +124,37 @@ elif tsunami_filter == "Sem Tsunami":
 st.markdown("---")
 st.subheader("📊 Dados Filtrados")
 
-col1, col2, col3 = st.columns(3)
 
-with col1:
-    st.metric("Eventos Filtrados", len(df_filtered))
+def desenhar_resumo(resumo_filtrado, aproximado):
+    col1, col2, col3 = st.columns(3)
+    
+    if aproximado:
+        with col1:
+            st.metric("Eventos Filtrados", resumo_filtrado['total'].formatar())
+        with col2:
+            st.metric("Magnitude Máxima", resumo_filtrado['magnitude_max'].formatar("{:.2f}"))
+        with col3:
+            st.metric("Eventos com Tsunami", resumo_filtrado['tsunamis'].formatar(),
+                      help=f"Fração com tsunami: {resumo_filtrado['fracao_tsunami'].formatar('{:.1%}')}")
+        legenda_aproximada(amostra, resumo_filtrado['amostra'])
+        return
+    
+    with col1:
+        st.metric("Eventos Filtrados", resumo_filtrado['total'])
+    
+    with col2:
+        st.metric("Magnitude Máxima", f"{resumo_filtrado['magnitude_max']:.2f}" if resumo_filtrado['total'] > 0 else "N/A")
+    
+    with col3:
+        st.metric("Eventos com Tsunami", resumo_filtrado['tsunamis'])
 
-with col2:
-    st.metric("Magnitude Máxima", f"{df_filtered['magnitude'].max():.2f}" if len(df_filtered) > 0 else "N/A")
 
-with col3:
-    st.metric("Eventos com Tsunami", int(df_filtered['tsunami'].sum()) if len(df_filtered) > 0 else 0)
+if selecionadas is not None:
+    desenhar_resumo(indice_selecao.resumo(selecionadas), False)
+    aviso_selecao(selecionadas, "no gráfico de dispersão")
+else:
+    # Contagens calculadas pelo backend, sem percorrer o DataFrame filtrado
+    refino.exibir(desenhar_resumo, lambda: amostra.resumo(filtro), lambda: backend.resumo(filtro))
 
 st.markdown("---")
 
@@ -103,52 +167,68 @@ st.subheader("📊 Gráfico Interativo 1: Magnitude vs. Profundidade")
 st.markdown("""
 Este gráfico de dispersão mostra a relação entre a **magnitude** e a **profundidade** dos terremotos. 
 A cor indica se o evento gerou tsunami ou não. O tamanho dos pontos representa a intensidade (sig).
-Você pode passar o mouse para ver detalhes específicos e fazer zoom.
+Você pode passar o mouse para ver detalhes específicos e fazer zoom. Selecione uma região com a **caixa** ou o
+**laço** para que os cartões, a evolução temporal e a tabela mostrem apenas os eventos selecionados.
 """)
 
-if len(df_filtered) > 0:
-    # Criar cópia para não alterar dados originais
-    df_plot = df_filtered.copy()
-    df_plot['Tsunami'] = df_plot['tsunami'].apply(lambda x: '🌊 Com Tsunami' if x == 1 else '❌ Sem Tsunami')
-    
-    fig_scatter = px.scatter(
-        df_plot,
-        x='magnitude',
-        y='depth',
-        color='Tsunami',
-        size='sig',
-        hover_data={
-            'magnitude': ':.2f',
-            'depth': ':.2f',
-            'sig': ':.0f',
-            'latitude': ':.2f',
-            'longitude': ':.2f',
-            'tsunami': False,
-            'Tsunami': True
-        },
-        title='Relação entre Magnitude e Profundidade dos Terremotos',
-        labels={
-            'magnitude': 'Magnitude (Escala Richter)',
-            'depth': 'Profundidade (km)',
-            'sig': 'Significância'
-        },
-        color_discrete_map={
-            '❌ Sem Tsunami': '#2ca02c',
-            '🌊 Com Tsunami': '#d62728'
-        }
-    )
-    
-    fig_scatter.update_layout(
-        height=500,
-        hovermode='closest',
-        legend=dict(title='Status do Tsunami'),
-        xaxis_title='Magnitude (Escala Richter)',
-        yaxis_title='Profundidade (km)'
-    )
-    
-    st.plotly_chart(fig_scatter, use_container_width=True)
-else:
-    st.warning("Nenhum evento encontrado com os filtros selecionados.")
+
+def desenhar_dispersao(df_pontos, aproximado):
+    if len(df_pontos) > 0:
+        # Criar cópia para não alterar dados originais
+        df_plot = df_pontos.copy()
+        df_plot['Tsunami'] = df_plot['tsunami'].apply(lambda x: '🌊 Com Tsunami' if x == 1 else '❌ Sem Tsunami')
+        # Número de linha no catálogo, lido de volta quando os pontos são selecionados
+        df_plot['linha'] = df_plot.index
+        
+        fig_scatter = px.scatter(
+            df_plot,
+            x='magnitude',
+            y='depth',
+            color='Tsunami',
+            size='sig',
+            custom_data=['linha'],
+            hover_data={
+                'magnitude': ':.2f',
+                'depth': ':.2f',
+                'sig': ':.0f',
+                'latitude': ':.2f',
+                'longitude': ':.2f',
+                'tsunami': False,
+                'Tsunami': True
+            },
+            title='Relação entre Magnitude e Profundidade dos Terremotos',
+            labels={
+                'magnitude': 'Magnitude (Escala Richter)',
+                'depth': 'Profundidade (km)',
+                'sig': 'Significância'
+            },
+            color_discrete_map={
+                '❌ Sem Tsunami': '#2ca02c',
+                '🌊 Com Tsunami': '#d62728'
+            }
+        )
+        
+        fig_scatter.update_layout(
+            height=500,
+            hovermode='closest',
+            legend=dict(title='Status do Tsunami'),
+            xaxis_title='Magnitude (Escala Richter)',
+            yaxis_title='Profundidade (km)'
+        )
+        
+        if aproximado:
+            grafico(fig_scatter, use_container_width=True)
+            st.caption(f"≈ {len(df_pontos):,} pontos da amostra estratificada; o gráfico completo substitui este "
+                       f"assim que ficar pronto.")
+        else:
+            # Só o gráfico exato aceita seleção: a amostra não tem todas as linhas
+            grafico_selecionavel(fig_scatter, "selecao_dispersao", catalogo)
+    else:
+        st.warning("Nenhum evento encontrado com os filtros selecionados.")
+
+
+# Na consulta aproximada, os pontos da amostra aparecem enquanto o filtro exato roda em segundo plano
+obter_filtrados = refino.exibir(desenhar_dispersao, lambda: amostra.pontos(filtro), lambda: backend.filtrar(filtro))
 
 st.markdown("---")
 
@@ -163,22 +243,61 @@ Este gráfico de linha mostra como a **magnitude máxima** dos terremotos evolui
 Você pode selecionar o período de tempo desejado usando o slider abaixo.
 """)
 
-# Preparar dados temporais
-if len(df_filtered) > 0:
-    try:
-        df_filtered_copy = df_filtered.copy()
+
+def desenhar_evolucao(df_yearly, year_range, aproximado):
+    if len(df_yearly) == 0:
+        st.warning("Nenhum evento encontrado com os filtros selecionados.")
+        return
+    
+    # Filtrar dados por período selecionado
+    df_yearly_filtered = df_yearly[
+        (df_yearly['year'] >= year_range[0]) & 
+        (df_yearly['year'] <= year_range[1])
+    ]
+    
+    if len(df_yearly_filtered) > 0:
+        # Criar figura com matplotlib
+        fig, ax = plt.subplots(figsize=(12, 6))
+        
+        ax.plot(df_yearly_filtered['year'], df_yearly_filtered['max_mag'], 
+                marker='o', linewidth=2.5, markersize=8, label='Magnitude Máxima', color='#d62728')
+        ax.plot(df_yearly_filtered['year'], df_yearly_filtered['mean_mag'], 
+                marker='s', linewidth=2.5, markersize=6, label='Magnitude Média', color='#1f77b4', linestyle='--')
+        if aproximado:
+            # Intervalo de 95% da média estimada em cada ano
+            ax.fill_between(df_yearly_filtered['year'],
+                            df_yearly_filtered['mean_mag'] - df_yearly_filtered['mean_mag_margem'],
+                            df_yearly_filtered['mean_mag'] + df_yearly_filtered['mean_mag_margem'],
+                            color='#1f77b4', alpha=0.2, label='Média: intervalo de 95%')
+        
+        ax.set_xlabel('Ano', fontsize=12, fontweight='bold')
+        ax.set_ylabel('Magnitude (Escala Richter)', fontsize=12, fontweight='bold')
+        ax.set_title('Evolução Temporal da Magnitude dos Terremotos', fontsize=14, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+        ax.legend(fontsize=10, loc='best')
+        ax.set_xticks(df_yearly_filtered['year'].unique())
         
+        plt.tight_layout()
+        st.pyplot(fig)
+        if aproximado:
+            st.caption("≈ Estimativa da amostra estratificada: a magnitude máxima de cada ano é um limite inferior, "
+                       "exceto nos anos com eventos do topo do catálogo. O gráfico exato substitui este assim que "
+                       "ficar pronto.")
+    else:
+        st.warning("Nenhum dado disponível para o período selecionado.")
+
+
+@st.fragment
+def secao_evolucao_temporal(catalogo, filtro, amostra, selecionadas):
+    """Slider de período e gráfico anual: mover o slider reexecuta só esta seção."""
+    try:
         # Criar coluna de ano se não existir
-        if 'Year' not in df_filtered_copy.columns:
+        if 'Year' not in catalogo.eventos.columns:
             st.error("Coluna 'Year' não encontrada no arquivo de dados.")
         else:
-            # Agrupar por ano e calcular magnitude máxima
-            df_yearly = df_filtered_copy.groupby('Year')['magnitude'].agg(['max', 'mean', 'count']).reset_index()
-            df_yearly.columns = ['year', 'max_mag', 'mean_mag', 'count']
-            
-            # Widget para seleção de período
-            min_year = int(df_yearly['year'].min())
-            max_year = int(df_yearly['year'].max())
+            # Widget para seleção de período (anos do catálogo, agregados uma vez por versão)
+            min_year = int(catalogo.por_ano['year'].min())
+            max_year = int(catalogo.por_ano['year'].max())
             
             year_range = st.slider(
                 "Selecione o período de anos",
@@ -189,37 +308,137 @@ if len(df_filtered) > 0:
                 key="year_range_filter"
             )
             
-            # Filtrar dados por período selecionado
-            df_yearly_filtered = df_yearly[
-                (df_yearly['year'] >= year_range[0]) & 
-                (df_yearly['year'] <= year_range[1])
-            ]
+            if selecionadas is not None:
+                # Agregados por ano só das linhas selecionadas na dispersão
+                indice_selecao = catalogo.derivado("indice_selecao", IndiceSelecao)
+                desenhar_evolucao(indice_selecao.agregar_por_ano(selecionadas), year_range, False)
+                aviso_selecao(selecionadas, "no gráfico de dispersão")
+                return
             
-            if len(df_yearly_filtered) > 0:
-                # Criar figura com matplotlib
-                fig, ax = plt.subplots(figsize=(12, 6))
-                
-                ax.plot(df_yearly_filtered['year'], df_yearly_filtered['max_mag'], 
-                        marker='o', linewidth=2.5, markersize=8, label='Magnitude Máxima', color='#d62728')
-                ax.plot(df_yearly_filtered['year'], df_yearly_filtered['mean_mag'], 
-                        marker='s', linewidth=2.5, markersize=6, label='Magnitude Média', color='#1f77b4', linestyle='--')
-                
-                ax.set_xlabel('Ano', fontsize=12, fontweight='bold')
-                ax.set_ylabel('Magnitude (Escala Richter)', fontsize=12, fontweight='bold')
-                ax.set_title('Evolução Temporal da Magnitude dos Terremotos', fontsize=14, fontweight='bold')
-                ax.grid(True, alpha=0.3)
-                ax.legend(fontsize=10, loc='best')
-                ax.set_xticks(df_yearly_filtered['year'].unique())
-                
-                plt.tight_layout()
-                st.pyplot(fig)
-            else:
-                st.warning("Nenhum dado disponível para o período selecionado.")
+            # Agrupar por ano e calcular magnitude máxima (agregação feita pelo backend,
+            # precedida pela estimativa da amostra na consulta aproximada)
+            refino_anual = RefinoProgressivo(amostra is not None)
+            refino_anual.exibir(
+                lambda df_yearly, aproximado: desenhar_evolucao(df_yearly, year_range, aproximado),
+                lambda: amostra.agregar_por_ano(filtro),
+                lambda: catalogo.backend.agregar_por_ano(filtro)
+            )
+            refino_anual.concluir()
         
     except Exception as e:
         st.error(f"Erro ao processar dados temporais: {str(e)}")
-else:
-    st.warning("Nenhum evento encontrado com os filtros selecionados.")
+
+
+# Preparar dados temporais
+secao_evolucao_temporal(catalogo, filtro, amostra, selecionadas)
+
+st.markdown("---")
+
+# ========================================
+# GRÁFICO INTERATIVO 3: TAXAS MÓVEIS E MOMENTO SÍSMICO
+# ========================================
+
+st.subheader("📈 Gráfico Interativo 3: Taxa de Eventos e Momento Sísmico")
+
+st.markdown("""
+Taxa mensal de eventos e fração de tsunamis em **janelas móveis**, e o **momento sísmico acumulado** no período.
+Os valores vêm de um índice mensal com somas acumuladas, calculado uma vez por versão dos dados: mover o
+período ou a janela não percorre os eventos novamente. Esta seção considera todo o catálogo
+(respeitando apenas a opção de eventos principais).
+""")
+
+
+@st.fragment
+def secao_taxas_moveis(catalogo, apenas_principais):
+    """Período e janela da série mensal: alterá-los reexecuta só esta seção."""
+    # Índice mensal construído uma única vez por versão dos dados
+    serie = catalogo.derivado(
+        "serie_mensal:principais" if apenas_principais else "serie_mensal",
+        lambda c: construir_serie(c, apenas_principais),
+        persistir=True
+    )
+
+    col1, col2 = st.columns([3, 1])
+
+    with col1:
+        periodo_serie = st.slider(
+            "Período",
+            min_value=serie.ano_inicial,
+            max_value=serie.ano_final,
+            value=(serie.ano_inicial, serie.ano_final),
+            step=1,
+            key="periodo_serie"
+        )
+
+    with col2:
+        janela_meses = st.selectbox(
+            "Janela móvel",
+            options=[3, 6, 12, 24, 60],
+            index=2,
+            format_func=lambda meses: f"{meses} meses",
+            key="janela_serie"
+        )
+
+    totais_periodo = serie.totais(*periodo_serie)
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("Eventos no Período", totais_periodo['eventos'])
+
+    with col2:
+        st.metric("Taxa Média Mensal", f"{totais_periodo['taxa_mensal']:.2f}")
+
+    with col3:
+        st.metric(
+            "Fração com Tsunami",
+            f"{totais_periodo['fracao_tsunami']:.1%}" if totais_periodo['eventos'] > 0 else "N/A"
+        )
+
+    with col4:
+        st.metric(
+            "Magnitude Equivalente (Mw)",
+            f"{totais_periodo['magnitude_equivalente']:.2f}" if totais_periodo['eventos'] > 0 else "N/A",
+            help="Magnitude de um único evento que liberaria todo o momento sísmico do período"
+        )
+
+    df_movel = serie.movel(janela_meses, *periodo_serie)
+    datas_movel = df_movel.index.to_timestamp()
+
+    fig_taxa = go.Figure()
+    fig_taxa.add_trace(go.Scatter(
+        x=datas_movel, y=df_movel['taxa_mensal'], name='Eventos por mês', line=dict(color='#1f77b4', width=2)
+    ))
+    fig_taxa.add_trace(go.Scatter(
+        x=datas_movel, y=df_movel['fracao_tsunami'], name='Fração com tsunami', yaxis='y2',
+        line=dict(color='#d62728', width=2, dash='dot')
+    ))
+    fig_taxa.update_layout(
+        title=f'Taxa de Eventos e Fração de Tsunamis (janela móvel de {janela_meses} meses)',
+        height=400,
+        xaxis_title='Mês',
+        yaxis=dict(title='Eventos por Mês'),
+        yaxis2=dict(title='Fração com Tsunami', overlaying='y', side='right', tickformat='.0%', range=[0, 1]),
+        legend=dict(x=0.01, y=0.99),
+        hovermode='x unified'
+    )
+
+    grafico(fig_taxa, use_container_width=True)
+
+    fig_momento = go.Figure(go.Scatter(
+        x=datas_movel, y=df_movel['momento_acumulado'], fill='tozeroy', line=dict(color='#ff7f0e', width=2)
+    ))
+    fig_momento.update_layout(
+        title='Momento Sísmico Acumulado no Período',
+        height=350,
+        xaxis_title='Mês',
+        yaxis=dict(title='Momento Sísmico (N·m)', exponentformat='power')
+    )
+
+    grafico(fig_momento, use_container_width=True)
+
+
+secao_taxas_moveis(catalogo, apenas_principais)
 
 st.markdown("---")
 
@@ -227,6 +446,12 @@ st.markdown("---")
 # TABELA DE DADOS FILTRADOS
 # ========================================
 
+# Estimativas substituídas pelos valores exatos; a tabela usa o mesmo resultado
+refino.concluir()
+df_filtered = obter_filtrados()
+if selecionadas is not None:
+    df_filtered = indice_selecao.eventos_de(selecionadas)
+
 st.subheader("📋 Tabela de Dados Filtrados")
 
 st.markdown("""
@@ -234,6 +459,9 @@ A tabela abaixo mostra os primeiros 100 registros dos dados filtrados.
 Você pode ordenar clicando nos cabeçalhos das colunas.
 """)
 
+if selecionadas is not None:
+    aviso_selecao(selecionadas, "no gráfico de dispersão")
+
 if len(df_filtered) > 0:
     # Selecionar colunas principais para exibição
     cols_to_display = ['magnitude', 'depth', 'latitude', 'longitude', 'Year', 'Month', 'tsunami']
@@ -255,4 +483,68 @@ else:
 
 st.markdown("---")
 
+# ========================================
+# EVENTOS HISTÓRICOS SEMELHANTES
+# ========================================
+
+st.subheader("🔎 Eventos Históricos Semelhantes")
+
+st.markdown("""
+Informe as características de um terremoto para encontrar os eventos do histórico mais parecidos com ele 
+em **magnitude**, **profundidade** e **distância entre epicentros**, junto com a ocorrência ou não de tsunami.
+""")
+
+
+@st.fragment
+def secao_semelhantes(catalogo):
+    """Busca de eventos semelhantes; independe dos filtros da barra lateral."""
+    # Índice de vizinhos construído uma única vez por versão dos dados
+    indice_vizinhos = catalogo.derivado("indice_vizinhos", construir_indice)
+
+    # Valores iniciais: o evento de maior magnitude do catálogo
+    evento_referencia = catalogo.eventos.loc[catalogo.eventos['magnitude'].idxmax()]
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+
+    with col1:
+        knn_magnitude = st.number_input("Magnitude", 0.0, 10.0, float(evento_referencia['magnitude']), 0.1, key="knn_magnitude")
+
+    with col2:
+        knn_profundidade = st.number_input("Profundidade (km)", 0.0, 800.0, float(evento_referencia['depth']), 1.0, key="knn_profundidade")
+
+    with col3:
+        knn_latitude = st.number_input("Latitude", -90.0, 90.0, float(evento_referencia['latitude']), 0.5, key="knn_latitude")
+
+    with col4:
+        knn_longitude = st.number_input("Longitude", -180.0, 180.0, float(evento_referencia['longitude']), 0.5, key="knn_longitude")
+
+    with col5:
+        knn_k = st.number_input("Quantidade de eventos", 1, 50, 10, 1, key="knn_k")
+
+    df_semelhantes = indice_vizinhos.semelhantes(knn_magnitude, knn_profundidade, knn_latitude, knn_longitude, int(knn_k))
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.metric("Eventos Semelhantes com Tsunami", f"{df_semelhantes['tsunami'].mean():.0%}" if len(df_semelhantes) > 0 else "N/A")
+
+    with col2:
+        st.metric("Distância Mediana do Epicentro", f"{df_semelhantes['distancia_km'].median():.0f} km" if len(df_semelhantes) > 0 else "N/A")
+
+    with col3:
+        st.metric("Magnitude Média dos Semelhantes", f"{df_semelhantes['magnitude'].mean():.2f}" if len(df_semelhantes) > 0 else "N/A")
+
+    df_display_knn = df_semelhantes[['magnitude', 'depth', 'latitude', 'longitude', 'Year', 'Month', 'distancia_km', 'tsunami']].copy()
+    df_display_knn['distancia_km'] = df_display_knn['distancia_km'].round(0)
+    df_display_knn.columns = ['Magnitude', 'Profundidade (km)', 'Latitude', 'Longitude', 'Ano', 'Mês', 'Distância (km)', 'Tsunami']
+
+    st.dataframe(df_display_knn, use_container_width=True)
+
+
+secao_semelhantes(catalogo)
+
+st.markdown("---")
+
 st.info("💡 Dica: Ajuste os filtros no menu lateral para explorar diferentes subconjuntos de dados e descobrir padrões interessantes!")
+
+concluir_pagina()
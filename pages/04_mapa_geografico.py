@@ -3,7 +3,19 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from analise.amostragem import construir_amostra, consulta_aproximada_ativa
+from analise.linha_do_tempo import PERIODOS, LinhaDoTempo
+from analise.selecao import IndiceSelecao
+from analise.proximidade import carregar_pontos_interesse, consultar_proximidade
+from componentes.filtros_laterais import filtros_laterais
+from componentes.metricas import concluir_pagina, grafico, iniciar_pagina
+from componentes.progressivo import RefinoProgressivo, legenda_aproximada
+from componentes.selecao_vinculada import aviso_selecao, grafico_selecionavel, linhas_selecionadas
+from dados import FiltroEventos, descrever_versao, obter_catalogo
+from dados.cache_disco import memorizar_em_disco
+
 st.set_page_config(page_title="Mapa Geográfico - Dashboard de Terremotos", layout="wide")
+iniciar_pagina("mapa_geografico")
 
 st.title("🗺️ Mapa Geográfico de Terremotos e Tsunamis")
 
@@ -17,37 +29,72 @@ permitindo visualizar padrões geográficos e a proximidade com zonas de risco.
 # ========================================
 
 try:
-    df = pd.read_csv("earthquake_data_tsunami.csv")
+    catalogo = obter_catalogo()
 except FileNotFoundError:
     st.error("Arquivo de dados 'earthquake_data_tsunami.csv' não encontrado.")
     st.stop()
 
+# Backend definido por DASHBOARD_BACKEND (pandas ou sqlite)
+backend = catalogo.backend
+
+# Em catálogos grandes, estimativas da amostra estratificada aparecem antes
+# dos valores exatos (DASHBOARD_CONSULTA_APROXIMADA)
+amostra = catalogo.derivado("amostra_estratificada", construir_amostra, persistir=True) if consulta_aproximada_ativa(catalogo) else None
+refino = RefinoProgressivo(amostra is not None)
+
 # ========================================
 # SIDEBAR - FILTROS
 # ========================================
 
 st.sidebar.subheader("🎚️ Filtros do Mapa")
 
-# Filtro de Magnitude
-min_mag = float(df['magnitude'].min())
-max_mag = float(df['magnitude'].max())
-magnitude_range = st.sidebar.slider(
-    "Magnitude Mínima",
-    min_value=min_mag,
-    max_value=max_mag,
-    value=min_mag,
-    step=0.1,
-    key="mag_map"
-)
+min_mag, max_mag = catalogo.limites['magnitude']
+
+
+def controles_filtros():
+    # Filtro de Magnitude
+    magnitude_range = st.slider(
+        "Magnitude Mínima",
+        min_value=min_mag,
+        max_value=max_mag,
+        value=min_mag,
+        step=0.1,
+        key="mag_map"
+    )
 
-# Filtro de Tsunami
-show_tsunami_only = st.sidebar.checkbox("Mostrar apenas eventos com tsunami", value=False, key="tsunami_map")
+    # Filtro de Tsunami
+    show_tsunami_only = st.checkbox("Mostrar apenas eventos com tsunami", value=False, key="tsunami_map")
 
-# Aplicar filtros
-df_map = df[df['magnitude'] >= magnitude_range].copy()
+    # Filtro: Eventos Principais (declusterização)
+    apenas_principais = st.toggle(
+        "Apenas eventos principais (sem réplicas)",
+        value=False,
+        key="principais_mapa",
+        help="Remove as réplicas (eventos dependentes) identificadas pelo método de Gardner–Knopoff"
+    )
+
+    return {'magnitude': magnitude_range, 'tsunami': show_tsunami_only, 'apenas_principais': apenas_principais}
+
+
+# Valores aplicados conforme DASHBOARD_MODO_FILTROS (imediato, lote ou espera)
+filtros = filtros_laterais("mapa", controles_filtros)
+
+st.sidebar.markdown("---")
+st.sidebar.caption(f"📦 Versão dos dados: {descrever_versao(catalogo)}")
+
+# Aplicar filtros (executados pelo backend configurado)
+filtro = FiltroEventos(
+    magnitude=(filtros['magnitude'], None),
+    tsunami=1 if filtros['tsunami'] else None,
+    apenas_principais=filtros['apenas_principais']
+)
 
-if show_tsunami_only:
-    df_map = df_map[df_map['tsunami'] == 1]
+# Seleção (caixa ou laço) no mapa: vale para a densidade, a linha do tempo,
+# as estatísticas e a tabela, recalculadas a partir das linhas selecionadas
+indice_selecao = catalogo.derivado("indice_selecao", IndiceSelecao)
+selecionadas = linhas_selecionadas("selecao_mapa", catalogo)
+if selecionadas is not None:
+    selecionadas = indice_selecao.restringir(selecionadas, filtro)
 
 st.markdown("---")
 
@@ -57,112 +104,362 @@ st.markdown("---")
 
 st.subheader("📊 Gráfico 4: Mapa de Distribuição Geográfica")
 
-st.markdown(f"""
-Este mapa interativo mostra a localização de **{len(df_map)} eventos** sísmicos ao redor do mundo. 
+def desenhar_mapa(df_pontos, aproximado):
+    # Na estimativa, a soma dos pesos da amostra estima o total de eventos
+    quantidade = f"≈ {df_pontos['peso'].sum():,.0f}" if aproximado else len(df_pontos)
+    
+    st.markdown(f"""
+Este mapa interativo mostra a localização de **{quantidade} eventos** sísmicos ao redor do mundo. 
 O tamanho dos marcadores representa a magnitude, e a cor indica se houve tsunami.
-Você pode fazer zoom, deslocar e passar o mouse para ver detalhes.
+Você pode fazer zoom, deslocar e passar o mouse para ver detalhes. Selecione uma região com a **caixa** ou o 
+**laço** para que as demais seções da página mostrem apenas os eventos selecionados.
 """)
 
-if len(df_map) > 0:
-    # Preparar dados para o mapa
-    df_map_plot = df_map.copy()
-    df_map_plot['Tsunami'] = df_map_plot['tsunami'].apply(lambda x: '🌊 Com Tsunami' if x == 1 else '❌ Sem Tsunami')
-    
-    try:
-        fig_map = px.scatter_geo(
-            df_map_plot,
-            lat='latitude',
-            lon='longitude',
-            color='Tsunami',
-            size='magnitude',
-            hover_name='Year',
-            hover_data={
-                'magnitude': ':.2f',
-                'depth': ':.2f',
-                'latitude': ':.2f',
-                'longitude': ':.2f',
-                'Year': True,
-                'Month': True,
-                'tsunami': False,
-                'Tsunami': True
-            },
-            title='Mapa de Distribuição de Terremotos e Tsunamis',
-            color_discrete_map={
-                '❌ Sem Tsunami': '#2ca02c',
-                '🌊 Com Tsunami': '#d62728'
-            },
-            projection='natural earth'
-        )
+    if len(df_pontos) > 0:
+        # Preparar dados para o mapa
+        df_map_plot = df_pontos.copy()
+        df_map_plot['Tsunami'] = df_map_plot['tsunami'].apply(lambda x: '🌊 Com Tsunami' if x == 1 else '❌ Sem Tsunami')
+        # Número de linha no catálogo, lido de volta quando os pontos são selecionados
+        df_map_plot['linha'] = df_map_plot.index
         
-        fig_map.update_layout(
-            height=600,
-            geo=dict(
+        try:
+            fig_map = px.scatter_geo(
+                df_map_plot,
+                lat='latitude',
+                lon='longitude',
+                color='Tsunami',
+                size='magnitude',
+                hover_name='Year',
+                custom_data=['linha'],
+                hover_data={
+                    'magnitude': ':.2f',
+                    'depth': ':.2f',
+                    'latitude': ':.2f',
+                    'longitude': ':.2f',
+                    'Year': True,
+                    'Month': True,
+                    'tsunami': False,
+                    'Tsunami': True
+                },
+                title='Mapa de Distribuição de Terremotos e Tsunamis',
+                color_discrete_map={
+                    '❌ Sem Tsunami': '#2ca02c',
+                    '🌊 Com Tsunami': '#d62728'
+                },
+                projection='natural earth'
+            )
+            
+            fig_map.update_layout(
+                height=600,
+                geo=dict(
+                    showland=True,
+                    landcolor='rgb(243, 243, 243)',
+                    coastlinecolor='rgb(204, 204, 204)',
+                    projection_type='natural earth',
+                    showlakes=True,
+                    lakecolor='rgb(255, 255, 255)',
+                    showcountries=True,
+                    countrycolor='rgb(204, 204, 204)'
+                ),
+                legend=dict(
+                    title='Status do Tsunami',
+                    x=0.01,
+                    y=0.99
+                ),
+                hovermode='closest'
+            )
+            
+            if aproximado:
+                grafico(fig_map, use_container_width=True)
+                st.caption(f"≈ {len(df_pontos):,} pontos da amostra estratificada; o mapa completo substitui este "
+                           f"assim que ficar pronto.")
+            else:
+                # Só o mapa exato aceita seleção: a amostra não tem todas as linhas
+                grafico_selecionavel(fig_map, "selecao_mapa", catalogo)
+        except Exception as e:
+            st.error(f"Erro ao gerar mapa: {str(e)}")
+    else:
+        st.warning("Nenhum evento encontrado com os filtros selecionados.")
+
+
+obter_mapa = refino.exibir(desenhar_mapa, lambda: amostra.pontos(filtro), lambda: backend.filtrar(filtro))
+
+st.markdown("---")
+
+# ========================================
+# GRÁFICO 5: DENSIDADE DE EVENTOS POR REGIÃO
+# ========================================
+
+st.subheader("📊 Gráfico 5: Densidade de Eventos Sísmicos")
+
+st.markdown("""
+Este mapa de densidade mostra as regiões com maior concentração de eventos sísmicos, 
+ajudando a identificar as zonas de maior atividade geológica.
+""")
+
+def desenhar_densidade(df_pontos, aproximado):
+    if len(df_pontos) > 0:
+        try:
+            fig_density = px.density_mapbox(
+                df_pontos,
+                lat='latitude',
+                lon='longitude',
+                z='magnitude',
+                radius=15,
+                center=dict(lat=0, lon=0),
+                zoom=0,
+                mapbox_style='open-street-map',
+                title='Densidade de Magnitude dos Terremotos',
+                color_continuous_scale='Viridis',
+                hover_data={
+                    'magnitude': ':.2f',
+                    'latitude': ':.2f',
+                    'longitude': ':.2f'
+                }
+            )
+            
+            fig_density.update_layout(
+                height=600,
+                hovermode='closest'
+            )
+            
+            grafico(fig_density, use_container_width=True)
+        except Exception as e:
+            st.error(f"Erro ao gerar mapa de densidade: {str(e)}")
+    else:
+        st.warning("Nenhum evento encontrado com os filtros selecionados.")
+
+
+if selecionadas is not None:
+    desenhar_densidade(indice_selecao.eventos_de(selecionadas), False)
+    aviso_selecao(selecionadas, "no mapa")
+else:
+    refino.exibir(desenhar_densidade, lambda: amostra.pontos(filtro), obter_mapa)
+
+st.markdown("---")
+
+# ========================================
+# LINHA DO TEMPO DOS EVENTOS (ANIMAÇÃO)
+# ========================================
+
+st.subheader("🎞️ Linha do Tempo da Atividade Sísmica")
+
+st.markdown("""
+Use **▶ Reproduzir** para acompanhar, período a período, onde ocorreram os eventos selecionados nos filtros. 
+Cada quadro mostra os eventos do período (os de maior magnitude, quando há muitos), e o fundo cinza resume 
+toda a atividade do filtro, célula a célula da grade.
+""")
+
+ROTULOS_PERIODO = {"ano": "Ano", "mes": "Mês"}
+
+
+@st.fragment
+def secao_linha_do_tempo(catalogo, filtro, selecionadas):
+    """Trocar ano/mês redesenha só a animação."""
+    periodo = st.radio(
+        "Quadros por",
+        options=PERIODOS,
+        format_func=ROTULOS_PERIODO.get,
+        horizontal=True,
+        key="periodo_linha_do_tempo"
+    )
+
+    # Ordem por período calculada uma vez por versão; quadros memorizados por filtro
+    linha = catalogo.derivado(f"linha_do_tempo:{periodo}", lambda c: LinhaDoTempo(c.eventos, periodo))
+    resultado = linha.quadros(filtro, linhas=selecionadas)
+    quadros = resultado['quadros']
+
+    if not quadros:
+        st.warning("Nenhum evento encontrado com os filtros selecionados.")
+        return
+
+    fundo = resultado['fundo']
+    primeiro = quadros[0]['data'][0]
+    duracao = 600 if periodo == "ano" else 150
+    quadro_imediato = {'frame': {'duration': 0, 'redraw': True}, 'mode': 'immediate', 'transition': {'duration': 0}}
+
+    figura = {
+        'data': [
+            dict(
+                fundo,
+                name='Atividade no filtro',
+                marker=dict(fundo['marker'], color='rgba(120, 120, 120, 0.3)'),
+                hovertemplate='%{customdata:,} eventos na célula<extra></extra>'
+            ),
+            # Só este traço muda de um quadro para outro
+            dict(
+                primeiro,
+                name='Eventos do período',
+                marker=dict(
+                    primeiro['marker'],
+                    cmin=0,
+                    cmax=1,
+                    colorscale=[[0, '#2ca02c'], [1, '#d62728']],
+                    line=dict(width=0.5, color='white')
+                ),
+                hovertemplate='Magnitude %{customdata[0]:.1f}<br>Profundidade %{customdata[1]:.0f} km<extra></extra>'
+            ),
+        ],
+        'layout': {
+            'title': quadros[0]['layout']['title'],
+            'height': 650,
+            'showlegend': False,
+            'geo': dict(
                 showland=True,
                 landcolor='rgb(243, 243, 243)',
                 coastlinecolor='rgb(204, 204, 204)',
                 projection_type='natural earth',
-                showlakes=True,
-                lakecolor='rgb(255, 255, 255)',
                 showcountries=True,
                 countrycolor='rgb(204, 204, 204)'
             ),
-            legend=dict(
-                title='Status do Tsunami',
-                x=0.01,
-                y=0.99
-            ),
-            hovermode='closest'
-        )
-        
-        st.plotly_chart(fig_map, use_container_width=True)
-    except Exception as e:
-        st.error(f"Erro ao gerar mapa: {str(e)}")
-else:
-    st.warning("Nenhum evento encontrado com os filtros selecionados.")
+            'updatemenus': [{
+                'type': 'buttons',
+                'direction': 'left',
+                'x': 0,
+                'y': 0,
+                'xanchor': 'left',
+                'yanchor': 'top',
+                'pad': {'t': 45},
+                'buttons': [
+                    {'label': '▶ Reproduzir', 'method': 'animate', 'args': [None, {
+                        'frame': {'duration': duracao, 'redraw': True}, 'transition': {'duration': 0}, 'fromcurrent': True
+                    }]},
+                    {'label': '⏸ Pausar', 'method': 'animate', 'args': [[None], quadro_imediato]},
+                ],
+            }],
+            'sliders': [{
+                'active': 0,
+                'x': 0.2,
+                'len': 0.8,
+                'y': 0,
+                'yanchor': 'top',
+                'pad': {'t': 30},
+                'currentvalue': {'prefix': 'Período: '},
+                # Com muitos quadros, os rótulos dos passos se sobrepõem: fica só o valor atual
+                'font': {'color': 'rgba(0, 0, 0, 0)'} if len(quadros) > 30 else {},
+                'steps': [
+                    {'label': quadro['name'], 'method': 'animate', 'args': [[quadro['name']], quadro_imediato]}
+                    for quadro in quadros
+                ],
+            }],
+        },
+        'frames': quadros,
+    }
+
+    grafico(figura, use_container_width=True)
+    st.caption(
+        f"{len(quadros)} quadros com {resultado['pontos']:,} dos {resultado['eventos']:,} eventos do filtro; "
+        f"cada quadro leva apenas os eventos do seu período."
+    )
+    if selecionadas is not None:
+        aviso_selecao(selecionadas, "no mapa")
+
+
+secao_linha_do_tempo(catalogo, filtro, selecionadas)
 
 st.markdown("---")
 
 # ========================================
-# GRÁFICO 5: DENSIDADE DE EVENTOS POR REGIÃO
+# PROXIMIDADE DE CIDADES COSTEIRAS E INSTALAÇÕES
 # ========================================
 
-st.subheader("📊 Gráfico 5: Densidade de Eventos Sísmicos")
+st.subheader("📍 Proximidade de Cidades Costeiras e Instalações")
 
 st.markdown("""
-Este mapa de densidade mostra as regiões com maior concentração de eventos sísmicos, 
-ajudando a identificar as zonas de maior atividade geológica.
+Para cada ponto de interesse (cidades costeiras, portos e usinas nucleares), conta quantos eventos com a
+magnitude mínima escolhida ocorreram dentro do raio informado e indica o **tsunami mais próximo** do catálogo.
+A consulta usa todo o catálogo da versão atual, independentemente dos filtros do mapa.
 """)
 
-if len(df_map) > 0:
-    try:
-        fig_density = px.density_mapbox(
-            df_map,
-            lat='latitude',
-            lon='longitude',
-            z='magnitude',
-            radius=15,
-            center=dict(lat=0, lon=0),
-            zoom=0,
-            mapbox_style='open-street-map',
-            title='Densidade de Magnitude dos Terremotos',
-            color_continuous_scale='Viridis',
-            hover_data={
-                'magnitude': ':.2f',
-                'latitude': ':.2f',
-                'longitude': ':.2f'
-            }
-        )
-        
-        fig_density.update_layout(
-            height=600,
-            hovermode='closest'
+
+@st.cache_data(show_spinner="Calculando proximidade...", max_entries=32)
+def calcular_proximidade(versao, assinatura_pontos, magnitude_min, raio_km, _catalogo, _pontos):
+    # ``versao`` e ``assinatura_pontos`` identificam o catálogo e os pontos de
+    # interesse na chave dos dois caches; os objetos em si não são hasheados.
+    # O arquivo de pontos não entra na versão do catálogo: editá-lo muda só a assinatura.
+    return memorizar_em_disco(
+        (versao, "proximidade", assinatura_pontos, magnitude_min, raio_km),
+        lambda: consultar_proximidade(_catalogo.eventos, _pontos, magnitude_min, raio_km)
+    )
+
+
+try:
+    pontos_interesse = carregar_pontos_interesse()
+except FileNotFoundError:
+    pontos_interesse = None
+    st.warning("Arquivo 'pontos_interesse.csv' não encontrado.")
+
+
+@st.fragment
+def secao_proximidade(catalogo, pontos_interesse, min_mag, max_mag):
+    """Sliders de magnitude e raio: alterá-los reexecuta só esta seção."""
+    col1, col2 = st.columns(2)
+
+    with col1:
+        magnitude_proximidade = st.slider(
+            "Magnitude mínima dos eventos", min_mag, max_mag, min(max(7.0, min_mag), max_mag), 0.1, key="mag_proximidade"
         )
-        
-        st.plotly_chart(fig_density, use_container_width=True)
-    except Exception as e:
-        st.error(f"Erro ao gerar mapa de densidade: {str(e)}")
-else:
-    st.warning("Nenhum evento encontrado com os filtros selecionados.")
+
+    with col2:
+        raio_proximidade = st.slider("Raio (km)", 50, 1000, 300, 50, key="raio_proximidade")
+
+    assinatura_pontos = int(pd.util.hash_pandas_object(pontos_interesse).sum())
+    df_proximidade = calcular_proximidade(
+        catalogo.versao, assinatura_pontos, magnitude_proximidade, raio_proximidade, catalogo, pontos_interesse
+    )
+
+    fig_proximidade = px.scatter_geo(
+        df_proximidade,
+        lat='latitude',
+        lon='longitude',
+        color='eventos_no_raio',
+        symbol='Tipo',
+        hover_name='Nome',
+        hover_data={
+            'Pais': True,
+            'eventos_no_raio': True,
+            'tsunami_mais_proximo_km': ':.0f',
+            'latitude': False,
+            'longitude': False
+        },
+        color_continuous_scale='YlOrRd',
+        title=f'Eventos de magnitude ≥ {magnitude_proximidade:.1f} a até {raio_proximidade} km',
+        labels={
+            'eventos_no_raio': 'Eventos no Raio',
+            'tsunami_mais_proximo_km': 'Tsunami Mais Próximo (km)',
+            'Pais': 'País'
+        },
+        projection='natural earth'
+    )
+
+    fig_proximidade.update_traces(marker=dict(size=10, line=dict(width=1, color='rgb(80, 80, 80)')))
+    fig_proximidade.update_layout(
+        height=500,
+        geo=dict(
+            showland=True,
+            landcolor='rgb(243, 243, 243)',
+            coastlinecolor='rgb(204, 204, 204)',
+            showcountries=True,
+            countrycolor='rgb(204, 204, 204)'
+        ),
+        legend=dict(x=0.01, y=0.99)
+    )
+
+    grafico(fig_proximidade, use_container_width=True)
+
+    df_display_proximidade = df_proximidade.sort_values(
+        ['eventos_no_raio', 'tsunami_mais_proximo_km'], ascending=[False, True]
+    )[['Nome', 'Pais', 'Tipo', 'eventos_no_raio', 'tsunami_mais_proximo_km',
+       'tsunami_mais_proximo_magnitude', 'tsunami_mais_proximo_ano']]
+    df_display_proximidade.columns = [
+        'Local', 'País', 'Tipo', 'Eventos no Raio', 'Tsunami Mais Próximo (km)', 'Magnitude do Tsunami', 'Ano do Tsunami'
+    ]
+
+    st.dataframe(df_display_proximidade.round(1), use_container_width=True, height=400, hide_index=True)
+
+
+if pontos_interesse is not None:
+    secao_proximidade(catalogo, pontos_interesse, min_mag, max_mag)
 
 st.markdown("---")
 
@@ -172,21 +469,63 @@ st.markdown("---")
 
 st.subheader("📊 Estatísticas Geográficas")
 
-if len(df_map) > 0:
+def desenhar_estatisticas(resultado, aproximado):
+    if aproximado:
+        resumo_mapa = resultado
+        if resumo_mapa['amostra'] == 0:
+            st.info("Nenhum evento encontrado com os filtros selecionados.")
+            return
+        valores = [
+            resumo_mapa['total'].formatar(),
+            resumo_mapa['latitude_media'].formatar("{:.2f}°"),
+            resumo_mapa['longitude_media'].formatar("{:.2f}°"),
+            resumo_mapa['tsunamis'].formatar(),
+        ]
+    else:
+        df_pontos, resumo_mapa = resultado
+        if len(df_pontos) == 0:
+            st.info("Nenhum evento encontrado com os filtros selecionados.")
+            return
+        valores = [
+            resumo_mapa['total'],
+            f"{df_pontos['latitude'].mean():.2f}°",
+            f"{df_pontos['longitude'].mean():.2f}°",
+            resumo_mapa['tsunamis'],
+        ]
+
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total de Eventos", len(df_map))
+        st.metric("Total de Eventos", valores[0])
     
     with col2:
-        st.metric("Latitude Média", f"{df_map['latitude'].mean():.2f}°")
+        st.metric("Latitude Média", valores[1])
     
     with col3:
-        st.metric("Longitude Média", f"{df_map['longitude'].mean():.2f}°")
+        st.metric("Longitude Média", valores[2])
     
     with col4:
-        st.metric("Eventos com Tsunami", int(df_map['tsunami'].sum()))
-    
+        st.metric("Eventos com Tsunami", valores[3])
+
+    if aproximado:
+        legenda_aproximada(amostra, resumo_mapa['amostra'])
+
+
+if selecionadas is not None:
+    desenhar_estatisticas((indice_selecao.eventos_de(selecionadas), indice_selecao.resumo(selecionadas)), False)
+    aviso_selecao(selecionadas, "no mapa")
+else:
+    refino.exibir(
+        desenhar_estatisticas, lambda: amostra.resumo(filtro), lambda: (obter_mapa(), backend.resumo(filtro))
+    )
+
+# Daqui em diante a página usa os eventos exatos
+refino.concluir()
+df_map = obter_mapa()
+if selecionadas is not None:
+    df_map = indice_selecao.eventos_de(selecionadas)
+
+if len(df_map) > 0:
     st.markdown("---")
     
     # Tabela com informações dos eventos
@@ -206,9 +545,9 @@ if len(df_map) > 0:
         file_name="terremotos_tsunamis_mapa.csv",
         mime="text/csv"
     )
-else:
-    st.info("Nenhum evento encontrado com os filtros selecionados.")
 
 st.markdown("---")
 
 st.info("💡 Dica: Ajuste os filtros no menu lateral para explorar diferentes regiões e magnitudes!")
+
+concluir_pagina()
@@ -1,9 +1,17 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from analise.limites_placas import carregar_limites_placas, construir_colunas_limites, construir_taxa_por_limite
+from analise.simulacao_perigo import obter_simulacao, periodo_retorno
+from componentes.metricas import concluir_pagina, grafico, iniciar_pagina
+from dados import config, descrever_versao, obter_catalogo
+from dados.regioes import construir_regioes
+
 st.set_page_config(page_title="Probabilidade por País - Dashboard de Terremotos", layout="wide")
+iniciar_pagina("probabilidade_pais")
 
 st.title("🌍 Probabilidade de Terremotos e Tsunamis por País")
 
@@ -17,11 +25,16 @@ considerando a proximidade com grandes placas tectônicas e histórico de evento
 # ========================================
 
 try:
-    df_risco = pd.read_csv("country_risk.csv")
+    catalogo = obter_catalogo()
 except FileNotFoundError:
     st.error("Arquivo de dados de risco 'country_risk.csv' não encontrado.")
     st.stop()
 
+# Hierarquia país → estado → município com os riscos (inclusive o combinado)
+# já agregados em cada nível, montada uma vez por versão dos dados
+regioes = catalogo.derivado("regioes_risco", construir_regioes, persistir=True)
+df_risco = regioes.raizes()
+
 # ========================================
 # SIDEBAR - FILTROS
 # ========================================
@@ -45,11 +58,13 @@ sort_by = st.sidebar.selectbox(
     key="sort_by"
 )
 
-# Aplicar filtros
-df_risco_filtered = df_risco[df_risco['Risco_Terremoto'] >= risco_min].copy()
+st.sidebar.markdown("---")
+st.sidebar.caption(f"📦 Versão dos dados: {descrever_versao(catalogo)}")
+
+COLUNAS_PAISES = ['Pais', 'Risco_Terremoto', 'Risco_Tsunami', 'Risco_Combinado', 'Placa_Tectonica']
 
-# Calcular Risco Combinado
-df_risco_filtered['Risco_Combinado'] = (df_risco_filtered['Risco_Terremoto'] + df_risco_filtered['Risco_Tsunami']) / 2
+# Aplicar filtros (o risco combinado já vem calculado na hierarquia)
+df_risco_filtered = df_risco[df_risco['Risco_Terremoto'] >= risco_min]
 
 # Ordenar
 if sort_by == "Risco de Terremoto":
@@ -73,16 +88,126 @@ with col1:
     st.metric("Total de Países", len(df_risco_filtered))
 
 with col2:
-    st.metric("Risco Máximo (Terremoto)", df_risco_filtered['Risco_Terremoto'].max())
+    st.metric("Risco Máximo (Terremoto)", f"{df_risco_filtered['Risco_Terremoto_Max'].max():.1f}")
 
 with col3:
-    st.metric("Risco Máximo (Tsunami)", df_risco_filtered['Risco_Tsunami'].max())
+    st.metric("Risco Máximo (Tsunami)", f"{df_risco_filtered['Risco_Tsunami_Max'].max():.1f}")
 
 with col4:
     st.metric("Risco Médio Combinado", f"{df_risco_filtered['Risco_Combinado'].mean():.2f}")
 
 st.markdown("---")
 
+# ========================================
+# PROBABILIDADES ANUAIS SIMULADAS
+# ========================================
+
+st.subheader("🎲 Probabilidades Anuais Simuladas")
+
+st.markdown(f"""
+Os níveis 0–10 acima são notas atribuídas. Aqui cada país recebe **probabilidades anuais** de uma
+simulação de Monte Carlo com {config.ANOS_SIMULADOS:,} anos: eventos gerados com a taxa e a distribuição
+de magnitudes (Gutenberg–Richter) ajustadas ao catálogo, na vizinhança de {config.RAIO_FONTES_KM:.0f} km
+de cidades de referência do país, e a intensidade (escala Mercalli) estimada em cada cidade.
+""")
+
+
+@st.fragment
+def secao_simulacao(catalogo, paises):
+    """Tabela e curvas da simulação; escolher os países das curvas reexecuta só esta seção."""
+    # Simulação feita uma vez por versão dos dados, locais e parâmetros
+    probabilidades, curvas = obter_simulacao(catalogo)
+    probabilidades = probabilidades[probabilidades['Pais'].isin(paises)]
+    if probabilidades.empty:
+        st.info("Nenhum dos países filtrados tem cidades de referência para a simulação.")
+        return
+
+    probabilidades = probabilidades.sort_values('P_Tremor', ascending=False)
+    limiar = config.LIMIAR_MMI
+
+    df_simulacao = pd.DataFrame({
+        'País': probabilidades['Pais'],
+        'Eventos no Catálogo': probabilidades['Eventos_Catalogo'],
+        'Eventos por Ano': probabilidades['Taxa_Anual'].map(lambda x: f"{x:.2f}"),
+        f'P(MMI ≥ {limiar:g}) ao Ano': probabilidades['P_Tremor'].map(lambda x: f"{x:.1%}"),
+        f'Retorno MMI ≥ {limiar:g} (anos)': [
+            f"{anos:,.0f}" if np.isfinite(anos) else "—" for anos in periodo_retorno(probabilidades['P_Tremor'])
+        ],
+        'P(Tsunami) ao Ano': probabilidades['P_Tsunami'].map(lambda x: f"{x:.1%}"),
+        'P(M ≥ 7) ao Ano': probabilidades['P_M7'].map(lambda x: f"{x:.1%}"),
+    })
+    st.dataframe(df_simulacao, use_container_width=True, hide_index=True)
+
+    sem_eventos = probabilidades.loc[probabilidades['Eventos_Catalogo'] == 0, 'Pais'].tolist()
+    if sem_eventos:
+        st.caption(
+            f"Sem eventos do catálogo perto das cidades de referência: {', '.join(sem_eventos)}. "
+            "O catálogo só traz eventos fortes, então a probabilidade simulada nesses países é zero."
+        )
+    sem_tsunami = probabilidades.loc[
+        (probabilidades['Eventos_Catalogo'] > 0) & (probabilidades['Fontes_Tsunami'] == 0), 'Pais'
+    ].tolist()
+    if sem_tsunami:
+        st.caption(
+            "Sem fontes tsunamigênicas (rasas, junto a uma zona de subducção ou com tsunami registrado, "
+            f"perto de uma cidade costeira): {', '.join(sem_tsunami)}. A probabilidade de tsunami é zero."
+        )
+
+    df_barras = probabilidades.melt(
+        id_vars='Pais', value_vars=['P_Tremor', 'P_Tsunami'], var_name='Tipo', value_name='Probabilidade'
+    )
+    df_barras['Tipo'] = df_barras['Tipo'].map({
+        'P_Tremor': f'🏔️ Tremor MMI ≥ {limiar:g}',
+        'P_Tsunami': '🌊 Tsunami'
+    })
+    fig_simulacao = px.bar(
+        df_barras,
+        x='Pais',
+        y='Probabilidade',
+        color='Tipo',
+        barmode='group',
+        title='Probabilidade Anual Simulada por País',
+        labels={'Pais': 'País', 'Tipo': 'Evento'},
+        color_discrete_sequence=['#d62728', '#1f77b4'],
+        height=450
+    )
+    fig_simulacao.update_layout(xaxis_tickangle=-45, yaxis_tickformat='.0%', hovermode='x unified')
+    fig_simulacao.update_traces(hovertemplate='%{y:.1%}')
+    grafico(fig_simulacao, use_container_width=True)
+
+    paises_curvas = st.multiselect(
+        "Países nas curvas de excedência",
+        options=probabilidades['Pais'].tolist(),
+        default=probabilidades['Pais'].head(4).tolist(),
+        key="paises_curvas"
+    )
+    if paises_curvas:
+        fig_curvas = px.line(
+            curvas[curvas['Pais'].isin(paises_curvas)],
+            x='MMI',
+            y='Probabilidade',
+            color='Pais',
+            markers=True,
+            log_y=True,
+            title='Probabilidade Anual de Exceder Cada Intensidade em Alguma Cidade do País',
+            labels={'MMI': 'Intensidade (Mercalli)', 'Probabilidade': 'Probabilidade anual', 'Pais': 'País'},
+            height=450
+        )
+        fig_curvas.update_layout(yaxis_tickformat='.1%')
+        grafico(fig_curvas, use_container_width=True)
+
+    st.caption(
+        "Intensidade pela relação de Bakun & Wentworth (1997) com a distância hipocentral; tsunamis só de "
+        "fontes tsunamigênicas perto da costa, com a fração observada nelas e a dependência em magnitude "
+        "ajustada no catálogo. "
+        "Estimativas grosseiras, para comparação entre países."
+    )
+
+
+secao_simulacao(catalogo, df_risco_filtered['Pais'].tolist())
+
+st.markdown("---")
+
 # ========================================
 # GRÁFICO 6: BARRAS COMPARATIVAS (PLOTLY)
 # ========================================
@@ -141,7 +266,7 @@ if len(df_risco_filtered) > 0:
             yaxis_title='Nível de Risco (0-10)'
         )
         
-        st.plotly_chart(fig_bar, use_container_width=True)
+        grafico(fig_bar, use_container_width=True)
     except Exception as e:
         st.error(f"Erro ao gerar gráfico de barras: {str(e)}")
 else:
@@ -197,7 +322,7 @@ if len(df_risco_filtered) > 0:
             yaxis_title='Risco de Tsunami (0-10)'
         )
         
-        st.plotly_chart(fig_scatter, use_container_width=True)
+        grafico(fig_scatter, use_container_width=True)
     except Exception as e:
         st.error(f"Erro ao gerar gráfico de dispersão: {str(e)}")
 else:
@@ -213,73 +338,111 @@ st.subheader("🔍 Seletiva de Visualização: Consulte Probabilidades por País
 
 st.markdown("""
 Selecione um país abaixo para visualizar seus dados de risco detalhados de forma clara e organizada.
+Quando os dados de risco descem a estados e municípios, escolha também a região dentro do país;
+os valores de um país ou estado são a média das regiões abaixo dele.
 """)
 
-if len(df_risco) > 0:
-    # Seletiva de país
-    pais_selecionado = st.selectbox(
-        "Escolha um país para visualizar seus dados de risco:",
-        options=df_risco['Pais'].sort_values().tolist(),
-        key="pais_select"
-    )
-    
-    # Obter dados do país selecionado
-    dados_pais = df_risco[df_risco['Pais'] == pais_selecionado].iloc[0]
-    
-    # Exibir informações do país selecionado
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.metric(
-            "🏔️ Risco de Terremoto",
-            f"{dados_pais['Risco_Terremoto']:.1f}/10"
-        )
-    
-    with col2:
-        st.metric(
-            "🌊 Risco de Tsunami",
-            f"{dados_pais['Risco_Tsunami']:.1f}/10"
+TODAS_REGIOES = "(todas)"
+
+
+@st.fragment
+def secao_pais(regioes):
+    """Consulta por região: trocar a seleção reexecuta só esta seção."""
+    if regioes.n_raizes > 0:
+        # Seletiva de país (os países já estão em ordem alfabética na hierarquia)
+        pais_selecionado = st.selectbox(
+            "Escolha um país para visualizar seus dados de risco:",
+            options=regioes.raizes()['nome'].tolist(),
+            key="pais_select"
         )
-    
-    with col3:
-        risco_combinado = (dados_pais['Risco_Terremoto'] + dados_pais['Risco_Tsunami']) / 2
-        st.metric(
-            "📊 Risco Combinado",
-            f"{risco_combinado:.2f}/10"
+        nomes = [pais_selecionado]
+        posicao = regioes.posicao(*nomes)
+
+        # Um seletor por nível abaixo do país, com os filhos da região escolhida no anterior.
+        # A chave inclui a região pai: cada uma guarda a própria seleção.
+        for nivel in range(1, len(regioes.niveis)):
+            if not regioes.tem_filhos(posicao):
+                break
+            escolha = st.selectbox(
+                regioes.rotulo_nivel(nivel),
+                options=[TODAS_REGIOES] + regioes.filhos(posicao)['nome'].tolist(),
+                key=f"regiao_{regioes.no(posicao)['caminho']}"
+            )
+            if escolha == TODAS_REGIOES:
+                break
+            nomes.append(escolha)
+            posicao = regioes.posicao(*nomes)
+
+        # Dados da região selecionada, sem percorrer a tabela
+        dados_pais = regioes.no(posicao)
+        pais_selecionado = dados_pais['caminho']
+
+        # Exibir informações da região selecionada
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.metric(
+                "🏔️ Risco de Terremoto",
+                f"{dados_pais['Risco_Terremoto']:.1f}/10"
+            )
+
+        with col2:
+            st.metric(
+                "🌊 Risco de Tsunami",
+                f"{dados_pais['Risco_Tsunami']:.1f}/10"
+            )
+
+        with col3:
+            st.metric(
+                "📊 Risco Combinado",
+                f"{dados_pais['Risco_Combinado']:.2f}/10"
+            )
+
+        if dados_pais['Regioes'] > 1:
+            st.caption(
+                f"Média de {dados_pais['Regioes']:,} regiões. Máximos: terremoto "
+                f"{dados_pais['Risco_Terremoto_Max']:.1f}, tsunami {dados_pais['Risco_Tsunami_Max']:.1f}, "
+                f"combinado {dados_pais['Risco_Combinado_Max']:.2f}."
+            )
+
+        # Exibir placa tectônica
+        if dados_pais['Regioes'] > 1:
+            st.info(f"**Placa Tectônica (mais frequente entre as regiões):** {dados_pais['Placa_Tectonica']}")
+        else:
+            st.info(f"**Placa Tectônica:** {dados_pais['Placa_Tectonica']}")
+
+        # Criar visualização em barras horizontais
+        st.subheader(f"📈 Análise Detalhada de Risco - {pais_selecionado}")
+
+        fig_pais = go.Figure()
+
+        fig_pais.add_trace(go.Bar(
+            y=['Risco de Terremoto', 'Risco de Tsunami'],
+            x=[dados_pais['Risco_Terremoto'], dados_pais['Risco_Tsunami']],
+            orientation='h',
+            marker=dict(
+                color=['#d62728', '#1f77b4']
+            ),
+            text=[f"{dados_pais['Risco_Terremoto']:.1f}", f"{dados_pais['Risco_Tsunami']:.1f}"],
+            textposition='auto',
+            hovertemplate='<b>%{y}</b><br>Nível: %{x:.1f}/10<extra></extra>'
+        ))
+
+        fig_pais.update_layout(
+            title=f'Níveis de Risco Sísmico - {pais_selecionado}',
+            xaxis_title='Nível de Risco (0-10)',
+            yaxis_title='Tipo de Risco',
+            height=400,
+            showlegend=False,
+            xaxis=dict(range=[0, 10])
         )
-    
-    # Exibir placa tectônica
-    st.info(f"**Placa Tectônica:** {dados_pais['Placa_Tectonica']}")
-    
-    # Criar visualização em barras horizontais
-    st.subheader(f"📈 Análise Detalhada de Risco - {pais_selecionado}")
-    
-    fig_pais = go.Figure()
-    
-    fig_pais.add_trace(go.Bar(
-        y=['Risco de Terremoto', 'Risco de Tsunami'],
-        x=[dados_pais['Risco_Terremoto'], dados_pais['Risco_Tsunami']],
-        orientation='h',
-        marker=dict(
-            color=['#d62728', '#1f77b4']
-        ),
-        text=[f"{dados_pais['Risco_Terremoto']:.1f}", f"{dados_pais['Risco_Tsunami']:.1f}"],
-        textposition='auto',
-        hovertemplate='<b>%{y}</b><br>Nível: %{x:.1f}/10<extra></extra>'
-    ))
-    
-    fig_pais.update_layout(
-        title=f'Níveis de Risco Sísmico - {pais_selecionado}',
-        xaxis_title='Nível de Risco (0-10)',
-        yaxis_title='Tipo de Risco',
-        height=400,
-        showlegend=False,
-        xaxis=dict(range=[0, 10])
-    )
-    
-    st.plotly_chart(fig_pais, use_container_width=True)
-else:
-    st.warning("Nenhum país disponível para consulta.")
+
+        grafico(fig_pais, use_container_width=True)
+    else:
+        st.warning("Nenhum país disponível para consulta.")
+
+
+secao_pais(regioes)
 
 st.markdown("---")
 
@@ -296,13 +459,7 @@ Os valores variam de 0 (sem risco) a 10 (risco máximo).
 
 if len(df_risco_filtered) > 0:
     # Preparar tabela para exibição
-    df_display = df_risco_filtered[[
-        'Pais',
-        'Risco_Terremoto',
-        'Risco_Tsunami',
-        'Risco_Combinado',
-        'Placa_Tectonica'
-    ]].copy()
+    df_display = df_risco_filtered[COLUNAS_PAISES].copy()
     
     df_display.columns = [
         'País',
@@ -325,8 +482,8 @@ if len(df_risco_filtered) > 0:
     col_btn1, col_btn2 = st.columns(2)
     
     with col_btn1:
-        # Download da seletiva filtrada
-        csv_filtrado = df_risco_filtered.to_csv(index=False)
+        # Download da seletiva filtrada (países, com os valores agregados)
+        csv_filtrado = df_risco_filtered[COLUNAS_PAISES].to_csv(index=False)
         st.download_button(
             label="📊 Baixar Seletiva Filtrada (CSV)",
             data=csv_filtrado,
@@ -336,10 +493,10 @@ if len(df_risco_filtered) > 0:
         )
     
     with col_btn2:
-        # Download de todos os países
-        csv_completo = df_risco.to_csv(index=False)
+        # Download do arquivo de risco completo (todas as regiões), gerado uma vez por versão dos dados
+        csv_completo = catalogo.derivado("csv_risco", lambda c: c.risco.to_csv(index=False), persistir=True)
         st.download_button(
-            label="📊 Baixar Todos os Países (CSV)",
+            label="📊 Baixar Todos os Países (CSV)" if len(regioes.niveis) == 1 else "📊 Baixar Todas as Regiões (CSV)",
             data=csv_completo,
             file_name="probabilidade_risco_paises_completo.csv",
             mime="text/csv",
@@ -350,6 +507,139 @@ else:
 
 st.markdown("---")
 
+# ========================================
+# TSUNAMIS POR TIPO DE LIMITE DE PLACA
+# ========================================
+
+st.subheader("🧭 Tsunamis por Tipo de Limite de Placa")
+
+st.markdown("""
+Cada evento do catálogo recebe a **distância ao limite de placa mais próximo** e o **tipo** desse limite
+(subducção, transformante, divergente ou colisão), a partir de um traçado simplificado dos principais limites.
+A tabela cruza o tipo com a faixa de distância e mostra a fração de eventos que gerou tsunami.
+São considerados apenas os anos em que o catálogo registra tsunamis.
+""")
+
+
+@st.fragment
+def secao_limites_placas(catalogo):
+    """Magnitude mínima e opção de eventos principais afetam só esta seção."""
+    # Coluna derivada e contagens por (tipo, faixa, magnitude) calculadas uma vez por versão dos dados
+    colunas_limites = catalogo.derivado("limites_placas", construir_colunas_limites, persistir=True)
+
+    col1, col2 = st.columns([3, 1])
+
+    with col1:
+        min_mag_evento, max_mag_evento = catalogo.limites['magnitude']
+        magnitude_limites = st.slider(
+            "Magnitude mínima dos eventos",
+            min_value=min_mag_evento,
+            max_value=max_mag_evento,
+            value=min_mag_evento,
+            step=0.1,
+            key="mag_limites"
+        )
+
+    with col2:
+        principais_limites = st.toggle(
+            "Apenas eventos principais",
+            value=False,
+            key="principais_limites",
+            help="Remove as réplicas (eventos dependentes) identificadas pelo método de Gardner–Knopoff"
+        )
+
+    taxa_limites = catalogo.derivado(
+        "taxa_por_limite:principais" if principais_limites else "taxa_por_limite",
+        lambda c: construir_taxa_por_limite(c, principais_limites),
+        persistir=True
+    )
+    df_limites = taxa_limites.tabela(magnitude_limites)
+
+    if df_limites['eventos'].sum() > 0:
+        matriz_taxa = df_limites.pivot(index='tipo_limite', columns='faixa_distancia', values='taxa_tsunami')
+        matriz_eventos = df_limites.pivot(index='tipo_limite', columns='faixa_distancia', values='eventos')
+
+        fig_limites = go.Figure(go.Heatmap(
+            z=matriz_taxa.to_numpy(),
+            x=[str(c) for c in matriz_taxa.columns],
+            y=[str(i).capitalize() for i in matriz_taxa.index],
+            customdata=matriz_eventos.to_numpy(),
+            text=[[f"{t:.0%}<br>({n})" if n > 0 else "" for t, n in zip(linha_t, linha_n)]
+                  for linha_t, linha_n in zip(matriz_taxa.to_numpy(), matriz_eventos.to_numpy())],
+            texttemplate='%{text}',
+            hovertemplate='%{y} · %{x}<br>Taxa de tsunami: %{z:.1%}<br>Eventos: %{customdata}<extra></extra>',
+            colorscale='Blues',
+            zmin=0,
+            zmax=1,
+            colorbar=dict(title='Taxa', tickformat='.0%')
+        ))
+
+        fig_limites.update_layout(
+            title='Fração de Eventos com Tsunami por Tipo de Limite e Distância (eventos entre parênteses)',
+            height=400,
+            xaxis_title='Distância ao Limite de Placa Mais Próximo',
+            yaxis_title='Tipo de Limite'
+        )
+
+        grafico(fig_limites, use_container_width=True)
+    else:
+        st.warning("Nenhum evento com a magnitude mínima selecionada.")
+
+    with st.expander("🗺️ Ver o traçado dos limites de placas e a distância de cada evento"):
+        df_tracado = carregar_limites_placas()
+
+        fig_tracado = px.line_geo(
+            df_tracado,
+            lat='latitude',
+            lon='longitude',
+            color='Tipo',
+            line_group='Limite',
+            hover_name='Limite',
+            projection='natural earth',
+            color_discrete_map={
+                'subducção': '#d62728',
+                'transformante': '#ff7f0e',
+                'divergente': '#1f77b4',
+                'colisão': '#9467bd'
+            }
+        )
+
+        df_eventos_limites = catalogo.eventos[['latitude', 'longitude', 'magnitude']].join(colunas_limites)
+        fig_tracado.add_trace(go.Scattergeo(
+            lat=df_eventos_limites['latitude'],
+            lon=df_eventos_limites['longitude'],
+            mode='markers',
+            name='Eventos',
+            marker=dict(
+                size=5,
+                color=df_eventos_limites['distancia_limite_km'],
+                colorscale='Viridis_r',
+                colorbar=dict(title='Distância (km)', x=1.12)
+            ),
+            customdata=df_eventos_limites[['distancia_limite_km', 'limite']],
+            hovertemplate='%{customdata[0]:.0f} km de %{customdata[1]}<extra></extra>'
+        ))
+
+        fig_tracado.update_layout(
+            height=550,
+            geo=dict(
+                showland=True,
+                landcolor='rgb(243, 243, 243)',
+                coastlinecolor='rgb(204, 204, 204)',
+                showcountries=True,
+                countrycolor='rgb(204, 204, 204)'
+            ),
+            legend=dict(title='Tipo de Limite', x=0.01, y=0.99)
+        )
+
+        grafico(fig_tracado, use_container_width=True)
+        st.caption("Traçado simplificado, adequado para comparações regionais; não substitui um modelo de placas detalhado.")
+
+
+secao_limites_placas(catalogo)
+
+st.markdown("---")
+
 # ========================================
 # INFORMAÇÕES SOBRE PLACAS TECTÔNICAS
 # ========================================
@@ -391,3 +681,5 @@ with st.expander("Clique para expandir informações sobre placas tectônicas"):
 st.markdown("---")
 
 st.info("💡 Dica: Use a seletiva acima para consultar dados de risco específicos de cada país!")
+
+concluir_pagina()
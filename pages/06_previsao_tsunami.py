@@ -0,0 +1,260 @@
+import os
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from analise.modelo_tsunami import ModeloTsunami, caminho_artefato_mais_recente
+from componentes.metricas import concluir_pagina, grafico, iniciar_pagina
+from dados import descrever_versao, obter_catalogo
+
+st.set_page_config(page_title="Previsão de Tsunami - Dashboard de Terremotos", layout="wide")
+iniciar_pagina("previsao_tsunami")
+
+st.title("🤖 Previsão de Probabilidade de Tsunami")
+
+st.markdown("""
+Esta página usa um **modelo de classificação** treinado com o histórico de eventos para estimar
+a probabilidade de um terremoto gerar tsunami, a partir da magnitude, profundidade, localização e
+das métricas de intensidade e de registro do evento.
+""")
+
+# ========================================
+# CARREGAR DADOS E MODELO
+# ========================================
+
+try:
+    catalogo = obter_catalogo()
+except FileNotFoundError:
+    st.error("Arquivo de dados 'earthquake_data_tsunami.csv' não encontrado.")
+    st.stop()
+
+df = catalogo.eventos
+
+
+@st.cache_resource(show_spinner="Carregando modelo...")
+def carregar_modelo(caminho, modificado_em):
+    # ``modificado_em`` faz parte da chave: um artefato regravado é recarregado
+    return ModeloTsunami.carregar(caminho)
+
+
+caminho_modelo = caminho_artefato_mais_recente()
+
+if caminho_modelo is None:
+    st.warning("""
+    Nenhum modelo treinado foi encontrado. Treine um modelo com o comando abaixo e recarregue a página:
+
+    `python -m analise.modelo_tsunami treinar`
+    """)
+    st.stop()
+
+modelo = carregar_modelo(caminho_modelo, os.path.getmtime(caminho_modelo))
+
+# Pontuação de todos os eventos em uma única chamada, uma vez por versão dos dados e do modelo.
+# A data de treino entra no nome: uma versão numerada de novo não reaproveita o cache em disco.
+probabilidades = catalogo.derivado(
+    f"probabilidade_tsunami:v{modelo.versao}:{modelo.artefato['treinado_em']}",
+    lambda c: modelo.prever(c.eventos),
+    persistir=True
+)
+
+st.sidebar.subheader("🤖 Modelo de Previsão")
+st.sidebar.caption(f"Modelo v{modelo.versao} · treinado em {modelo.artefato['treinado_em']}")
+
+apenas_principais = st.sidebar.toggle(
+    "Apenas eventos principais (sem réplicas)",
+    value=False,
+    key="principais_previsao",
+    help="Remove as réplicas (eventos dependentes) identificadas pelo método de Gardner–Knopoff"
+)
+
+if apenas_principais:
+    selecao_principais = (df['principal'] == 1).to_numpy()
+    df = df[selecao_principais]
+    probabilidades = probabilidades[selecao_principais]
+
+st.sidebar.markdown("---")
+st.sidebar.caption(f"📦 Versão dos dados: {descrever_versao(catalogo)}")
+
+# ========================================
+# DESEMPENHO DO MODELO
+# ========================================
+
+st.markdown("---")
+st.subheader("📊 Desempenho do Modelo")
+
+metricas = modelo.artefato['metricas_validacao']
+ano_inicio, ano_fim = modelo.artefato['anos_treino']
+
+col1, col2, col3, col4 = st.columns(4)
+
+with col1:
+    st.metric("Versão do Modelo", f"v{modelo.versao}")
+
+with col2:
+    st.metric("AUC (validação)", f"{metricas['auc']:.3f}")
+
+with col3:
+    st.metric("Acurácia (validação)", f"{metricas['acuracia']:.1%}")
+
+with col4:
+    st.metric("Probabilidade Média Prevista", f"{probabilidades.mean():.1%}")
+
+st.caption(
+    f"Treinado com eventos de {ano_inicio} a {ano_fim}, período em que a ocorrência de tsunami é registrada no catálogo. "
+    f"Métricas calculadas em {metricas['eventos']} eventos separados para validação."
+)
+
+st.markdown("---")
+
+# ========================================
+# GRÁFICO: DISTRIBUIÇÃO DAS PROBABILIDADES
+# ========================================
+
+st.subheader("📊 Distribuição da Probabilidade Prevista")
+
+st.markdown("""
+Este histograma compara as probabilidades previstas para eventos que **geraram** e que **não geraram** tsunami.
+Quanto mais separadas as distribuições, melhor o modelo distingue os dois casos.
+""")
+
+df_prob = pd.DataFrame({
+    'probabilidade': probabilidades,
+    'Tsunami': df['tsunami'].map({1: '🌊 Com Tsunami', 0: '❌ Sem Tsunami'})
+})
+
+fig_hist = px.histogram(
+    df_prob,
+    x='probabilidade',
+    color='Tsunami',
+    nbins=20,
+    barmode='overlay',
+    opacity=0.7,
+    title='Probabilidade Prevista por Ocorrência Real de Tsunami',
+    labels={'probabilidade': 'Probabilidade Prevista de Tsunami'},
+    color_discrete_map={
+        '❌ Sem Tsunami': '#2ca02c',
+        '🌊 Com Tsunami': '#d62728'
+    }
+)
+
+fig_hist.update_layout(
+    height=400,
+    xaxis_title='Probabilidade Prevista de Tsunami',
+    yaxis_title='Quantidade de Eventos',
+    legend=dict(title='Status do Tsunami')
+)
+
+grafico(fig_hist, use_container_width=True)
+
+st.markdown("---")
+
+# ========================================
+# MAPA DE PROBABILIDADE PREVISTA
+# ========================================
+
+st.subheader("🗺️ Mapa de Probabilidade Prevista")
+
+df_mapa = df[['latitude', 'longitude', 'magnitude', 'depth', 'Year']].copy()
+df_mapa['probabilidade'] = probabilidades
+
+fig_mapa = px.scatter_geo(
+    df_mapa,
+    lat='latitude',
+    lon='longitude',
+    color='probabilidade',
+    size='magnitude',
+    hover_data={
+        'magnitude': ':.2f',
+        'depth': ':.2f',
+        'Year': True,
+        'probabilidade': ':.1%'
+    },
+    color_continuous_scale='RdYlGn_r',
+    range_color=(0, 1),
+    title='Probabilidade Prevista de Tsunami por Evento',
+    labels={'probabilidade': 'Probabilidade'},
+    projection='natural earth'
+)
+
+fig_mapa.update_layout(
+    height=600,
+    geo=dict(
+        showland=True,
+        landcolor='rgb(243, 243, 243)',
+        coastlinecolor='rgb(204, 204, 204)',
+        showcountries=True,
+        countrycolor='rgb(204, 204, 204)'
+    )
+)
+
+grafico(fig_mapa, use_container_width=True)
+
+st.markdown("---")
+
+# ========================================
+# SIMULAÇÃO DE EVENTO HIPOTÉTICO
+# ========================================
+
+st.subheader("🧪 Simule um Evento Hipotético")
+
+st.markdown("""
+Informe as características de um terremoto para estimar a probabilidade de tsunami.
+Os valores iniciais correspondem às medianas do catálogo.
+""")
+
+medianas = df[modelo.artefato['colunas_entrada']].median()
+
+with st.form("evento_hipotetico"):
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        magnitude = st.number_input("Magnitude", 0.0, 10.0, float(medianas['magnitude']), 0.1)
+        profundidade = st.number_input("Profundidade (km)", 0.0, 800.0, float(medianas['depth']), 1.0)
+        latitude = st.number_input("Latitude", -90.0, 90.0, float(medianas['latitude']), 0.5)
+        longitude = st.number_input("Longitude", -180.0, 180.0, float(medianas['longitude']), 0.5)
+
+    with col2:
+        sig = st.number_input("Significância (sig)", 0.0, 3500.0, float(medianas['sig']), 10.0)
+        mmi = st.number_input("Intensidade MMI", 0.0, 12.0, float(medianas['mmi']), 1.0)
+        cdi = st.number_input("Intensidade CDI", 0.0, 12.0, float(medianas['cdi']), 1.0)
+
+    with col3:
+        gap = st.number_input("Gap Azimutal", 0.0, 360.0, float(medianas['gap']), 1.0)
+        dmin = st.number_input("Distância à Estação (dmin)", 0.0, 30.0, float(medianas['dmin']), 0.1)
+        nst = st.number_input("Número de Estações (nst)", 0.0, 1000.0, float(medianas['nst']), 1.0)
+
+    simular = st.form_submit_button("🔮 Calcular Probabilidade")
+
+if simular:
+    evento = pd.DataFrame([{
+        'magnitude': magnitude, 'depth': profundidade, 'latitude': latitude, 'longitude': longitude,
+        'sig': sig, 'mmi': mmi, 'cdi': cdi, 'gap': gap, 'dmin': dmin, 'nst': nst
+    }])
+    probabilidade = float(modelo.prever(evento)[0])
+
+    st.metric("🌊 Probabilidade Prevista de Tsunami", f"{probabilidade:.1%}")
+    st.progress(probabilidade)
+
+st.markdown("---")
+
+# ========================================
+# TABELA: EVENTOS COM MAIOR PROBABILIDADE
+# ========================================
+
+st.subheader("📋 Eventos com Maior Probabilidade Prevista")
+
+cols_to_display = ['magnitude', 'depth', 'latitude', 'longitude', 'Year', 'Month', 'tsunami']
+df_display = df[cols_to_display].copy()
+df_display['probabilidade'] = probabilidades
+df_display = df_display.sort_values('probabilidade', ascending=False).head(50)
+df_display['probabilidade'] = df_display['probabilidade'].apply(lambda x: f"{x:.1%}")
+df_display.columns = ['Magnitude', 'Profundidade (km)', 'Latitude', 'Longitude', 'Ano', 'Mês', 'Tsunami', 'Probabilidade']
+
+st.dataframe(df_display, use_container_width=True, height=400)
+
+st.markdown("---")
+
+st.info("💡 Dica: O modelo é treinado offline. Após atualizar os dados, execute `python -m analise.modelo_tsunami treinar` para gerar uma nova versão.")
+
+concluir_pagina()
@@ -0,0 +1,409 @@
+import argparse
+import hashlib
+import io
+import json
+import logging
+import math
+import signal
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from dados import config
+from dados.catalogo import COLUNAS_EVENTOS, obter_catalogo
+from dados.filtros import FiltroEventos
+from dados.metricas import contador, histograma
+from dados.regioes import construir_regioes
+from servicos.metricas import ROTA_METRICAS, TIPO_EXPOSICAO, corpo_metricas
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# API HTTP DE CONSULTA AO CATÁLOGO
+# ========================================
+# Expõe as mesmas consultas do dashboard para outros serviços, sobre a
+# camada de dados (catálogo versionado + backend configurado):
+#
+#   GET /eventos           eventos filtrados, paginados
+#   GET /agregados/anual   magnitude máxima, média e contagem por ano
+#   GET /risco             risco de terremoto e tsunami por país ou região
+#   GET /versao            versão dos dados em uso
+#   GET /metrics           métricas do processo (formato do Prometheus)
+#
+# A resposta depende apenas da versão dos dados e da consulta, então o ETag
+# é calculado antes de qualquer trabalho: um ``If-None-Match`` igual recebe
+# 304 sem tocar nos dados. As respostas montadas ficam num cache LRU do
+# processo, também indexado pela versão. ``formato=arrow`` (ou
+# ``Accept: application/vnd.apache.arrow.stream``) devolve o stream IPC do
+# Apache Arrow quando o pyarrow está instalado.
+
+TAMANHO_PAGINA_PADRAO = 1000
+TAMANHO_PAGINA_MAXIMO = 10000
+# Limites dos anos aceitos na URL: fora deles, o inteiro nem cabe numa
+# coluna INTEGER do SQLite
+ANO_MINIMO, ANO_MAXIMO = 1, 9999
+TIPO_ARROW = "application/vnd.apache.arrow.stream"
+COLUNAS_RESPOSTA = COLUNAS_EVENTOS + ['principal']
+
+REQUISICOES = contador("dashboard_api_requisicoes_total", "Requisições da API por rota e origem da resposta",
+                       ["rota", "resultado"])
+DURACAO = histograma("dashboard_api_segundos", "Tempo de resposta da API", ["rota"])
+
+
+class ErroConsulta(ValueError):
+    """Parâmetro de consulta inválido; vira uma resposta 400."""
+
+
+# ========================================
+# PARÂMETROS
+# ========================================
+
+
+def _numero(parametros, nome, tipo=float):
+    valor = parametros.get(nome)
+    if valor is None or valor == "":
+        return None
+    try:
+        numero = tipo(valor)
+    except ValueError:
+        raise ErroConsulta(f"'{nome}' deve ser numérico: {valor!r}")
+    if isinstance(numero, float) and not math.isfinite(numero):
+        raise ErroConsulta(f"'{nome}' deve ser finito: {valor!r}")
+    return numero
+
+
+def _intervalo(parametros, nome, tipo=float, limites=None):
+    minimo = _numero(parametros, f"{nome}_min", tipo)
+    maximo = _numero(parametros, f"{nome}_max", tipo)
+    if minimo is None and maximo is None:
+        return None
+    if limites is not None and any(v is not None and not limites[0] <= v <= limites[1] for v in (minimo, maximo)):
+        raise ErroConsulta(f"'{nome}_min' e '{nome}_max' devem estar entre {limites[0]} e {limites[1]}")
+    if minimo is not None and maximo is not None and minimo > maximo:
+        raise ErroConsulta(f"'{nome}_min' maior que '{nome}_max'")
+    return (minimo, maximo)
+
+
+def filtro_da_consulta(parametros):
+    """Monta o ``FiltroEventos`` a partir dos parâmetros da URL.
+
+    ``magnitude_min``/``magnitude_max``, ``profundidade_min``/``profundidade_max``,
+    ``ano_min``/``ano_max``, ``tsunami`` (0 ou 1), ``principais`` (0 ou 1) e
+    ``bbox=lat_min,lat_max,lon_min,lon_max``.
+    """
+    tsunami = _numero(parametros, "tsunami", int)
+    if tsunami not in (None, 0, 1):
+        raise ErroConsulta("'tsunami' deve ser 0 ou 1")
+
+    bbox = parametros.get("bbox")
+    if bbox:
+        try:
+            bbox = tuple(float(v) for v in bbox.split(","))
+        except ValueError:
+            raise ErroConsulta(f"'bbox' inválido: {bbox!r}")
+        if not all(math.isfinite(v) for v in bbox):
+            raise ErroConsulta("'bbox' deve ter valores finitos")
+        if len(bbox) != 4 or bbox[0] > bbox[1] or bbox[2] > bbox[3]:
+            raise ErroConsulta("'bbox' deve ser lat_min,lat_max,lon_min,lon_max")
+
+    return FiltroEventos(
+        magnitude=_intervalo(parametros, "magnitude"),
+        profundidade=_intervalo(parametros, "profundidade"),
+        tsunami=tsunami,
+        anos=_intervalo(parametros, "ano", int, (ANO_MINIMO, ANO_MAXIMO)),
+        bbox=bbox or None,
+        apenas_principais=parametros.get("principais") == "1",
+    )
+
+
+def _paginacao(parametros):
+    pagina = _numero(parametros, "pagina", int)
+    tamanho = _numero(parametros, "tamanho", int)
+    pagina = 1 if pagina is None else pagina
+    tamanho = TAMANHO_PAGINA_PADRAO if tamanho is None else tamanho
+    if pagina < 1 or not 1 <= tamanho <= TAMANHO_PAGINA_MAXIMO:
+        raise ErroConsulta(f"'pagina' deve ser ≥ 1 e 'tamanho' entre 1 e {TAMANHO_PAGINA_MAXIMO}")
+    return pagina, tamanho
+
+
+# ========================================
+# ROTAS
+# ========================================
+
+
+# Cada rota tem duas etapas: ``interpretar`` valida os parâmetros da URL e
+# devolve a consulta já interpretada (uma tupla de valores comparáveis), que
+# é a única coisa que entra na chave do cache e no ETag; ``consultar`` recebe
+# essa tupla. Parâmetros desconhecidos ficam de fora, e grafias diferentes
+# do mesmo valor (``6`` e ``6.0``) caem na mesma resposta.
+
+
+def _interpretar_eventos(parametros):
+    return (filtro_da_consulta(parametros), *_paginacao(parametros))
+
+
+def _consultar_eventos(catalogo, filtro, pagina, tamanho):
+    eventos = catalogo.backend.filtrar(filtro)
+    total = len(eventos)
+    trecho = eventos.iloc[(pagina - 1) * tamanho:pagina * tamanho]
+    trecho = trecho[[c for c in COLUNAS_RESPOSTA if c in trecho.columns]].reset_index(drop=True)
+    metadados = {
+        'total': total,
+        'pagina': pagina,
+        'tamanho': tamanho,
+        'paginas': max(1, math.ceil(total / tamanho)),
+    }
+    return trecho, metadados, 'eventos'
+
+
+def _interpretar_agregado_anual(parametros):
+    return (filtro_da_consulta(parametros),)
+
+
+def _consultar_agregado_anual(catalogo, filtro):
+    agregado = catalogo.backend.agregar_por_ano(filtro)
+    return agregado.reset_index(drop=True), {'total': len(agregado)}, 'anos'
+
+
+def _interpretar_risco(parametros):
+    nomes = []
+    for nome in ("pais", "estado", "municipio"):
+        if not parametros.get(nome):
+            break
+        nomes.append(parametros[nome])
+    return tuple(nomes)
+
+
+def _consultar_risco(catalogo, *nomes):
+    regioes = catalogo.derivado("regioes_risco", construir_regioes, persistir=True)
+    if nomes:
+        # Uma região pelo caminho (país, estado, município), sem percorrer a tabela
+        posicao = regioes.posicao(*nomes)
+        risco = regioes.tabela.iloc[[] if posicao is None else [posicao]]
+    else:
+        risco = regioes.raizes()
+    colunas = regioes.niveis + ['Risco_Terremoto', 'Risco_Tsunami', 'Risco_Combinado', 'Placa_Tectonica']
+    return risco[colunas].reset_index(drop=True), {'total': len(risco)}, 'paises'
+
+
+ROTAS = {
+    "/eventos": (_interpretar_eventos, _consultar_eventos),
+    "/agregados/anual": (_interpretar_agregado_anual, _consultar_agregado_anual),
+    "/risco": (_interpretar_risco, _consultar_risco),
+}
+
+
+def _corpo_json(tabela, metadados, nome, versao):
+    registros = json.loads(tabela.to_json(orient='records', force_ascii=False))
+    return json.dumps({'versao': versao, **metadados, nome: registros}, ensure_ascii=False).encode()
+
+
+def _corpo_arrow(tabela, metadados, versao):
+    import pyarrow as pa
+
+    dados = pa.Table.from_pandas(tabela, preserve_index=False)
+    dados = dados.replace_schema_metadata({
+        'versao': versao, **{chave: str(valor) for chave, valor in metadados.items()}
+    })
+    destino = io.BytesIO()
+    with pa.ipc.new_stream(destino, dados.schema) as escritor:
+        escritor.write_table(dados)
+    return destino.getvalue()
+
+
+def arrow_disponivel():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# ========================================
+# CACHE DE RESPOSTAS
+# ========================================
+
+
+class CacheRespostas:
+    """LRU de respostas prontas (corpo + tipo), protegido por trava."""
+
+    def __init__(self, capacidade):
+        self.capacidade = capacidade
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+
+    def obter(self, chave):
+        with self._trava:
+            item = self._itens.get(chave)
+            if item is None:
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return item
+
+    def guardar(self, chave, item):
+        if self.capacidade <= 0:
+            return
+        with self._trava:
+            self._itens[chave] = item
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.capacidade:
+                self._itens.popitem(last=False)
+
+
+def chave_consulta(rota, consulta, formato):
+    """Forma canônica da consulta já interpretada pela rota."""
+    return repr((rota, formato, consulta))
+
+
+def calcular_etag(versao, chave):
+    return f'"{versao}-{hashlib.sha1(chave.encode()).hexdigest()[:16]}"'
+
+
+# ========================================
+# SERVIDOR
+# ========================================
+
+
+class ManipuladorAPI(BaseHTTPRequestHandler):
+    # HTTP/1.1 mantém a conexão aberta entre requisições do mesmo cliente
+    protocol_version = "HTTP/1.1"
+    # Cabeçalho e corpo saem em escritas separadas; com o Nagle ativo, cada
+    # resposta esperaria o ACK atrasado do cliente (~40 ms)
+    disable_nagle_algorithm = True
+    server_version = "DashboardTerremotos/1.0"
+    cache = None
+
+    def log_message(self, formato, *args):
+        logger.debug("%s %s", self.address_string(), formato % args)
+
+    def _responder(self, status, corpo=b"", tipo="application/json", etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+            # O cliente pode guardar a resposta, mas deve revalidar a cada uso
+            self.send_header("Cache-Control", "no-cache")
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(corpo)
+
+    def _erro(self, status, mensagem):
+        self._responder(status, json.dumps({'erro': mensagem}, ensure_ascii=False).encode())
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        rota = url.path.rstrip("/") or "/"
+        if rota == ROTA_METRICAS:
+            return self._responder(HTTPStatus.OK, corpo_metricas(), TIPO_EXPOSICAO)
+
+        inicio = time.perf_counter()
+        resultado = self._atender(rota, dict(parse_qsl(url.query)))
+        # Rotas inexistentes num só rótulo: a URL não cria séries novas
+        rotulo = rota if rota in ROTAS or rota == "/versao" else "inexistente"
+        REQUISICOES.incrementar(rota=rotulo, resultado=resultado)
+        DURACAO.observar(time.perf_counter() - inicio, rota=rotulo)
+
+    def _atender(self, rota, parametros):
+        """Responde à consulta e retorna a origem da resposta, para as métricas."""
+        # Uma única versão do catálogo por requisição
+        catalogo = obter_catalogo()
+
+        if rota == "/versao":
+            corpo = {'versao': catalogo.versao, 'carregado_em': catalogo.carregado_em.isoformat(timespec="seconds"),
+                     'eventos': len(catalogo.eventos), 'backend': catalogo.backend.nome,
+                     'arrow': arrow_disponivel(), 'rotas': sorted(ROTAS)}
+            self._responder(HTTPStatus.OK, json.dumps(corpo).encode())
+            return "calculada"
+
+        if rota not in ROTAS:
+            self._erro(HTTPStatus.NOT_FOUND, f"Rota '{rota}' inexistente. Opções: {', '.join(sorted(ROTAS))}")
+            return "erro"
+
+        formato = parametros.pop("formato", None)
+        if formato is None:
+            formato = "arrow" if TIPO_ARROW in self.headers.get("Accept", "") else "json"
+        if formato not in ("json", "arrow"):
+            self._erro(HTTPStatus.BAD_REQUEST, "'formato' deve ser json ou arrow")
+            return "erro"
+        if formato == "arrow" and not arrow_disponivel():
+            self._erro(HTTPStatus.NOT_ACCEPTABLE, "Formato Arrow indisponível: instale o pacote pyarrow")
+            return "erro"
+
+        interpretar, consultar = ROTAS[rota]
+        try:
+            consulta = interpretar(parametros)
+        except ErroConsulta as erro:
+            self._erro(HTTPStatus.BAD_REQUEST, str(erro))
+            return "erro"
+
+        chave = chave_consulta(rota, consulta, formato)
+        etag = calcular_etag(catalogo.versao, chave)
+        candidatos = [v.strip() for v in self.headers.get("If-None-Match", "").split(",")]
+        if etag in candidatos or "*" in candidatos:
+            self._responder(HTTPStatus.NOT_MODIFIED, etag=etag)
+            return "nao_modificada"
+
+        resposta = self.cache.obter(etag)
+        origem = "cache"
+        if resposta is None:
+            origem = "calculada"
+            try:
+                tabela, metadados, nome = consultar(catalogo, *consulta)
+                if formato == "arrow":
+                    resposta = (_corpo_arrow(tabela, metadados, catalogo.versao), TIPO_ARROW)
+                else:
+                    resposta = (_corpo_json(tabela, metadados, nome, catalogo.versao), "application/json")
+            except Exception:
+                # Sem isto, a exceção sai do ``do_GET``: o cliente recebe a
+                # conexão fechada sem status e a requisição não é contada
+                logger.exception("Falha ao consultar %s %r", rota, consulta)
+                self._erro(HTTPStatus.INTERNAL_SERVER_ERROR, "Erro interno ao consultar o catálogo")
+                return "erro"
+            self.cache.guardar(etag, resposta)
+
+        corpo, tipo = resposta
+        self._responder(HTTPStatus.OK, corpo, tipo, etag)
+        return origem
+
+
+def criar_servidor(host="127.0.0.1", porta=None, capacidade_cache=None):
+    """Servidor com uma thread por conexão e cache de respostas próprio."""
+    capacidade = config.API_CACHE_RESPOSTAS if capacidade_cache is None else capacidade_cache
+    manipulador = type("ManipuladorAPI", (ManipuladorAPI,), {'cache': CacheRespostas(capacidade)})
+    servidor = ThreadingHTTPServer((host, config.API_PORTA if porta is None else porta), manipulador)
+    servidor.daemon_threads = True
+    return servidor
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="API HTTP local de consulta ao catálogo de terremotos.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=None, help=f"padrão: {config.API_PORTA}")
+    parser.add_argument("--cache", type=int, default=None, help="respostas mantidas no cache (0 desativa)")
+    argumentos = parser.parse_args()
+
+    # Carrega o catálogo antes de aceitar conexões
+    catalogo = obter_catalogo()
+    servidor = criar_servidor(argumentos.host, argumentos.porta, argumentos.cache)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    logger.info("API da versão %s em http://%s:%d", catalogo.versao, *servidor.server_address[:2])
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
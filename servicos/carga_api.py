@@ -0,0 +1,140 @@
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+
+from dados.catalogo import obter_catalogo
+
+# ========================================
+# TESTE DE CARGA DA API
+# ========================================
+# Dispara requisições de clientes simultâneos (uma thread e uma conexão
+# HTTP/1.1 por cliente) contra a API e mede a latência de cada uma, em
+# níveis crescentes de concorrência. As consultas são sorteadas de um
+# conjunto fixo, então parte delas encontra a resposta já em cache. Com
+# ``--revalidar`` o cliente reenvia o ETag recebido e conta os 304.
+#
+# Sem ``--url``, sobe a API nesta mesma máquina numa porta livre.
+
+
+def gerar_consultas(quantidade, semente=0):
+    """Consultas variadas sobre os limites do catálogo atual."""
+    limites = obter_catalogo().limites
+    gerador = np.random.default_rng(semente)
+    mag_min, mag_max = limites['magnitude']
+    ano_min, ano_max = limites['anos']
+
+    consultas = []
+    for i in range(quantidade):
+        tipo = i % 4
+        if tipo == 3:
+            consultas.append("/agregados/anual?" + urlencode({
+                'magnitude_min': round(gerador.uniform(mag_min, mag_max - 0.5), 1)
+            }))
+            continue
+        parametros = {'magnitude_min': round(gerador.uniform(mag_min, mag_max - 0.5), 1)}
+        if tipo >= 1:
+            inicio = int(gerador.integers(ano_min, ano_max))
+            parametros.update(ano_min=inicio, ano_max=int(gerador.integers(inicio, ano_max + 1)))
+        if tipo == 2:
+            lat, lon = gerador.uniform(-60, 30), gerador.uniform(-180, 120)
+            parametros['bbox'] = f"{lat:.1f},{lat + 30:.1f},{lon:.1f},{lon + 60:.1f}"
+        parametros['tamanho'] = 500
+        consultas.append("/eventos?" + urlencode(parametros))
+    return consultas
+
+
+def _cliente(host, porta, consultas, requisicoes, revalidar, semente, resultados):
+    gerador = np.random.default_rng(semente)
+    conexao = http.client.HTTPConnection(host, porta, timeout=60)
+    etags = {}
+    latencias, nao_modificadas, erros = [], 0, 0
+    for indice in gerador.integers(0, len(consultas), requisicoes):
+        caminho = consultas[indice]
+        cabecalhos = {'If-None-Match': etags[caminho]} if revalidar and caminho in etags else {}
+        inicio = time.perf_counter()
+        try:
+            conexao.request("GET", caminho, headers=cabecalhos)
+            resposta = conexao.getresponse()
+            resposta.read()
+        except (OSError, http.client.HTTPException):
+            erros += 1
+            conexao.close()
+            conexao = http.client.HTTPConnection(host, porta, timeout=60)
+            continue
+        latencias.append(time.perf_counter() - inicio)
+        if resposta.status == 304:
+            nao_modificadas += 1
+        elif resposta.status == 200:
+            etags[caminho] = resposta.getheader("ETag")
+        else:
+            erros += 1
+    conexao.close()
+    resultados.append((latencias, nao_modificadas, erros))
+
+
+def medir(host, porta, consultas, clientes, requisicoes, revalidar):
+    resultados = []
+    threads = [
+        threading.Thread(target=_cliente, args=(host, porta, consultas, requisicoes, revalidar, semente, resultados))
+        for semente in range(clientes)
+    ]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    segundos = time.perf_counter() - inicio
+
+    latencias = np.concatenate([np.asarray(r[0]) for r in resultados]) * 1000
+    return {
+        'clientes': clientes,
+        'requisicoes': int(len(latencias)),
+        'por_segundo': round(len(latencias) / segundos, 1),
+        'p50_ms': round(float(np.percentile(latencias, 50)), 2) if len(latencias) else None,
+        'p99_ms': round(float(np.percentile(latencias, 99)), 2) if len(latencias) else None,
+        'nao_modificadas': sum(r[1] for r in resultados),
+        'erros': sum(r[2] for r in resultados),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga da API de consulta (p50/p99 por concorrência).")
+    parser.add_argument("--url", default=None, help="API já em execução (padrão: sobe uma local)")
+    parser.add_argument("--concorrencia", default="1,2,4,8,16,32", help="níveis de clientes simultâneos")
+    parser.add_argument("--requisicoes", type=int, default=200, help="requisições por cliente em cada nível")
+    parser.add_argument("--consultas", type=int, default=64, help="consultas distintas sorteadas")
+    parser.add_argument("--revalidar", action="store_true", help="reenvia o ETag recebido (If-None-Match)")
+    parser.add_argument("--sem-cache", action="store_true", help="API local sem cache de respostas")
+    parser.add_argument("--json", default=None, help="grava os resultados neste arquivo")
+    argumentos = parser.parse_args()
+
+    if argumentos.url:
+        endereco = urlsplit(argumentos.url)
+        host, porta = endereco.hostname, endereco.port or 80
+    else:
+        from servicos.api import criar_servidor
+
+        servidor = criar_servidor(porta=0, capacidade_cache=0 if argumentos.sem_cache else None)
+        host, porta = servidor.server_address[:2]
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    consultas = gerar_consultas(argumentos.consultas)
+    print(f"{len(consultas)} consultas distintas, {argumentos.requisicoes} requisições por cliente"
+          f"{', revalidando ETags' if argumentos.revalidar else ''}")
+    print(f"{'clientes':>8} {'req':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'304':>6} {'erros':>6}")
+
+    niveis = []
+    for clientes in (int(c) for c in argumentos.concorrencia.split(",")):
+        nivel = medir(host, porta, consultas, clientes, argumentos.requisicoes, argumentos.revalidar)
+        niveis.append(nivel)
+        print(f"{nivel['clientes']:>8} {nivel['requisicoes']:>7} {nivel['por_segundo']:>9} "
+              f"{nivel['p50_ms']:>8} {nivel['p99_ms']:>8} {nivel['nao_modificadas']:>6} {nivel['erros']:>6}")
+
+    if argumentos.json:
+        with open(argumentos.json, "w", encoding="utf-8") as arquivo:
+            json.dump({'consultas': len(consultas), 'niveis': niveis}, arquivo, indent=2)
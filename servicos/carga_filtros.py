@@ -0,0 +1,268 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from dados import config
+from servicos.carga_sessoes import TEMPO_LIMITE_EXECUCAO, SessaoSimulada, _commit_atual, iniciar_servidor
+
+# ========================================
+# EXECUÇÕES POR GESTO NOS FILTROS
+# ========================================
+# Mede quantas execuções da página inteira cada gesto nos filtros da barra
+# lateral provoca, em cada modo de DASHBOARD_MODO_FILTROS. Um gesto é uma
+# sequência rápida de alterações (o usuário ajustando magnitude, depois
+# profundidade, marcando um toggle), com ``--intervalo`` segundos entre
+# elas. A sessão se comporta como o navegador:
+#
+#   - widget fora de formulário: cada alteração envia uma mensagem de rerun,
+#     com o ``fragment_id`` quando o widget está num fragmento;
+#   - widget num ``st.form``: nada é enviado até o clique em "Aplicar";
+#   - fragmentos com ``run_every``: a sessão repete o rerun do fragmento no
+#     intervalo pedido pelo servidor, como o temporizador do navegador.
+#
+# Cada modo roda num servidor próprio. O relatório traz, por página, as
+# execuções completas iniciadas, concluídas e interrompidas por gesto, as
+# execuções de fragmento e o tempo entre a última alteração e o fim da
+# última execução completa (quando o resultado aparece na tela).
+
+PAGINAS_FILTROS = ("", "analise_interativa", "mapa_geografico")
+TIPOS_FILTRO = ("slider", "selectbox", "checkbox", "toggle")
+
+
+class SessaoGestos(SessaoSimulada):
+    """Sessão que lê as mensagens do servidor continuamente enquanto envia alterações."""
+
+    def __init__(self, url, gerador):
+        super().__init__(url, [], gerador, 0)
+        self.conexao = None
+        self.temporizadores = {}
+        self.contagem = {'iniciadas': 0, 'concluidas': 0, 'fragmentos': 0}
+        self.em_execucao = False
+        self.ultima_completa = 0.0
+        self.execucao_concluida = asyncio.Event()
+        self._mensagens = []
+
+    async def _enviar(self, fragmento="", automatico=False, extras=()):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        mensagem = BackMsg()
+        mensagem.rerun_script.page_script_hash = self.paginas.get(self.pagina, "")
+        mensagem.rerun_script.widget_states.widgets.extend([*self.estados.values(), *extras])
+        mensagem.rerun_script.fragment_id = fragmento
+        mensagem.rerun_script.is_auto_rerun = automatico
+        await self.conexao.send(mensagem.SerializeToString())
+
+    async def _temporizador(self, fragmento, intervalo):
+        while True:
+            await asyncio.sleep(intervalo)
+            await self._enviar(fragmento, automatico=True)
+
+    async def _receber(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        from streamlit.testing.v1.element_tree import parse_tree_from_messages
+
+        while True:
+            resposta = ForwardMsg()
+            resposta.ParseFromString(await self.conexao.recv())
+            tipo = resposta.WhichOneof("type")
+            if tipo == "navigation":
+                self.paginas = {p.url_pathname: p.page_script_hash for p in resposta.navigation.app_pages}
+            elif tipo == "new_session" and not resposta.new_session.fragment_ids_this_run:
+                self.contagem['iniciadas'] += 1
+                self.em_execucao = True
+                self._mensagens = []
+            elif tipo == "auto_rerun" and resposta.auto_rerun.fragment_id not in self.temporizadores:
+                self.temporizadores[resposta.auto_rerun.fragment_id] = asyncio.create_task(
+                    self._temporizador(resposta.auto_rerun.fragment_id, resposta.auto_rerun.interval)
+                )
+            elif tipo == "delta" and resposta.delta.fragment_id:
+                elemento = resposta.delta.new_element
+                tipo_elemento = elemento.WhichOneof("type")
+                identificador = getattr(getattr(elemento, tipo_elemento), "id", None) if tipo_elemento else None
+                if identificador:
+                    self.fragmentos[identificador] = resposta.delta.fragment_id
+
+            if self.em_execucao:
+                self._mensagens.append(resposta)
+            if tipo != "script_finished":
+                continue
+            if resposta.script_finished == ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY:
+                self.contagem['fragmentos'] += 1
+            if resposta.script_finished != ForwardMsg.FINISHED_SUCCESSFULLY:
+                # Execuções interrompidas são contadas pela diferença entre
+                # iniciadas e concluídas
+                continue
+            self.em_execucao = False
+            self.contagem['concluidas'] += 1
+            self.ultima_completa = time.perf_counter()
+            self.arvore = parse_tree_from_messages(self._mensagens)
+            self.execucao_concluida.set()
+
+    async def _aguardar_execucao(self):
+        self.execucao_concluida.clear()
+        await asyncio.wait_for(self.execucao_concluida.wait(), TEMPO_LIMITE_EXECUCAO)
+
+    async def abrir(self, pagina):
+        import websockets
+
+        self.conexao = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+        self._leitor = asyncio.create_task(self._receber())
+        await self._enviar()
+        await self._aguardar_execucao()
+        if pagina:
+            self.pagina = pagina
+            await self._enviar()
+            await self._aguardar_execucao()
+
+    async def fechar(self):
+        for tarefa in [self._leitor, *self.temporizadores.values()]:
+            tarefa.cancel()
+        await self.conexao.close()
+
+    def _filtros(self):
+        return [
+            no for no in self.arvore.sidebar
+            if getattr(no, "type", None) in TIPOS_FILTRO and not getattr(no.proto, "disabled", False)
+        ]
+
+    async def gesto(self, alteracoes, intervalo, espera):
+        """Uma sequência de alterações nos filtros; retorna as contagens do gesto."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        filtros = self._filtros()
+        sliders = [w for w in filtros if w.type == "slider"]
+        inicio = dict(self.contagem)
+        formulario = None
+        ultima_alteracao = time.perf_counter()
+        for _ in range(alteracoes):
+            # Sliders na maioria das vezes: é neles que os valores se acumulam
+            candidatos = sliders if sliders and self.gerador.random() < 0.7 else filtros
+            widget = candidatos[int(self.gerador.integers(0, len(candidatos)))]
+            self.estados[widget.id] = self._novo_estado(widget)
+            if widget.proto.form_id:
+                formulario = widget.proto.form_id
+            else:
+                await self._enviar(self.fragmentos.get(widget.id, ""))
+                ultima_alteracao = time.perf_counter()
+            await asyncio.sleep(intervalo)
+        if formulario:
+            botao = next(
+                no for no in self.arvore.sidebar
+                if getattr(no, "type", None) == "button" and no.proto.form_id == formulario
+            )
+            await self._enviar(extras=[WidgetState(id=botao.id, trigger_value=True)])
+            ultima_alteracao = time.perf_counter()
+
+        # Terminou quando nenhuma execução completa começa por um intervalo
+        # maior que o da espera dos filtros
+        silencio = 3 * espera + 0.5
+        referencia = (self.contagem['iniciadas'], self.contagem['concluidas'])
+        desde = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.05)
+            atual = (self.contagem['iniciadas'], self.contagem['concluidas'])
+            if atual != referencia:
+                referencia, desde = atual, time.perf_counter()
+            elif not self.em_execucao and time.perf_counter() - desde >= silencio:
+                break
+            if time.perf_counter() - ultima_alteracao > TEMPO_LIMITE_EXECUCAO:
+                raise TimeoutError("O gesto não terminou dentro do tempo limite.")
+
+        medicao = {chave: self.contagem[chave] - inicio[chave] for chave in self.contagem}
+        medicao['interrompidas'] = medicao['iniciadas'] - medicao['concluidas']
+        medicao['segundos_ate_resultado'] = (
+            self.ultima_completa - ultima_alteracao if self.ultima_completa > ultima_alteracao else None
+        )
+        return medicao
+
+
+# ========================================
+# MEDIÇÃO POR MODO
+# ========================================
+
+
+async def medir_pagina(url, pagina, gestos, alteracoes, intervalo, espera, semente):
+    sessao = SessaoGestos(url, np.random.default_rng(semente))
+    await sessao.abrir(pagina)
+    try:
+        medicoes = [await sessao.gesto(alteracoes, intervalo, espera) for _ in range(gestos)]
+    finally:
+        await sessao.fechar()
+
+    tempos = [m['segundos_ate_resultado'] for m in medicoes if m['segundos_ate_resultado'] is not None]
+    return {
+        'gestos': gestos,
+        'alteracoes_por_gesto': alteracoes,
+        **{
+            f"{chave}_por_gesto": round(sum(m[chave] for m in medicoes) / gestos, 2)
+            for chave in ('iniciadas', 'concluidas', 'interrompidas', 'fragmentos')
+        },
+        'ate_resultado_p50_ms': round(float(np.percentile(tempos, 50)) * 1000, 1) if tempos else None,
+        'ate_resultado_max_ms': round(max(tempos) * 1000, 1) if tempos else None,
+    }
+
+
+def imprimir_modo(modo, paginas):
+    for pagina, resultado in paginas.items():
+        print(f"{modo:>9} {pagina or 'inicio':>20} {resultado['iniciadas_por_gesto']:>10} "
+              f"{resultado['concluidas_por_gesto']:>10} {resultado['interrompidas_por_gesto']:>12} "
+              f"{resultado['fragmentos_por_gesto']:>10} {resultado['ate_resultado_p50_ms'] or '-':>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Execuções da página por gesto nos filtros, por modo de filtros.")
+    parser.add_argument("--modos", default="imediato,lote,espera", help="valores de DASHBOARD_MODO_FILTROS")
+    parser.add_argument("--paginas", default=",".join(p or "inicio" for p in PAGINAS_FILTROS))
+    parser.add_argument("--gestos", type=int, default=5, help="gestos por página")
+    parser.add_argument("--alteracoes", type=int, default=8, help="alterações de filtro por gesto")
+    parser.add_argument("--intervalo", type=float, default=0.15, help="segundos entre alterações de um gesto")
+    parser.add_argument("--porta", type=int, default=8598)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", default=None, help="relatório JSON (padrão: .cache/carga/filtros-<data>-<commit>.json)")
+    argumentos = parser.parse_args()
+
+    paginas = [("" if p == "inicio" else p) for p in argumentos.paginas.split(",")]
+    url = f"ws://127.0.0.1:{argumentos.porta}/_stcore/stream"
+    print(f"{argumentos.alteracoes} alterações por gesto, {argumentos.intervalo} s entre elas, "
+          f"espera dos filtros {config.ESPERA_FILTROS} s")
+    print(f"{'modo':>9} {'página':>20} {'iniciadas':>10} {'concluídas':>10} {'interrompidas':>12} "
+          f"{'fragmentos':>10} {'resultado ms':>12}")
+
+    modos = {}
+    for modo in argumentos.modos.split(","):
+        servidor = iniciar_servidor(argumentos.porta, {'DASHBOARD_MODO_FILTROS': modo})
+        try:
+            modos[modo] = {
+                pagina or "inicio": asyncio.run(medir_pagina(
+                    url, pagina, argumentos.gestos, argumentos.alteracoes, argumentos.intervalo,
+                    config.ESPERA_FILTROS, argumentos.semente
+                ))
+                for pagina in paginas
+            }
+        finally:
+            servidor.terminate()
+            servidor.wait()
+        imprimir_modo(modo, modos[modo])
+
+    commit = _commit_atual()
+    relatorio = {
+        'gerado_em': datetime.now().isoformat(timespec="seconds"),
+        'commit': commit,
+        'parametros': {
+            'gestos': argumentos.gestos, 'alteracoes': argumentos.alteracoes,
+            'intervalo': argumentos.intervalo, 'espera_filtros': config.ESPERA_FILTROS,
+        },
+        'modos': modos,
+    }
+    saida = argumentos.saida or os.path.join(
+        config.DIRETORIO_CACHE, "carga", f"filtros-{datetime.now():%Y%m%d-%H%M%S}-{commit or 'sem-commit'}.json"
+    )
+    os.makedirs(os.path.dirname(saida) or ".", exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f"Relatório gravado em {saida}")
@@ -0,0 +1,393 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from dados import config
+
+# ========================================
+# TESTE DE CARGA DAS SESSÕES DO DASHBOARD
+# ========================================
+# Simula N usuários simultâneos contra UM processo ``streamlit run``: cada
+# sessão abre o WebSocket do Streamlit como o navegador faria, pede a
+# execução da página e interage com ela (arrasta sliders, troca selectbox,
+# radio e toggles, muda de página). A latência de cada interação vai do
+# envio da mensagem ao ``script_finished`` da execução correspondente.
+#
+# A memória do processo servidor é lida de /proc (RSS) durante cada nível;
+# a memória por sessão é o crescimento do RSS dividido pelo número de
+# sessões. O relatório em JSON pode ser comparado entre versões com
+# ``--comparar``.
+
+PAGINAS_PADRAO = ("", "visao_geral", "analise_interativa", "mapa_geografico", "probabilidade_pais")
+TIPOS_INTERAGIVEIS = ("slider", "selectbox", "radio", "checkbox", "toggle")
+CHANCE_TROCAR_PAGINA = 0.3
+TEMPO_LIMITE_EXECUCAO = 180
+
+
+def rss_mb(pid):
+    """RSS atual do processo, em MiB (Linux)."""
+    try:
+        with open(f"/proc/{pid}/status") as arquivo:
+            for linha in arquivo:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+# ========================================
+# SESSÃO SIMULADA
+# ========================================
+
+
+class SessaoSimulada:
+    """Um usuário: conexão WebSocket, página atual e valores dos widgets alterados."""
+
+    def __init__(self, url, paginas, gerador, pausa):
+        self.url = url
+        self.paginas_permitidas = paginas
+        self.gerador = gerador
+        self.pausa = pausa
+        self.paginas = {}
+        self.pagina = ""
+        self.estados = {}
+        # Widgets dentro de ``st.fragment``: o navegador reexecuta só o fragmento
+        self.fragmentos = {}
+        self.fragmento = ""
+        self.arvore = None
+        self.medicoes = []
+        self.erros = 0
+        self.ultimo_erro = None
+
+    async def _executar(self, conexao, rotulo):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        from streamlit.testing.v1.element_tree import Widget, parse_tree_from_messages
+
+        mensagem = BackMsg()
+        mensagem.rerun_script.page_script_hash = self.paginas.get(self.pagina, "")
+        mensagem.rerun_script.widget_states.widgets.extend(self.estados.values())
+        mensagem.rerun_script.fragment_id = self.fragmento
+
+        inicio = time.perf_counter()
+        await conexao.send(mensagem.SerializeToString())
+        recebidas = []
+        while True:
+            resposta = ForwardMsg()
+            resposta.ParseFromString(await asyncio.wait_for(conexao.recv(), TEMPO_LIMITE_EXECUCAO))
+            tipo = resposta.WhichOneof("type")
+            if tipo == "navigation":
+                self.paginas = {p.url_pathname: p.page_script_hash for p in resposta.navigation.app_pages}
+            recebidas.append(resposta)
+            if tipo == "script_finished":
+                break
+        segundos = time.perf_counter() - inicio
+
+        for resposta in recebidas:
+            if resposta.HasField("delta") and resposta.delta.fragment_id:
+                elemento = resposta.delta.new_element
+                tipo_elemento = elemento.WhichOneof("type")
+                identificador = getattr(getattr(elemento, tipo_elemento), "id", None) if tipo_elemento else None
+                if identificador:
+                    self.fragmentos[identificador] = resposta.delta.fragment_id
+
+        arvore = parse_tree_from_messages(recebidas)
+        falhou = len(arvore.exception) > 0
+        self.erros += falhou
+        if falhou:
+            self.ultimo_erro = f"{self.pagina or 'inicio'}: {arvore.exception[0].message}"
+        self.medicoes.append({
+            'pagina': self.pagina or "inicio", 'interacao': rotulo[0], 'widget': rotulo[1],
+            'fragmento': bool(self.fragmento), 'segundos': segundos, 'erro': falhou,
+        })
+        if self.fragmento:
+            # Execução parcial: o resto da página continua como estava
+            self.fragmento = ""
+            return
+        self.arvore = arvore
+        # Só os widgets presentes na página continuam sendo enviados
+        presentes = {no.id for no in self.arvore if isinstance(no, Widget)}
+        self.estados = {i: e for i, e in self.estados.items() if i in presentes}
+
+    def _novo_estado(self, widget):
+        """Valor sorteado para o widget, serializado como o navegador enviaria."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        gerador = self.gerador
+        estado = WidgetState(id=widget.id)
+        if widget.type == "slider":
+            proto = widget.proto
+            passos = max(1, int(round((proto.max - proto.min) / proto.step)))
+            valores = np.sort(proto.min + proto.step * gerador.integers(0, passos + 1, len(proto.default)))
+            estado.double_array_value.data[:] = np.round(valores, 6).tolist()
+        elif widget.type in ("selectbox", "radio"):
+            # As opções já chegam formatadas, e é o rótulo que o navegador devolve
+            estado.string_value = widget.options[int(gerador.integers(0, len(widget.options)))]
+        else:
+            estado.bool_value = bool(gerador.integers(0, 2))
+        return estado
+
+    def _proxima_interacao(self):
+        """Escolhe entre mudar de página e alterar um widget da página atual."""
+        candidatos = [
+            no for no in self.arvore
+            if getattr(no, "type", None) in TIPOS_INTERAGIVEIS and not getattr(no.proto, "disabled", False)
+            and not getattr(no.proto, "form_id", "")
+        ]
+        outras = [p for p in self.paginas_permitidas if p in self.paginas and p != self.pagina]
+        if outras and (not candidatos or self.gerador.random() < CHANCE_TROCAR_PAGINA):
+            self.pagina = outras[int(self.gerador.integers(0, len(outras)))]
+            return "troca_pagina", self.pagina or "inicio"
+
+        widget = candidatos[int(self.gerador.integers(0, len(candidatos)))]
+        self.estados[widget.id] = self._novo_estado(widget)
+        self.fragmento = self.fragmentos.get(widget.id, "")
+        return widget.type, widget.label
+
+    async def executar(self, interacoes):
+        import websockets
+
+        async with websockets.connect(self.url, subprotocols=["streamlit"], max_size=None) as conexao:
+            await self._executar(conexao, ("abertura", self.pagina or "inicio"))
+            for _ in range(interacoes):
+                if self.pausa:
+                    await asyncio.sleep(self.gerador.uniform(0, 2 * self.pausa))
+                await self._executar(conexao, self._proxima_interacao())
+
+
+# ========================================
+# NÍVEIS DE CONCORRÊNCIA
+# ========================================
+
+
+def _percentis(segundos):
+    if not segundos:
+        return {}
+    milissegundos = np.asarray(segundos) * 1000
+    return {f"p{p}_ms": round(float(np.percentile(milissegundos, p)), 1) for p in (50, 90, 99)} | {
+        'max_ms': round(float(milissegundos.max()), 1), 'interacoes': len(milissegundos)
+    }
+
+
+async def _amostrar_rss(pid, amostras, parar):
+    while not parar.is_set():
+        amostras.append(rss_mb(pid))
+        try:
+            await asyncio.wait_for(parar.wait(), 0.25)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def medir_nivel(url, pid, sessoes, interacoes, paginas, pausa, semente):
+    rss_inicio = rss_mb(pid) if pid else None
+    amostras, parar = [], asyncio.Event()
+    amostrador = asyncio.create_task(_amostrar_rss(pid, amostras, parar)) if pid else None
+
+    simuladas = [
+        SessaoSimulada(url, paginas, np.random.default_rng(semente + i), pausa) for i in range(sessoes)
+    ]
+    inicio = time.perf_counter()
+    resultados = await asyncio.gather(*(s.executar(interacoes) for s in simuladas), return_exceptions=True)
+    segundos = time.perf_counter() - inicio
+    # Logo após as sessões fecharem: quanto da memória do nível ficou retido
+    rss_fim = rss_mb(pid) if pid else None
+
+    if amostrador:
+        parar.set()
+        await amostrador
+    falhas_conexao = [r for r in resultados if isinstance(r, Exception)]
+
+    medicoes = [m for s in simuladas for m in s.medicoes]
+    por_pagina = {}
+    for medicao in medicoes:
+        por_pagina.setdefault(medicao['pagina'], []).append(medicao['segundos'])
+    por_tipo, por_widget = {}, {}
+    for medicao in medicoes:
+        por_tipo.setdefault(medicao['interacao'], []).append(medicao['segundos'])
+        if medicao['interacao'] not in ("abertura", "troca_pagina"):
+            rotulo = f"{medicao['pagina']} · {medicao['widget']}" + (" (fragmento)" if medicao['fragmento'] else "")
+            por_widget.setdefault(rotulo, []).append(medicao['segundos'])
+
+    pico = max((a for a in amostras if a is not None), default=None)
+    nivel = {
+        'sessoes': sessoes,
+        'segundos': round(segundos, 1),
+        'interacoes_por_segundo': round(len(medicoes) / segundos, 2),
+        **_percentis([m['segundos'] for m in medicoes]),
+        'erros_script': sum(s.erros for s in simuladas),
+        'falhas_sessao': len(falhas_conexao),
+        'rss_inicio_mb': round(rss_inicio, 1) if rss_inicio else None,
+        'rss_pico_mb': round(pico, 1) if pico else None,
+        'rss_fim_mb': round(rss_fim, 1) if rss_fim else None,
+        'memoria_por_sessao_mb': round((pico - rss_inicio) / sessoes, 2) if pico and rss_inicio else None,
+        'por_pagina': {pagina: _percentis(valores) for pagina, valores in sorted(por_pagina.items())},
+        'por_interacao': {tipo: _percentis(valores) for tipo, valores in sorted(por_tipo.items())},
+        'por_widget': {widget: _percentis(valores) for widget, valores in sorted(por_widget.items())},
+    }
+    if falhas_conexao:
+        nivel['exemplo_falha'] = repr(falhas_conexao[0])
+    erros = [s.ultimo_erro for s in simuladas if s.ultimo_erro]
+    if erros:
+        nivel['exemplo_erro'] = erros[0]
+    return nivel
+
+
+# ========================================
+# SERVIDOR E RELATÓRIO
+# ========================================
+
+
+def iniciar_servidor(porta, ambiente=None):
+    """Sobe ``streamlit run 01_app.py`` sem navegador e espera ficar saudável.
+
+    ``ambiente`` acrescenta variáveis (DASHBOARD_*) às do processo atual.
+    """
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", os.path.join(config.DIRETORIO_RAIZ, "01_app.py"),
+         "--server.headless", "true", "--server.port", str(porta), "--browser.gatherUsageStats", "false"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=config.DIRETORIO_RAIZ,
+        env={**os.environ, **(ambiente or {})}
+    )
+    for _ in range(120):
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{porta}/_stcore/health", timeout=1) as resposta:
+                if resposta.status == 200:
+                    return processo
+        except OSError:
+            time.sleep(0.5)
+    processo.terminate()
+    raise RuntimeError("O servidor Streamlit não respondeu em 60 s.")
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=config.DIRETORIO_RAIZ, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def imprimir_niveis(niveis, cabecalho=True):
+    if cabecalho:
+        print(f"{'sessões':>7} {'int/s':>7} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+              f"{'RSS MiB':>8} {'MiB/sessão':>10} {'erros':>6}")
+    for nivel in niveis:
+        print(f"{nivel['sessoes']:>7} {nivel['interacoes_por_segundo']:>7} {nivel.get('p50_ms', '-'):>8} "
+              f"{nivel.get('p90_ms', '-'):>8} {nivel.get('p99_ms', '-'):>8} {nivel['rss_pico_mb'] or '-':>8} "
+              f"{nivel['memoria_por_sessao_mb'] or '-':>10} {nivel['erros_script'] + nivel['falhas_sessao']:>6}")
+
+
+def comparar(caminho_base, caminho_novo):
+    """Variação percentual por nível entre dois relatórios."""
+    with open(caminho_base, encoding="utf-8") as arquivo:
+        base = json.load(arquivo)
+    with open(caminho_novo, encoding="utf-8") as arquivo:
+        novo = json.load(arquivo)
+
+    print(f"base: {base.get('commit')} ({base['gerado_em']})  novo: {novo.get('commit')} ({novo['gerado_em']})")
+    metricas = ('p50_ms', 'p99_ms', 'interacoes_por_segundo', 'rss_pico_mb', 'memoria_por_sessao_mb')
+    print(f"{'sessões':>7} " + " ".join(f"{m:>24}" for m in metricas))
+    niveis_base = {n['sessoes']: n for n in base['niveis']}
+    for nivel in novo['niveis']:
+        anterior = niveis_base.get(nivel['sessoes'])
+        if anterior is None:
+            continue
+        colunas = []
+        for metrica in metricas:
+            a, b = anterior.get(metrica), nivel.get(metrica)
+            variacao = f"{(b - a) / a * 100:+.0f}%" if a and b is not None else "-"
+            colunas.append(f"{a} → {b} ({variacao})")
+        print(f"{nivel['sessoes']:>7} " + " ".join(f"{c:>24}" for c in colunas))
+
+        # Por widget: o mesmo controle pode ter passado a reexecutar só o fragmento
+        widgets_base = {w.removesuffix(" (fragmento)"): v for w, v in anterior.get('por_widget', {}).items()}
+        for widget, valores in nivel.get('por_widget', {}).items():
+            a, b = widgets_base.get(widget.removesuffix(" (fragmento)"), {}).get('p50_ms'), valores.get('p50_ms')
+            if a and b is not None:
+                print(f"{'':>7}   {widget}: p50 {a} → {b} ms ({(b - a) / a * 100:+.0f}%)")
+
+
+async def _executar_niveis(url, pid, argumentos, paginas):
+    # Uma sessão percorre todas as páginas antes da medição: imports, catálogo
+    # e caches compartilhados não entram na conta da memória por sessão
+    aquecimento = SessaoSimulada(url, paginas, np.random.default_rng(argumentos.semente), 0)
+    await aquecimento.executar(0)
+    for pagina in paginas:
+        aquecimento.pagina = pagina
+        await aquecimento.executar(0)
+
+    imprimir_niveis([])
+    niveis = []
+    for sessoes in (int(n) for n in argumentos.sessoes.split(",")):
+        nivel = await medir_nivel(url, pid, sessoes, argumentos.interacoes, paginas, argumentos.pausa,
+                                  argumentos.semente)
+        niveis.append(nivel)
+        imprimir_niveis([nivel], cabecalho=False)
+    return niveis
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga com sessões simultâneas do dashboard.")
+    parser.add_argument("--sessoes", default="1,2,4,8,16", help="níveis de sessões simultâneas")
+    parser.add_argument("--interacoes", type=int, default=10, help="interações por sessão, além da abertura")
+    parser.add_argument("--pausa", type=float, default=0.5, help="pausa média (s) entre interações; 0 = sem pausa")
+    parser.add_argument("--paginas", default=",".join(p or "inicio" for p in PAGINAS_PADRAO),
+                        help="páginas visitadas (caminho da URL; 'inicio' para a página principal)")
+    parser.add_argument("--url", default=None, help="servidor já em execução (padrão: sobe um local)")
+    parser.add_argument("--pid", type=int, default=None, help="PID do servidor informado em --url, para medir o RSS")
+    parser.add_argument("--porta", type=int, default=8599, help="porta do servidor local")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", default=None, help="relatório JSON (padrão: .cache/carga/<data>-<commit>.json)")
+    parser.add_argument("--comparar", nargs=2, metavar=("BASE", "NOVO"), help="compara dois relatórios e sai")
+    argumentos = parser.parse_args()
+
+    if argumentos.comparar:
+        comparar(*argumentos.comparar)
+        sys.exit(0)
+
+    paginas = [("" if p == "inicio" else p) for p in argumentos.paginas.split(",")]
+    servidor = None
+    if argumentos.url:
+        endereco = urlsplit(argumentos.url)
+        url, pid = f"ws://{endereco.netloc}{endereco.path.rstrip('/')}/_stcore/stream", argumentos.pid
+    else:
+        servidor = iniciar_servidor(argumentos.porta)
+        url, pid = f"ws://127.0.0.1:{argumentos.porta}/_stcore/stream", servidor.pid
+
+    try:
+        print(f"{argumentos.interacoes} interações por sessão, pausa média {argumentos.pausa} s")
+        niveis = asyncio.run(_executar_niveis(url, pid, argumentos, paginas))
+    finally:
+        if servidor:
+            servidor.terminate()
+            servidor.wait()
+
+    commit = _commit_atual()
+    relatorio = {
+        'gerado_em': datetime.now().isoformat(timespec="seconds"),
+        'commit': commit,
+        'parametros': {
+            'interacoes': argumentos.interacoes, 'pausa': argumentos.pausa, 'paginas': paginas,
+            'semente': argumentos.semente, 'servidor_externo': bool(argumentos.url),
+        },
+        'niveis': niveis,
+    }
+    saida = argumentos.saida or os.path.join(
+        config.DIRETORIO_CACHE, "carga", f"{datetime.now():%Y%m%d-%H%M%S}-{commit or 'sem-commit'}.json"
+    )
+    os.makedirs(os.path.dirname(saida) or ".", exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f"Relatório gravado em {saida}")
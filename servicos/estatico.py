@@ -0,0 +1,449 @@
+import argparse
+import base64
+import glob
+import html
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import re
+import shutil
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from types import SimpleNamespace
+
+from dados import config
+from dados.catalogo import GerenciadorCatalogo, versao_arquivos
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# PACOTE ESTÁTICO DO DASHBOARD
+# ========================================
+# Cada página é executada sem navegador (``streamlit.testing``), com os
+# filtros no valor padrão, e os elementos exibidos são convertidos em HTML:
+# gráficos Plotly com a especificação embutida, tabelas, métricas e textos.
+# As páginas são renderizadas em paralelo, uma por processo.
+#
+# Estrutura gerada em ``config.DIRETORIO_ESTATICO``:
+#
+#   index.html            redireciona para a versão atual
+#   manifesto.json        versão publicada, horário e páginas
+#   <versao>/             uma pasta por versão dos dados
+#       plotly.min.js     biblioteca local: nenhum acesso externo
+#       <pagina>.html     página renderizada
+#       dados/<pagina>.json   gráficos, tabelas e métricas em JSON
+#
+# A pasta da versão é montada com outro nome e renomeada no fim; só então o
+# manifesto e o index.html são trocados. A versão anterior é mantida para
+# quem ainda estiver navegando nela.
+
+LINHAS_MAXIMAS_TABELA = 200
+TENTATIVAS_VERSAO = 3
+
+ESTILO = """
+body { font-family: "Source Sans Pro", Arial, sans-serif; margin: 0; color: #31333f; }
+nav { background: #f0f2f6; padding: 0.8rem 2rem; display: flex; gap: 1.2rem; flex-wrap: wrap; align-items: center; }
+nav a { color: #31333f; text-decoration: none; } nav a.atual { font-weight: bold; }
+nav .versao { margin-left: auto; font-size: 0.85rem; color: #808495; }
+main { max-width: 1200px; margin: 0 auto; padding: 1rem 2rem 3rem; }
+.linha { display: flex; gap: 1rem; } .coluna { flex: 1; min-width: 0; }
+.metrica .rotulo { font-size: 0.9rem; color: #808495; } .metrica .valor { font-size: 2rem; }
+.alerta { padding: 0.8rem 1rem; border-radius: 0.5rem; margin: 0.5rem 0; }
+.info { background: #e8f0fe; } .warning { background: #fffbe6; } .error { background: #fdecea; } .success { background: #e6f4ea; }
+.legenda { font-size: 0.85rem; color: #808495; }
+.tabela { max-height: 420px; overflow: auto; }
+table { border-collapse: collapse; font-size: 0.85rem; } th, td { padding: 0.25rem 0.6rem; border-bottom: 1px solid #e6e9ef; text-align: right; }
+img { max-width: 100%; }
+"""
+
+
+# ========================================
+# RENDERIZAÇÃO DE UMA PÁGINA (PROCESSO DE TRABALHO)
+# ========================================
+
+
+def listar_paginas():
+    """Scripts do dashboard na ordem do menu, com o nome do arquivo gerado."""
+    paginas = [(os.path.join(config.DIRETORIO_RAIZ, "01_app.py"), "index")]
+    for caminho in sorted(glob.glob(os.path.join(config.DIRETORIO_RAIZ, "pages", "*.py"))):
+        nome = os.path.splitext(os.path.basename(caminho))[0]
+        paginas.append((caminho, re.sub(r"^\d+_", "", nome)))
+    return paginas
+
+
+def _arquivos_de_midia():
+    """Guarda o armazenamento de mídia de cada execução para recuperar as imagens.
+
+    O ``AppTest`` cria um armazenamento em memória por execução e não o
+    expõe; sem isso as figuras do Matplotlib não teriam como ser copiadas.
+    """
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.testing.v1 import app_test
+
+    class ArmazenamentoRegistrado(MemoryMediaFileStorage):
+        ultimo = None
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            ArmazenamentoRegistrado.ultimo = self
+
+    app_test.MemoryMediaFileStorage = ArmazenamentoRegistrado
+    return ArmazenamentoRegistrado
+
+
+def _elementos(no, midia):
+    """Converte a árvore de elementos do ``AppTest`` em uma lista serializável."""
+    from streamlit.testing.v1.element_tree import Block, Column, Expander, Tab
+
+    resultado = []
+    for filho in no.children.values():
+        tipo = getattr(filho, "type", None)
+
+        if isinstance(filho, Expander):
+            resultado.append({"tipo": "expansor", "rotulo": filho.label, "filhos": _elementos(filho, midia)})
+        elif isinstance(filho, Tab):
+            resultado.append({"tipo": "expansor", "rotulo": filho.label, "filhos": _elementos(filho, midia)})
+        elif isinstance(filho, Column):
+            resultado.append({"tipo": "coluna", "filhos": _elementos(filho, midia)})
+        elif isinstance(filho, Block):
+            filhos = _elementos(filho, midia)
+            if filhos and all(f["tipo"] == "coluna" for f in filhos):
+                resultado.append({"tipo": "linha", "filhos": filhos})
+            else:
+                resultado.extend(filhos)
+        elif tipo in ("title", "subheader", "header", "markdown", "caption"):
+            resultado.append({"tipo": tipo, "texto": filho.value})
+        elif tipo in ("info", "warning", "error", "success"):
+            resultado.append({"tipo": "alerta", "nivel": tipo, "texto": filho.value})
+        elif tipo == "metric":
+            resultado.append({"tipo": "metrica", "rotulo": filho.label, "valor": filho.value})
+        elif tipo == "plotly_chart":
+            resultado.append({
+                "tipo": "grafico",
+                "figura": json.loads(filho.proto.spec),
+                "config": json.loads(filho.proto.config or "{}"),
+            })
+        elif tipo == "dataframe":
+            tabela = filho.value.head(LINHAS_MAXIMAS_TABELA)
+            resultado.append({"tipo": "tabela", "dados": json.loads(tabela.to_json(orient="split", force_ascii=False))})
+        elif tipo == "image":
+            for url in filho.value:
+                try:
+                    arquivo = midia.ultimo.get_file(url.rsplit("/", 1)[-1])
+                except Exception:
+                    logger.warning("Imagem %s não encontrada; omitida do pacote", url)
+                    continue
+                resultado.append({
+                    "tipo": "imagem",
+                    "dados": f"data:{arquivo.mimetype};base64,{base64.b64encode(arquivo.content).decode()}",
+                })
+        # Widgets (sliders, botões, formulários) não têm equivalente estático
+    return resultado
+
+
+def renderizar_pagina(caminho):
+    """Executa a página com os filtros padrão e devolve os elementos e a versão dos dados."""
+    logging.disable(logging.WARNING)
+    from streamlit.testing.v1 import AppTest
+
+    from dados import obter_catalogo
+
+    midia = _arquivos_de_midia()
+    app = AppTest.from_file(caminho, default_timeout=300).run()
+    if app.exception:
+        raise RuntimeError(f"{os.path.basename(caminho)}: {app.exception[0].value}")
+
+    elementos = _elementos(app.main, midia)
+    # A página inicial só tem título na barra lateral
+    titulos = [e["texto"] for e in elementos if e["tipo"] == "title"] + [t.value for t in app.sidebar.title]
+    titulo = titulos[0] if titulos else os.path.basename(caminho)
+    return {"titulo": titulo, "elementos": elementos, "versao": obter_catalogo().versao}
+
+
+# ========================================
+# CONVERSÃO PARA HTML
+# ========================================
+
+
+def _inline(texto):
+    texto = html.escape(texto)
+    texto = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", texto)
+    texto = re.sub(r"(?<!\*)\*(?!\s)(.+?)\*", r"<em>\1</em>", texto)
+    return re.sub(r"`(.+?)`", r"<code>\1</code>", texto)
+
+
+def markdown_simples(texto):
+    """Subconjunto de Markdown usado nas páginas: títulos, listas, negrito e separadores."""
+    blocos, paragrafo, itens = [], [], []
+
+    def fechar():
+        if paragrafo:
+            blocos.append(f"<p>{_inline(' '.join(paragrafo))}</p>")
+            paragrafo.clear()
+        if itens:
+            blocos.append("<ul>" + "".join(f"<li>{_inline(i)}</li>" for i in itens) + "</ul>")
+            itens.clear()
+
+    for linha in texto.strip().splitlines():
+        linha = linha.strip()
+        titulo = re.match(r"^(#{1,6})\s+(.*)$", linha)
+        if not linha:
+            fechar()
+        elif linha == "---":
+            fechar()
+            blocos.append("<hr>")
+        elif titulo:
+            fechar()
+            nivel = min(len(titulo.group(1)) + 1, 6)
+            blocos.append(f"<h{nivel}>{_inline(titulo.group(2))}</h{nivel}>")
+        elif re.match(r"^[-*]\s+", linha):
+            if paragrafo:
+                fechar()
+            itens.append(re.sub(r"^[-*]\s+", "", linha))
+        else:
+            if itens:
+                fechar()
+            paragrafo.append(linha)
+    fechar()
+    return "\n".join(blocos)
+
+
+def _json_em_script(objeto):
+    return json.dumps(objeto, ensure_ascii=False).replace("</", "<\\/")
+
+
+def _html_elementos(elementos, contador):
+    partes = []
+    for elemento in elementos:
+        tipo = elemento["tipo"]
+        if tipo == "title":
+            partes.append(f"<h1>{_inline(elemento['texto'])}</h1>")
+        elif tipo in ("header", "subheader"):
+            partes.append(f"<h2>{_inline(elemento['texto'])}</h2>")
+        elif tipo == "markdown":
+            partes.append(markdown_simples(elemento["texto"]))
+        elif tipo == "caption":
+            partes.append(f"<p class='legenda'>{_inline(elemento['texto'])}</p>")
+        elif tipo == "alerta":
+            partes.append(f"<div class='alerta {elemento['nivel']}'>{markdown_simples(elemento['texto'])}</div>")
+        elif tipo == "metrica":
+            partes.append(
+                f"<div class='metrica'><div class='rotulo'>{html.escape(elemento['rotulo'])}</div>"
+                f"<div class='valor'>{html.escape(str(elemento['valor']))}</div></div>"
+            )
+        elif tipo == "grafico":
+            identificador = f"grafico-{next(contador)}"
+            configuracao = {"responsive": True, **elemento["config"]}
+            partes.append(
+                f"<div id='{identificador}'></div><script>Plotly.newPlot('{identificador}', "
+                f"{_json_em_script(elemento['figura'].get('data', []))}, "
+                f"{_json_em_script(elemento['figura'].get('layout', {}))}, {_json_em_script(configuracao)});</script>"
+            )
+        elif tipo == "tabela":
+            dados = elemento["dados"]
+            cabecalho = "".join(f"<th>{html.escape(str(c))}</th>" for c in dados["columns"])
+            linhas = "".join(
+                "<tr>" + "".join(f"<td>{html.escape('' if v is None else str(v))}</td>" for v in linha) + "</tr>"
+                for linha in dados["data"]
+            )
+            partes.append(f"<div class='tabela'><table><thead><tr>{cabecalho}</tr></thead><tbody>{linhas}</tbody></table></div>")
+        elif tipo == "imagem":
+            partes.append(f"<img src='{elemento['dados']}' alt=''>")
+        elif tipo == "linha":
+            partes.append(f"<div class='linha'>{_html_elementos(elemento['filhos'], contador)}</div>")
+        elif tipo == "coluna":
+            partes.append(f"<div class='coluna'>{_html_elementos(elemento['filhos'], contador)}</div>")
+        elif tipo == "expansor":
+            partes.append(
+                f"<details><summary>{_inline(elemento['rotulo'])}</summary>"
+                f"{_html_elementos(elemento['filhos'], contador)}</details>"
+            )
+    return "\n".join(partes)
+
+
+def montar_html(pagina, nome, paginas, versao, gerado_em):
+    contador = iter(range(1_000_000))
+    menu = "".join(
+        f"<a href='{outro}.html'{' class=atual' if outro == nome else ''}>{_inline(titulo)}</a>"
+        for outro, titulo in paginas
+    )
+    return f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(pagina['titulo'])}</title>
+<script src="plotly.min.js"></script>
+<style>{ESTILO}</style>
+</head>
+<body>
+<nav>{menu}<span class="versao">📦 Versão dos dados {versao} · gerado em {gerado_em:%d/%m/%Y %H:%M}</span></nav>
+<main>
+{_html_elementos(pagina['elementos'], contador)}
+</main>
+</body>
+</html>
+"""
+
+
+def _dados_json(pagina, versao):
+    """Gráficos, tabelas e métricas da página em JSON, na ordem em que aparecem."""
+    graficos, tabelas, metricas = [], [], []
+
+    def coletar(elementos):
+        for elemento in elementos:
+            if elemento["tipo"] == "grafico":
+                graficos.append(elemento["figura"])
+            elif elemento["tipo"] == "tabela":
+                tabelas.append(elemento["dados"])
+            elif elemento["tipo"] == "metrica":
+                metricas.append({"rotulo": elemento["rotulo"], "valor": elemento["valor"]})
+            coletar(elemento.get("filhos", []))
+
+    coletar(pagina["elementos"])
+    return {"titulo": pagina["titulo"], "versao": versao, "metricas": metricas, "graficos": graficos, "tabelas": tabelas}
+
+
+# ========================================
+# EXPORTAÇÃO
+# ========================================
+
+
+def _gravar(caminho, conteudo):
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        arquivo.write(conteudo)
+    os.replace(temporario, caminho)
+
+
+def ler_manifesto(saida=None):
+    try:
+        with open(os.path.join(saida or config.DIRETORIO_ESTATICO, "manifesto.json"), encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except FileNotFoundError:
+        return None
+
+
+def _iniciar_trabalhador():
+    # Sem a thread de atualização, que só atrasaria o encerramento. O catálogo
+    # é criado depois, na primeira página, e lê o valor já alterado.
+    config.INTERVALO_ATUALIZACAO = 0.0
+
+
+def _renderizar_todas(paginas, trabalhadores):
+    # Processos novos a cada exportação: cada um lê a versão atual dos dados
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=trabalhadores or len(paginas), mp_context=contexto,
+                             initializer=_iniciar_trabalhador) as pool:
+        return list(pool.map(renderizar_pagina, [caminho for caminho, _ in paginas]))
+
+
+def exportar(saida=None, trabalhadores=None, forcar=False):
+    """Gera o pacote estático da versão atual dos dados e o publica.
+
+    Retorna o manifesto publicado. Sem ``forcar``, nada é refeito se o
+    manifesto já corresponde à versão atual dos arquivos.
+    """
+    saida = saida or config.DIRETORIO_ESTATICO
+    os.makedirs(saida, exist_ok=True)
+
+    manifesto = ler_manifesto(saida)
+    if not forcar and manifesto and manifesto["versao"] == versao_arquivos():
+        logger.info("Pacote estático já está na versão %s", manifesto["versao"])
+        return manifesto
+
+    paginas = listar_paginas()
+    for _ in range(TENTATIVAS_VERSAO):
+        inicio = time.perf_counter()
+        renderizadas = _renderizar_todas(paginas, trabalhadores)
+        versoes = {pagina["versao"] for pagina in renderizadas}
+        # Os dados mudaram no meio da exportação: as páginas precisam ser da mesma versão
+        if len(versoes) == 1:
+            break
+        logger.warning("Páginas renderizadas com versões diferentes %s; repetindo", sorted(versoes))
+    else:
+        raise RuntimeError("Os dados mudaram durante todas as tentativas de exportação.")
+
+    versao = versoes.pop()
+    gerado_em = datetime.now()
+    titulos = [(nome, pagina["titulo"]) for (_, nome), pagina in zip(paginas, renderizadas)]
+
+    temporario = os.path.join(saida, f".{versao}.{os.getpid()}.tmp")
+    shutil.rmtree(temporario, ignore_errors=True)
+    os.makedirs(os.path.join(temporario, "dados"))
+
+    import plotly
+    shutil.copy(os.path.join(os.path.dirname(plotly.__file__), "package_data", "plotly.min.js"), temporario)
+
+    for (_, nome), pagina in zip(paginas, renderizadas):
+        _gravar(os.path.join(temporario, f"{nome}.html"), montar_html(pagina, nome, titulos, versao, gerado_em))
+        _gravar(os.path.join(temporario, "dados", f"{nome}.json"),
+                json.dumps(_dados_json(pagina, versao), ensure_ascii=False))
+
+    destino = os.path.join(saida, versao)
+    shutil.rmtree(destino, ignore_errors=True)
+    os.replace(temporario, destino)
+
+    versao_anterior = manifesto["versao"] if manifesto else None
+    novo_manifesto = {
+        "versao": versao,
+        "gerado_em": gerado_em.isoformat(timespec="seconds"),
+        "segundos": round(time.perf_counter() - inicio, 1),
+        "paginas": [{"arquivo": f"{versao}/{nome}.html", "titulo": titulo} for nome, titulo in titulos],
+    }
+    _gravar(os.path.join(saida, "index.html"),
+            f"<!DOCTYPE html><meta charset='utf-8'><meta http-equiv='refresh' content='0; url={versao}/index.html'>"
+            f"<a href='{versao}/index.html'>Dashboard de Terremotos e Tsunamis</a>\n")
+    _gravar(os.path.join(saida, "manifesto.json"), json.dumps(novo_manifesto, ensure_ascii=False, indent=2))
+
+    # Mantém só a versão publicada e a imediatamente anterior
+    for pasta in os.listdir(saida):
+        caminho = os.path.join(saida, pasta)
+        if os.path.isdir(caminho) and not pasta.startswith(".") and pasta not in (versao, versao_anterior):
+            shutil.rmtree(caminho, ignore_errors=True)
+
+    logger.info("Pacote estático da versão %s gerado em %.1f s", versao, novo_manifesto["segundos"])
+    return novo_manifesto
+
+
+def observar(saida=None, trabalhadores=None, intervalo=None):
+    """Regenera o pacote sempre que uma nova versão dos arquivos de dados se estabiliza."""
+    versoes = queue.Queue()
+
+    # Só a versão (hash do conteúdo) é calculada aqui; as páginas montam o catálogo
+    gerenciador = GerenciadorCatalogo(
+        construir=lambda *arquivos: SimpleNamespace(versao=versao_arquivos(*arquivos)),
+        intervalo=intervalo
+    )
+    gerenciador.ao_publicar(lambda atual: versoes.put(atual.versao))
+    gerenciador.iniciar()
+
+    while True:
+        versoes.get()
+        try:
+            exportar(saida, trabalhadores)
+        except Exception:
+            logger.exception("Falha ao gerar o pacote estático; mantendo o anterior")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Gera o pacote estático (HTML/JSON) do dashboard.")
+    parser.add_argument("--saida", default=None, help=f"diretório de saída (padrão: {config.DIRETORIO_ESTATICO})")
+    parser.add_argument("--trabalhadores", type=int, default=None, help="processos em paralelo (padrão: um por página)")
+    parser.add_argument("--forcar", action="store_true", help="gera mesmo que a versão não tenha mudado")
+    parser.add_argument("--observar", action="store_true", help="continua rodando e regenera a cada nova versão")
+    argumentos = parser.parse_args()
+
+    if argumentos.observar:
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        observar(argumentos.saida, argumentos.trabalhadores)
+    else:
+        manifesto = exportar(argumentos.saida, argumentos.trabalhadores, argumentos.forcar)
+        print(f"Versão {manifesto['versao']}: {len(manifesto['paginas'])} páginas em "
+              f"{argumentos.saida or config.DIRETORIO_ESTATICO}")
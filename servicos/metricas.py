@@ -0,0 +1,167 @@
+import argparse
+import asyncio
+import logging
+import socket
+import sys
+import threading
+import urllib.request
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from dados import config
+from dados.metricas import REGISTRO
+
+logger = logging.getLogger(__name__)
+
+# ========================================
+# EXPOSIÇÃO DAS MÉTRICAS
+# ========================================
+# ``GET /metrics`` devolve o registro do processo (``dados/metricas.py``) no
+# formato de texto do Prometheus. No dashboard, o servidor sobe numa thread
+# na primeira execução de página do processo, em METRICAS_HOST:METRICAS_PORTA;
+# a API expõe a mesma rota na sua própria porta.
+#
+# Com vários processos do Streamlit no mesmo host, só o primeiro consegue a
+# porta; os demais registram um aviso e seguem sem expor (cada um deve
+# receber sua própria DASHBOARD_METRICAS_PORTA).
+
+ROTA_METRICAS = "/metrics"
+TIPO_EXPOSICAO = "text/plain; version=0.0.4; charset=utf-8"
+
+# Métricas que devem crescer sob carga (conferência do ``--conferir``)
+METRICAS_CONFERIDAS = (
+    "dashboard_execucoes_total",
+    "dashboard_execucao_segundos_count",
+    "dashboard_grafico_bytes_count",
+    "dashboard_payload_execucao_bytes_sum",
+    "dashboard_derivados_total",
+)
+
+
+def corpo_metricas():
+    return REGISTRO.expor().encode()
+
+
+class ManipuladorMetricas(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "DashboardTerremotos/1.0"
+
+    def log_message(self, formato, *args):
+        logger.debug("%s %s", self.address_string(), formato % args)
+
+    def do_GET(self):
+        if urlsplit(self.path).path.rstrip("/") != ROTA_METRICAS:
+            status, corpo, tipo = HTTPStatus.NOT_FOUND, f"Use {ROTA_METRICAS}\n".encode(), "text/plain"
+        else:
+            status, corpo, tipo = HTTPStatus.OK, corpo_metricas(), TIPO_EXPOSICAO
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+_servidor = None
+_tentou_iniciar = False
+_trava = threading.Lock()
+
+
+def iniciar_servidor_metricas(host=None, porta=None):
+    """Sobe o servidor de métricas uma vez por processo; None se desativado ou sem a porta."""
+    global _servidor, _tentou_iniciar
+    if _tentou_iniciar:
+        return _servidor
+    with _trava:
+        if _tentou_iniciar:
+            return _servidor
+        _tentou_iniciar = True
+        porta = config.METRICAS_PORTA if porta is None else porta
+        if porta <= 0:
+            return None
+        try:
+            servidor = ThreadingHTTPServer((host or config.METRICAS_HOST, porta), ManipuladorMetricas)
+        except OSError as erro:
+            logger.warning("Métricas não expostas na porta %d: %s", porta, erro)
+            return None
+        servidor.daemon_threads = True
+        threading.Thread(target=servidor.serve_forever, name="metricas", daemon=True).start()
+        logger.info("Métricas em http://%s:%d%s", *servidor.server_address[:2], ROTA_METRICAS)
+        _servidor = servidor
+    return _servidor
+
+
+def raspar(url):
+    """Séries de uma exposição em texto: {nome{rótulos}: valor}."""
+    with urllib.request.urlopen(url, timeout=10) as resposta:
+        texto = resposta.read().decode()
+    series = {}
+    for linha in texto.splitlines():
+        if linha and not linha.startswith("#"):
+            serie, _, valor = linha.rpartition(" ")
+            series[serie] = float(valor)
+    return series
+
+
+def somar(series, nome):
+    """Soma das séries de uma métrica, com quaisquer rótulos."""
+    return sum(valor for serie, valor in series.items() if serie.split("{")[0] == nome)
+
+
+def _porta_livre():
+    with socket.socket() as provisorio:
+        provisorio.bind(("127.0.0.1", 0))
+        return provisorio.getsockname()[1]
+
+
+if __name__ == "__main__":
+    import numpy as np
+
+    from servicos.carga_sessoes import PAGINAS_PADRAO, SessaoSimulada, iniciar_servidor, medir_nivel
+
+    parser = argparse.ArgumentParser(
+        description="Raspa as métricas do dashboard; com --conferir, confirma que elas andam sob carga."
+    )
+    parser.add_argument("--url", default=None,
+                        help=f"endereço das métricas (padrão: http://{config.METRICAS_HOST}:{config.METRICAS_PORTA}{ROTA_METRICAS})")
+    parser.add_argument("--conferir", action="store_true",
+                        help="sobe um dashboard local, raspa antes e depois de uma rodada do teste de carga")
+    parser.add_argument("--sessoes", type=int, default=2)
+    parser.add_argument("--interacoes", type=int, default=4)
+    argumentos = parser.parse_args()
+
+    if not argumentos.conferir:
+        url = argumentos.url or f"http://{config.METRICAS_HOST}:{config.METRICAS_PORTA}{ROTA_METRICAS}"
+        with urllib.request.urlopen(url, timeout=10) as resposta:
+            sys.stdout.write(resposta.read().decode())
+        sys.exit(0)
+
+    porta, porta_metricas = _porta_livre(), _porta_livre()
+    url_metricas = f"http://127.0.0.1:{porta_metricas}{ROTA_METRICAS}"
+    servidor = iniciar_servidor(porta, {"DASHBOARD_METRICAS_PORTA": str(porta_metricas)})
+    url = f"ws://127.0.0.1:{porta}/_stcore/stream"
+    paginas = list(PAGINAS_PADRAO)
+    try:
+        # A primeira execução de página sobe o servidor de métricas
+        asyncio.run(SessaoSimulada(url, paginas, np.random.default_rng(0), 0).executar(0))
+        antes = raspar(url_metricas)
+        nivel = asyncio.run(medir_nivel(url, servidor.pid, argumentos.sessoes, argumentos.interacoes,
+                                        paginas, 0, 0))
+        depois = raspar(url_metricas)
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+    print(f"{argumentos.sessoes} sessões × {argumentos.interacoes} interações "
+          f"({nivel['erros_script'] + nivel['falhas_sessao']} erros)")
+    print(f"{'métrica':<40} {'antes':>14} {'depois':>14} {'variação':>14}")
+    paradas = []
+    for nome in METRICAS_CONFERIDAS:
+        a, b = somar(antes, nome), somar(depois, nome)
+        print(f"{nome:<40} {a:>14,.0f} {b:>14,.0f} {b - a:>+14,.0f}")
+        if b <= a:
+            paradas.append(nome)
+    if paradas:
+        print(f"Métricas que não andaram sob carga: {', '.join(paradas)}")
+        sys.exit(1)
+    print("Todas as métricas conferidas andaram sob carga.")
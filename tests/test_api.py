@@ -0,0 +1,81 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from servicos.api import ROTAS, ErroConsulta, chave_consulta, filtro_da_consulta
+
+
+@pytest.mark.parametrize("parametros", [
+    {"bbox": "nan,10,0,10"},
+    {"bbox": "0,inf,0,10"},
+    {"bbox": "-inf,10,0,10"},
+    {"magnitude_min": "nan"},
+    {"profundidade_max": "inf"},
+])
+def test_valores_nao_finitos_sao_rejeitados(parametros):
+    with pytest.raises(ErroConsulta):
+        filtro_da_consulta(parametros)
+
+
+def _chave(rota, parametros):
+    interpretar, _ = ROTAS[rota]
+    return chave_consulta(rota, interpretar(parametros), "json")
+
+
+@pytest.mark.parametrize("rota", ["/eventos", "/agregados/anual"])
+def test_chave_ignora_parametros_desconhecidos(rota):
+    base = {"magnitude_min": "6", "bbox": "-10,10,100,120"}
+    esperada = _chave(rota, base)
+    assert _chave(rota, {**base, "cb": "123"}) == esperada
+    assert _chave(rota, {**base, "x": "qualquer"}) == esperada
+    assert _chave(rota, {"bbox": "-10,10,100,120", "magnitude_min": "6.0"}) == esperada
+    assert _chave(rota, {**base, "magnitude_min": "6.5"}) != esperada
+
+
+def test_chave_de_eventos_inclui_paginacao():
+    assert _chave("/eventos", {"pagina": "2"}) != _chave("/eventos", {})
+    assert _chave("/eventos", {"pagina": "1", "tamanho": "1000"}) == _chave("/eventos", {})
+
+
+def test_chave_de_risco_usa_so_o_caminho_da_regiao():
+    assert _chave("/risco", {"pais": "Japão", "cb": "1"}) == _chave("/risco", {"pais": "Japão"})
+    # Sem país, estado e município não valem (mesma regra da consulta)
+    assert _chave("/risco", {"estado": "X"}) == _chave("/risco", {})
+
+
+@pytest.mark.parametrize("parametros", [
+    {"ano_min": "99999999999999999999"},
+    {"ano_max": "0"},
+    {"ano_min": "-5", "ano_max": "2000"},
+])
+def test_anos_fora_dos_limites_sao_rejeitados(parametros):
+    with pytest.raises(ErroConsulta):
+        filtro_da_consulta(parametros)
+
+
+def _erros_contados(api, rota):
+    return api.REQUISICOES._series.get(api.REQUISICOES._chave({'rota': rota, 'resultado': "erro"}), 0)
+
+
+def test_falha_na_consulta_vira_500_contado(monkeypatch):
+    from servicos import api
+
+    def falhar(catalogo, filtro):
+        raise OverflowError("teste")
+
+    monkeypatch.setitem(api.ROTAS, "/agregados/anual", (api._interpretar_agregado_anual, falhar))
+    servidor = api.criar_servidor(porta=0, capacidade_cache=0)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    antes = _erros_contados(api, "/agregados/anual")
+    try:
+        with pytest.raises(urllib.error.HTTPError) as erro:
+            urllib.request.urlopen(f"http://127.0.0.1:{servidor.server_address[1]}/agregados/anual")
+        assert erro.value.code == 500
+        assert "erro" in json.loads(erro.value.read())
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+    assert _erros_contados(api, "/agregados/anual") == antes + 1
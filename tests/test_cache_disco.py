@@ -0,0 +1,45 @@
+import pytest
+
+from dados import cache_disco, config
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return cache_disco.CacheDisco(str(tmp_path / "derivados"), 2**20)
+
+
+def test_parametro_diferente_nao_le_artefato_antigo(cache, monkeypatch):
+    cache.gravar(("v1", "amostra_estratificada"), "antigo")
+    assert cache.obter(("v1", "amostra_estratificada")) == "antigo"
+
+    monkeypatch.setattr(config, "FRACAO_AMOSTRA", config.FRACAO_AMOSTRA * 2)
+    with pytest.raises(KeyError):
+        cache.obter(("v1", "amostra_estratificada"))
+
+
+def test_arquivo_de_entrada_alterado_nao_le_artefato_antigo(cache, monkeypatch, tmp_path):
+    monkeypatch.setattr(cache_disco, "VERIFICAR_ARQUIVOS_A_CADA_S", 0)
+    limites = tmp_path / "limites_placas.csv"
+    limites.write_text("Limite,Tipo,latitude,longitude\nA,subducção,0,0\n")
+    monkeypatch.setattr(config, "ARQUIVO_LIMITES_PLACAS", str(limites))
+    cache.gravar(("v1", "limites_placas"), "antigo")
+    assert cache.obter(("v1", "limites_placas")) == "antigo"
+
+    limites.write_text("Limite,Tipo,latitude,longitude\nA,subducção,0,0\nA,subducção,1,1\n")
+    with pytest.raises(KeyError):
+        cache.obter(("v1", "limites_placas"))
+
+
+def test_parametro_de_operacao_mantem_a_chave(cache, monkeypatch):
+    cache.gravar(("v1", "regioes_risco"), "valor")
+    monkeypatch.setattr(config, "METRICAS_PORTA", config.METRICAS_PORTA + 1)
+    assert cache.obter(("v1", "regioes_risco")) == "valor"
+
+
+def test_chave_nao_confere_arquivos_a_cada_consulta(monkeypatch):
+    cache_disco.assinatura_entradas()
+    conferidos = []
+    monkeypatch.setattr(cache_disco, "_hash_arquivo", lambda caminho: conferidos.append(caminho))
+    for _ in range(100):
+        cache_disco.CacheDisco.chave(("v1", "regioes_risco"))
+    assert conferidos == []
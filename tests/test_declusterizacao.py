@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analise.declusterizacao import (
+    _catalogo_sintetico, _haversine_km, declusterizar, janela_distancia_km, janela_tempo_dias, tempo_em_dias
+)
+from dados import config
+
+
+def gardner_knopoff_exaustivo(eventos, fracao_precursores=0.0):
+    """Mesma varredura de ``declusterizar``, comparando cada evento com todos os outros."""
+    lat = eventos['latitude'].to_numpy(dtype=np.float64)
+    lon = eventos['longitude'].to_numpy(dtype=np.float64)
+    magnitude = eventos['magnitude'].to_numpy(dtype=np.float64)
+    t = tempo_em_dias(eventos)
+    raio = janela_distancia_km(magnitude)
+    duracao = janela_tempo_dias(magnitude)
+    n = len(eventos)
+
+    sequencia = np.lexsort((t, -magnitude))
+    posicao = np.empty(n, dtype=np.int64)
+    posicao[sequencia] = np.arange(n)
+    grupo = np.arange(n)
+    atribuido = np.zeros(n, dtype=bool)
+    for i in sequencia:
+        if atribuido[i]:
+            continue
+        atribuido[i] = True
+        intervalo = t - t[i]
+        janela = (
+            (intervalo >= -fracao_precursores * duracao[i]) & (intervalo <= duracao[i])
+            & (_haversine_km(lat[i], lon[i], lat, lon) <= raio[i])
+            & ~atribuido & (posicao > posicao[i])
+        )
+        atribuido[janela] = True
+        grupo[janela] = i
+    return grupo
+
+
+def _comparar(eventos, fracao_precursores=0.0):
+    resultado = declusterizar(eventos, fracao_precursores)
+    esperado = gardner_knopoff_exaustivo(eventos, fracao_precursores)
+    np.testing.assert_array_equal(resultado['grupo'].to_numpy(), esperado)
+    np.testing.assert_array_equal(resultado['principal'].to_numpy(), esperado == np.arange(len(eventos)))
+
+
+def test_catalogo_do_dashboard():
+    _comparar(pd.read_csv(config.ARQUIVO_EVENTOS))
+
+
+def test_evento_de_2001_nao_e_replica_de_2022():
+    eventos = pd.read_csv(config.ARQUIVO_EVENTOS)
+    resultado = declusterizar(eventos)
+    alvo = ((eventos['Year'] == 2001) & (eventos['Month'] == 12)
+            & np.isclose(eventos['latitude'], -9.613) & np.isclose(eventos['longitude'], 159.53))
+    assert alvo.sum() == 1
+    assert resultado.loc[alvo, 'principal'].all()
+
+
+@pytest.mark.parametrize("fracao_precursores", [0.0, 0.5])
+def test_catalogo_sintetico(fracao_precursores):
+    _comparar(_catalogo_sintetico(3000, semente=1), fracao_precursores)
+
+
+def test_altas_latitudes_e_antimeridiano():
+    # Janelas que cobrem a grade inteira de longitudes perto dos polos e eventos dos dois lados de ±180°
+    gerador = np.random.default_rng(2)
+    n = 1500
+    eventos = pd.DataFrame({
+        'latitude': np.concatenate([gerador.uniform(84, 90, n // 3), gerador.uniform(-90, -84, n // 3),
+                                    gerador.uniform(-10, 10, n - 2 * (n // 3))]),
+        'longitude': np.concatenate([gerador.uniform(-180, 180, 2 * (n // 3)),
+                                     gerador.choice([-179.8, 179.8], n - 2 * (n // 3))]),
+        'magnitude': 6.0 + gerador.exponential(0.7, n),
+        'Year': gerador.integers(1990, 2024, n),
+        'Month': gerador.integers(1, 13, n),
+    })
+    _comparar(eventos)
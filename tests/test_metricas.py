@@ -0,0 +1,37 @@
+from streamlit.testing.v1 import AppTest
+
+
+def _pagina_com_grafico(sem_gancho):
+    import numpy as np
+    import plotly.graph_objects as go
+    import streamlit as st
+    from types import SimpleNamespace
+
+    from componentes import metricas
+
+    if sem_gancho:
+        # Contexto de uma versão do Streamlit sem ``_enqueue``
+        metricas.get_script_run_ctx = lambda: SimpleNamespace()
+    st.session_state[metricas.CHAVE_EXECUCAO] = {'pagina': "teste", 'inicio': 0.0, 'bytes': 0, 'concluida': False}
+    figura = go.Figure(go.Scatter(x=np.arange(2000), y=np.sin(np.arange(2000) / 50)))
+    metricas.grafico(figura)
+    st.session_state['serializado'] = metricas._tamanho_serializado(figura)
+
+
+def _executar(sem_gancho):
+    app = AppTest.from_function(_pagina_com_grafico, args=(sem_gancho,), default_timeout=60).run()
+    assert not app.exception
+    return app, app.session_state["_metricas_execucao"]['bytes']
+
+
+def test_bytes_medidos_sao_os_da_mensagem_da_figura():
+    app, medido = _executar(sem_gancho=False)
+    especificacao = len(app.get("plotly_chart")[0].proto.spec)
+    # A mensagem leva a especificação da figura mais os campos do elemento (a
+    # medida pela figura serializada daria exatamente o tamanho da especificação)
+    assert especificacao < medido <= especificacao + 1024
+
+
+def test_sem_gancho_mede_a_figura_serializada():
+    app, medido = _executar(sem_gancho=True)
+    assert medido == app.session_state['serializado']
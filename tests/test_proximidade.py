@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from analise.proximidade import contar_eventos_no_raio
+from analise.vizinhos import distancia_haversine_km
+
+
+def contar_exaustivo(latitude, longitude, lat_pontos, lon_pontos, raio_km):
+    distancias = distancia_haversine_km(lat_pontos[:, None], lon_pontos[:, None], latitude[None, :], longitude[None, :])
+    return (distancias <= raio_km).sum(axis=1)
+
+
+@pytest.fixture(scope="module")
+def eventos():
+    gerador = np.random.default_rng(0)
+    n = 20_000
+    return np.degrees(np.arcsin(gerador.uniform(-1, 1, n))), gerador.uniform(-180, 180, n)
+
+
+@pytest.mark.parametrize("raio_km", [100, 300, 1000, 3000, 4000, 5000])
+def test_pontos_espalhados(eventos, raio_km):
+    gerador = np.random.default_rng(1)
+    lat_pontos = np.degrees(np.arcsin(gerador.uniform(-1, 1, 300)))
+    lon_pontos = gerador.uniform(-180, 180, 300)
+    np.testing.assert_array_equal(
+        contar_eventos_no_raio(*eventos, lat_pontos, lon_pontos, raio_km, trabalhadores=1),
+        contar_exaustivo(*eventos, lat_pontos, lon_pontos, raio_km)
+    )
+
+
+@pytest.mark.parametrize("raio_km", [50, 300, 2000])
+def test_altas_latitudes(eventos, raio_km):
+    # Eventos e pontos perto dos polos e do antimeridiano
+    gerador = np.random.default_rng(2)
+    latitude = np.concatenate([eventos[0], gerador.uniform(80, 90, 2000), gerador.uniform(-90, -80, 2000)])
+    longitude = np.concatenate([eventos[1], gerador.uniform(-180, 180, 4000)])
+    lat_pontos = np.concatenate([[87.9, -87.9, 89.99, -89.99], gerador.uniform(75, 90, 100), gerador.uniform(-90, -75, 100)])
+    lon_pontos = np.concatenate([[0.0, 179.9, -180.0, 45.0], gerador.uniform(-180, 180, 200)])
+    np.testing.assert_array_equal(
+        contar_eventos_no_raio(latitude, longitude, lat_pontos, lon_pontos, raio_km, trabalhadores=1),
+        contar_exaustivo(latitude, longitude, lat_pontos, lon_pontos, raio_km)
+    )